@@ -0,0 +1,29 @@
+"""ベンチマーク共通の初期化。Blender の外では fake_bpy を bpy として読み込む。"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+FAKE_BPY_DIR = Path(__file__).resolve().parent / "fake_bpy"
+
+
+def setup():
+    """bpy（実物または代替）とアドオンを読み込み、登録済みの状態にする。"""
+    try:
+        import bpy
+    except ImportError:
+        sys.path.insert(0, str(FAKE_BPY_DIR))
+        import bpy
+    packages = str(ROOT / "packages")
+    if packages not in sys.path:
+        sys.path.insert(0, packages)
+
+    import garment_pattern_uv
+
+    if not hasattr(bpy.types.Scene, "garment_uv"):
+        garment_pattern_uv.register()
+    return bpy
+
+
+def is_fake(bpy):
+    return Path(getattr(bpy, "__file__", "") or "").is_relative_to(FAKE_BPY_DIR)
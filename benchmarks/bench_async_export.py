@@ -0,0 +1,108 @@
+"""バックグラウンドエクスポート（ExportJob）でメインスレッドが止まる時間を計測する。
+
+25 万頂点の衣服を、キャッシュの無い状態から次の 2 通りで JSON に書き出す。
+
+- sync: 従来の execute と同じ手順（読み出し・絞り込み・検証・書き込みをすべて UI スレッドで）
+- job: モーダルオペレーターと同じく、タイマーの代わりに step() を間隔を空けて呼ぶ
+
+job ではメインスレッドで過ごした合計時間と、1 回で最も長く止めた時間（UI が固まる
+時間の目安）を表示する。書き出した JSON が同じになることと、中断した場合に既存の
+ファイルが残ることも確かめる。
+
+    blender --background --factory-startup --python benchmarks/bench_async_export.py
+    python benchmarks/bench_async_export.py
+"""
+
+import filecmp
+import os
+import tempfile
+import time
+
+import _harness
+
+bpy = _harness.setup()
+
+import synthetic  # noqa: E402
+from garment_pattern_uv.core.membership import invalidate_membership  # noqa: E402
+from garment_pattern_uv.core.topology import invalidate_topology  # noqa: E402
+from garment_pattern_uv.core.uv_metrics import invalidate_uv_mesh  # noqa: E402
+from garment_pattern_uv.data_io import (  # noqa: E402
+    _props_to_dict_for_objects,
+    _validate_data_dict,
+    _write_json,
+)
+from garment_pattern_uv.export_job import ExportJob  # noqa: E402
+
+SPEC = synthetic.GarmentSpec("async_250k", 250_000, 40, 6, 48, 0.5, reasoning_length=400)
+TIMER_INTERVAL = 0.05
+
+
+def _invalidate():
+    for invalidate in (invalidate_membership, invalidate_topology, invalidate_uv_mesh):
+        invalidate()
+
+
+def _sync(props, obj, path):
+    _invalidate()
+    start = time.perf_counter()
+    data = _props_to_dict_for_objects(props, [obj])
+    if _validate_data_dict(data):
+        raise AssertionError("synthetic garment does not validate")
+    _write_json(path, data)
+    return time.perf_counter() - start
+
+
+def _job(props, obj, path, cancel_after=None):
+    """step() を TIMER_INTERVAL ごとに呼び、メインスレッドで使った時間を集める。"""
+    _invalidate()
+    start = time.perf_counter()
+    job = ExportJob(props, [obj], path)
+    steps = [time.perf_counter() - start]
+    while not job.done:
+        if cancel_after is not None and len(steps) >= cancel_after:
+            job.cancel()
+        time.sleep(TIMER_INTERVAL)
+        step_start = time.perf_counter()
+        job.step()
+        steps.append(time.perf_counter() - step_start)
+    return time.perf_counter() - start, steps, job
+
+
+def main():
+    obj, _ = synthetic.build_garment(bpy, SPEC)
+    scene = bpy.context.scene
+    scene.collection.objects.link(obj)
+    props = scene.garment_uv
+    synthetic.fill_annotation(props, obj, SPEC)
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            sync_path = os.path.join(root, "sync.json")
+            job_path = os.path.join(root, "job.json")
+            sync_time = _sync(props, obj, sync_path)
+            total, steps, job = _job(props, obj, job_path)
+            if job.status != "FINISHED":
+                raise AssertionError(f"job ended with {job.status}: {job.error}")
+            if not filecmp.cmp(sync_path, job_path, shallow=False):
+                raise AssertionError("background export differs from the synchronous export")
+
+            _, _, cancelled = _job(props, obj, sync_path, cancel_after=3)
+            if cancelled.status != "CANCELLED" or not filecmp.cmp(
+                sync_path, job_path, shallow=False
+            ):
+                raise AssertionError("cancelled export touched the existing file")
+            if any(name.endswith(".tmp") for name in os.listdir(root)):
+                raise AssertionError("cancelled export left a temporary file behind")
+
+        main_thread = sum(steps)
+        print(f"{SPEC.name}: {len(obj.data.vertices)} vertices, {len(obj.data.loops)} loops")
+        print(f"  sync export (UI blocked)  {sync_time * 1000:>9.1f} ms")
+        print(f"  job wall time             {total * 1000:>9.1f} ms ({len(steps)} ticks)")
+        print(f"  job main thread, total    {main_thread * 1000:>9.1f} ms")
+        print(f"  job main thread, longest  {max(steps) * 1000:>9.1f} ms")
+    finally:
+        scene.collection.objects.unlink(obj)
+        synthetic.remove_garment(bpy, obj)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""列指向形式（.gpuvc）と JSONL データセットの読み出しを比べる。
+
+10 万着分の合成レコード（UV 指標付き）を JSONL データセットとして書き、
+scripts/convert_dataset.py と同じ手順で .gpuvc に変換してから、次を計測する。
+
+- 全件の読み出し: JSONL の解析と、.gpuvc から dict への復元
+- 学習時の典型的な読み方: 種類で絞ってパーツの UV 指標を配列で取り出す
+  （JSONL は全件を解析する必要があり、.gpuvc は memmap した列を引くだけ）
+
+.gpuvc から戻したレコードが元のレコードと一致することも確かめる。
+
+    python benchmarks/bench_columnar.py
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+import _harness
+
+_harness.setup()
+
+from garment_pattern_uv.constants import GARMENT_TYPE_OPTIONS  # noqa: E402
+from garment_pattern_uv.core.columnar import ColumnarDataset, ColumnarWriter  # noqa: E402
+from garment_pattern_uv.core.dataset_index import iter_corpus_files, iter_file_records  # noqa: E402
+from garment_pattern_uv.core.dataset_writer import ShardedJsonlWriter  # noqa: E402
+
+GARMENT_COUNT = 100_000
+BATCH = 1000
+PART_NAMES = ("front", "back", "sleeve_l", "sleeve_r", "collar", "cuff_l", "cuff_r",
+              "yoke", "pocket", "waistband", "placket", "hood")
+
+
+def _metrics(rng):
+    return {
+        "polygon_count": rng.randrange(100, 5000),
+        "island_count": rng.randrange(1, 4),
+        "area_3d": round(rng.uniform(0.01, 0.5), 6),
+        "area_uv": round(rng.uniform(0.01, 0.2), 6),
+        "uv_scale": round(rng.uniform(0.3, 1.2), 6),
+        "area_distortion": round(rng.uniform(0, 0.3), 6),
+        "angle_distortion": round(rng.uniform(0, 8), 6),
+        "packing_ratio": round(rng.uniform(0.4, 0.9), 6),
+    }
+
+
+def _record(rng, number):
+    names = rng.sample(PART_NAMES, rng.randint(4, len(PART_NAMES)))
+    return {
+        "garment_id": f"g{number:06d}",
+        "garment_type": rng.choice(GARMENT_TYPE_OPTIONS),
+        "design_reasoning": f"design note {rng.randrange(5000)}",
+        "parts": [
+            {
+                "name": f"part_{name}",
+                "label": name.split("_")[0],
+                "modeling_reasoning": f"modeling note {rng.randrange(5000)}",
+                "uv_reasoning": f"uv note {rng.randrange(5000)}",
+                "uv_metrics": _metrics(rng),
+                "seams": [
+                    {"name": f"seam_{name}_{index}", "seam_reasoning": f"seam note {index}"}
+                    for index in range(rng.randint(1, 4))
+                ],
+            }
+            for name in names
+        ],
+    }
+
+
+def _write_corpus(directory):
+    rng = random.Random(11)
+    with ShardedJsonlWriter(directory, max_shard_bytes=64 * 1024 * 1024) as writer:
+        for start in range(0, GARMENT_COUNT, BATCH):
+            writer.write_many(
+                (record["garment_id"], record)
+                for record in (_record(rng, number) for number in range(start, start + BATCH))
+            )
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def _jsonl_records(directory):
+    return [data for path in iter_corpus_files([directory]) for data in iter_file_records(path)]
+
+
+def _jsonl_query(directory):
+    """skirt のパーツの (uv_scale, angle_distortion) を配列にする。"""
+    rows = [
+        (part["uv_metrics"]["uv_scale"], part["uv_metrics"]["angle_distortion"])
+        for data in _jsonl_records(directory)
+        if data["garment_type"] == "skirt"
+        for part in data["parts"]
+    ]
+    return np.array(rows, dtype=np.float64)
+
+
+def _columnar_query(path):
+    with ColumnarDataset(path) as dataset:
+        garments = dataset.table("garments")
+        parts = dataset.table("parts")
+        skirts = garments["garment_type"].equals("skirt")
+        selected = skirts[parts["garment"]]
+        return np.stack(
+            [parts["uv_scale"][selected], parts["angle_distortion"][selected]], axis=1
+        )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        corpus = os.path.join(root, "corpus")
+        _write_corpus(corpus)
+        corpus_bytes = sum(os.path.getsize(path) for path in iter_corpus_files([corpus]))
+        columnar = os.path.join(root, "corpus.gpuvc")
+
+        def convert():
+            with ColumnarWriter(columnar) as writer:
+                for data in _jsonl_records(corpus):
+                    writer.add(data)
+
+        convert_time, _ = _timed(convert)
+        jsonl_time, expected = _timed(lambda: _jsonl_records(corpus))
+
+        def restore():
+            with ColumnarDataset(columnar) as dataset:
+                return list(dataset)
+
+        restore_time, restored = _timed(restore)
+        if restored != expected:
+            raise AssertionError("records restored from the columnar file differ")
+        jsonl_query_time, jsonl_rows = _timed(lambda: _jsonl_query(corpus))
+        columnar_query_time, columnar_rows = _timed(lambda: _columnar_query(columnar))
+        if not np.array_equal(jsonl_rows, columnar_rows):
+            raise AssertionError("columnar query differs from the JSONL scan")
+
+        print(f"{GARMENT_COUNT} garments: JSONL {corpus_bytes / 1e6:.1f} MB,"
+              f" columnar {os.path.getsize(columnar) / 1e6:.1f} MB"
+              f" (converted in {convert_time:.2f} s)")
+        print(f"  all records, JSONL parse          {jsonl_time:>8.3f} s")
+        print(f"  all records, columnar to dict     {restore_time:>8.3f} s")
+        print(f"  skirt part metrics, JSONL         {jsonl_query_time:>8.3f} s")
+        print(f"  skirt part metrics, columnar      {columnar_query_time * 1000:>8.2f} ms"
+              f" ({len(columnar_rows)} parts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""データセット索引（DatasetIndex）の構築時間と問い合わせの応答時間を計測する。
+
+10 万着分の合成レコードを JSONL データセットとして書き、索引を作ってから、
+種類とパーツ数・パーツ名・理由の全文検索で引く。問い合わせはどれも数ミリ秒に
+収まることを目安にする。全レコードを読み直して同じ条件で数えた結果とも突き合わせる。
+
+    python benchmarks/bench_dataset_index.py
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import _harness
+
+_harness.setup()
+
+from garment_pattern_uv.constants import GARMENT_TYPE_OPTIONS  # noqa: E402
+from garment_pattern_uv.core.dataset_index import DatasetIndex, iter_corpus_files, iter_file_records  # noqa: E402
+from garment_pattern_uv.core.dataset_writer import ShardedJsonlWriter  # noqa: E402
+
+GARMENT_COUNT = 100_000
+BATCH = 1000
+REPEAT = 5
+PART_NAMES = ("front", "back", "sleeve_l", "sleeve_r", "collar", "cuff_l", "cuff_r",
+              "yoke", "pocket", "waistband", "placket", "hood")
+PHRASES = (
+    "cut on the bias", "a dart shapes the bust", "straight grain along the center",
+    "eased into the armhole", "top-stitched for strength", "pleats add volume",
+    "gathered at the waist", "faced with lining", "slit for movement",
+)
+
+
+def _reasoning(rng):
+    return " and ".join(rng.sample(PHRASES, 2)) + f" (note {rng.randrange(2000)})"
+
+
+def _record(rng, number):
+    part_count = rng.randint(4, len(PART_NAMES))
+    names = rng.sample(PART_NAMES, part_count)
+    seams = [f"seam_{index}" for index in range(part_count + rng.randint(0, 6))]
+    parts = []
+    for name in names:
+        parts.append({
+            "name": name,
+            "label": name.split("_")[0],
+            "modeling_reasoning": _reasoning(rng),
+            "uv_reasoning": _reasoning(rng),
+            "seams": [
+                {"name": seam, "seam_reasoning": _reasoning(rng)}
+                for seam in rng.sample(seams, 2)
+            ],
+        })
+    return {
+        "garment_id": f"g{number:06d}",
+        "garment_type": rng.choice(GARMENT_TYPE_OPTIONS),
+        "design_reasoning": _reasoning(rng),
+        "parts": parts,
+    }
+
+
+def _write_corpus(directory):
+    rng = random.Random(7)
+    with ShardedJsonlWriter(directory, max_shard_bytes=64 * 1024 * 1024) as writer:
+        for start in range(0, GARMENT_COUNT, BATCH):
+            records = [_record(rng, number) for number in range(start, start + BATCH)]
+            writer.write_many((record["garment_id"], record) for record in records)
+
+
+def _median(fn):
+    samples = []
+    result = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def _scan(directory, predicate):
+    start = time.perf_counter()
+    matched = sum(
+        1
+        for path in iter_corpus_files([directory])
+        for data in iter_file_records(path)
+        if predicate(data)
+    )
+    return time.perf_counter() - start, matched
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        corpus = os.path.join(root, "corpus")
+        start = time.perf_counter()
+        _write_corpus(corpus)
+        write_time = time.perf_counter() - start
+        corpus_bytes = sum(os.path.getsize(path) for path in iter_corpus_files([corpus]))
+
+        index_path = os.path.join(root, "index.sqlite")
+        with DatasetIndex(index_path) as index:
+            start = time.perf_counter()
+            result = index.add_paths([corpus])
+            index.optimize()
+            build_time = time.perf_counter() - start
+            start = time.perf_counter()
+            again = index.add_paths([corpus])
+            rebuild_time = time.perf_counter() - start
+            counts = index.counts()
+
+            queries = {
+                "skirt, > 8 parts": lambda: index.find_garments(
+                    garment_type="skirt", min_parts=9, limit=None
+                ),
+                "part name hood*": lambda: index.find_garments(part_name="hood*"),
+                "text dart (seams)": lambda: index.search_reasoning(
+                    "dart", field="seam_reasoning", limit=100
+                ),
+                "text \"bias\" skirt": lambda: index.search_reasoning(
+                    "bias", garment_type="skirt", limit=100
+                ),
+            }
+            timings = {name: _median(query) for name, query in queries.items()}
+        index_bytes = sum(
+            os.path.getsize(index_path + suffix)
+            for suffix in ("", "-wal")
+            if os.path.exists(index_path + suffix)
+        )
+
+        scan_time, scanned = _scan(
+            corpus,
+            lambda data: data["garment_type"] == "skirt" and len(data["parts"]) > 8,
+        )
+        if scanned != len(timings["skirt, > 8 parts"][1]):
+            raise AssertionError("index query does not match a full scan")
+        if again["records"] or again["skipped"] != result["files"]:
+            raise AssertionError("unchanged shards were read again")
+
+    print(f"corpus: {result['records']} garments, {corpus_bytes / 1e6:.1f} MB in {result['files']} files"
+          f" (written in {write_time:.1f} s)")
+    print(f"index:  {index_bytes / 1e6:.1f} MB, {counts['parts']} parts,"
+          f" {counts['reasoning']} reasoning refs, {counts['texts']} unique texts")
+    print(f"  build                 {build_time:>9.2f} s")
+    print(f"  rerun (unchanged)     {rebuild_time * 1000:>9.2f} ms")
+    print(f"  full scan (skirt > 8) {scan_time:>9.2f} s")
+    for name, (elapsed, rows) in timings.items():
+        print(f"  {name:<21} {elapsed * 1000:>9.2f} ms  ({len(rows)} rows)")
+
+
+if __name__ == "__main__":
+    main()
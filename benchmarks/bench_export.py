@@ -0,0 +1,168 @@
+"""エクスポート前の処理（読み出し・シーム絞り込み・検証）を旧手順と ExportModel で比較する。
+
+旧手順はエクスポート（_props_to_dict → _snapshot_props → シーム割り当て → 絞り込み
+→ スキーマ検証）と _validate_props（同じ読み出しと割り当てをもう 1 度）を別々に走らせていた。
+ExportModel は 1 度の走査で両方をまかなう。段階ごとの時間も表示する。
+
+    blender --background --factory-startup --python benchmarks/bench_export.py
+    python benchmarks/bench_export.py
+"""
+
+import statistics
+import time
+
+import numpy as np
+
+import _harness
+
+bpy = _harness.setup()
+
+from garment_pattern_uv.core.annotation import (  # noqa: E402
+    filter_seams,
+    validate_data_dict,
+    validate_groups,
+)
+from garment_pattern_uv.core.seams import seams_for_export  # noqa: E402
+from garment_pattern_uv.data_io import _export_model, _props_to_dict  # noqa: E402
+from garment_pattern_uv.mesh_sync import (  # noqa: E402
+    _split_group_names,
+    _vertices_by_group,
+)
+from garment_pattern_uv.reasoning_text import (  # noqa: E402
+    get_reasoning_value,
+    set_reasoning_value,
+)
+
+VERTEX_COUNT = 200_000
+PART_COUNTS = (10, 50, 200)
+SEAMS_PER_PART = 5
+TEXT_LENGTH = 2_000
+REPEAT = 5
+
+
+def _build_scene(part_count):
+    mesh = bpy.data.meshes.new(f"bench_export_{part_count}")
+    mesh.vertices.add(VERTEX_COUNT)
+    mesh.uv_layers.new(name="UVMap")
+    obj = bpy.data.objects.new(mesh.name, mesh)
+
+    props = bpy.context.scene.garment_uv
+    props.parts.clear()
+    body = "理由" * (TEXT_LENGTH // 2)
+    bounds = np.linspace(0, VERTEX_COUNT, part_count + 1, dtype=np.int64)
+    for part_index in range(part_count):
+        start, stop = int(bounds[part_index]), int(bounds[part_index + 1])
+        part = props.parts.add()
+        part.name = f"part_{part_index:03d}"
+        obj.vertex_groups.new(name=part.name).add(range(start, stop), 1.0, "REPLACE")
+        for field in ("modeling_reasoning", "uv_reasoning"):
+            set_reasoning_value(part, field, body)
+        for seam_index in range(SEAMS_PER_PART):
+            seam = part.seams.add()
+            seam.name = f"seam_{part_index:03d}_{seam_index}"
+            obj.vertex_groups.new(name=seam.name).add(
+                range(start, min(start + 16, stop)), 1.0, "REPLACE"
+            )
+            set_reasoning_value(seam, "seam_reasoning", body)
+    return props, obj
+
+
+def _legacy_snapshot(props):
+    return {
+        part.name: {
+            "seams": {
+                seam.name: {
+                    "seam_reasoning": get_reasoning_value(seam, "seam_reasoning")
+                }
+                for seam in part.seams
+            },
+            "modeling_reasoning": get_reasoning_value(part, "modeling_reasoning"),
+            "uv_reasoning": get_reasoning_value(part, "uv_reasoning"),
+        }
+        for part in props.parts
+    }
+
+
+def _legacy_seams(props, obj):
+    part_names, seam_names = _split_group_names(obj)
+    return part_names, seams_for_export(
+        _vertices_by_group(obj), part_names, seam_names, _legacy_snapshot(props)
+    )
+
+
+def _legacy(props, obj):
+    """ExportModel 導入前の手順: エクスポートと検証でそれぞれ全体を読み直す。"""
+    data = _props_to_dict(props)
+    _, seams_by_part = _legacy_seams(props, obj)
+    exported = filter_seams(data, seams_by_part)
+    export_errors = validate_data_dict(exported)
+
+    data = _props_to_dict(props)
+    errors = validate_data_dict(data)
+    part_names, seams_by_part = _legacy_seams(props, obj)
+    group_errors, warnings = validate_groups(
+        {part.name for part in props.parts},
+        part_names,
+        seams_by_part,
+        {part.name: {seam.name for seam in part.seams} for part in props.parts},
+    )
+    return exported, export_errors, errors + group_errors, warnings
+
+
+def _model(props, obj, stages=None):
+    start = time.perf_counter()
+    model = _export_model(props, obj)
+    read = time.perf_counter()
+    model.seams_by_part  # 遅延計算をここで走らせる
+    seams = time.perf_counter()
+    exported = model.export_data()
+    filtered = time.perf_counter()
+    export_errors = model.schema_errors()
+    errors, warnings = model.validate()
+    validated = time.perf_counter()
+    if stages is not None:
+        for name, elapsed in (
+            ("read", read - start),
+            ("seams", seams - read),
+            ("filter", filtered - seams),
+            ("validate", validated - filtered),
+        ):
+            stages.setdefault(name, []).append(elapsed)
+    return exported, export_errors, errors, warnings
+
+
+def _time(fn, *args):
+    samples = []
+    result = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    print(
+        f"{'parts':>6} {'legacy [s]':>12} {'model [s]':>12} {'speedup':>8}"
+        f"   stages (read / seams / filter / validate)"
+    )
+    for part_count in PART_COUNTS:
+        props, obj = _build_scene(part_count)
+        legacy_time, legacy = _time(_legacy, props, obj)
+        stages = {}
+        model_time, model = _time(_model, props, obj, stages)
+        assert legacy == model
+        breakdown = " / ".join(
+            f"{statistics.median(samples) * 1000:.2f}" for samples in stages.values()
+        )
+        print(
+            f"{part_count:>6} {legacy_time:>12.4f} {model_time:>12.4f}"
+            f" {legacy_time / model_time:>7.1f}x   {breakdown} ms"
+        )
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+
+
+if __name__ == "__main__":
+    main()
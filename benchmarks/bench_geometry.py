@@ -0,0 +1,213 @@
+"""パーツ・シームの配列ファイル（.gpuvg）の書き出し費用と、読み出しの速さを計測する。
+
+10 万頂点の衣服について、次を比べる。
+
+- export: JSON だけの書き出しと、配列ファイルも書く書き出し（所属・辺・UV はキャッシュ済み）
+- read: 下流のジョブが .blend を開き直して要素ごとに読んでいた手順（頂点グループ・
+  座標・面・UV を Python で走査）と、GeometryFile で memmap した配列を全部読む手順
+
+要素ごとに読んだ結果と配列ファイルの中身（頂点番号・座標・面・UV・シームの辺と
+辺の両側の UV）が一致することと、ExportJob で書いたファイルが同期の書き出しと
+同じになることも確かめる。
+
+    blender --background --factory-startup --python benchmarks/bench_geometry.py
+    python benchmarks/bench_geometry.py
+"""
+
+import filecmp
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import _harness
+
+bpy = _harness.setup()
+
+import synthetic  # noqa: E402
+from garment_pattern_uv.core.geometry import GeometryFile  # noqa: E402
+from garment_pattern_uv.data_io import (  # noqa: E402
+    _export_model_for_objects,
+    _geometry_path,
+    _write_json,
+    _write_json_with_geometry,
+)
+from garment_pattern_uv.export_job import ExportJob  # noqa: E402
+
+SPEC = synthetic.GarmentSpec("geometry_100k", 100_000, 20, 6, 48, 0.5)
+REPEAT = 3
+
+
+def _best(fn):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples), result
+
+
+def _read_per_element(obj, data):
+    """下流のジョブが .blend を開き直してしていたように、要素ごとに読んで配列を作る。"""
+    mesh = obj.data
+    uvs = mesh.uv_layers["UVMap"].data
+    names = {group.index: group.name for group in obj.vertex_groups}
+    part_names = {part["name"] for part in data["parts"]}
+    seam_names = {seam["name"] for part in data["parts"] for seam in part["seams"]}
+    members = {}
+    groups_of = []
+    for index, vertex in enumerate(mesh.vertices):
+        groups = {names[element.group] for element in vertex.groups if element.weight > 0}
+        groups_of.append(groups)
+        for name in groups:
+            members.setdefault(name, []).append(index)
+    local = {
+        name: {vertex: position for position, vertex in enumerate(vertices)}
+        for name, vertices in members.items()
+    }
+    parts = {
+        name: {
+            "vertices": members[name],
+            "positions": [mesh.vertices[vertex].co for vertex in members[name]],
+            "face_sizes": [],
+            "face_vertices": [],
+            "face_uvs": [],
+        }
+        for name in part_names
+    }
+    seams = {
+        name: {
+            "vertices": members[name],
+            "positions": [mesh.vertices[vertex].co for vertex in members[name]],
+            "edges": [],
+            "edge_sides": [],
+            "edge_side_uvs": [],
+        }
+        for name in seam_names
+    }
+    edge_positions = {}
+    for edge in mesh.edges:
+        a, b = edge.vertices
+        for name in groups_of[a] & groups_of[b] & seam_names:
+            edge_positions[name, frozenset((a, b))] = (len(seams[name]["edges"]), a)
+            seams[name]["edges"].append([local[name][a], local[name][b]])
+
+    sides = {name: [] for name in seam_names}
+    for polygon in mesh.polygons:
+        loops = range(polygon.loop_start, polygon.loop_start + polygon.loop_total)
+        face = [(mesh.loops[loop].vertex_index, tuple(uvs[loop].uv)) for loop in loops]
+        inside = set.intersection(*(groups_of[vertex] for vertex, _ in face)) & part_names
+        for name in inside:
+            part = parts[name]
+            part["face_sizes"].append(len(face))
+            part["face_vertices"].extend(local[name][vertex] for vertex, _ in face)
+            part["face_uvs"].extend(uv for _, uv in face)
+        for (start, start_uv), (end, end_uv) in zip(face, face[1:] + face[:1]):
+            for name in groups_of[start] & groups_of[end] & seam_names:
+                found = edge_positions.get((name, frozenset((start, end))))
+                if found is not None:
+                    position, first = found
+                    pair = (start_uv, end_uv) if start == first else (end_uv, start_uv)
+                    sides[name].append((position, pair))
+    for name, entries in sides.items():
+        entries.sort(key=lambda side: side[0])
+        seams[name]["edge_sides"] = [position for position, _ in entries]
+        seams[name]["edge_side_uvs"] = [list(pair) for _, pair in entries]
+    return parts, seams
+
+
+def _read_arrays(path):
+    """配列ファイルの全配列を読み、パーツ名・シーム名 → 名前 → 配列 にする。"""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    parts = {}
+    seams = {}
+    with GeometryFile.for_annotation(path, data) as geometry:
+        for part in data["parts"]:
+            (entry,) = part["geometry"]
+            parts[part["name"]] = {
+                key: np.array(value) for key, value in geometry.arrays(entry).items()
+            }
+            for seam in part["seams"]:
+                (entry,) = seam["geometry"]
+                seams[seam["name"]] = {
+                    key: np.array(value) for key, value in geometry.arrays(entry).items()
+                }
+    return parts, seams
+
+
+def _check(expected, actual, kind):
+    if expected.keys() != actual.keys():
+        raise AssertionError(f"{kind} names differ")
+    for name, arrays in expected.items():
+        for key, values in arrays.items():
+            array = actual[name][key]
+            reference = np.asarray(values, dtype=array.dtype).reshape(array.shape)
+            if not np.array_equal(reference, array):
+                raise AssertionError(f"{kind} {name}: {key} differs from the per-element read")
+
+
+def _job(props, obj, path):
+    job = ExportJob(props, [obj], path, geometry=True)
+    while not job.done:
+        job.step()
+        time.sleep(0.001)
+    if job.status != "FINISHED":
+        raise AssertionError(f"job ended with {job.status}: {job.error}")
+
+
+def main():
+    obj, _ = synthetic.build_garment(bpy, SPEC)
+    scene = bpy.context.scene
+    scene.collection.objects.link(obj)
+    props = scene.garment_uv
+    synthetic.fill_annotation(props, obj, SPEC)
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            json_path = os.path.join(root, "plain.json")
+            geometry_json = os.path.join(root, "geometry.json")
+            json_time, _ = _best(
+                lambda: _write_json(
+                    json_path, _export_model_for_objects(props, [obj]).export_data()
+                )
+            )
+            geometry_time, _ = _best(
+                lambda: _write_json_with_geometry(
+                    geometry_json, _export_model_for_objects(props, [obj])
+                )
+            )
+            with open(geometry_json, encoding="utf-8") as handle:
+                data = json.load(handle)
+
+            start = time.perf_counter()
+            expected_parts, expected_seams = _read_per_element(obj, data)
+            per_element_time = time.perf_counter() - start
+            array_time, (parts, seams) = _best(lambda: _read_arrays(geometry_json))
+            _check(expected_parts, parts, "part")
+            _check(expected_seams, seams, "seam")
+
+            job_json = os.path.join(root, "job.json")
+            _job(props, obj, job_json)
+            if not filecmp.cmp(
+                _geometry_path(job_json), _geometry_path(geometry_json), shallow=False
+            ):
+                raise AssertionError("ExportJob wrote different geometry arrays")
+            leftovers = [name for name in os.listdir(root) if name.endswith(".tmp")]
+            if leftovers:
+                raise AssertionError(f"temporary files left behind: {leftovers}")
+
+            array_bytes = os.path.getsize(_geometry_path(geometry_json))
+            print(f"{SPEC.vertex_count} vertices, {len(parts)} parts, {len(seams)} seams")
+            print(f"  export JSON only             {json_time * 1000:>9.1f} ms")
+            print(f"  export JSON + arrays         {geometry_time * 1000:>9.1f} ms"
+                  f" ({array_bytes / 1e6:.1f} MB of arrays)")
+            print(f"  read per element (reopen)    {per_element_time * 1000:>9.1f} ms")
+            print(f"  read arrays (memmap)         {array_time * 1000:>9.1f} ms")
+    finally:
+        synthetic.remove_garment(bpy, obj)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""再エクスポートの判定に使う入力ハッシュの費用と、変更のない回の省略を確かめる。
+
+1. 25 万頂点の衣服について、入力ハッシュと書き出し用のデータ作成を、どちらも
+   キャッシュの無い状態から計測する。入力ハッシュは変更のないファイルでも
+   毎回かかる 1 ファイルあたりの費用なので、頂点ごとに読む所属の読み出しと
+   それ以外（配列のハッシュ）に分けて表示する。
+2. fake_bpy では .blend を開けないので、開いたことにして同じシーンを使い、
+   ダミーの .blend を並べたライブラリで export_library を繰り返す。
+   2 回目は全ファイルを開かずに済み、.blend の中身だけ変えた回は開いても
+   書き出さず、プロパティを変えた回はその衣服だけを書き出すことを確かめる。
+
+    blender --background --factory-startup --python benchmarks/bench_incremental_export.py
+    python benchmarks/bench_incremental_export.py
+"""
+
+import os
+import statistics
+import tempfile
+import time
+
+import _harness
+
+bpy = _harness.setup()
+
+import synthetic  # noqa: E402
+from garment_pattern_uv.batch_export import export_library  # noqa: E402
+from garment_pattern_uv.core.membership import (  # noqa: E402
+    GroupMembership,
+    invalidate_membership,
+)
+from garment_pattern_uv.core.topology import invalidate_topology  # noqa: E402
+from garment_pattern_uv.core.uv_metrics import invalidate_uv_mesh  # noqa: E402
+from garment_pattern_uv.data_io import (  # noqa: E402
+    _export_input_hash,
+    _props_to_dict_for_objects,
+)
+from garment_pattern_uv.reasoning_text import set_reasoning_value  # noqa: E402
+
+SPEC = synthetic.GarmentSpec("incremental_250k", 250_000, 40, 6, 48, 0.5, reasoning_length=400)
+FILE_COUNT = 8
+REPEAT = 3
+
+
+def _cold(fn):
+    samples = []
+    result = None
+    for _ in range(REPEAT):
+        for invalidate in (invalidate_membership, invalidate_topology, invalidate_uv_mesh):
+            invalidate()
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def _write_library(root):
+    for index in range(FILE_COUNT):
+        directory = os.path.join(root, f"garment_{index:02d}")
+        os.makedirs(directory)
+        with open(os.path.join(directory, "garment.blend"), "wb") as handle:
+            handle.write(os.urandom(64 * 1024))
+
+
+def _touch_blend(root, index):
+    with open(os.path.join(root, f"garment_{index:02d}", "garment.blend"), "ab") as handle:
+        handle.write(b"\0")
+
+
+def _export(input_root, output_root):
+    start = time.perf_counter()
+    manifest = export_library(input_root, output_root)
+    return time.perf_counter() - start, manifest
+
+
+def _library(props):
+    with tempfile.TemporaryDirectory() as root:
+        input_root = os.path.join(root, "library")
+        output_root = os.path.join(root, "export")
+        _write_library(input_root)
+        runs = [("first run", *_export(input_root, output_root))]
+        runs.append(("unchanged", *_export(input_root, output_root)))
+        _touch_blend(input_root, 0)
+        runs.append((".blend touched", *_export(input_root, output_root)))
+        _touch_blend(input_root, 1)
+        set_reasoning_value(props.parts[0], "uv_reasoning", "changed between runs")
+        runs.append(("props changed", *_export(input_root, output_root)))
+
+    expected = {
+        "first run": (0, 0),
+        "unchanged": (FILE_COUNT, FILE_COUNT),
+        ".blend touched": (FILE_COUNT - 1, FILE_COUNT),
+        "props changed": (FILE_COUNT - 1, FILE_COUNT - 1),
+    }
+    print(f"library of {FILE_COUNT} files ({'label':<15} {'time [s]':>9} unchanged files/garments)")
+    for label, elapsed, manifest in runs:
+        counts = (manifest["unchanged_files"], manifest["unchanged_garments"])
+        if manifest["failed_files"] or counts != expected[label]:
+            raise AssertionError(f"{label}: unexpected manifest counts {counts}")
+        print(f"  {label:<15} {elapsed:>9.3f} {counts[0]:>3}/{counts[1]}")
+
+
+def main():
+    obj, _ = synthetic.build_garment(bpy, SPEC)
+    scene = bpy.context.scene
+    scene.collection.objects.link(obj)
+    props = scene.garment_uv
+    synthetic.fill_annotation(props, obj, SPEC)
+    try:
+        hash_time, _ = _cold(lambda: _export_input_hash(props, [obj]))
+        membership_time, _ = _cold(lambda: GroupMembership.from_object(obj))
+        export_time, _ = _cold(lambda: _props_to_dict_for_objects(props, [obj]))
+        print(f"{SPEC.name}: {len(obj.data.vertices)} vertices, {len(obj.data.loops)} loops")
+        print(f"  input hash per file (cold) {hash_time * 1000:>9.2f} ms"
+              f"  ({hash_time / export_time:.0%} of export data)")
+        print(f"    membership read          {membership_time * 1000:>9.2f} ms"
+              "  (per-vertex weight walk)")
+        print(f"    rest of the hash         {(hash_time - membership_time) * 1000:>9.2f} ms")
+        print(f"  export data (cold)         {export_time * 1000:>9.2f} ms")
+
+        if _harness.is_fake(bpy):
+            bpy.ops.wm.open_mainfile = lambda **_kwargs: None
+            _library(props)
+    finally:
+        scene.collection.objects.unlink(obj)
+        synthetic.remove_garment(bpy, obj)
+
+
+if __name__ == "__main__":
+    main()
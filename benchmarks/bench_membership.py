@@ -0,0 +1,156 @@
+"""_vertices_by_group の旧実装（頂点ごとの set 構築）と CSR 実装を比較する。
+
+所属の構築に加えて、シーム × パーツの割り当て（旧: set の積、新: ビット配列の
+隣接行列）まで含めた時間も計測する。
+
+CSR 実装の時間は次の 2 つに分けても出す。Blender はウェイトを一括で読めないため、
+読み出しは頂点ごとの Python のループのままで、numpy で速くなるのは構築だけになる。
+
+- read: _read_group_chunks で頂点グループを (頂点, グループ) の配列に読む
+- build: 読んだ配列から CSR を作る（GroupMembership.from_chunks）
+
+Blender 上でも、fake_bpy を使って素の Python でも実行できる::
+
+    blender --background --factory-startup --python benchmarks/bench_membership.py
+    python benchmarks/bench_membership.py
+"""
+
+import statistics
+import time
+
+import numpy as np
+
+import _harness
+
+bpy = _harness.setup()
+
+from garment_pattern_uv.core.membership import (  # noqa: E402
+    MIN_CHUNK_VERTICES,
+    READ_BYTES_PER_VERTEX,
+    GroupMembership,
+    _read_group_chunks,
+    memory_limit,
+)
+
+VERTEX_COUNTS = (10_000, 100_000, 1_000_000)
+PART_COUNT = 40
+SEAM_COUNT = 150
+REPEAT = 3
+
+
+def _legacy_vertices_by_group(obj):
+    group_index_to_name = {group.index: group.name for group in obj.vertex_groups}
+    vertices_by_group = {group.name: set() for group in obj.vertex_groups}
+    for vertex in obj.data.vertices:
+        for group in vertex.groups:
+            if group.weight <= 0:
+                continue
+            name = group_index_to_name.get(group.group)
+            if name is not None:
+                vertices_by_group[name].add(vertex.index)
+    return vertices_by_group
+
+
+def _legacy_seams(obj):
+    vertices_by_group = _legacy_vertices_by_group(obj)
+    part_names = [name for name in vertices_by_group if name.startswith("part_")]
+    seam_names = [name for name in vertices_by_group if name.startswith("seam_")]
+    seams_by_part = {name: set() for name in part_names}
+    for seam_name in seam_names:
+        seam_vertices = vertices_by_group.get(seam_name, set())
+        for part_name in part_names:
+            if seam_vertices & vertices_by_group.get(part_name, set()):
+                seams_by_part[part_name].add(seam_name)
+    return seams_by_part
+
+
+def _csr_seams(obj):
+    membership = GroupMembership.from_object(obj)
+    part_names = [name for name in membership if name.startswith("part_")]
+    seam_names = [name for name in membership if name.startswith("seam_")]
+    incidence = membership.incidence(seam_names, part_names)
+    return {
+        part_name: {seam_names[row] for row in incidence[:, column].nonzero()[0]}
+        for column, part_name in enumerate(part_names)
+    }
+
+
+def _read_chunks(obj):
+    chunk_vertices = max(MIN_CHUNK_VERTICES, memory_limit() // READ_BYTES_PER_VERTEX)
+    return list(_read_group_chunks(obj.data, chunk_vertices))
+
+
+def _build_from_chunks(chunks, obj):
+    names = [group.name for group in obj.vertex_groups]
+    return GroupMembership.from_chunks(names, chunks, len(obj.data.vertices))
+
+
+def _build_object(vertex_count, seed=0):
+    rng = np.random.default_rng(seed)
+    mesh = bpy.data.meshes.new(f"bench_{vertex_count}")
+    mesh.vertices.add(vertex_count)
+    mesh.vertices.foreach_set(
+        "co", rng.random(vertex_count * 3, dtype=np.float32).tolist()
+    )
+    obj = bpy.data.objects.new(mesh.name, mesh)
+
+    bounds = np.linspace(0, vertex_count, PART_COUNT + 1, dtype=np.int64)
+    for index in range(PART_COUNT):
+        group = obj.vertex_groups.new(name=f"part_{index:02d}")
+        group.add(range(int(bounds[index]), int(bounds[index + 1])), 1.0, "REPLACE")
+    for index in range(SEAM_COUNT):
+        center = int(rng.integers(0, vertex_count))
+        members = np.arange(center - 32, center + 32) % vertex_count
+        group = obj.vertex_groups.new(name=f"seam_{index:03d}")
+        group.add(members.tolist(), 1.0, "REPLACE")
+    return obj
+
+
+def _time(fn, obj):
+    samples = []
+    result = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn(obj)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def _report(label, vertex_count, legacy_time, csr_time):
+    print(
+        f"{label:>10} {vertex_count:>10} {legacy_time:>12.4f} {csr_time:>12.4f}"
+        f" {legacy_time / csr_time:>7.1f}x"
+    )
+
+
+def _report_phase(label, vertex_count, csr_time):
+    print(f"{label:>10} {vertex_count:>10} {'':>12} {csr_time:>12.4f}")
+
+
+def main():
+    print(
+        f"{'stage':>10} {'vertices':>10} {'legacy [s]':>12} {'csr [s]':>12} {'speedup':>8}"
+    )
+    for vertex_count in VERTEX_COUNTS:
+        obj = _build_object(vertex_count)
+        legacy_time, legacy = _time(_legacy_vertices_by_group, obj)
+        csr_time, membership = _time(GroupMembership.from_object, obj)
+        for name, vertices in legacy.items():
+            assert set(membership[name]) == vertices, name
+        _report("membership", vertex_count, legacy_time, csr_time)
+        read_time, chunks = _time(_read_chunks, obj)
+        build_time, _ = _time(lambda obj: _build_from_chunks(chunks, obj), obj)
+        _report_phase("read", vertex_count, read_time)
+        _report_phase("build", vertex_count, build_time)
+
+        legacy_time, legacy = _time(_legacy_seams, obj)
+        csr_time, seams = _time(_csr_seams, obj)
+        assert legacy == seams
+        _report("seams", vertex_count, legacy_time, csr_time)
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+
+
+if __name__ == "__main__":
+    main()
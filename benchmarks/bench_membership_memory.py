@@ -0,0 +1,143 @@
+"""頂点グループの所属とシーム割り当てのピークメモリ（RSS）を、旧実装と比べる。
+
+200 グループ（パーツ 50・シーム 150）の 200 万頂点メッシュで、次を計測する。
+
+- legacy sets: グループごとに Python の set を作り、set の積で割り当てる旧実装
+- csr, one chunk: 全頂点を 1 度にリストへ積んでから CSR を作る（チャンク分割なし）
+- csr, N MB: memory_limit を N MB にしてチャンクごとに読む現在の実装
+
+ru_maxrss はプロセスの最大値しか分からないので、メッシュを作ったあと経路ごとに
+fork した子プロセスで計測し、fork 時点からの増分を表示する。
+
+    blender --background --factory-startup --python benchmarks/bench_membership_memory.py
+    python benchmarks/bench_membership_memory.py
+"""
+
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+import _harness
+
+bpy = _harness.setup()
+
+from garment_pattern_uv.core.membership import (  # noqa: E402
+    GroupMembership,
+    _read_group_chunks,
+)
+
+VERTEX_COUNT = 2_000_000
+PART_COUNT = 50
+SEAM_COUNT = 150
+SEAM_LENGTH = 64
+LIMITS_MB = (128, 16)
+
+
+def _peak_rss_bytes():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KiB、macOS はバイトで返す
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _build_object(seed=0):
+    """パーツが半分ずつ重なる（頂点あたり 2 グループ）メッシュを作る。"""
+    rng = np.random.default_rng(seed)
+    mesh = bpy.data.meshes.new("bench_membership_memory")
+    mesh.vertices.add(VERTEX_COUNT)
+    obj = bpy.data.objects.new(mesh.name, mesh)
+    bounds = np.linspace(0, VERTEX_COUNT, PART_COUNT + 1, dtype=np.int64)
+    half = VERTEX_COUNT // PART_COUNT // 2
+    for index in range(PART_COUNT):
+        start = max(0, int(bounds[index]) - half)
+        stop = min(VERTEX_COUNT, int(bounds[index + 1]) + half)
+        obj.vertex_groups.new(name=f"part_{index:02d}").add(range(start, stop), 1.0, "REPLACE")
+    for index in range(SEAM_COUNT):
+        center = int(rng.integers(0, VERTEX_COUNT))
+        members = np.arange(center, center + SEAM_LENGTH) % VERTEX_COUNT
+        obj.vertex_groups.new(name=f"seam_{index:03d}").add(members.tolist(), 1.0, "REPLACE")
+    return obj
+
+
+def _legacy(obj):
+    names = {group.index: group.name for group in obj.vertex_groups}
+    vertices_by_group = {name: set() for name in names.values()}
+    for vertex in obj.data.vertices:
+        for element in vertex.groups:
+            if element.weight > 0 and element.group in names:
+                vertices_by_group[names[element.group]].add(vertex.index)
+    part_names = [name for name in vertices_by_group if name.startswith("part_")]
+    seam_names = [name for name in vertices_by_group if name.startswith("seam_")]
+    return {
+        part_name: {
+            seam_name
+            for seam_name in seam_names
+            if vertices_by_group[seam_name] & vertices_by_group[part_name]
+        }
+        for part_name in part_names
+    }
+
+
+def _seams(membership):
+    part_names = [name for name in membership if name.startswith("part_")]
+    seam_names = [name for name in membership if name.startswith("seam_")]
+    incidence = membership.incidence(seam_names, part_names)
+    return {
+        part_name: {seam_names[row] for row in incidence[:, column].nonzero()[0]}
+        for column, part_name in enumerate(part_names)
+    }
+
+
+def _one_chunk(obj):
+    mesh = obj.data
+    names = [group.name for group in obj.vertex_groups]
+    chunks = _read_group_chunks(mesh, len(mesh.vertices))
+    return _seams(GroupMembership.from_chunks(names, chunks, len(mesh.vertices)))
+
+
+def _limited(limit_mb):
+    def run(obj):
+        return _seams(GroupMembership.from_object(obj, limit=limit_mb * 1024 * 1024))
+
+    return run
+
+
+PATHS = {"legacy sets": _legacy, "csr, one chunk": _one_chunk}
+PATHS.update({f"csr, {limit} MB": _limited(limit) for limit in LIMITS_MB})
+
+
+def _measure(label, obj, queue):
+    baseline = _peak_rss_bytes()
+    start = time.perf_counter()
+    result = PATHS[label](obj)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, _peak_rss_bytes() - baseline, sorted((k, sorted(v)) for k, v in result.items())))
+
+
+def main():
+    if "fork" not in multiprocessing.get_all_start_methods():
+        print("peak RSS needs fork-based child processes; skipped on this platform")
+        return
+    context = multiprocessing.get_context("fork")
+    obj = _build_object()
+    print(f"{VERTEX_COUNT} vertices, {PART_COUNT + SEAM_COUNT} groups")
+    print(f"{'path':<16} {'time [s]':>9} {'peak RSS [MB]':>14}")
+    expected = None
+    for label in PATHS:
+        queue = context.Queue()
+        child = context.Process(target=_measure, args=(label, obj, queue))
+        child.start()
+        elapsed, peak, result = queue.get()
+        child.join()
+        if expected is None:
+            expected = result
+        elif result != expected:
+            raise AssertionError(f"{label}: seam assignment differs from the legacy path")
+        print(f"{label:<16} {elapsed:>9.2f} {peak / 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""複数オブジェクトに分かれた衣服のシーム割り当てを、逐次とスレッドプールで比較する。
+
+所属と辺の読み出し（メインスレッド）は計測前に済ませ、ExportModel.seams_by_part の
+時間だけを比べる。結果が逐次計算と一致することも確かめる。
+
+    blender --background --factory-startup --python benchmarks/bench_multi_object.py
+    python benchmarks/bench_multi_object.py
+"""
+
+import os
+import statistics
+import time
+
+import _harness
+
+bpy = _harness.setup()
+
+import synthetic  # noqa: E402
+from garment_pattern_uv.core.export_model import ExportModel  # noqa: E402
+from garment_pattern_uv.data_io import _mesh_source, _props_to_dict  # noqa: E402
+
+OBJECT_COUNTS = (1, 2, 4, 8)
+VERTICES_PER_OBJECT = 250_000
+REPEAT = 5
+
+
+def _build(object_count):
+    objects = []
+    for index in range(object_count):
+        spec = synthetic.GarmentSpec(
+            f"panel_{index}",
+            VERTICES_PER_OBJECT,
+            part_count=12,
+            seams_per_part=10,
+            seam_length=64,
+            overlap=0.6,
+            seed=index,
+        )
+        obj, _ = synthetic.build_garment(bpy, spec)
+        # オブジェクトをまたいで名前が衝突しないように付け直す。
+        for group in obj.vertex_groups:
+            group.name = group.name.replace("_", f"_{index}x", 1)
+        objects.append(obj)
+    return objects
+
+
+def _seams(data, sources, max_workers):
+    # 毎回 incidence と辺の隣接のキャッシュを捨てて、計算を計測に含める。
+    for source in sources:
+        source.membership._incidence_cache.clear()
+        source.topology._adjacency.clear()
+    model = ExportModel(data, "MESH", sources, max_workers=max_workers)
+    return model.seams_by_part
+
+
+def _time(fn, *args):
+    samples = []
+    result = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    props = bpy.context.scene.garment_uv
+    data = _props_to_dict(props)
+    workers = os.cpu_count() or 1
+    print(f"workers: {workers}")
+    print(f"{'objects':>8} {'serial [s]':>12} {'pool [s]':>12} {'speedup':>8}")
+    for object_count in OBJECT_COUNTS:
+        objects = _build(object_count)
+        sources = [_mesh_source(obj) for obj in objects]
+        serial_time, serial = _time(_seams, data, sources, 1)
+        pool_time, pooled = _time(_seams, data, sources, workers)
+        assert serial == pooled
+        print(
+            f"{object_count:>8} {serial_time:>12.4f} {pool_time:>12.4f}"
+            f" {serial_time / pool_time:>7.1f}x"
+        )
+        for obj in objects:
+            synthetic.remove_garment(bpy, obj)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""理由テキストのストア（内容ハッシュで 1 件ずつ保持）の効果を計測する。
+
+定型文を共有するアノテーションを作り、次を表示する。
+
+- 保存される文字数: 以前の形式（文字列プロパティと Text の二重保存）とストア
+- 以前の形式からストアへの移行（migrate_reasoning）の時間
+- _props_to_dict の時間: LRU キャッシュが空の場合と温まっている場合
+
+    blender --background --factory-startup --python benchmarks/bench_reasoning.py
+    python benchmarks/bench_reasoning.py
+"""
+
+import statistics
+import time
+
+import _harness
+
+bpy = _harness.setup()
+
+from garment_pattern_uv import reasoning_text  # noqa: E402
+from garment_pattern_uv.data_io import _props_to_dict  # noqa: E402
+from garment_pattern_uv.reasoning_text import migrate_reasoning  # noqa: E402
+
+PART_COUNTS = (10, 50, 200)
+SEAMS_PER_PART = 5
+TEXT_LENGTH = 4_000
+# 定型文の種類。各フィールドはこのうちのどれかか、固有の文になる。
+BOILERPLATE_COUNT = 8
+UNIQUE_EVERY = 4
+REPEAT = 5
+
+
+def _body(index):
+    if index % UNIQUE_EVERY == 0:
+        seed = f"固有の理由 {index}。"
+    else:
+        seed = f"定型の理由 {index % BOILERPLATE_COUNT}。"
+    return (seed * (TEXT_LENGTH // len(seed) + 1))[:TEXT_LENGTH]
+
+
+def _build_legacy(props, part_count):
+    """以前の形式（文字列プロパティ + gpuv.* の Text）のアノテーションを作る。"""
+    for text in list(bpy.data.texts):
+        bpy.data.texts.remove(text)
+    props.reasoning_store.clear()
+    props.parts.clear()
+    counter = iter(range(1 << 30))
+    written = 0
+
+    def legacy(owner, field, label):
+        nonlocal written
+        value = _body(next(counter))
+        text = bpy.data.texts.new(f"gpuv.{label}.{field}")
+        text.write(value)
+        owner[field] = value
+        setattr(owner, f"{field}_text", text)
+        written += 2 * len(value)
+
+    for part_index in range(part_count):
+        part = props.parts.add()
+        part.name = f"part_{part_index:03d}"
+        legacy(part, "modeling_reasoning", part.name)
+        legacy(part, "uv_reasoning", part.name)
+        for seam_index in range(SEAMS_PER_PART):
+            seam = part.seams.add()
+            seam.name = f"seam_{part_index:03d}_{seam_index}"
+            legacy(seam, "seam_reasoning", f"{part.name}.{seam.name}")
+    return written
+
+
+def _time(fn, setup=None):
+    samples = []
+    result = None
+    for _ in range(REPEAT):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    props = bpy.context.scene.garment_uv
+    print(
+        f"{'parts':>6} {'legacy chars':>13} {'store chars':>12} {'blobs':>6}"
+        f" {'migrate [s]':>12} {'cold [s]':>10} {'warm [s]':>10}"
+    )
+    for part_count in PART_COUNTS:
+        legacy_chars = _build_legacy(props, part_count)
+        before = _props_to_dict(props)
+        start = time.perf_counter()
+        migrate_reasoning(props)
+        migrate_time = time.perf_counter() - start
+        assert _props_to_dict(props) == before
+        assert not bpy.data.texts
+
+        store_chars = sum(len(blob.value) for blob in props.reasoning_store)
+        cold_time, _ = _time(
+            lambda: _props_to_dict(props), setup=reasoning_text._VALUES.clear
+        )
+        warm_time, _ = _time(lambda: _props_to_dict(props))
+        print(
+            f"{part_count:>6} {legacy_chars:>13} {store_chars:>12}"
+            f" {len(props.reasoning_store):>6} {migrate_time:>12.4f}"
+            f" {cold_time:>10.4f} {warm_time:>10.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""シームの選択（is_selected の update）とシーム一覧の絞り込みの費用を計測する。
+
+パーツ 60・シーム 480 本のアノテーションで、全シームを 1 本ずつ選択して解除する。
+旧実装は update のたびに全パーツ・全シームを走査して自分の位置を探していた。
+現在は位置の索引を引くだけで、構造が変わったときだけ索引を作り直す。
+オペレーターが名前からパーツとシームを引く費用も、全シームについて旧実装の
+走査と位置の索引（item_index）で比べる。
+あわせて、シーム 400 本のパーツでシーム一覧の filter_items を計測する。
+
+    blender --background --factory-startup --python benchmarks/bench_seam_selection.py
+    python benchmarks/bench_seam_selection.py
+"""
+
+import statistics
+import time
+
+import _harness
+
+bpy = _harness.setup()
+
+from garment_pattern_uv import properties  # noqa: E402
+from garment_pattern_uv.item_index import find_part, find_seam  # noqa: E402
+from garment_pattern_uv.panels import _filter_seams  # noqa: E402
+
+PART_COUNT = 60
+SEAMS_PER_PART = 8
+LONG_PART_SEAMS = 400
+BITFLAG = 1 << 30
+REPEAT = 5
+
+
+def _legacy_on_seam_selected(self, context):
+    props = context.scene.garment_uv
+    for part_index, part in enumerate(props.parts):
+        for seam_index, seam in enumerate(part.seams):
+            if seam is self:
+                if self.is_selected:
+                    if part.active_seam_index != seam_index:
+                        part.active_seam_index = seam_index
+                    if props.active_part_index != part_index:
+                        props.active_part_index = part_index
+                elif part.active_seam_index == seam_index:
+                    part.active_seam_index = next(
+                        (i for i, s in enumerate(part.seams) if s.is_selected), -1
+                    )
+                return
+
+
+def _legacy_lookup(props, part_name, seam_name):
+    for part_index, part in enumerate(props.parts):
+        if part.name == part_name:
+            for seam_index, seam in enumerate(part.seams):
+                if seam.name == seam_name:
+                    return part_index, seam_index
+    return None
+
+
+def _indexed_lookup(props, part_name, seam_name):
+    part_index = find_part(props, part_name)
+    if part_index < 0:
+        return None
+    return part_index, find_seam(props, part_index, seam_name)
+
+
+def _lookup_all(props, lookup):
+    names = [(part.name, seam.name) for part in props.parts for seam in part.seams]
+    start = time.perf_counter()
+    found = [lookup(props, part_name, seam_name) for part_name, seam_name in names]
+    return time.perf_counter() - start, found
+
+
+def _build(props):
+    props.parts.clear()
+    for part_index in range(PART_COUNT):
+        part = props.parts.add()
+        part.name = f"part_{part_index:02d}"
+        for seam_index in range(SEAMS_PER_PART):
+            part.seams.add().name = f"seam_{part_index:02d}_{seam_index}"
+
+
+def _toggle_all(props, update):
+    """全シームを選択してから解除する。値は ID プロパティで書き、update は直接呼ぶ。"""
+    start = time.perf_counter()
+    for value in (True, False):
+        for part in props.parts:
+            for seam in part.seams:
+                seam["is_selected"] = value
+                update(seam, bpy.context)
+    return time.perf_counter() - start
+
+
+def _state(props):
+    return (
+        props.active_part_index,
+        [part.active_seam_index for part in props.parts],
+        [seam.is_selected for part in props.parts for seam in part.seams],
+    )
+
+
+def main():
+    props = bpy.context.scene.garment_uv
+    _build(props)
+    toggles = 2 * PART_COUNT * SEAMS_PER_PART
+    results = {}
+    for label, update in (
+        ("legacy scan", _legacy_on_seam_selected),
+        ("location index", properties._on_seam_selected),
+    ):
+        samples = []
+        for _ in range(REPEAT):
+            _build(props)
+            samples.append(_toggle_all(props, update))
+        results[label] = (statistics.median(samples), _state(props))
+    if results["legacy scan"][1] != results["location index"][1]:
+        raise AssertionError("selection state differs from the legacy update")
+    lookups = {
+        "legacy scan": _lookup_all(props, _legacy_lookup),
+        "location index": _lookup_all(props, _indexed_lookup),
+    }
+    if lookups["legacy scan"][1] != lookups["location index"][1]:
+        raise AssertionError("name lookups differ from the legacy scan")
+
+    long_part = props.parts.add()
+    long_part.name = "part_long"
+    for seam_index in range(LONG_PART_SEAMS):
+        seam = long_part.seams.add()
+        seam.name = f"seam_{seam_index:03d}"
+        seam["is_selected"] = seam_index % 3 == 0
+    filters = {
+        "no filter": ("", False, False),
+        "name *05*": ("05", False, False),
+        "selected, sorted": ("", True, True),
+    }
+    filter_times = {}
+    for label, (pattern, selected_only, sort_alpha) in filters.items():
+        samples = []
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            flags, _ = _filter_seams(long_part.seams, pattern, selected_only, sort_alpha, BITFLAG)
+            samples.append(time.perf_counter() - start)
+        filter_times[label] = (statistics.median(samples), sum(1 for flag in flags if flag))
+
+    print(f"{PART_COUNT} parts, {PART_COUNT * SEAMS_PER_PART} seams, {toggles} toggles")
+    for label, (elapsed, _) in results.items():
+        print(f"  {label:<16} {elapsed * 1000:>9.2f} ms ({elapsed / toggles * 1e6:.1f} us/toggle)")
+    print(f"name lookups, {PART_COUNT * SEAMS_PER_PART} seams")
+    for label, (elapsed, _) in lookups.items():
+        print(f"  {label:<16} {elapsed * 1000:>9.2f} ms")
+    print(f"seam list filter_items, {LONG_PART_SEAMS} seams")
+    for label, (elapsed, shown) in filter_times.items():
+        print(f"  {label:<16} {elapsed * 1000:>9.3f} ms ({shown} shown)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""辺の接続によるシーム割り当て（MeshTopology）の費用を、頂点の共有による判定と比べる。
+
+辺数 50 万程度の格子で、辺の読み出し・CSR の構築、全シームの隣接判定（初回と
+キャッシュ済み）、折れ線と長さの計算を計測する。割り当てが生成器の期待値と
+一致することも確かめる。
+
+    blender --background --factory-startup --python benchmarks/bench_topology.py
+    python benchmarks/bench_topology.py
+"""
+
+import statistics
+import time
+
+import _harness
+
+bpy = _harness.setup()
+
+import synthetic  # noqa: E402
+from garment_pattern_uv.core.seams import seams_by_incidence  # noqa: E402
+from garment_pattern_uv.core.topology import MeshTopology  # noqa: E402
+from garment_pattern_uv.mesh_sync import _split_group_names, _vertices_by_group  # noqa: E402
+
+SPECS = (
+    synthetic.GarmentSpec("topology_100k", 100_000, 40, 6, 48, 0.5, seed=2),
+    synthetic.GarmentSpec("topology_250k", 250_000, 80, 8, 64, 0.7, seed=3),
+)
+REPEAT = 5
+
+
+def _median(fn):
+    samples = []
+    result = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def _run(spec):
+    obj, expected = synthetic.build_garment(bpy, spec)
+    edge_count = len(obj.data.edges)
+    try:
+        membership = _vertices_by_group(obj)
+        part_names, seam_names = _split_group_names(obj)
+
+        build_time, topology = _median(lambda: MeshTopology.from_mesh(obj.data))
+
+        def cold():
+            topology._adjacency.clear()
+            return seams_by_incidence(membership, part_names, seam_names, topology)
+
+        cold_time, by_edges = _median(cold)
+        warm_time, _ = _median(
+            lambda: seams_by_incidence(membership, part_names, seam_names, topology)
+        )
+
+        def by_vertices():
+            membership._incidence_cache.clear()
+            return seams_by_incidence(membership, part_names, seam_names)
+
+        vertex_time, _ = _median(by_vertices)
+
+        def shapes():
+            topology._seams.clear()
+            return [
+                (seam.length, len(seam.polylines))
+                for seam in topology.seams(membership, seam_names).values()
+            ]
+
+        shape_time, _ = _median(shapes)
+        if by_edges != expected:
+            raise AssertionError("edge-based seam assignment does not match the generator")
+    finally:
+        synthetic.remove_garment(bpy, obj)
+
+    print(f"{spec.name}: {edge_count} edges, {len(seam_names)} seams")
+    print(f"  build topology       {build_time * 1000:>9.2f} ms")
+    print(f"  adjacency (cold)     {cold_time * 1000:>9.2f} ms")
+    print(f"  adjacency (cached)   {warm_time * 1000:>9.2f} ms")
+    print(f"  vertex incidence     {vertex_time * 1000:>9.2f} ms")
+    print(f"  length + polylines   {shape_time * 1000:>9.2f} ms")
+
+
+def main():
+    for spec in SPECS:
+        _run(spec)
+
+
+if __name__ == "__main__":
+    main()
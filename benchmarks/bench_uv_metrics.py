@@ -0,0 +1,66 @@
+"""パーツごとの UV 指標（UVMesh）の計算時間を、ループ数を変えて計測する。
+
+UVMesh の構築（バッファの読み出し、面ごとの面積・角度、アイランド）と、
+パーツへの振り分け・集計を分けて表示する。バッチエクスポートで毎回走るので、
+100 万ループで 1 秒を大きく下回ることを目安にする。
+
+    blender --background --factory-startup --python benchmarks/bench_uv_metrics.py
+    python benchmarks/bench_uv_metrics.py
+"""
+
+import statistics
+import time
+
+import _harness
+
+bpy = _harness.setup()
+
+import synthetic  # noqa: E402
+from garment_pattern_uv.core.uv_metrics import UVMesh, finish_metrics  # noqa: E402
+from garment_pattern_uv.mesh_sync import _split_group_names, _vertices_by_group  # noqa: E402
+
+VERTEX_COUNTS = (10_000, 100_000, 250_000)
+PART_COUNT = 40
+REPEAT = 3
+
+
+def _median(fn):
+    samples = []
+    result = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    print(f"{'loops':>10} {'build [s]':>10} {'parts [s]':>10} {'total [s]':>10}")
+    for vertex_count in VERTEX_COUNTS:
+        spec = synthetic.GarmentSpec(f"uv_{vertex_count}", vertex_count, PART_COUNT, 2, 16)
+        obj, _ = synthetic.build_garment(bpy, spec)
+        loop_count = len(obj.data.loops)
+        try:
+            membership = _vertices_by_group(obj)
+            part_names, _ = _split_group_names(obj)
+            build_time, uv_mesh = _median(lambda: UVMesh.from_mesh(obj.data))
+
+            def totals():
+                uv_mesh._metrics.clear()
+                return uv_mesh.part_totals(membership, part_names)
+
+            parts_time, result = _median(totals)
+            # 格子の UV は 3D と同じ形なので歪みは 0 になる
+            for entry in result.values():
+                metrics = finish_metrics(entry)
+                assert metrics["area_distortion"] == 0.0, metrics
+        finally:
+            synthetic.remove_garment(bpy, obj)
+        print(
+            f"{loop_count:>10} {build_time:>10.4f} {parts_time:>10.4f}"
+            f" {build_time + parts_time:>10.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Blender の外でアドオンを読み込むための bpy の代替。
+
+ベンチマークなど CI 上で動かすコードのためのもので、実装は必要最小限に留める。
+sys.path の先頭に ``benchmarks/fake_bpy`` を追加すると ``import bpy`` でこれが読み込まれる。
+"""
+
+import os
+from types import SimpleNamespace
+
+from . import props, types
+
+__all__ = ("app", "context", "data", "ops", "path", "props", "types", "utils")
+
+
+# bpy.app
+#################################################
+
+
+def _persistent(function):
+    return function
+
+
+class _Timers:
+    def __init__(self):
+        self._registered = {}
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self._registered[function] = first_interval
+
+    def unregister(self, function):
+        if function not in self._registered:
+            raise ValueError("Error: function is not registered")
+        del self._registered[function]
+
+    def is_registered(self, function):
+        return function in self._registered
+
+    def run_pending(self):
+        """登録済みタイマーを 1 回ずつ実行する（代替実装専用）。"""
+        for function in list(self._registered):
+            del self._registered[function]
+            interval = function()
+            if interval is not None:
+                self._registered[function] = interval
+
+
+app = SimpleNamespace(
+    version=(4, 2, 0),
+    binary_path="blender",
+    background=True,
+    handlers=SimpleNamespace(
+        depsgraph_update_post=[],
+        load_post=[],
+        save_pre=[],
+        undo_post=[],
+        redo_post=[],
+        persistent=_persistent,
+    ),
+    timers=_Timers(),
+)
+
+
+# bpy.data
+#################################################
+
+
+class _IDCollection(types.bpy_prop_collection):
+    def __init__(self, id_type):
+        super().__init__(id_type)
+
+    def _unique_name(self, name):
+        base = name
+        suffix = 1
+        while name in self:
+            name = f"{base}.{suffix:03d}"
+            suffix += 1
+        return name
+
+    def new(self, name, *args):
+        item = self._item_type(self._unique_name(name), *args)
+        self.append(item)
+        return item
+
+    def remove(self, item):
+        list.remove(self, item)
+
+
+data = SimpleNamespace(
+    texts=_IDCollection(types.Text),
+    meshes=_IDCollection(types.Mesh),
+    objects=_IDCollection(types.Object),
+    scenes=_IDCollection(types.Scene),
+    filepath="",
+)
+
+
+# bpy.context
+#################################################
+
+
+class _Context:
+    def __init__(self):
+        self.window_manager = types.WindowManager()
+        self.scene = None
+
+    @property
+    def view_layer(self):
+        return self.scene.view_layers[0] if self.scene is not None else None
+
+    @property
+    def object(self):
+        view_layer = self.view_layer
+        return view_layer.objects.active if view_layer is not None else None
+
+    @property
+    def active_object(self):
+        return self.object
+
+
+context = _Context()
+context.scene = data.scenes.new("Scene")
+
+
+# bpy.path / bpy.utils / bpy.ops
+#################################################
+
+
+def _abspath(path, start=None, library=None):
+    if path.startswith("//"):
+        base = start or os.path.dirname(data.filepath) or os.getcwd()
+        return os.path.join(base, path[2:])
+    return path
+
+
+path = SimpleNamespace(abspath=_abspath)
+
+
+def _register_class(cls):
+    for name, value in getattr(cls, "__annotations__", {}).items():
+        if isinstance(value, props._PropertyDeferred):
+            setattr(cls, name, value)
+    cls.is_registered = True
+
+
+def _unregister_class(cls):
+    cls.is_registered = False
+
+
+utils = SimpleNamespace(register_class=_register_class, unregister_class=_unregister_class)
+
+
+def _unsupported(*_args, **_kwargs):
+    raise NotImplementedError("bpy.ops is not available in the fake bpy module")
+
+
+ops = SimpleNamespace(wm=SimpleNamespace(open_mainfile=_unsupported))
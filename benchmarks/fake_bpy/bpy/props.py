@@ -0,0 +1,117 @@
+"""bpy.props の最小限の代替。プロパティは型クラスに登録されるとデスクリプタとして振る舞う。"""
+
+
+class _PropertyDeferred:
+    def __init__(self, function, keywords):
+        self.function = function
+        self.keywords = keywords
+        self._name = None
+
+    def __repr__(self):
+        return f"<_PropertyDeferred {self.function.__name__} {self._name}>"
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def _values(self, instance):
+        return instance.__dict__.setdefault("_rna_values", {})
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        getter = self.keywords.get("get")
+        if getter is not None:
+            return getter(instance)
+        values = self._values(instance)
+        if self._name not in values:
+            values[self._name] = self._default(instance)
+        return values[self._name]
+
+    def __set__(self, instance, value):
+        if self.function is CollectionProperty:
+            raise AttributeError(f"bpy_struct: attribute '{self._name}' is read-only")
+        setter = self.keywords.get("set")
+        if setter is not None:
+            setter(instance, value)
+        else:
+            self._values(instance)[self._name] = value
+        update = self.keywords.get("update")
+        if update is not None:
+            import bpy
+
+            update(instance, bpy.context)
+
+    def _default(self, instance):
+        from . import types
+
+        keywords = self.keywords
+        if self.function is CollectionProperty:
+            collection = types.bpy_prop_collection(keywords["type"])
+            collection._id_data = instance.id_data
+            return collection
+        if self.function is PointerProperty:
+            pointer_type = keywords["type"]
+            if issubclass(pointer_type, types.PropertyGroup):
+                group = pointer_type()
+                group._id_data = instance.id_data
+                return group
+            return None
+        if self.function is EnumProperty:
+            if "default" in keywords:
+                return keywords["default"]
+            items = keywords.get("items", ())
+            if callable(items):
+                items = items(instance, None)
+            return items[0][0] if items else ""
+        return keywords.get("default", _DEFAULTS[self.function])
+
+
+def _deferred(function):
+    def wrapper(**keywords):
+        return _PropertyDeferred(wrapper, keywords)
+
+    wrapper.__name__ = function.__name__
+    return wrapper
+
+
+@_deferred
+def BoolProperty():
+    pass
+
+
+@_deferred
+def CollectionProperty():
+    pass
+
+
+@_deferred
+def EnumProperty():
+    pass
+
+
+@_deferred
+def FloatProperty():
+    pass
+
+
+@_deferred
+def IntProperty():
+    pass
+
+
+@_deferred
+def PointerProperty():
+    pass
+
+
+@_deferred
+def StringProperty():
+    pass
+
+
+_DEFAULTS = {
+    BoolProperty: False,
+    FloatProperty: 0.0,
+    IntProperty: 0,
+    StringProperty: "",
+}
@@ -0,0 +1,506 @@
+"""bpy.types の最小限の代替。アドオンの読み込みとメッシュ／プロパティ操作に必要な範囲だけを持つ。"""
+
+import numpy as np
+
+from .props import _PropertyDeferred
+
+
+class _RNAMeta(type):
+    def __setattr__(cls, name, value):
+        if isinstance(value, _PropertyDeferred):
+            value._name = name
+        super().__setattr__(name, value)
+
+
+class bpy_struct(metaclass=_RNAMeta):
+    def as_pointer(self):
+        return id(self)
+
+    @property
+    def id_data(self):
+        """所属する ID。PropertyGroup は作られた時点の持ち主から引き継ぐ。"""
+        return self.__dict__.get("_id_data")
+
+    # ID プロパティとしての読み書き（登録済みプロパティの保存値を共有する）
+    def _id_properties(self):
+        return self.__dict__.setdefault("_rna_values", {})
+
+    def get(self, key, default=None):
+        return self._id_properties().get(key, default)
+
+    def keys(self):
+        return self._id_properties().keys()
+
+    def __getitem__(self, key):
+        return self._id_properties()[key]
+
+    def __setitem__(self, key, value):
+        self._id_properties()[key] = value
+
+    def __delitem__(self, key):
+        del self._id_properties()[key]
+
+
+class bpy_prop_collection(list):
+    """CollectionProperty の代替。要素は item_type のインスタンス。"""
+
+    def __init__(self, item_type=None, items=()):
+        super().__init__(items)
+        self._item_type = item_type
+
+    def add(self):
+        item = self._item_type()
+        item._id_data = getattr(self, "_id_data", None)
+        self.append(item)
+        return item
+
+    def remove(self, index):
+        del self[index]
+
+    def move(self, source, target):
+        self.insert(target, self.pop(source))
+
+    def find(self, name):
+        for index, item in enumerate(self):
+            if item.name == name:
+                return index
+        return -1
+
+    def get(self, name, default=None):
+        index = self.find(name)
+        return self[index] if index >= 0 else default
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.get(key)
+            if item is None:
+                raise KeyError(key)
+            return item
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return self.find(key) >= 0
+        return super().__contains__(key)
+
+    def foreach_get(self, attr, buffer):
+        buffer[:] = [getattr(item, attr) for item in self]
+
+
+class PropertyGroup(bpy_struct):
+    pass
+
+
+class Operator(bpy_struct):
+    def report(self, level, message):
+        self.last_report = (set(level), message)
+
+
+class Panel(bpy_struct):
+    pass
+
+
+class UIList(bpy_struct):
+    pass
+
+
+class AddonPreferences(bpy_struct):
+    pass
+
+
+class Header(bpy_struct):
+    pass
+
+
+class Menu(bpy_struct):
+    pass
+
+
+class Node(bpy_struct):
+    pass
+
+
+class NodeSocket(bpy_struct):
+    pass
+
+
+class NodeTree(bpy_struct):
+    pass
+
+
+class RenderEngine(bpy_struct):
+    pass
+
+
+class Gizmo(bpy_struct):
+    pass
+
+
+class GizmoGroup(bpy_struct):
+    pass
+
+
+class ID(bpy_struct):
+    users = 0
+
+    def __init__(self, name=""):
+        self.name = name
+
+    @property
+    def id_data(self):
+        return self
+
+    @property
+    def original(self):
+        return self
+
+
+class Text(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self._body = ""
+
+    def as_string(self):
+        return self._body
+
+    def clear(self):
+        self._body = ""
+
+    def write(self, value):
+        self._body += value
+
+    def from_string(self, value):
+        self._body = value
+
+    @property
+    def lines(self):
+        return [_TextLine(line) for line in self._body.split("\n")]
+
+
+class _TextLine:
+    __slots__ = ("body",)
+
+    def __init__(self, body):
+        self.body = body
+
+
+# Mesh data
+#################################################
+
+
+class _ArrayItem:
+    __slots__ = ("_owner", "index")
+
+    def __init__(self, owner, index):
+        self._owner = owner
+        self.index = index
+
+    def __getattr__(self, attr):
+        array = self._owner._arrays[attr]
+        value = array[self.index]
+        return value.tolist() if array.ndim > 1 else value.item()
+
+
+class _ArrayCollection:
+    """頂点や辺のように属性を numpy 配列で保持するコレクション。"""
+
+    _item_class = _ArrayItem
+    _layout = {}
+
+    def __init__(self):
+        self._arrays = {
+            attr: np.zeros((0,) + shape, dtype=dtype)
+            for attr, (dtype, shape) in self._layout.items()
+        }
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return (self._item_class(self, index) for index in range(self._length))
+
+    def __getitem__(self, index):
+        if not -self._length <= index < self._length:
+            raise IndexError(index)
+        return self._item_class(self, index % self._length)
+
+    def add(self, count):
+        for attr, array in self._arrays.items():
+            grown = np.zeros((count,) + array.shape[1:], dtype=array.dtype)
+            self._arrays[attr] = np.concatenate([array, grown])
+        self._length += count
+
+    def foreach_get(self, attr, buffer):
+        source = self._arrays[attr].ravel()
+        if isinstance(buffer, np.ndarray):
+            buffer[:] = source
+        else:
+            buffer[:] = source.tolist()
+
+    def foreach_set(self, attr, values):
+        array = self._arrays[attr]
+        array[...] = np.asarray(values, dtype=array.dtype).reshape(array.shape)
+
+
+class VertexGroupElement:
+    __slots__ = ("group", "weight")
+
+    def __init__(self, group, weight):
+        self.group = group
+        self.weight = weight
+
+
+class VertexGroupElements(list):
+    def foreach_get(self, attr, buffer):
+        buffer[:] = [getattr(element, attr) for element in self]
+
+
+class MeshVertex(_ArrayItem):
+    __slots__ = ()
+
+    @property
+    def groups(self):
+        return self._owner._groups[self.index]
+
+
+class MeshVertices(_ArrayCollection):
+    _item_class = MeshVertex
+    _layout = {"co": (np.float32, (3,)), "select": (np.bool_, ())}
+
+    def __init__(self):
+        super().__init__()
+        self._groups = []
+
+    def add(self, count):
+        super().add(count)
+        self._groups.extend(VertexGroupElements() for _ in range(count))
+
+
+class MeshEdges(_ArrayCollection):
+    _layout = {"vertices": (np.int32, (2,))}
+
+
+class MeshLoops(_ArrayCollection):
+    _layout = {"vertex_index": (np.int32, ())}
+
+
+class MeshPolygons(_ArrayCollection):
+    _layout = {"loop_start": (np.int32, ()), "loop_total": (np.int32, ())}
+
+
+class MeshUVLoops(_ArrayCollection):
+    _layout = {"uv": (np.float32, (2,))}
+
+
+class MeshUVLoopLayer(bpy_struct):
+    def __init__(self, name, loop_count):
+        self.name = name
+        self.data = MeshUVLoops()
+        self.data.add(loop_count)
+
+
+class UVLoopLayers(bpy_prop_collection):
+    def __init__(self, mesh):
+        super().__init__(MeshUVLoopLayer)
+        self._mesh = mesh
+        self.active = None
+
+    def new(self, name="UVMap"):
+        layer = MeshUVLoopLayer(name, len(self._mesh.loops))
+        self.append(layer)
+        if self.active is None:
+            self.active = layer
+        return layer
+
+
+class Mesh(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.vertices = MeshVertices()
+        self.edges = MeshEdges()
+        self.loops = MeshLoops()
+        self.polygons = MeshPolygons()
+        self.uv_layers = UVLoopLayers(self)
+
+    def from_pydata(self, vertices, edges, faces):
+        self.vertices.add(len(vertices))
+        if len(vertices):
+            self.vertices.foreach_set("co", np.asarray(vertices, dtype=np.float32))
+        if len(edges):
+            self.edges.add(len(edges))
+            self.edges.foreach_set("vertices", np.asarray(edges, dtype=np.int32))
+        if len(faces):
+            totals = np.fromiter((len(face) for face in faces), dtype=np.int32)
+            starts = np.concatenate([[0], np.cumsum(totals)[:-1]]).astype(np.int32)
+            self.polygons.add(len(faces))
+            self.polygons.foreach_set("loop_start", starts)
+            self.polygons.foreach_set("loop_total", totals)
+            self.loops.add(int(totals.sum()))
+            self.loops.foreach_set(
+                "vertex_index",
+                np.fromiter((index for face in faces for index in face), dtype=np.int32),
+            )
+            if not len(edges):
+                self._edges_from_faces(faces)
+
+    def _edges_from_faces(self, faces):
+        pairs = {
+            tuple(sorted((face[corner], face[(corner + 1) % len(face)])))
+            for face in faces
+            for corner in range(len(face))
+        }
+        if pairs:
+            self.edges.add(len(pairs))
+            self.edges.foreach_set("vertices", np.array(sorted(pairs), dtype=np.int32))
+
+    def update(self, *_args, **_kwargs):
+        pass
+
+
+# Objects
+#################################################
+
+
+class VertexGroup(bpy_struct):
+    def __init__(self, owner, name, index):
+        self._owner = owner
+        self.name = name
+        self.index = index
+
+    def add(self, index, weight, type):
+        groups = self._owner.data.vertices._groups
+        for vertex_index in index:
+            elements = groups[vertex_index]
+            for element in elements:
+                if element.group == self.index:
+                    if type == "REPLACE":
+                        element.weight = weight
+                    elif type == "ADD":
+                        element.weight += weight
+                    elif type == "SUBTRACT":
+                        element.weight -= weight
+                    break
+            else:
+                elements.append(VertexGroupElement(self.index, weight))
+
+    def remove(self, index):
+        groups = self._owner.data.vertices._groups
+        for vertex_index in index:
+            elements = groups[vertex_index]
+            elements[:] = [item for item in elements if item.group != self.index]
+
+    def weight(self, index):
+        for element in self._owner.data.vertices._groups[index]:
+            if element.group == self.index:
+                return element.weight
+        raise RuntimeError("Error: Vertex not in group")
+
+
+class VertexGroups(bpy_prop_collection):
+    def __init__(self, owner):
+        super().__init__(VertexGroup)
+        self._owner = owner
+        self.active_index = -1
+
+    def new(self, name="Group"):
+        base = name
+        suffix = 1
+        while name in self:
+            name = f"{base}.{suffix:03d}"
+            suffix += 1
+        group = VertexGroup(self._owner, name, len(self))
+        self.append(group)
+        self.active_index = group.index
+        return group
+
+    def remove(self, group):
+        removed = group.index
+        list.remove(self, group)
+        for index, item in enumerate(self):
+            item.index = index
+        for elements in self._owner.data.vertices._groups:
+            elements[:] = [item for item in elements if item.group != removed]
+            for item in elements:
+                if item.group > removed:
+                    item.group -= 1
+
+
+class Object(ID):
+    def __init__(self, name="", data=None):
+        super().__init__(name)
+        self.data = data
+        self.type = "MESH" if isinstance(data, Mesh) else "EMPTY"
+        self.mode = "OBJECT"
+        self.vertex_groups = VertexGroups(self)
+
+    def update_from_editmode(self):
+        return True
+
+
+# Scenes
+#################################################
+
+
+class LayerObjects(list):
+    def __init__(self):
+        super().__init__()
+        self.active = None
+
+
+class ViewLayer(bpy_struct):
+    def __init__(self, name="ViewLayer"):
+        self.name = name
+        self.objects = LayerObjects()
+
+
+class CollectionObjects(list):
+    def __init__(self, scene):
+        super().__init__()
+        self._scene = scene
+
+    def link(self, obj):
+        self.append(obj)
+        for view_layer in self._scene.view_layers:
+            view_layer.objects.append(obj)
+
+    def unlink(self, obj):
+        self.remove(obj)
+        for view_layer in self._scene.view_layers:
+            if obj in view_layer.objects:
+                view_layer.objects.remove(obj)
+
+
+class Collection(ID):
+    def __init__(self, name="", scene=None):
+        super().__init__(name)
+        self.objects = CollectionObjects(scene)
+        self.children = []
+
+    @property
+    def all_objects(self):
+        objects = list(self.objects)
+        for child in self.children:
+            objects.extend(child.all_objects)
+        return objects
+
+
+class Scene(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.view_layers = [ViewLayer()]
+        self.collection = Collection(name, self)
+
+    @property
+    def objects(self):
+        return self.collection.all_objects
+
+
+class WindowManager(ID):
+    def __init__(self, name="WinMan"):
+        super().__init__(name)
+        self.clipboard = ""
+        self.windows = []
+
+    def fileselect_add(self, _operator):
+        pass
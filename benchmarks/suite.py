@@ -0,0 +1,209 @@
+"""合成衣服メッシュで同期・検証・絞り込み・書き出しを通しで計測し、ベースラインと比べる。
+
+    python benchmarks/suite.py                         # 計測して表示
+    python benchmarks/suite.py --save results.json     # 結果を JSON に保存
+    python benchmarks/suite.py --baseline results.json # 保存済みの結果と比較
+    blender --background --factory-startup --python benchmarks/suite.py -- --quick
+
+--baseline を渡すと、threshold（既定 25%）と min-delta（既定 1 ms）の両方を超えて
+遅くなった段階を回帰として表示し、終了コード 1 を返す。ベースラインは実行環境ごとに
+取り直すこと（fake_bpy と Blender の結果は比べられない）。
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import _harness
+
+bpy = _harness.setup()
+
+import synthetic  # noqa: E402
+from garment_pattern_uv.core.membership import invalidate_membership  # noqa: E402
+from garment_pattern_uv.core.seams import seams_for_export  # noqa: E402
+from garment_pattern_uv.core.topology import invalidate_topology  # noqa: E402
+from garment_pattern_uv.core.uv_metrics import invalidate_uv_mesh  # noqa: E402
+from garment_pattern_uv.data_io import _export_model, _write_json  # noqa: E402
+from garment_pattern_uv.mesh_sync import (  # noqa: E402
+    _mesh_topology,
+    _split_group_names,
+    _sync_from_vertex_groups,
+    _uv_mesh,
+    _vertices_by_group,
+)
+
+SCENARIOS = (
+    synthetic.GarmentSpec("small", 10_000, 8, 4, 24, 0.5, seed=1),
+    synthetic.GarmentSpec("medium", 100_000, 40, 6, 48, 0.5, seed=2),
+    synthetic.GarmentSpec("large", 400_000, 120, 8, 64, 0.7, seed=3),
+    synthetic.GarmentSpec("dense_seams", 100_000, 20, 60, 200, 1.0, seed=4),
+)
+QUICK_SCENARIOS = ("small", "medium")
+STAGES = ("membership", "sync_full", "sync_fast", "model", "validate", "filter", "export")
+
+
+def _stage_times(obj, props, output_dir):
+    """1 回分の各段階の所要時間（秒）を返す。"""
+    times = {}
+
+    start = time.perf_counter()
+    invalidate_membership(obj.as_pointer())
+    invalidate_topology(obj.as_pointer())
+    invalidate_uv_mesh(obj.as_pointer())
+    _vertices_by_group(obj)
+    _mesh_topology(obj)
+    _uv_mesh(obj)
+    times["membership"] = time.perf_counter() - start
+
+    props.last_sync_signature = ""
+    start = time.perf_counter()
+    _sync_from_vertex_groups(props, obj)
+    times["sync_full"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _sync_from_vertex_groups(props, obj)
+    times["sync_fast"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = _export_model(props, obj)
+    model.seams_by_part  # 遅延計算をここで走らせる
+    times["model"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.validate()
+    times["validate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = model.export_data()
+    times["filter"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _write_json(os.path.join(output_dir, f"{props.garment_id}.json"), data)
+    times["export"] = time.perf_counter() - start
+    return times
+
+
+def _check(obj, expected):
+    part_names, seam_names = _split_group_names(obj)
+    membership = _vertices_by_group(obj)
+    for topology in (None, _mesh_topology(obj)):
+        actual = seams_for_export(membership, part_names, seam_names, {}, topology)
+        actual = {name: set(seams) for name, seams in actual.items()}
+        if actual != expected:
+            raise AssertionError("seam assignment does not match the generator")
+
+
+def run_scenario(spec, repeat, output_dir):
+    obj, expected = synthetic.build_garment(bpy, spec)
+    props = bpy.context.scene.garment_uv
+    try:
+        _check(obj, expected)
+        synthetic.fill_annotation(props, obj, spec)
+        samples = {stage: [] for stage in STAGES}
+        for _ in range(repeat):
+            for stage, elapsed in _stage_times(obj, props, output_dir).items():
+                samples[stage].append(elapsed)
+    finally:
+        synthetic.remove_garment(bpy, obj)
+    return {
+        "spec": spec.as_dict(),
+        "stages": {stage: statistics.median(values) for stage, values in samples.items()},
+    }
+
+
+def _environment():
+    return {
+        "bpy": "fake" if _harness.is_fake(bpy) else ".".join(map(str, bpy.app.version)),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def compare(current, baseline, threshold, min_delta):
+    """回帰した (シナリオ, 段階, 基準値, 今回値) のリストを返す。"""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None or base.get("spec") != result["spec"]:
+            continue
+        for stage, elapsed in result["stages"].items():
+            before = base["stages"].get(stage)
+            if before is None:
+                continue
+            if elapsed > before * (1 + threshold) and elapsed - before > min_delta:
+                regressions.append((name, stage, before, elapsed))
+    return regressions
+
+
+def _print_results(results, baseline):
+    header = f"{'scenario':>12} {'stage':>10} {'time [ms]':>10}"
+    if baseline is not None:
+        header += f" {'baseline':>10} {'ratio':>7}"
+    print(header)
+    for name, result in results["scenarios"].items():
+        base = (baseline or {}).get("scenarios", {}).get(name, {}).get("stages", {})
+        for stage, elapsed in result["stages"].items():
+            line = f"{name:>12} {stage:>10} {elapsed * 1000:>10.2f}"
+            if stage in base:
+                line += f" {base[stage] * 1000:>10.2f} {elapsed / base[stage]:>6.2f}x"
+            print(line)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="suite")
+    parser.add_argument("--quick", action="store_true", help="小さいシナリオだけ")
+    parser.add_argument("--scenario", action="append", default=[])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="結果を書き出す JSON のパス")
+    parser.add_argument("--baseline", help="比較するベースライン JSON のパス")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = _parse_args(argv)
+    names = args.scenario or (
+        QUICK_SCENARIOS if args.quick else [spec.name for spec in SCENARIOS]
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+
+    results = {"environment": _environment(), "scenarios": {}}
+    with tempfile.TemporaryDirectory(prefix="gpuv_bench_") as output_dir:
+        for spec in SCENARIOS:
+            if spec.name in names:
+                results["scenarios"][spec.name] = run_scenario(
+                    spec, args.repeat, output_dir
+                )
+
+    _print_results(results, baseline)
+    if args.save:
+        _write_json(args.save, results)
+
+    if baseline is None:
+        return 0
+    if baseline.get("environment", {}).get("bpy") != results["environment"]["bpy"]:
+        print("warning: baseline was recorded with a different bpy", file=sys.stderr)
+    regressions = compare(
+        results, baseline, args.threshold, args.min_delta_ms / 1000
+    )
+    for name, stage, before, elapsed in regressions:
+        print(
+            f"REGRESSION {name}/{stage}: {before * 1000:.2f} ms -> {elapsed * 1000:.2f} ms",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))
@@ -0,0 +1,190 @@
+"""ベンチマーク用の合成衣服メッシュを作る。
+
+格子状のメッシュを行方向の帯に分けてパーツとし、各パーツにシームを並べる。
+頂点グループは ``part_`` / ``seam_`` の命名規則に従うので、_split_group_names や
+同期・エクスポートの処理をそのまま通せる。乱数は seed で固定する。
+
+パラメータ:
+
+- vertex_count: 頂点数（格子に収まるよう切り上げる）
+- part_count: パーツ数（行の帯の数）
+- seams_per_part: パーツあたりのシーム数
+- seam_length: シーム 1 本の頂点数
+- overlap: 隣のパーツとの境界をまたぐシームの割合（0〜1）
+"""
+
+import math
+
+import numpy as np
+
+DEFAULT_REASONING_LENGTH = 400
+
+
+class GarmentSpec:
+    def __init__(
+        self,
+        name="synthetic",
+        vertex_count=10_000,
+        part_count=10,
+        seams_per_part=4,
+        seam_length=32,
+        overlap=0.5,
+        reasoning_length=DEFAULT_REASONING_LENGTH,
+        seed=0,
+    ):
+        if part_count < 1:
+            raise ValueError("part_count must be at least 1")
+        if not 0.0 <= overlap <= 1.0:
+            raise ValueError("overlap must be between 0 and 1")
+        self.name = name
+        self.vertex_count = vertex_count
+        self.part_count = part_count
+        self.seams_per_part = seams_per_part
+        self.seam_length = seam_length
+        self.overlap = overlap
+        self.reasoning_length = reasoning_length
+        self.seed = seed
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def _grid_shape(spec):
+    width = max(2, math.ceil(math.sqrt(spec.vertex_count)))
+    height = max(2, spec.part_count * 2, math.ceil(spec.vertex_count / width))
+    return width, height
+
+
+def _grid_topology(width, height):
+    """格子の頂点座標・辺・四角形面を numpy 配列で返す。"""
+    ys, xs = np.divmod(np.arange(width * height, dtype=np.int64), width)
+    coords = np.column_stack(
+        [xs / (width - 1), ys / (height - 1), np.zeros(width * height)]
+    ).astype(np.float32)
+
+    index = np.arange(width * height, dtype=np.int32).reshape(height, width)
+    horizontal = np.column_stack([index[:, :-1].ravel(), index[:, 1:].ravel()])
+    vertical = np.column_stack([index[:-1, :].ravel(), index[1:, :].ravel()])
+    edges = np.concatenate([horizontal, vertical]).astype(np.int32)
+    faces = np.column_stack(
+        [
+            index[:-1, :-1].ravel(),
+            index[:-1, 1:].ravel(),
+            index[1:, 1:].ravel(),
+            index[1:, :-1].ravel(),
+        ]
+    ).astype(np.int32)
+    return coords, edges, faces
+
+
+def _fill_mesh(mesh, coords, edges, faces):
+    """from_pydata を使わず foreach_set でまとめて書き込む（頂点数が多くても速い）。"""
+    mesh.vertices.add(len(coords))
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.edges.add(len(edges))
+    mesh.edges.foreach_set("vertices", edges.ravel())
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set("vertex_index", faces.ravel())
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set(
+        "loop_start", np.arange(0, faces.size, 4, dtype=np.int32)
+    )
+    mesh.polygons.foreach_set("loop_total", np.full(len(faces), 4, dtype=np.int32))
+
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    uv_layer.data.foreach_set("uv", coords[faces.ravel(), :2].ravel())
+    mesh.update()
+
+
+def _part_rows(spec, height):
+    return np.linspace(0, height, spec.part_count + 1, dtype=np.int64)
+
+
+def _seam_members(spec, rng, width, rows, part_index):
+    """パーツ part_index のシームごとの頂点インデックスを返す。"""
+    start_row, stop_row = int(rows[part_index]), int(rows[part_index + 1])
+    length = min(spec.seam_length, width)
+    seams = []
+    for _ in range(spec.seams_per_part):
+        column = int(rng.integers(0, width - length + 1))
+        columns = np.arange(column, column + length)
+        crosses = (
+            part_index + 1 < spec.part_count and rng.random() < spec.overlap
+        )
+        if crosses:
+            # 境界の上下 2 行に半分ずつ置き、隣のパーツと頂点を共有させる。
+            half = length // 2
+            row_a = np.full(half, stop_row - 1)
+            row_b = np.full(length - half, stop_row)
+            members = np.concatenate(
+                [row_a * width + columns[:half], row_b * width + columns[half:]]
+            )
+        else:
+            row = int(rng.integers(start_row, stop_row))
+            members = row * width + columns
+        seams.append(members)
+    return seams
+
+
+def build_garment(bpy, spec):
+    """spec に従ってメッシュとオブジェクトを作り、(obj, 期待するシーム割り当て) を返す。
+
+    期待値はパーツ名 → そのパーツと頂点を共有するシーム名の集合。
+    """
+    rng = np.random.default_rng(spec.seed)
+    width, height = _grid_shape(spec)
+    coords, edges, faces = _grid_topology(width, height)
+
+    mesh = bpy.data.meshes.new(spec.name)
+    _fill_mesh(mesh, coords, edges, faces)
+    obj = bpy.data.objects.new(spec.name, mesh)
+
+    rows = _part_rows(spec, height)
+    part_names = [f"part_{index:03d}" for index in range(spec.part_count)]
+    for index, name in enumerate(part_names):
+        start, stop = int(rows[index]) * width, int(rows[index + 1]) * width
+        obj.vertex_groups.new(name=name).add(range(start, stop), 1.0, "REPLACE")
+
+    expected = {name: set() for name in part_names}
+    part_of_vertex = np.repeat(np.arange(spec.part_count), np.diff(rows) * width)
+    for part_index in range(spec.part_count):
+        seams = _seam_members(spec, rng, width, rows, part_index)
+        for seam_index, members in enumerate(seams):
+            seam_name = f"seam_{part_index:03d}_{seam_index:02d}"
+            obj.vertex_groups.new(name=seam_name).add(members.tolist(), 1.0, "REPLACE")
+            for touched in np.unique(part_of_vertex[members]):
+                expected[part_names[int(touched)]].add(seam_name)
+    return obj, expected
+
+
+def fill_annotation(props, obj, spec):
+    """頂点グループに合わせてパーツとシームを作り、理由を埋める。"""
+    body = ("合成データの理由テキスト。" * spec.reasoning_length)[: spec.reasoning_length]
+    props.garment_id = spec.name
+    props.garment_type = "shirt"
+    props.design_reasoning = body
+    props.parts.clear()
+    groups = [group.name for group in obj.vertex_groups]
+    for part_name in (name for name in groups if name.startswith("part_")):
+        part = props.parts.add()
+        part.name = part_name
+        part.label = part_name
+        part.modeling_reasoning = body
+        part.uv_reasoning = body
+        prefix = f"seam_{part_name[len('part_'):]}_"
+        for seam_name in (name for name in groups if name.startswith(prefix)):
+            seam = part.seams.add()
+            seam.name = seam_name
+            seam.seam_reasoning = body
+    props.active_part_index = 0 if props.parts else -1
+    props.last_sync_signature = ""
+
+
+def remove_garment(bpy, obj):
+    mesh = obj.data
+    bpy.data.objects.remove(obj)
+    bpy.data.meshes.remove(mesh)
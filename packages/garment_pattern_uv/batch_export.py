@@ -0,0 +1,573 @@
+"""Blender をバックグラウンドで起動して .blend ライブラリを一括エクスポートする。
+
+``scripts/garment_uv_batch.py`` から呼び出す::
+
+    blender --background --factory-startup --python scripts/garment_uv_batch.py -- \
+        INPUT_DIR OUTPUT_DIR [--workers N] [--format jsonl --compression gzip]
+
+``--workers`` が 2 以上なら .blend 1 ファイルごとに Blender プロセスを起動し、
+最大 N 個を並列に走らせる。結果は OUTPUT_DIR/manifest.json にまとめる。
+既定ではシーン内で part_/seam_ グループを持つ全メッシュを 1 着分としてまとめる
+（``--objects active`` ならアクティブ優先の 1 オブジェクトだけ）。
+``--format jsonl`` では OUTPUT_DIR をシャード付き JSONL データセットとして追記し、
+同じコマンドを再実行すると完了済みの .blend を飛ばして続きから処理する。
+
+JSON 出力では、マニフェストに .blend の内容ハッシュと衣服ごとの入力ハッシュ
+（プロパティ・頂点グループ・形状・UV）を記録する。再実行時は .blend が変わって
+いなければ開かずに、衣服の入力が変わっていなければ書き出さずに前回の結果を使う
+（``--full`` で全件を書き出し直す）。
+``--geometry`` を付けると、JSON ごとにパーツ・シームの頂点番号・座標・UV の配列
+ファイル（.gpuvg、core.geometry）も書き、JSON から参照する（JSON 出力のみ）。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+
+from .core.annotation_schema import SCHEMA_SHA256
+from .core.content_hash import file_digest
+from .core.dataset_writer import DEFAULT_MAX_SHARD_BYTES, ShardedJsonlWriter
+from .core.membership import set_memory_limit
+from .data_io import (
+    _export_input_hash,
+    _export_model_for_objects,
+    _geometry_path,
+    _validate_data_dict,
+    _write_json,
+    _write_json_with_geometry,
+)
+from .mesh_sync import _garment_objects, _split_group_names
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _iter_blend_files(root):
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(".blend"):
+                yield os.path.join(directory, filename)
+
+
+def _garment_object(scene):
+    """シーンのアノテーション対象メッシュ（アクティブ優先、無ければ part_ を持つ最初のもの）。"""
+    candidates = [obj for obj in scene.objects if obj.type == "MESH"]
+    active = scene.view_layers[0].objects.active if scene.view_layers else None
+    if active is not None and active in candidates:
+        candidates.remove(active)
+        candidates.insert(0, active)
+    for obj in candidates:
+        part_names, _ = _split_group_names(obj)
+        if part_names:
+            return obj
+    return None
+
+
+def _export_objects(scene, objects):
+    if objects == "active":
+        obj = _garment_object(scene)
+        return [obj] if obj is not None else []
+    return _garment_objects(scene.objects)
+
+
+def _garment_filename(blend_path, scene, props):
+    garment_id = props.garment_id.strip()
+    if garment_id:
+        return f"{garment_id}.json"
+    stem = os.path.splitext(os.path.basename(blend_path))[0]
+    return f"{stem}.{scene.name}.json"
+
+
+def _ensure_registered():
+    if hasattr(bpy.types.Scene, "garment_uv"):
+        return
+    from . import register
+
+    register()
+
+
+def _reusable(garment, input_hash):
+    """前回の結果 garment を、入力ハッシュが input_hash のまま使い回せるか。"""
+    if garment is None or not input_hash or garment.get("input_hash") != input_hash:
+        return False
+    if garment["errors"]:
+        return True
+    geometry = garment.get("geometry")
+    if geometry is not None and not os.path.exists(geometry):
+        return False
+    return garment["output"] is not None and os.path.exists(garment["output"])
+
+
+def collect_blend_file(
+    blend_path, objects="scene", previous=None, geometry=False, hashed=True
+):
+    """1 つの .blend を開き、アノテーションを持つシーンごとのデータと検証結果を返す。
+
+    previous（シーン名 → 前回の結果）と入力ハッシュが一致するシーンは書き出さず、
+    前回の結果に ``unchanged`` を付けて返す（"data" を持たない）。
+    geometry なら、配列ファイルを書けるよう中間表現を "model" に残す。
+    hashed が偽なら入力ハッシュを計算しない（"input_hash" は None）。
+    """
+    _ensure_registered()
+    bpy.ops.wm.open_mainfile(filepath=blend_path, load_ui=False)
+
+    previous = previous or {}
+    garments = []
+    for scene in bpy.data.scenes:
+        props = getattr(scene, "garment_uv", None)
+        if props is None or not (props.parts or props.garment_id.strip()):
+            continue
+        start = time.perf_counter()
+        export_objects = _export_objects(scene, objects)
+        input_hash = _export_input_hash(props, export_objects) if hashed else None
+        earlier = previous.get(scene.name)
+        if _reusable(earlier, input_hash):
+            garments.append(
+                dict(earlier, unchanged=True, seconds=time.perf_counter() - start)
+            )
+            continue
+        model = _export_model_for_objects(props, export_objects)
+        data = model.export_data()
+        garment = {
+            "scene": scene.name,
+            "garment_id": props.garment_id,
+            "filename": _garment_filename(blend_path, scene, props),
+            "output": None,
+            "errors": _validate_data_dict(data),
+            "input_hash": input_hash,
+            "data": data,
+            "seconds": time.perf_counter() - start,
+        }
+        if geometry:
+            garment["model"] = model
+        garments.append(garment)
+    return garments
+
+
+def export_blend_file(
+    blend_path, output_dir, objects="scene", previous=None, geometry=False
+):
+    """1 つの .blend を開き、アノテーションを持つシーンごとに JSON を書き出す。
+
+    geometry なら配列ファイルも書き、そのパスを "geometry" に記録する。
+    """
+    garments = collect_blend_file(blend_path, objects, previous, geometry)
+    for garment in garments:
+        data = garment.pop("data", None)
+        model = garment.pop("model", None)
+        if data is None or garment["errors"]:
+            continue
+        path = os.path.join(output_dir, garment["filename"])
+        if model is None:
+            _write_json(path, data)
+        else:
+            _write_json_with_geometry(path, model)
+            if model.is_mesh:
+                garment["geometry"] = _geometry_path(path)
+        garment["output"] = path
+    return garments
+
+
+def _process_file(
+    blend_path,
+    input_root,
+    output_root,
+    output_format="json",
+    objects="scene",
+    previous=None,
+    geometry=False,
+):
+    relative = os.path.relpath(blend_path, input_root)
+    output_dir = os.path.join(output_root, os.path.dirname(relative))
+    start = time.perf_counter()
+    record = {"file": relative, "garments": [], "error": None}
+    try:
+        if output_format == "jsonl":
+            # JSONL はコーディネータが 1 つのライターでまとめて書く。シャードの
+            # sources で再開し、入力ハッシュによる読み飛ばしはしないので計算しない。
+            record["garments"] = collect_blend_file(blend_path, objects, hashed=False)
+        else:
+            record["garments"] = export_blend_file(
+                blend_path, output_dir, objects, previous, geometry
+            )
+    except Exception:
+        record["error"] = traceback.format_exc(limit=4).strip()
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+def _garment_key(record, garment):
+    return garment["garment_id"].strip() or f"{record['file']}::{garment['scene']}"
+
+
+def _write_jsonl_record(writer, record):
+    """ワーカーの結果を JSONL に追記する。失敗したファイルは完了扱いにしない。"""
+    valid = []
+    for garment in record["garments"]:
+        data = garment.pop("data", None)
+        if data is not None and not garment["errors"]:
+            valid.append((garment, _garment_key(record, garment), data))
+    source = None if record["error"] else record["file"]
+    writer.write_many([(key, data) for _, key, data in valid], source=source)
+    for garment, key, _ in valid:
+        entry = writer.entries[key]
+        garment["output"] = f"{entry['shard']}@{entry['offset']}"
+
+
+def _worker_command(
+    runner,
+    blend_path,
+    input_root,
+    output_root,
+    result_path,
+    output_format,
+    objects,
+    previous_path=None,
+    geometry=False,
+):
+    command = [
+        bpy.app.binary_path,
+        "--background",
+        "--factory-startup",
+        "--python",
+        runner,
+        "--",
+        input_root,
+        output_root,
+        "--format",
+        output_format,
+        "--objects",
+        objects,
+        "--only",
+        blend_path,
+        "--result",
+        result_path,
+    ]
+    if previous_path is not None:
+        command += ["--previous", previous_path]
+    if geometry:
+        command.append("--geometry")
+    return command
+
+
+def _run_worker(
+    runner,
+    blend_path,
+    input_root,
+    output_root,
+    output_format,
+    objects,
+    previous=None,
+    geometry=False,
+):
+    handle, result_path = tempfile.mkstemp(prefix="gpuv_batch_", suffix=".json")
+    os.close(handle)
+    previous_path = None
+    if previous:
+        # 前回の結果はワーカーへファイルで渡す（マニフェスト全体は読ませない）。
+        previous_path = result_path[: -len(".json")] + ".previous.json"
+        _write_json(previous_path, previous)
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(
+            _worker_command(
+                runner,
+                blend_path,
+                input_root,
+                output_root,
+                result_path,
+                output_format,
+                objects,
+                previous_path,
+                geometry,
+            ),
+            capture_output=True,
+            text=True,
+        )
+        try:
+            with open(result_path, encoding="utf-8") as result_file:
+                return json.load(result_file)
+        except (OSError, ValueError):
+            return {
+                "file": os.path.relpath(blend_path, input_root),
+                "garments": [],
+                "error": (
+                    f"worker exited with {completed.returncode}: "
+                    f"{completed.stderr.strip()[-2000:]}"
+                ),
+                "seconds": time.perf_counter() - start,
+            }
+    finally:
+        for path in (result_path, previous_path):
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+
+def _previous_records(output_root, objects, geometry=False):
+    """前回の JSON 出力のマニフェストから、.blend の相対パス → 記録を返す。
+
+    出力の設定やスキーマが違う回のものは使わない。
+    """
+    try:
+        with open(os.path.join(output_root, MANIFEST_NAME), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if (
+        manifest.get("format") != "json"
+        or manifest.get("objects") != objects
+        or manifest.get("geometry", False) != geometry
+        or manifest.get("schema") != SCHEMA_SHA256
+    ):
+        return {}
+    return {record["file"]: record for record in manifest.get("files", [])}
+
+
+def _file_state(blend_path, earlier):
+    """.blend の大きさ・更新時刻・内容ハッシュ。
+
+    大きさと更新時刻が前回と同じなら、読まずに前回のハッシュを使う。
+    """
+    stat = os.stat(blend_path)
+    state = {"file_size": stat.st_size, "file_mtime_ns": stat.st_mtime_ns}
+    if (
+        earlier is not None
+        and earlier.get("file_hash")
+        and all(earlier.get(key) == value for key, value in state.items())
+    ):
+        state["file_hash"] = earlier["file_hash"]
+    else:
+        state["file_hash"] = file_digest(blend_path)
+    return state
+
+
+def _unchanged_record(earlier, state):
+    """内容の変わらない .blend について、前回の記録をそのまま使えれば返す。"""
+    if earlier is None or earlier["error"] or earlier.get("file_hash") != state["file_hash"]:
+        return None
+    garments = earlier["garments"]
+    if not all(_reusable(garment, garment.get("input_hash")) for garment in garments):
+        return None
+    return dict(
+        earlier,
+        **state,
+        garments=[dict(garment, unchanged=True) for garment in garments],
+        unchanged=True,
+        seconds=0.0,
+    )
+
+
+def export_library(
+    input_root,
+    output_root,
+    workers=1,
+    runner=None,
+    output_format="json",
+    compression=None,
+    max_shard_bytes=DEFAULT_MAX_SHARD_BYTES,
+    objects="scene",
+    incremental=True,
+    geometry=False,
+):
+    """input_root 以下の全 .blend を処理し、マニフェストの dict を返す。
+
+    output_format="jsonl" では output_root をシャード付き JSONL データセットとし、
+    index で完了済みの .blend は読み込まずに飛ばす（中断後の再開）。
+    output_format="json" で incremental なら、前回のマニフェストと比べて
+    内容の変わらない .blend・衣服を書き出さずに前回の結果を引き継ぐ。
+    """
+    blend_files = list(_iter_blend_files(input_root))
+    writer = None
+    skipped = 0
+    if output_format == "jsonl":
+        writer = ShardedJsonlWriter(
+            output_root, max_shard_bytes=max_shard_bytes, compression=compression
+        )
+        pending = [
+            path
+            for path in blend_files
+            if os.path.relpath(path, input_root) not in writer.sources
+        ]
+        skipped = len(blend_files) - len(pending)
+        blend_files = pending
+
+    start = time.perf_counter()
+    previous_records = {}
+    if output_format == "json" and incremental:
+        previous_records = _previous_records(output_root, objects, geometry)
+    records_by_file = {}
+    states = {}
+    previous_garments = {}
+    pending = []
+    for path in blend_files:
+        relative = os.path.relpath(path, input_root)
+        earlier = previous_records.get(relative)
+        if output_format == "json":
+            states[relative] = _file_state(path, earlier)
+            record = _unchanged_record(earlier, states[relative])
+            if record is not None:
+                records_by_file[relative] = record
+                continue
+        if earlier is not None and not earlier["error"]:
+            previous_garments[path] = {
+                garment["scene"]: garment for garment in earlier["garments"]
+            }
+        pending.append(path)
+
+    def finish(record):
+        record.update(states.get(record["file"], {}))
+        if writer is not None:
+            _write_jsonl_record(writer, record)
+        records_by_file[record["file"]] = record
+
+    try:
+        if workers > 1:
+            if runner is None:
+                raise ValueError("workers > 1 requires the runner script path")
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(
+                    lambda path: _run_worker(
+                        runner,
+                        path,
+                        input_root,
+                        output_root,
+                        output_format,
+                        objects,
+                        previous_garments.get(path),
+                        geometry,
+                    ),
+                    pending,
+                )
+                for record in results:
+                    finish(record)
+        else:
+            for path in pending:
+                finish(
+                    _process_file(
+                        path,
+                        input_root,
+                        output_root,
+                        output_format,
+                        objects,
+                        previous_garments.get(path),
+                        geometry,
+                    )
+                )
+    finally:
+        if writer is not None:
+            writer.close()
+
+    records = [
+        records_by_file[os.path.relpath(path, input_root)] for path in blend_files
+    ]
+    manifest = {
+        "input": os.path.abspath(input_root),
+        "output": os.path.abspath(output_root),
+        "format": output_format,
+        "objects": objects,
+        "geometry": geometry,
+        "schema": SCHEMA_SHA256,
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+        "file_count": len(records),
+        "skipped_files": skipped,
+        "unchanged_files": sum(1 for record in records if record.get("unchanged")),
+        "garment_count": sum(len(record["garments"]) for record in records),
+        "unchanged_garments": sum(
+            1
+            for record in records
+            for garment in record["garments"]
+            if garment.get("unchanged")
+        ),
+        "failed_files": sum(1 for record in records if record["error"]),
+        "files": records,
+    }
+    _write_json(os.path.join(output_root, MANIFEST_NAME), manifest)
+    return manifest
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="garment_uv_batch")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--format", choices=("json", "jsonl"), default="json")
+    parser.add_argument("--objects", choices=("scene", "active"), default="scene")
+    parser.add_argument("--compression", choices=("none", "gzip", "zstd"), default="none")
+    parser.add_argument(
+        "--shard-size-mb", type=int, default=DEFAULT_MAX_SHARD_BYTES // (1024 * 1024)
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="re-export even unchanged garments"
+    )
+    parser.add_argument(
+        "--geometry",
+        action="store_true",
+        help="also write per-part/seam vertex, position and UV arrays (.gpuvg, JSON only)",
+    )
+    parser.add_argument(
+        "--memory-limit-mb",
+        type=float,
+        help="working memory ceiling for vertex group reads (default 128)",
+    )
+    parser.add_argument("--only", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    parser.add_argument("--previous", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.geometry and args.format != "json":
+        parser.error("--geometry is only supported with --format json")
+    return args
+
+
+def main(argv, runner=None):
+    args = _parse_args(argv)
+    if args.memory_limit_mb:
+        # ワーカーの Blender プロセスへは環境変数で引き継ぐ。
+        os.environ["GPUV_MEMORY_LIMIT_MB"] = str(args.memory_limit_mb)
+        set_memory_limit()
+    if args.only:
+        # ワーカープロセス: 1 ファイルだけ処理して結果を書き出す。
+        previous = None
+        if args.previous:
+            with open(args.previous, encoding="utf-8") as handle:
+                previous = json.load(handle)
+        record = _process_file(
+            args.only,
+            args.input_dir,
+            args.output_dir,
+            args.format,
+            args.objects,
+            previous,
+            args.geometry,
+        )
+        _write_json(args.result, record)
+        return 0 if record["error"] is None else 1
+
+    manifest = export_library(
+        args.input_dir,
+        args.output_dir,
+        workers=max(1, args.workers),
+        runner=runner,
+        output_format=args.format,
+        compression=None if args.compression == "none" else args.compression,
+        max_shard_bytes=args.shard_size_mb * 1024 * 1024,
+        objects=args.objects,
+        incremental=not args.full,
+        geometry=args.geometry,
+    )
+    print(
+        f"Exported {manifest['garment_count']} garments from "
+        f"{manifest['file_count']} files in {manifest['seconds']:.1f}s "
+        f"({manifest['unchanged_garments']} unchanged, "
+        f"{manifest['failed_files']} failed)",
+        file=sys.stderr,
+    )
+    return 0 if manifest["failed_files"] == 0 else 1
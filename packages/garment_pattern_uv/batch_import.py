@@ -0,0 +1,118 @@
+"""書き出したアノテーション（JSON／JSONL シャード／データセット）をシーンへ読み戻す。
+
+読み込めるのは次の 3 種類:
+
+- ``*.json``: レコード 1 件（またはレコードの配列）
+- ``*.jsonl`` / ``*.jsonl.gz`` / ``*.jsonl.zst``: シャード 1 つ分のレコード
+- ``index.jsonl`` またはそれを含むディレクトリ: シャード付きデータセット全体
+
+データセットは index から garment_id を引けるので、必要なレコードだけを読む。
+"""
+
+import json
+import os
+
+import bpy
+
+from .core.dataset_writer import (
+    INDEX_NAME,
+    iter_shard_records,
+    read_index_entries,
+    read_record,
+)
+from .data_io import _dict_to_props, _validate_data_dict
+from .mesh_sync import _reset_sync_state
+
+
+def _dataset_directory(path):
+    if os.path.isdir(path):
+        return path
+    if os.path.basename(path) == INDEX_NAME:
+        return os.path.dirname(path)
+    return None
+
+
+def iter_annotation_records(path):
+    """path に含まれるアノテーションの dict を順に返す。"""
+    directory = _dataset_directory(path)
+    if directory is not None:
+        for entry in read_index_entries(directory).values():
+            yield read_record(directory, entry)
+        return
+
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        if isinstance(data, list):
+            yield from data
+        else:
+            yield data
+        return
+
+    yield from iter_shard_records(path)
+
+
+def find_annotation_record(path, garment_id):
+    """garment_id のレコードを返す。見つからなければ None。
+
+    garment_id が空、またはファイルにレコードが 1 件しかない場合はそのレコードを返す。
+    """
+    directory = _dataset_directory(path)
+    if directory is not None and garment_id:
+        entry = read_index_entries(directory).get(garment_id)
+        return read_record(directory, entry) if entry is not None else None
+
+    first = None
+    count = 0
+    for data in iter_annotation_records(path):
+        if garment_id and isinstance(data, dict) and data.get("garment_id") == garment_id:
+            return data
+        if first is None:
+            first = data
+        count += 1
+    if count == 1 or (first is not None and not garment_id):
+        return first
+    return None
+
+
+def import_annotation(data, props):
+    """data を検証してから props に読み込む。エラーがあれば読み込まずに返す。"""
+    errors = _validate_data_dict(data)
+    if errors:
+        return errors
+    _dict_to_props(data, props)
+    # 読み込んだパーツを次の同期で頂点グループと突き合わせ直す。
+    props.last_sync_signature = ""
+    return []
+
+
+def import_records(records, scenes=None):
+    """garment_id が一致するシーンへレコードをまとめて読み込み、結果の dict を返す。"""
+    if scenes is None:
+        scenes = bpy.data.scenes
+    targets = {}
+    for scene in scenes:
+        props = getattr(scene, "garment_uv", None)
+        garment_id = props.garment_id.strip() if props is not None else ""
+        if garment_id:
+            targets.setdefault(garment_id, props)
+
+    result = {"imported": [], "unmatched": [], "errors": {}}
+    for data in records:
+        garment_id = data.get("garment_id", "") if isinstance(data, dict) else ""
+        props = targets.get(garment_id) if isinstance(garment_id, str) else None
+        if props is None:
+            result["unmatched"].append(garment_id)
+            continue
+        errors = import_annotation(data, props)
+        if errors:
+            result["errors"][garment_id] = errors
+        else:
+            result["imported"].append(garment_id)
+    _reset_sync_state()
+    return result
+
+
+def import_library(path, scenes=None):
+    """path のレコードを、garment_id が一致する開いているシーンへ読み込む。"""
+    return import_records(iter_annotation_records(path), scenes)
@@ -1,5 +1,12 @@
 GARMENT_TYPE_OPTIONS = ("shirt", "jacket", "pants", "skirt", "one-piece")
 
+# 頂点グループの分類ルール (役割, 接頭辞)。先に書いたものが優先される。
+# ダーツやノッチを扱うときは ("dart", "dart_") のように追加する。
+GROUP_PREFIX_RULES = (("seam", "seam_"), ("part", "part_"))
+
+# 検証と UV 指標の計算に使う UV レイヤー名
+UV_MAP_NAME = "UVMap"
+
 
 def _nonempty(value):
     # 非空の文字列かどうかを判定する。
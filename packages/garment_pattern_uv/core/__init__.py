@@ -0,0 +1,5 @@
+"""bpy に依存しないアルゴリズム群。
+
+頂点グループ配列やパーツ／シームのレコードといった素のデータだけを扱うので、
+Blender の外でも実行・計測できる。bpy 側のモジュールはこれらの薄いアダプタになる。
+"""
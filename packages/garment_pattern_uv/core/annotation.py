@@ -0,0 +1,92 @@
+from ..constants import GARMENT_TYPE_OPTIONS
+from . import annotation_schema
+
+
+def _string(value):
+    return value if isinstance(value, str) else ""
+
+
+def normalize_annotation(data):
+    """読み込んだ dict を、文字列以外の値を空文字に置き換えた正規形にする。"""
+    garment_type = _string(data.get("garment_type", ""))
+    if garment_type not in GARMENT_TYPE_OPTIONS:
+        garment_type = GARMENT_TYPE_OPTIONS[0]
+
+    parts = []
+    for part_data in data.get("parts") or []:
+        if not isinstance(part_data, dict):
+            continue
+        seams = [
+            {
+                "name": _string(seam_data.get("name", "")),
+                "seam_reasoning": _string(seam_data.get("seam_reasoning", "")),
+            }
+            for seam_data in part_data.get("seams") or []
+            if isinstance(seam_data, dict)
+        ]
+        parts.append(
+            {
+                "name": _string(part_data.get("name", "")),
+                "label": _string(part_data.get("label", "")),
+                "modeling_reasoning": _string(part_data.get("modeling_reasoning", "")),
+                "uv_reasoning": _string(part_data.get("uv_reasoning", "")),
+                "seams": seams,
+            }
+        )
+
+    return {
+        "garment_id": _string(data.get("garment_id", "")),
+        "garment_type": garment_type,
+        "design_reasoning": _string(data.get("design_reasoning", "")),
+        "parts": parts,
+    }
+
+
+def filter_seams(data, seams_by_part):
+    """各パーツの seams を seams_by_part に含まれるものだけに絞る。"""
+    for part in data["parts"]:
+        allowed_seams = set(seams_by_part.get(part.get("name", ""), []))
+        part["seams"] = [
+            seam for seam in part["seams"] if seam.get("name") in allowed_seams
+        ]
+    return data
+
+
+def validate_data_dict(data):
+    """スキーマから生成した検証コード（annotation_schema）で data を検証する。"""
+    return annotation_schema.validate(data)
+
+
+def validate_groups(part_names, part_group_names, seams_by_part, seams_in_props):
+    """プロパティ側のパーツ／シームと頂点グループ側の対応を突き合わせる。"""
+    errors = []
+    warnings = []
+    vg_names = set(part_group_names)
+
+    missing_parts = sorted(name for name in part_names if name not in vg_names)
+    extra_parts = sorted(name for name in vg_names if name not in part_names)
+
+    if missing_parts:
+        errors.append(f"欠落しているパートの頂点グループ: {', '.join(missing_parts)}")
+    if extra_parts:
+        warnings.append(f"Vertex groups not in JSON (parts): {', '.join(extra_parts)}")
+
+    for part_name, expected_seams in seams_by_part.items():
+        actual_seams = seams_in_props.get(part_name, set())
+        missing_seams = sorted(set(expected_seams) - actual_seams)
+        extra_seams = sorted(actual_seams - set(expected_seams))
+        if missing_seams:
+            warnings.append(f"Missing seams for {part_name}: {', '.join(missing_seams)}")
+        if extra_seams:
+            warnings.append(f"Extra seams for {part_name}: {', '.join(extra_seams)}")
+    return errors, warnings
+
+
+def format_validation_summary(errors, warnings):
+    if errors:
+        summary = f"Errors: {len(errors)}"
+    else:
+        summary = "OK"
+    if warnings:
+        summary = f"{summary}, Warnings: {len(warnings)}"
+    return summary
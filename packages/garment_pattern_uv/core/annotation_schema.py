@@ -0,0 +1,270 @@
+"""annotations.schema.json を展開した検証コード。
+
+このファイルは scripts/compile_schema.py が生成する。直接編集せず、
+スキーマを変更したら生成し直すこと。
+"""
+
+SCHEMA_ID = 'https://example.com/garment-pattern-uv-dataset/annotations.schema.json'
+SCHEMA_SHA256 = '8357e526de37d473818a8b1c84eacb886e8f74bdcd1842e9dab0d6f480277d81'
+
+_MISSING = object()
+_PART_KEYS = frozenset(('geometry', 'label', 'modeling_reasoning', 'name', 'seams', 'uv_metrics', 'uv_reasoning'))
+_SEAM_KEYS = frozenset(('geometry', 'name', 'seam_reasoning'))
+_UV_METRICS_KEYS = frozenset(('angle_distortion', 'area_3d', 'area_distortion', 'area_uv', 'island_count', 'packing_ratio', 'polygon_count', 'uv_scale'))
+_GEOMETRY_FILE_KEYS = frozenset(('file', 'size'))
+_GEOMETRY_ARRAYS_KEYS = frozenset(('edge_side_uvs', 'edge_sides', 'edges', 'face_sizes', 'face_uvs', 'face_vertices', 'object', 'positions', 'vertices'))
+_ARRAY_REF_KEYS = frozenset(('dtype', 'offset', 'shape'))
+_ROOT_KEYS = frozenset(('design_reasoning', 'garment_id', 'garment_type', 'geometry', 'parts'))
+
+
+def _format_path(path):
+    """(親, キー) の入れ子タプルを parts[0].seams[1].name の形にする。"""
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    text = ""
+    for key in reversed(keys):
+        if isinstance(key, int):
+            text += f"[{key}]"
+        else:
+            text += f".{key}" if text else key
+    return text
+
+
+def _message(path, label):
+    if path is None:
+        return f"ルートは{label}である必要があります。"
+    return f"{_format_path(path)} は{label}である必要があります。"
+
+
+def _unknown_key_message(path):
+    return f"{_format_path(path)} はスキーマに無いキーです。"
+
+
+def _required_message(path):
+    return f"{_format_path(path)} は必須です。"
+
+
+def _validate_part(value, path, errors):
+    if not isinstance(value, dict):
+        errors.append(_message(path, "オブジェクト"))
+        return
+    if not _PART_KEYS.issuperset(value):
+        for key in sorted(value.keys() - _PART_KEYS):
+            errors.append(_unknown_key_message((path, key)))
+    part_name = value.get("name", _MISSING)
+    if part_name is not _MISSING:
+        if not isinstance(part_name, str):
+            errors.append(_message((path, "name"), "文字列"))
+    part_label = value.get("label", _MISSING)
+    if part_label is not _MISSING:
+        if not isinstance(part_label, str):
+            errors.append(_message((path, "label"), "文字列"))
+    part_modeling_reasoning = value.get("modeling_reasoning", _MISSING)
+    if part_modeling_reasoning is not _MISSING:
+        if not isinstance(part_modeling_reasoning, str):
+            errors.append(_message((path, "modeling_reasoning"), "文字列"))
+    part_uv_reasoning = value.get("uv_reasoning", _MISSING)
+    if part_uv_reasoning is not _MISSING:
+        if not isinstance(part_uv_reasoning, str):
+            errors.append(_message((path, "uv_reasoning"), "文字列"))
+    part_uv_metrics = value.get("uv_metrics", _MISSING)
+    if part_uv_metrics is not _MISSING:
+        _validate_uv_metrics(part_uv_metrics, (path, "uv_metrics"), errors)
+    part_seams = value.get("seams", _MISSING)
+    if part_seams is not _MISSING:
+        if not isinstance(part_seams, list):
+            errors.append(_message((path, "seams"), "配列"))
+        else:
+            for part_seams_index, part_seams_item in enumerate(part_seams):
+                _validate_seam(part_seams_item, ((path, "seams"), part_seams_index), errors)
+    part_geometry = value.get("geometry", _MISSING)
+    if part_geometry is not _MISSING:
+        if not isinstance(part_geometry, list):
+            errors.append(_message((path, "geometry"), "配列"))
+        else:
+            for part_geometry_index, part_geometry_item in enumerate(part_geometry):
+                _validate_geometry_arrays(part_geometry_item, ((path, "geometry"), part_geometry_index), errors)
+
+
+def _validate_seam(value, path, errors):
+    if not isinstance(value, dict):
+        errors.append(_message(path, "オブジェクト"))
+        return
+    if not _SEAM_KEYS.issuperset(value):
+        for key in sorted(value.keys() - _SEAM_KEYS):
+            errors.append(_unknown_key_message((path, key)))
+    seam_name = value.get("name", _MISSING)
+    if seam_name is not _MISSING:
+        if not isinstance(seam_name, str):
+            errors.append(_message((path, "name"), "文字列"))
+    seam_seam_reasoning = value.get("seam_reasoning", _MISSING)
+    if seam_seam_reasoning is not _MISSING:
+        if not isinstance(seam_seam_reasoning, str):
+            errors.append(_message((path, "seam_reasoning"), "文字列"))
+    seam_geometry = value.get("geometry", _MISSING)
+    if seam_geometry is not _MISSING:
+        if not isinstance(seam_geometry, list):
+            errors.append(_message((path, "geometry"), "配列"))
+        else:
+            for seam_geometry_index, seam_geometry_item in enumerate(seam_geometry):
+                _validate_geometry_arrays(seam_geometry_item, ((path, "geometry"), seam_geometry_index), errors)
+
+
+def _validate_uv_metrics(value, path, errors):
+    if not isinstance(value, dict):
+        errors.append(_message(path, "オブジェクト"))
+        return
+    if not _UV_METRICS_KEYS.issuperset(value):
+        for key in sorted(value.keys() - _UV_METRICS_KEYS):
+            errors.append(_unknown_key_message((path, key)))
+    uv_metrics_polygon_count = value.get("polygon_count", _MISSING)
+    if uv_metrics_polygon_count is not _MISSING:
+        if (not isinstance(uv_metrics_polygon_count, int) or isinstance(uv_metrics_polygon_count, bool)):
+            errors.append(_message((path, "polygon_count"), "整数"))
+    uv_metrics_island_count = value.get("island_count", _MISSING)
+    if uv_metrics_island_count is not _MISSING:
+        if (not isinstance(uv_metrics_island_count, int) or isinstance(uv_metrics_island_count, bool)):
+            errors.append(_message((path, "island_count"), "整数"))
+    uv_metrics_area_3d = value.get("area_3d", _MISSING)
+    if uv_metrics_area_3d is not _MISSING:
+        if (not isinstance(uv_metrics_area_3d, (int, float)) or isinstance(uv_metrics_area_3d, bool)):
+            errors.append(_message((path, "area_3d"), "数値"))
+    uv_metrics_area_uv = value.get("area_uv", _MISSING)
+    if uv_metrics_area_uv is not _MISSING:
+        if (not isinstance(uv_metrics_area_uv, (int, float)) or isinstance(uv_metrics_area_uv, bool)):
+            errors.append(_message((path, "area_uv"), "数値"))
+    uv_metrics_uv_scale = value.get("uv_scale", _MISSING)
+    if uv_metrics_uv_scale is not _MISSING:
+        if (not isinstance(uv_metrics_uv_scale, (int, float)) or isinstance(uv_metrics_uv_scale, bool)):
+            errors.append(_message((path, "uv_scale"), "数値"))
+    uv_metrics_area_distortion = value.get("area_distortion", _MISSING)
+    if uv_metrics_area_distortion is not _MISSING:
+        if (not isinstance(uv_metrics_area_distortion, (int, float)) or isinstance(uv_metrics_area_distortion, bool)):
+            errors.append(_message((path, "area_distortion"), "数値"))
+    uv_metrics_angle_distortion = value.get("angle_distortion", _MISSING)
+    if uv_metrics_angle_distortion is not _MISSING:
+        if (not isinstance(uv_metrics_angle_distortion, (int, float)) or isinstance(uv_metrics_angle_distortion, bool)):
+            errors.append(_message((path, "angle_distortion"), "数値"))
+    uv_metrics_packing_ratio = value.get("packing_ratio", _MISSING)
+    if uv_metrics_packing_ratio is not _MISSING:
+        if (not isinstance(uv_metrics_packing_ratio, (int, float)) or isinstance(uv_metrics_packing_ratio, bool)):
+            errors.append(_message((path, "packing_ratio"), "数値"))
+
+
+def _validate_geometry_file(value, path, errors):
+    if not isinstance(value, dict):
+        errors.append(_message(path, "オブジェクト"))
+        return
+    if not _GEOMETRY_FILE_KEYS.issuperset(value):
+        for key in sorted(value.keys() - _GEOMETRY_FILE_KEYS):
+            errors.append(_unknown_key_message((path, key)))
+    geometry_file_file = value.get("file", _MISSING)
+    if geometry_file_file is not _MISSING:
+        if not isinstance(geometry_file_file, str):
+            errors.append(_message((path, "file"), "文字列"))
+    geometry_file_size = value.get("size", _MISSING)
+    if geometry_file_size is not _MISSING:
+        if (not isinstance(geometry_file_size, int) or isinstance(geometry_file_size, bool)):
+            errors.append(_message((path, "size"), "整数"))
+
+
+def _validate_geometry_arrays(value, path, errors):
+    if not isinstance(value, dict):
+        errors.append(_message(path, "オブジェクト"))
+        return
+    if not _GEOMETRY_ARRAYS_KEYS.issuperset(value):
+        for key in sorted(value.keys() - _GEOMETRY_ARRAYS_KEYS):
+            errors.append(_unknown_key_message((path, key)))
+    geometry_arrays_object = value.get("object", _MISSING)
+    if geometry_arrays_object is not _MISSING:
+        if not isinstance(geometry_arrays_object, str):
+            errors.append(_message((path, "object"), "文字列"))
+    geometry_arrays_vertices = value.get("vertices", _MISSING)
+    if geometry_arrays_vertices is not _MISSING:
+        _validate_array_ref(geometry_arrays_vertices, (path, "vertices"), errors)
+    geometry_arrays_positions = value.get("positions", _MISSING)
+    if geometry_arrays_positions is not _MISSING:
+        _validate_array_ref(geometry_arrays_positions, (path, "positions"), errors)
+    geometry_arrays_face_sizes = value.get("face_sizes", _MISSING)
+    if geometry_arrays_face_sizes is not _MISSING:
+        _validate_array_ref(geometry_arrays_face_sizes, (path, "face_sizes"), errors)
+    geometry_arrays_face_vertices = value.get("face_vertices", _MISSING)
+    if geometry_arrays_face_vertices is not _MISSING:
+        _validate_array_ref(geometry_arrays_face_vertices, (path, "face_vertices"), errors)
+    geometry_arrays_face_uvs = value.get("face_uvs", _MISSING)
+    if geometry_arrays_face_uvs is not _MISSING:
+        _validate_array_ref(geometry_arrays_face_uvs, (path, "face_uvs"), errors)
+    geometry_arrays_edges = value.get("edges", _MISSING)
+    if geometry_arrays_edges is not _MISSING:
+        _validate_array_ref(geometry_arrays_edges, (path, "edges"), errors)
+    geometry_arrays_edge_sides = value.get("edge_sides", _MISSING)
+    if geometry_arrays_edge_sides is not _MISSING:
+        _validate_array_ref(geometry_arrays_edge_sides, (path, "edge_sides"), errors)
+    geometry_arrays_edge_side_uvs = value.get("edge_side_uvs", _MISSING)
+    if geometry_arrays_edge_side_uvs is not _MISSING:
+        _validate_array_ref(geometry_arrays_edge_side_uvs, (path, "edge_side_uvs"), errors)
+
+
+def _validate_array_ref(value, path, errors):
+    if not isinstance(value, dict):
+        errors.append(_message(path, "オブジェクト"))
+        return
+    if not _ARRAY_REF_KEYS.issuperset(value):
+        for key in sorted(value.keys() - _ARRAY_REF_KEYS):
+            errors.append(_unknown_key_message((path, key)))
+    array_ref_offset = value.get("offset", _MISSING)
+    if array_ref_offset is not _MISSING:
+        if (not isinstance(array_ref_offset, int) or isinstance(array_ref_offset, bool)):
+            errors.append(_message((path, "offset"), "整数"))
+    array_ref_dtype = value.get("dtype", _MISSING)
+    if array_ref_dtype is not _MISSING:
+        if not isinstance(array_ref_dtype, str):
+            errors.append(_message((path, "dtype"), "文字列"))
+    array_ref_shape = value.get("shape", _MISSING)
+    if array_ref_shape is not _MISSING:
+        if not isinstance(array_ref_shape, list):
+            errors.append(_message((path, "shape"), "配列"))
+        else:
+            for array_ref_shape_index, array_ref_shape_item in enumerate(array_ref_shape):
+                if (not isinstance(array_ref_shape_item, int) or isinstance(array_ref_shape_item, bool)):
+                    errors.append(_message(((path, "shape"), array_ref_shape_index), "整数"))
+
+
+def _validate_root(value, path, errors):
+    if not isinstance(value, dict):
+        errors.append(_message(path, "オブジェクト"))
+        return
+    if not _ROOT_KEYS.issuperset(value):
+        for key in sorted(value.keys() - _ROOT_KEYS):
+            errors.append(_unknown_key_message((path, key)))
+    root_garment_id = value.get("garment_id", _MISSING)
+    if root_garment_id is not _MISSING:
+        if not isinstance(root_garment_id, str):
+            errors.append(_message((path, "garment_id"), "文字列"))
+    root_garment_type = value.get("garment_type", _MISSING)
+    if root_garment_type is not _MISSING:
+        if not isinstance(root_garment_type, str):
+            errors.append(_message((path, "garment_type"), "文字列"))
+    root_design_reasoning = value.get("design_reasoning", _MISSING)
+    if root_design_reasoning is not _MISSING:
+        if not isinstance(root_design_reasoning, str):
+            errors.append(_message((path, "design_reasoning"), "文字列"))
+    root_parts = value.get("parts", _MISSING)
+    if root_parts is not _MISSING:
+        if not isinstance(root_parts, list):
+            errors.append(_message((path, "parts"), "配列"))
+        else:
+            for root_parts_index, root_parts_item in enumerate(root_parts):
+                _validate_part(root_parts_item, ((path, "parts"), root_parts_index), errors)
+    root_geometry = value.get("geometry", _MISSING)
+    if root_geometry is not _MISSING:
+        _validate_geometry_file(root_geometry, (path, "geometry"), errors)
+
+
+def validate(data):
+    """data をスキーマで検証し、エラーメッセージのリストを返す（空なら妥当）。"""
+    errors = []
+    _validate_root(data, None, errors)
+    return errors
@@ -0,0 +1,597 @@
+"""アノテーションの列指向バイナリ形式（.gpuvc）。学習時に JSON を解析せずに読む。
+
+衣服・パーツ・シーム・パーツの頂点番号を正規化した 4 つの表に分け、列ごとに
+Arrow と同じ形のバッファで持つ（固定長の値はそのまま、文字列は offsets と
+UTF-8 のバイト列、名前やラベルのように値の種類が少ない列は辞書の番号）。
+ファイル構成::
+
+    b"GPUVCOL1"  uint64 ヘッダ長  ヘッダ（JSON）  バッファ…（64 バイト境界）
+
+ヘッダには表ごとの行数と、列ごとの型・バッファの位置を書く。ColumnarDataset は
+ファイルを np.memmap で開き、列をコピーせずに numpy 配列として返す。子の表は
+親の行順に並んでいて、親の ``*_offsets`` 列（行数 + 1）から子の範囲を引ける。
+"""
+
+import json
+import os
+import struct
+from array import array
+
+import numpy as np
+
+from .annotation_schema import SCHEMA_SHA256
+
+MAGIC = b"GPUVCOL1"
+VERSION = 1
+SUFFIX = ".gpuvc"
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sQ")
+# 全件を dict に戻すときに、列からまとめて読む衣服の数
+RECORD_BATCH = 4096
+
+UV_METRIC_INTS = ("polygon_count", "island_count")
+UV_METRIC_FLOATS = (
+    "area_3d",
+    "area_uv",
+    "uv_scale",
+    "area_distortion",
+    "angle_distortion",
+    "packing_ratio",
+)
+
+# 表 → (列名, 型)。型は string / dictionary / offsets / list_int32 / int32 / int64 / float64 / bool
+TABLES = {
+    "garments": (
+        ("garment_id", "string"),
+        ("garment_type", "dictionary"),
+        ("design_reasoning", "string"),
+        ("part_offsets", "offsets"),
+    ),
+    "parts": (
+        ("garment", "int32"),
+        ("name", "dictionary"),
+        ("label", "dictionary"),
+        ("modeling_reasoning", "string"),
+        ("uv_reasoning", "string"),
+        ("has_uv_metrics", "bool"),
+        *((field, "int64") for field in UV_METRIC_INTS),
+        *((field, "float64") for field in UV_METRIC_FLOATS),
+        ("seam_offsets", "offsets"),
+    ),
+    "seams": (
+        ("part", "int32"),
+        ("name", "dictionary"),
+        ("seam_reasoning", "string"),
+    ),
+    "part_vertices": (
+        ("part", "int32"),
+        ("object", "dictionary"),
+        ("vertices", "list_int32"),
+    ),
+}
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+# 書き込み側: 列ごとのバッファを Python の array / bytearray に積む
+#################################################
+
+
+class _StringBuilder:
+    def __init__(self):
+        self.offsets = array("q", [0])
+        self.data = bytearray()
+
+    def append(self, value):
+        self.data += value.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def buffers(self):
+        return {
+            "offsets": np.frombuffer(self.offsets, dtype=np.int64),
+            "data": np.frombuffer(self.data, dtype=np.uint8),
+        }
+
+
+class _DictionaryBuilder:
+    def __init__(self):
+        self.codes = {}
+        self.indices = array("i")
+        self.dictionary = _StringBuilder()
+
+    def append(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+            self.dictionary.append(value)
+        self.indices.append(code)
+
+    def buffers(self):
+        dictionary = self.dictionary.buffers()
+        return {
+            "indices": np.frombuffer(self.indices, dtype=np.int32),
+            "dictionary_offsets": dictionary["offsets"],
+            "dictionary_data": dictionary["data"],
+        }
+
+
+class _ValueBuilder:
+    _TYPES = {"int32": ("i", np.int32), "int64": ("q", np.int64), "float64": ("d", np.float64)}
+
+    def __init__(self, kind):
+        typecode, self.dtype = self._TYPES[kind]
+        self.values = array(typecode)
+
+    def append(self, value):
+        self.values.append(value)
+
+    def buffers(self):
+        return {"values": np.frombuffer(self.values, dtype=self.dtype)}
+
+
+class _BoolBuilder:
+    def __init__(self):
+        self.values = bytearray()
+
+    def append(self, value):
+        self.values.append(1 if value else 0)
+
+    def buffers(self):
+        return {"values": np.frombuffer(self.values, dtype=np.bool_)}
+
+
+class _OffsetsBuilder:
+    """子の件数を受け取り、累積の offsets（行数 + 1）にする。"""
+
+    def __init__(self):
+        self.offsets = array("q", [0])
+
+    def append(self, count):
+        self.offsets.append(self.offsets[-1] + count)
+
+    def buffers(self):
+        return {"offsets": np.frombuffer(self.offsets, dtype=np.int64)}
+
+
+class _ListBuilder:
+    def __init__(self):
+        self.offsets = array("q", [0])
+        self.chunks = []
+
+    def append(self, values):
+        values = np.asarray(values, dtype=np.int32)
+        self.chunks.append(values)
+        self.offsets.append(self.offsets[-1] + values.size)
+
+    def buffers(self):
+        values = np.concatenate(self.chunks) if self.chunks else np.zeros(0, dtype=np.int32)
+        return {"offsets": np.frombuffer(self.offsets, dtype=np.int64), "values": values}
+
+
+def _builder(kind):
+    if kind == "string":
+        return _StringBuilder()
+    if kind == "dictionary":
+        return _DictionaryBuilder()
+    if kind == "offsets":
+        return _OffsetsBuilder()
+    if kind == "list_int32":
+        return _ListBuilder()
+    if kind == "bool":
+        return _BoolBuilder()
+    return _ValueBuilder(kind)
+
+
+class ColumnarWriter:
+    """アノテーションを積んで、close() で 1 つのファイルに書く。
+
+    書き込みは一時ファイルからの置き換えなので、途中で失敗しても path に
+    書きかけのファイルは残らない。with を例外で抜けた場合は何も書かない。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._columns = {
+            table: {column: _builder(kind) for column, kind in columns}
+            for table, columns in TABLES.items()
+        }
+        self._rows = dict.fromkeys(TABLES, 0)
+
+    def __len__(self):
+        return self._rows["garments"]
+
+    def add(self, data, part_vertices=()):
+        """スキーマ形式の data を 1 着分加える。
+
+        part_vertices は (パーツ名, オブジェクト名, 頂点番号の配列) の列。
+        data に無いパーツの分は捨てる。
+        """
+        garments = self._columns["garments"]
+        parts = self._columns["parts"]
+        seams = self._columns["seams"]
+        garment_row = self._rows["garments"]
+        garments["garment_id"].append(data.get("garment_id", ""))
+        garments["garment_type"].append(data.get("garment_type", ""))
+        garments["design_reasoning"].append(data.get("design_reasoning", ""))
+
+        part_rows = {}
+        part_list = data.get("parts", [])
+        for part in part_list:
+            part_row = self._rows["parts"]
+            part_rows.setdefault(part.get("name", ""), part_row)
+            parts["garment"].append(garment_row)
+            for column in ("name", "label", "modeling_reasoning", "uv_reasoning"):
+                parts[column].append(part.get(column, ""))
+            metrics = part.get("uv_metrics")
+            parts["has_uv_metrics"].append(metrics is not None)
+            metrics = metrics or {}
+            for field in UV_METRIC_INTS:
+                parts[field].append(int(metrics.get(field, 0)))
+            for field in UV_METRIC_FLOATS:
+                parts[field].append(float(metrics.get(field, 0.0)))
+            seam_list = part.get("seams", [])
+            for seam in seam_list:
+                seams["part"].append(part_row)
+                seams["name"].append(seam.get("name", ""))
+                seams["seam_reasoning"].append(seam.get("seam_reasoning", ""))
+            parts["seam_offsets"].append(len(seam_list))
+            self._rows["seams"] += len(seam_list)
+            self._rows["parts"] += 1
+        garments["part_offsets"].append(len(part_list))
+        self._rows["garments"] += 1
+
+        # パーツの行順に並べ、ColumnarDataset.part_vertices で二分探索できるようにする
+        entries = sorted(
+            (
+                (part_rows[part_name], object_name, vertices)
+                for part_name, object_name, vertices in part_vertices
+                if part_name in part_rows
+            ),
+            key=lambda entry: entry[0],
+        )
+        table = self._columns["part_vertices"]
+        for part_row, object_name, vertices in entries:
+            table["part"].append(part_row)
+            table["object"].append(object_name)
+            table["vertices"].append(vertices)
+        self._rows["part_vertices"] += len(entries)
+
+    def _layout(self):
+        """(ヘッダ, [(データ部の先頭からの位置, 配列)]) を作る。"""
+        tables = {}
+        buffers = []
+        position = 0
+        for table, columns in TABLES.items():
+            column_specs = {}
+            for column, kind in columns:
+                specs = {}
+                for name, values in self._columns[table][column].buffers().items():
+                    values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+                    specs[name] = {
+                        "dtype": values.dtype.str,
+                        "offset": position,
+                        "length": int(values.size),
+                    }
+                    buffers.append((position, values))
+                    position = _align(position + values.nbytes)
+                column_specs[column] = {"type": kind, "buffers": specs}
+            tables[table] = {"rows": self._rows[table], "columns": column_specs}
+        header = {
+            "format": "garment_pattern_uv.columnar",
+            "version": VERSION,
+            "schema_sha256": SCHEMA_SHA256,
+            "tables": tables,
+        }
+        return header, buffers
+
+    def close(self):
+        header, buffers = self._layout()
+        payload = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        data_start = _align(_PREFIX.size + len(payload))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as handle:
+                handle.write(_PREFIX.pack(MAGIC, len(payload)))
+                handle.write(payload)
+                for offset, values in buffers:
+                    handle.seek(data_start + offset)
+                    handle.write(values.view(np.uint8).data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_exc):
+        if exc_type is None:
+            self.close()
+
+
+def write_columnar(path, records):
+    """records（dict または (dict, part_vertices)）を path に書き、件数を返す。"""
+    with ColumnarWriter(path) as writer:
+        for record in records:
+            if isinstance(record, dict):
+                writer.add(record)
+            else:
+                writer.add(*record)
+    return len(writer)
+
+
+# 読み出し側: memmap したファイルの一部を配列として返す
+#################################################
+
+
+class StringColumn:
+    """offsets（行数 + 1）と UTF-8 のバイト列で表した文字列の列。"""
+
+    __slots__ = ("offsets", "data")
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        start, stop = self.offsets[row], self.offsets[row + 1]
+        return self.data[start:stop].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def to_list(self, start=0, stop=None):
+        """start〜stop 行目の文字列のリスト。バイト列はまとめて 1 度だけ読む。"""
+        stop = len(self) if stop is None else stop
+        bounds = self.offsets[start : stop + 1].tolist()
+        if not bounds:
+            return []
+        base = bounds[0]
+        blob = self.data[base : bounds[-1]].tobytes()
+        return [
+            blob[begin - base : end - base].decode("utf-8")
+            for begin, end in zip(bounds, bounds[1:])
+        ]
+
+
+class DictionaryColumn:
+    """辞書（StringColumn）の番号で表した列。equals は番号の比較だけで済む。"""
+
+    __slots__ = ("indices", "dictionary", "_values")
+
+    def __init__(self, indices, dictionary):
+        self.indices = indices
+        self.dictionary = dictionary
+        self._values = None
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def values(self):
+        """辞書の文字列（番号順）。"""
+        if self._values is None:
+            self._values = self.dictionary.to_list()
+        return self._values
+
+    def __getitem__(self, row):
+        return self.values[self.indices[row]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.indices.tolist())
+
+    def to_list(self, start=0, stop=None):
+        values = self.values
+        return [values[code] for code in self.indices[start:stop].tolist()]
+
+    def code(self, value):
+        """value の辞書番号。辞書に無ければ -1。"""
+        try:
+            return self.values.index(value)
+        except ValueError:
+            return -1
+
+    def equals(self, value):
+        return self.indices == self.code(value)
+
+
+class ListColumn:
+    """offsets（行数 + 1）と値の配列で表した可変長の列。要素はコピーしない。"""
+
+    __slots__ = ("offsets", "values")
+
+    def __init__(self, offsets, values):
+        self.offsets = offsets
+        self.values = values
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        return self.values[self.offsets[row] : self.offsets[row + 1]]
+
+
+class ColumnarTable:
+    def __init__(self, name, spec, buffer, data_start):
+        self.name = name
+        self.rows = spec["rows"]
+        self._specs = spec["columns"]
+        self._buffer = buffer
+        self._data_start = data_start
+        self._cache = {}
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def column_names(self):
+        return list(self._specs)
+
+    def _array(self, spec):
+        dtype = np.dtype(spec["dtype"])
+        start = self._data_start + spec["offset"]
+        return self._buffer[start : start + spec["length"] * dtype.itemsize].view(dtype)
+
+    def column(self, name):
+        """列を返す。数値の列は ndarray、文字列などは *Column（いずれも memmap のビュー）。"""
+        column = self._cache.get(name)
+        if column is None:
+            spec = self._specs[name]
+            buffers = {key: self._array(value) for key, value in spec["buffers"].items()}
+            kind = spec["type"]
+            if kind == "string":
+                column = StringColumn(buffers["offsets"], buffers["data"])
+            elif kind == "dictionary":
+                column = DictionaryColumn(
+                    buffers["indices"],
+                    StringColumn(buffers["dictionary_offsets"], buffers["dictionary_data"]),
+                )
+            elif kind == "list_int32":
+                column = ListColumn(buffers["offsets"], buffers["values"])
+            elif kind == "offsets":
+                column = buffers["offsets"]
+            else:
+                column = buffers["values"]
+            self._cache[name] = column
+        return column
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+
+class ColumnarDataset:
+    """.gpuvc ファイルを memmap で開いたもの。len と反復は衣服（レコード）単位。"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as handle:
+            prefix = handle.read(_PREFIX.size)
+            if len(prefix) < _PREFIX.size or prefix[:8] != MAGIC:
+                raise ValueError(f"{path} is not a columnar annotation file.")
+            _magic, header_length = _PREFIX.unpack(prefix)
+            header = json.loads(handle.read(header_length).decode("utf-8"))
+        if header.get("version") != VERSION:
+            raise ValueError(f"{path}: unsupported columnar version {header.get('version')}.")
+        self.schema_sha256 = header.get("schema_sha256", "")
+        self._buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        data_start = _align(_PREFIX.size + header_length)
+        self.tables = {
+            name: ColumnarTable(name, spec, self._buffer, data_start)
+            for name, spec in header["tables"].items()
+        }
+
+    def __len__(self):
+        return len(self.tables["garments"])
+
+    def table(self, name):
+        return self.tables[name]
+
+    def close(self):
+        # 返した列は memmap を参照し続けるので、ここでは参照を外すだけにする
+        self.tables = {}
+        self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def part_vertices(self, part_row):
+        """part_row のパーツの [(オブジェクト名, 頂点番号の配列)]。"""
+        table = self.tables["part_vertices"]
+        rows = table["part"]
+        start = int(np.searchsorted(rows, part_row, side="left"))
+        stop = int(np.searchsorted(rows, part_row, side="right"))
+        objects = table["object"]
+        vertices = table["vertices"]
+        return [(objects[row], vertices[row]) for row in range(start, stop)]
+
+    def _records(self, start, stop):
+        """start〜stop 番目の衣服を dict に戻す。列は範囲ごとにまとめてリストにする。"""
+        garments = self.tables["garments"]
+        parts = self.tables["parts"]
+        seams = self.tables["seams"]
+        part_offsets = garments["part_offsets"][start : stop + 1].tolist()
+        part_start, part_stop = part_offsets[0], part_offsets[-1]
+        seam_offsets = parts["seam_offsets"][part_start : part_stop + 1].tolist()
+        seam_start, seam_stop = seam_offsets[0], seam_offsets[-1]
+
+        def strings(table, column, begin, end):
+            return table[column].to_list(begin, end)
+
+        garment_columns = [
+            strings(garments, column, start, stop)
+            for column in ("garment_id", "garment_type", "design_reasoning")
+        ]
+        part_columns = [
+            strings(parts, column, part_start, part_stop)
+            for column in ("name", "label", "modeling_reasoning", "uv_reasoning")
+        ]
+        has_metrics = parts["has_uv_metrics"][part_start:part_stop].tolist()
+        metric_columns = [
+            (field, parts[field][part_start:part_stop].tolist())
+            for field in UV_METRIC_INTS + UV_METRIC_FLOATS
+        ]
+        seam_names = strings(seams, "name", seam_start, seam_stop)
+        seam_reasoning = strings(seams, "seam_reasoning", seam_start, seam_stop)
+
+        records = []
+        for row in range(stop - start):
+            garment_id, garment_type, design_reasoning = (
+                column[row] for column in garment_columns
+            )
+            part_list = []
+            for part_row in range(part_offsets[row] - part_start, part_offsets[row + 1] - part_start):
+                name, label, modeling_reasoning, uv_reasoning = (
+                    column[part_row] for column in part_columns
+                )
+                part = {
+                    "name": name,
+                    "label": label,
+                    "modeling_reasoning": modeling_reasoning,
+                    "uv_reasoning": uv_reasoning,
+                }
+                if has_metrics[part_row]:
+                    part["uv_metrics"] = {field: values[part_row] for field, values in metric_columns}
+                seam_begin = seam_offsets[part_row] - seam_start
+                seam_end = seam_offsets[part_row + 1] - seam_start
+                part["seams"] = [
+                    {"name": seam_names[seam_row], "seam_reasoning": seam_reasoning[seam_row]}
+                    for seam_row in range(seam_begin, seam_end)
+                ]
+                part_list.append(part)
+            records.append(
+                {
+                    "garment_id": garment_id,
+                    "garment_type": garment_type,
+                    "design_reasoning": design_reasoning,
+                    "parts": part_list,
+                }
+            )
+        return records
+
+    def record(self, row):
+        """row 番目の衣服をスキーマ形式の dict に戻す。"""
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return self._records(row, row + 1)[0]
+
+    def iter_records(self, batch=RECORD_BATCH):
+        """全衣服を dict で返す。batch 着ずつまとめて列から読む。"""
+        for start in range(0, len(self), batch):
+            yield from self._records(start, min(start + batch, len(self)))
+
+    def __iter__(self):
+        return self.iter_records()
@@ -0,0 +1,84 @@
+"""エクスポートの入力（アノテーション・頂点グループ・メッシュ・UV）の内容ハッシュ。
+
+再エクスポートでは、前回のマニフェストに記録したハッシュと一致する衣服を
+書き出し直さずに飛ばす。配列はバッファのまま BLAKE2b に流すので、頂点ごとの
+Python ループは無い。配列ごとに名前・dtype・形も混ぜ、区切りの違う入力が
+同じハッシュにならないようにする。
+"""
+
+import hashlib
+import json
+
+import numpy as np
+
+from .topology import _read_edges
+
+DIGEST_SIZE = 16
+FILE_CHUNK_BYTES = 1024 * 1024
+
+
+class ContentHasher:
+    """名前付きの値を順に流し込んで 1 つのハッシュにする。"""
+
+    def __init__(self):
+        self._hash = hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+    def _tag(self, name, kind, detail=""):
+        self._hash.update(f"\0{name}\0{kind}\0{detail}\0".encode("utf-8"))
+
+    def update_text(self, name, text):
+        payload = text.encode("utf-8")
+        self._tag(name, "text", len(payload))
+        self._hash.update(payload)
+
+    def update_json(self, name, value):
+        """value をキー順・区切り固定の JSON にしてから流す。"""
+        text = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        self.update_text(name, text)
+
+    def update_array(self, name, array):
+        array = np.ascontiguousarray(array)
+        self._tag(name, array.dtype.str, array.shape)
+        self._hash.update(memoryview(array).cast("B"))
+
+    def update_mesh(self, mesh, uv_name):
+        """形状（座標・辺・面）と uv_name の UV を流す。UV が無いことも区別する。"""
+        edges, coords = _read_edges(mesh)
+        self.update_array("coords", coords)
+        self.update_array("edges", edges)
+        loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vertices)
+        self.update_array("loop_vertices", loop_vertices)
+        loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        self.update_array("loop_totals", loop_totals)
+        layer = mesh.uv_layers.get(uv_name)
+        if layer is None:
+            self._tag("uv", "missing")
+            return
+        uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        layer.data.foreach_get("uv", uvs)
+        self.update_array("uv", uvs)
+
+    def update_membership(self, membership):
+        """GroupMembership の CSR（グループ名の並び込み）を流す。"""
+        self.update_json("groups", list(membership.names))
+        self.update_array("group_indptr", membership.indptr)
+        self.update_array("group_indices", membership.indices)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def file_digest(path):
+    """ファイル内容の BLAKE2b（16 進）。大きなファイルも一定のメモリで読む。"""
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    buffer = bytearray(FILE_CHUNK_BYTES)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as handle:
+        while True:
+            size = handle.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+    return digest.hexdigest()
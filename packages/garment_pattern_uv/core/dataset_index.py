@@ -0,0 +1,467 @@
+"""書き出したアノテーション群から問い合わせ用の索引（SQLite）を作る。
+
+JSON／JSONL シャード／データセットディレクトリをファイル単位でストリームに読み、
+衣服・パーツ・理由テキストを次の表に入れる::
+
+    garments        garment_id, garment_type, part_count, seam_count, 読んだファイル
+    parts           衣服ごとのパーツ名・ラベル・接するシーム数
+    reasoning       (衣服, パーツ, シーム, フィールド番号) → texts の行
+    texts           理由テキスト本体。内容のハッシュで 1 つにまとめる
+    reasoning_fts   texts の全文索引（FTS5。使えない環境では LIKE で探す）
+    sources         読み込んだファイルのパス・大きさ・更新時刻
+
+同じ garment_id を読み直すと前の行を置き換える。sources と一致するファイルは
+読み飛ばすので、書き出し先に追記した分だけを索引へ足せる。変わったファイルは
+そのファイルから入れた衣服を消してから読み直し、消えたファイルの衣服は捨てる。
+"""
+
+import json
+import os
+import sqlite3
+
+from .dataset_writer import INDEX_NAME, iter_shard_records
+from .reasoning_store import LRUCache, content_key
+
+SCHEMA_VERSION = 1
+COMMIT_INTERVAL = 2000
+# 構築中に覚えておく 本文 → texts の id の件数。溢れた分は texts.key から引き直す。
+TEXT_CACHE_ENTRIES = 65536
+DEFAULT_QUERY_LIMIT = 100
+SHARD_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+# batch_export の manifest は衣服のレコードではない
+SKIPPED_FILENAMES = {INDEX_NAME, "manifest.json"}
+# reasoning.field にはこの並びの位置を入れる
+REASONING_FIELDS = ("design_reasoning", "modeling_reasoning", "uv_reasoning", "seam_reasoning")
+
+_TABLES = """
+CREATE TABLE IF NOT EXISTS garments (
+    id INTEGER PRIMARY KEY,
+    garment_id TEXT NOT NULL UNIQUE,
+    garment_type TEXT NOT NULL,
+    part_count INTEGER NOT NULL,
+    seam_count INTEGER NOT NULL,
+    source INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS garments_by_type ON garments (garment_type, part_count);
+CREATE INDEX IF NOT EXISTS garments_by_seams ON garments (seam_count);
+CREATE INDEX IF NOT EXISTS garments_by_source ON garments (source);
+CREATE TABLE IF NOT EXISTS parts (
+    garment INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    label TEXT NOT NULL,
+    seam_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parts_by_garment ON parts (garment);
+CREATE INDEX IF NOT EXISTS parts_by_name ON parts (name);
+CREATE INDEX IF NOT EXISTS parts_by_label ON parts (label);
+CREATE TABLE IF NOT EXISTS texts (
+    id INTEGER PRIMARY KEY,
+    key BLOB NOT NULL UNIQUE,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reasoning (
+    garment INTEGER NOT NULL,
+    part TEXT NOT NULL,
+    seam TEXT NOT NULL,
+    field INTEGER NOT NULL,
+    text INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reasoning_by_garment ON reasoning (garment);
+CREATE INDEX IF NOT EXISTS reasoning_by_text ON reasoning (text);
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reasoning_fts USING fts5("
+    "body, content='texts', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+)
+
+
+def _fts5_available(connection):
+    try:
+        connection.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(body)")
+    except sqlite3.OperationalError:
+        return False
+    connection.execute("DROP TABLE temp._fts5_probe")
+    return True
+
+
+def _is_record_file(filename):
+    if filename in SKIPPED_FILENAMES:
+        return False
+    return filename.endswith(".json") or filename.endswith(SHARD_SUFFIXES)
+
+
+def iter_corpus_files(paths):
+    """paths（ファイルかディレクトリ）に含まれるレコードのファイルを名前順に返す。"""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if _is_record_file(filename):
+                    yield os.path.join(directory, filename)
+
+
+def iter_file_records(path):
+    """ファイル 1 つ分のレコードを順に返す。.json はレコード 1 件かその配列。"""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        if isinstance(data, list):
+            yield from data
+        else:
+            yield data
+        return
+    yield from iter_shard_records(path)
+
+
+def _text(value):
+    return value if isinstance(value, str) else ""
+
+
+def _list(value):
+    return value if isinstance(value, list) else []
+
+
+def _record_rows(data):
+    """レコードを (garments の値, parts の行, 理由の行) に分ける。
+
+    シームは接するパーツそれぞれの下に出てくるので、衣服のシーム数は名前の異なり数。
+    """
+    parts = []
+    reasoning = []
+    seam_names = set()
+    design = _text(data.get("design_reasoning"))
+    if design:
+        reasoning.append(("", "", 0, design))
+    for part in _list(data.get("parts")):
+        if not isinstance(part, dict):
+            continue
+        name = _text(part.get("name"))
+        seams = [seam for seam in _list(part.get("seams")) if isinstance(seam, dict)]
+        parts.append((name, _text(part.get("label")), len(seams)))
+        for field in (1, 2):
+            value = _text(part.get(REASONING_FIELDS[field]))
+            if value:
+                reasoning.append((name, "", field, value))
+        for seam in seams:
+            seam_name = _text(seam.get("name"))
+            seam_names.add(seam_name)
+            value = _text(seam.get("seam_reasoning"))
+            if value:
+                reasoning.append((name, seam_name, 3, value))
+    garment = (
+        _text(data.get("garment_id")),
+        _text(data.get("garment_type")),
+        len(parts),
+        len(seam_names),
+    )
+    return garment, parts, reasoning
+
+
+class DatasetIndex:
+    """索引ファイル 1 つへの接続。with 文で使うと抜けるときに確定して閉じる。"""
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA cache_size=-65536")
+        self._connection.executescript(_TABLES)
+        self.has_fts = _fts5_available(self._connection)
+        if self.has_fts:
+            self._connection.execute(_FTS_TABLE)
+        self._connection.execute(
+            "INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+        )
+        self._connection.commit()
+        self._text_ids = LRUCache(TEXT_CACHE_ENTRIES)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.commit()
+            self._connection.close()
+            self._connection = None
+
+    # ---- 書き込み ----
+
+    def _text_id(self, body):
+        """body の texts 上の id。初めての内容なら追加して全文索引にも入れる。"""
+        text_id = self._text_ids.get(body)
+        if text_id is not None:
+            return text_id
+        key = bytes.fromhex(content_key(body))
+        row = self._connection.execute("SELECT id FROM texts WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            text_id = row[0]
+        else:
+            cursor = self._connection.execute(
+                "INSERT INTO texts (key, body) VALUES (?, ?)", (key, body)
+            )
+            text_id = cursor.lastrowid
+            if self.has_fts:
+                self._connection.execute(
+                    "INSERT INTO reasoning_fts (rowid, body) VALUES (?, ?)", (text_id, body)
+                )
+        self._text_ids.put(body, text_id)
+        return text_id
+
+    def _remove_garment(self, garment_id):
+        row = self._connection.execute(
+            "SELECT id FROM garments WHERE garment_id = ?", (garment_id,)
+        ).fetchone()
+        if row is None:
+            return
+        for table in ("parts", "reasoning"):
+            self._connection.execute(f"DELETE FROM {table} WHERE garment = ?", row)
+        self._connection.execute("DELETE FROM garments WHERE id = ?", row)
+
+    def _remove_source(self, source, keep_source=True):
+        """sources の id が source のファイルから入れた衣服を消す。"""
+        garments = "SELECT id FROM garments WHERE source = ?"
+        for table in ("parts", "reasoning"):
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE garment IN ({garments})", (source,)
+            )
+        self._connection.execute("DELETE FROM garments WHERE source = ?", (source,))
+        if not keep_source:
+            self._connection.execute("DELETE FROM sources WHERE id = ?", (source,))
+
+    def _remove_missing_sources(self, paths, seen):
+        """paths 以下にあった sources のうち、今回見つからなかったものを消す。数を返す。"""
+        roots = [os.path.abspath(path) for path in paths]
+        prefixes = tuple(os.path.join(root, "") for root in roots if os.path.isdir(root))
+        files = {root for root in roots if not os.path.isdir(root)}
+        missing = [
+            source
+            for source, path in self._connection.execute("SELECT id, path FROM sources")
+            if path not in seen and (path in files or path.startswith(prefixes))
+        ]
+        for source in missing:
+            self._remove_source(source, keep_source=False)
+        return len(missing)
+
+    def add_record(self, data, source=0):
+        """レコード 1 件を索引に入れる。garment_id が無いものは入れずに False を返す。
+
+        source は sources の id（_source_id で得る）。
+        """
+        if not isinstance(data, dict):
+            return False
+        garment, parts, reasoning = _record_rows(data)
+        if not garment[0]:
+            return False
+        self._remove_garment(garment[0])
+        cursor = self._connection.execute(
+            "INSERT INTO garments (garment_id, garment_type, part_count, seam_count, source)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (*garment, source),
+        )
+        garment_row = cursor.lastrowid
+        self._connection.executemany(
+            "INSERT INTO parts VALUES (?, ?, ?, ?)",
+            [(garment_row, *part) for part in parts],
+        )
+        self._connection.executemany(
+            "INSERT INTO reasoning VALUES (?, ?, ?, ?, ?)",
+            [
+                (garment_row, part, seam, field, self._text_id(body))
+                for part, seam, field, body in reasoning
+            ],
+        )
+        return True
+
+    def _source_id(self, path, stat):
+        """path の sources 上の id と、前回から変わっていないかどうか。"""
+        row = self._connection.execute(
+            "SELECT id, size, mtime_ns FROM sources WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            cursor = self._connection.execute(
+                "INSERT INTO sources (path, size, mtime_ns) VALUES (?, -1, -1)", (path,)
+            )
+            return cursor.lastrowid, False
+        return row[0], row[1:] == (stat.st_size, stat.st_mtime_ns)
+
+    def add_paths(self, paths, progress=None):
+        """paths 以下のレコードを読み込み、{files, skipped, removed, records} を返す。
+
+        前回から大きさと更新時刻が変わっていないファイルは読まない。変わった
+        ファイルは前回そのファイルから入れた衣服を消してから読み直し、paths 以下に
+        無くなったファイルの衣服は消す（removed はその数）。
+        progress(path, records) はファイルを 1 つ読み終えるごとに呼ばれる。
+        """
+        result = {"files": 0, "skipped": 0, "removed": 0, "records": 0}
+        pending = 0
+        seen = set()
+        for path in iter_corpus_files(paths):
+            path = os.path.abspath(path)
+            if not os.path.isfile(path):
+                continue
+            seen.add(path)
+            stat = os.stat(path)
+            source, unchanged = self._source_id(path, stat)
+            if unchanged:
+                result["skipped"] += 1
+                continue
+            self._remove_source(source)
+            added = 0
+            for data in iter_file_records(path):
+                if self.add_record(data, source):
+                    added += 1
+                    pending += 1
+                    if pending >= COMMIT_INTERVAL:
+                        self._connection.commit()
+                        pending = 0
+            self._connection.execute(
+                "UPDATE sources SET size = ?, mtime_ns = ? WHERE id = ?",
+                (stat.st_size, stat.st_mtime_ns, source),
+            )
+            result["files"] += 1
+            result["records"] += added
+            if progress is not None:
+                progress(path, added)
+        result["removed"] = self._remove_missing_sources(paths, seen)
+        self._connection.commit()
+        return result
+
+    def optimize(self):
+        """どこからも参照されない texts を消し、全文索引と統計情報を整える。"""
+        orphans = [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT id FROM texts WHERE id NOT IN (SELECT text FROM reasoning)"
+            )
+        ]
+        if orphans and self.has_fts:
+            self._connection.executemany(
+                "INSERT INTO reasoning_fts (reasoning_fts, rowid, body)"
+                " SELECT 'delete', id, body FROM texts WHERE id = ?",
+                [(text_id,) for text_id in orphans],
+            )
+        self._connection.executemany(
+            "DELETE FROM texts WHERE id = ?", [(text_id,) for text_id in orphans]
+        )
+        self._text_ids.clear()
+        if self.has_fts:
+            self._connection.execute("INSERT INTO reasoning_fts (reasoning_fts) VALUES ('optimize')")
+        self._connection.execute("ANALYZE")
+        self._connection.commit()
+        return len(orphans)
+
+    # ---- 問い合わせ ----
+
+    def find_garments(
+        self,
+        garment_type=None,
+        min_parts=None,
+        max_parts=None,
+        min_seams=None,
+        max_seams=None,
+        part_name=None,
+        part_label=None,
+        limit=DEFAULT_QUERY_LIMIT,
+    ):
+        """条件に合う衣服の dict を索引に入れた順に返す。
+
+        part_name は GLOB パターン（``sleeve*`` など）、part_label は完全一致。
+        """
+        clauses = []
+        params = []
+        for column, operator, value in (
+            ("garment_type", "=", garment_type),
+            ("part_count", ">=", min_parts),
+            ("part_count", "<=", max_parts),
+            ("seam_count", ">=", min_seams),
+            ("seam_count", "<=", max_seams),
+        ):
+            if value is not None:
+                clauses.append(f"g.{column} {operator} ?")
+                params.append(value)
+        for column, operator, value in (("name", "GLOB", part_name), ("label", "=", part_label)):
+            if value is not None:
+                clauses.append(f"g.id IN (SELECT garment FROM parts WHERE {column} {operator} ?)")
+                params.append(value)
+        sql = (
+            "SELECT garment_id, garment_type, part_count, seam_count, s.path"
+            " FROM garments g LEFT JOIN sources s ON s.id = g.source"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY g.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        columns = ("garment_id", "garment_type", "part_count", "seam_count", "source")
+        return [dict(zip(columns, row)) for row in self._connection.execute(sql, params)]
+
+    def _matching_texts(self, text):
+        """text を含む texts の id の SQL と引数。FTS5 があれば MATCH 式として扱う。"""
+        if self.has_fts:
+            return "SELECT rowid FROM reasoning_fts WHERE reasoning_fts MATCH ?", [text]
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return "SELECT id FROM texts WHERE body LIKE ? ESCAPE '\\'", [pattern]
+
+    def search_reasoning(self, text, field=None, garment_type=None, limit=DEFAULT_QUERY_LIMIT):
+        """理由に text を含む (衣服, パーツ, シーム, フィールド) を dict で返す。
+
+        FTS5 があれば text は MATCH 式（``dart*``、``"bias cut"`` など）になる。
+        並びはテキスト単位で、衣服の順ではない（並べ替えると limit で打ち切れなくなる）。
+        """
+        match_sql, params = self._matching_texts(text)
+        sql = (
+            "SELECT g.garment_id, g.garment_type, r.part, r.seam, r.field, t.body"
+            " FROM reasoning r JOIN garments g ON g.id = r.garment JOIN texts t ON t.id = r.text"
+            f" WHERE r.text IN ({match_sql})"
+        )
+        if field is not None:
+            if field not in REASONING_FIELDS:
+                raise ValueError(f"Unknown reasoning field: {field}")
+            sql += " AND r.field = ?"
+            params.append(REASONING_FIELDS.index(field))
+        if garment_type is not None:
+            sql += " AND g.garment_type = ?"
+            params.append(garment_type)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        columns = ("garment_id", "garment_type", "part", "seam", "field", "text")
+        rows = [dict(zip(columns, row)) for row in self._connection.execute(sql, params)]
+        for row in rows:
+            row["field"] = REASONING_FIELDS[row["field"]]
+        return rows
+
+    def summary(self):
+        """衣服の種類ごとの件数・パーツ数・シーム数の集計。"""
+        rows = self._connection.execute(
+            "SELECT garment_type, COUNT(*), ROUND(AVG(part_count), 2), MAX(part_count),"
+            " ROUND(AVG(seam_count), 2)"
+            " FROM garments GROUP BY garment_type ORDER BY garment_type"
+        )
+        columns = ("garment_type", "garments", "mean_parts", "max_parts", "mean_seams")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def counts(self):
+        return {
+            table: self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("garments", "parts", "reasoning", "texts", "sources")
+        }
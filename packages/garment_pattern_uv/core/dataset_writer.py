@@ -0,0 +1,276 @@
+"""アノテーションをシャード分割した JSON Lines データセットとして書き出す。
+
+ディレクトリ構成::
+
+    <prefix>-00000.jsonl[.gz|.zst]   レコード 1 件 = 1 行
+    <prefix>-00001.jsonl[.gz|.zst]   max_shard_bytes を超えたら次のシャードへ
+    index.jsonl                      garment_id → (shard, offset, length) の追記ログ
+
+圧縮時はレコードごとに独立した gzip メンバー／zstd フレームとして書くので、
+シャード全体をストリームで読むことも、index の offset から 1 件だけ読むこともできる。
+index には書き終えた入力（source）も記録し、中断後の再開時に完了済みの入力を飛ばせる。
+"""
+
+import gzip
+import io
+import json
+import os
+import re
+
+INDEX_NAME = "index.jsonl"
+DEFAULT_MAX_SHARD_BYTES = 256 * 1024 * 1024
+COMPRESSION_SUFFIXES = {None: ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def _zstd_module():
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        pass
+    try:
+        from compression import zstd
+
+        return zstd
+    except ImportError:
+        raise RuntimeError(
+            "zstd compression requires the 'zstandard' package (or Python 3.14+)."
+        ) from None
+
+
+def _compress(payload, compression):
+    if compression == "gzip":
+        return gzip.compress(payload, mtime=0)
+    if compression == "zstd":
+        module = _zstd_module()
+        if hasattr(module, "ZstdCompressor"):
+            return module.ZstdCompressor().compress(payload)
+        return module.compress(payload)
+    return payload
+
+
+def _decompress(payload, compression):
+    if compression == "gzip":
+        return gzip.decompress(payload)
+    if compression == "zstd":
+        module = _zstd_module()
+        if hasattr(module, "ZstdDecompressor"):
+            return module.ZstdDecompressor().decompress(payload)
+        return module.decompress(payload)
+    return payload
+
+
+def _open_stream(path, compression):
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        module = _zstd_module()
+        if hasattr(module, "ZstdDecompressor"):
+            return module.ZstdDecompressor().stream_reader(
+                open(path, "rb"), read_across_frames=True, closefd=True
+            )
+        return module.open(path, "rb")
+    return open(path, "rb")
+
+
+def compression_for_path(path):
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def encode_record(data):
+    return (
+        json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+    ).encode("utf-8")
+
+
+def iter_shard_records(path):
+    """シャード（圧縮の有無は拡張子で判定）のレコードを先頭から順に返す。"""
+    with _open_stream(path, compression_for_path(path)) as raw:
+        for line in io.TextIOWrapper(raw, encoding="utf-8"):
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_record(directory, entry):
+    """index のエントリ 1 件に対応するレコードを読み出す。"""
+    path = os.path.join(directory, entry["shard"])
+    with open(path, "rb") as handle:
+        handle.seek(entry["offset"])
+        payload = handle.read(entry["length"])
+    return json.loads(_decompress(payload, compression_for_path(path)))
+
+
+def read_index_entries(directory):
+    """index を読み取り専用で読み、garment_id → エントリの dict を返す。"""
+    entries = {}
+    path = os.path.join(directory, INDEX_NAME)
+    if not os.path.exists(path):
+        return entries
+    with open(path, "rb") as handle:
+        content = handle.read()
+    for line in content[: content.rfind(b"\n") + 1].splitlines():
+        if line.strip():
+            entry = json.loads(line)
+            if "garment_id" in entry:
+                entries[entry["garment_id"]] = entry
+    return entries
+
+
+def _read_index(path):
+    """index を読み、途中で切れた末尾行があれば取り除く。"""
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, "rb+") as handle:
+        content = handle.read()
+        valid_end = content.rfind(b"\n") + 1
+        if valid_end != len(content):
+            handle.truncate(valid_end)
+    for line in content[:valid_end].splitlines():
+        if line.strip():
+            entries.append(json.loads(line))
+    return entries
+
+
+class ShardedJsonlWriter:
+    """追記専用のシャード付き JSONL ライター。with 文で使う。"""
+
+    def __init__(
+        self,
+        directory,
+        prefix="annotations",
+        max_shard_bytes=DEFAULT_MAX_SHARD_BYTES,
+        compression=None,
+    ):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd":
+            _zstd_module()
+        self.directory = directory
+        self.prefix = prefix
+        self.max_shard_bytes = max_shard_bytes
+        self.compression = compression
+        self.entries = {}
+        self.sources = set()
+        self._shard_pattern = re.compile(
+            rf"^{re.escape(prefix)}-(\d{{5}}){re.escape(COMPRESSION_SUFFIXES[compression])}$"
+        )
+        self._shard_number = 0
+        self._shard = None
+        self._index = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._resume()
+
+    # Resume
+    #################################################
+
+    def _shard_name(self, number):
+        return f"{self.prefix}-{number:05d}{COMPRESSION_SUFFIXES[self.compression]}"
+
+    def _resume(self):
+        shard_ends = {}
+        for entry in _read_index(os.path.join(self.directory, INDEX_NAME)):
+            if "garment_id" in entry:
+                self.entries[entry["garment_id"]] = entry
+                end = entry["offset"] + entry["length"]
+                shard_ends[entry["shard"]] = max(shard_ends.get(entry["shard"], 0), end)
+            elif entry.get("complete"):
+                self.sources.add(entry["source"])
+
+        numbers = [
+            int(match.group(1))
+            for match in map(self._shard_pattern.match, os.listdir(self.directory))
+            if match
+        ]
+        self._shard_number = max(numbers, default=0)
+        # index に載る前に中断されたレコードはシャード末尾から切り捨てる。
+        path = os.path.join(self.directory, self._shard_name(self._shard_number))
+        valid_end = shard_ends.get(self._shard_name(self._shard_number), 0)
+        if os.path.exists(path) and os.path.getsize(path) > valid_end:
+            with open(path, "rb+") as handle:
+                handle.truncate(valid_end)
+
+    # Writing
+    #################################################
+
+    def __contains__(self, garment_id):
+        return garment_id in self.entries
+
+    def _current_shard(self, incoming):
+        if self._shard is None:
+            path = os.path.join(self.directory, self._shard_name(self._shard_number))
+            self._shard = open(path, "ab")
+        size = self._shard.tell()
+        if size and size + incoming > self.max_shard_bytes:
+            self._shard.close()
+            self._shard_number += 1
+            path = os.path.join(self.directory, self._shard_name(self._shard_number))
+            self._shard = open(path, "ab")
+        return self._shard
+
+    def write_many(self, records, source=None):
+        """(garment_id, data) の列を書き、まとめて index に登録する。
+
+        source を渡すと、その入力が完了済みであることも同時に記録する。
+        既に index にある garment_id は書かずに飛ばす。
+        """
+        index_lines = []
+        written = []
+        for garment_id, data in records:
+            if garment_id in self.entries:
+                continue
+            payload = _compress(encode_record(data), self.compression)
+            shard = self._current_shard(len(payload))
+            entry = {
+                "garment_id": garment_id,
+                "shard": self._shard_name(self._shard_number),
+                "offset": shard.tell(),
+                "length": len(payload),
+            }
+            if source is not None:
+                entry["source"] = source
+            shard.write(payload)
+            index_lines.append(entry)
+            written.append(entry)
+
+        if self._shard is not None:
+            self._shard.flush()
+            os.fsync(self._shard.fileno())
+        if source is not None:
+            index_lines.append({"source": source, "complete": True})
+        if index_lines:
+            if self._index is None:
+                index_path = os.path.join(self.directory, INDEX_NAME)
+                self._index = open(index_path, "a", encoding="utf-8")
+            self._index.write(
+                "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in index_lines)
+            )
+            self._index.flush()
+        for entry in written:
+            self.entries[entry["garment_id"]] = entry
+        if source is not None:
+            self.sources.add(source)
+        return written
+
+    def write(self, garment_id, data, source=None):
+        written = self.write_many([(garment_id, data)], source=source)
+        return written[0] if written else None
+
+    def close(self):
+        for handle in (self._shard, self._index):
+            if handle is not None:
+                handle.close()
+        self._shard = None
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
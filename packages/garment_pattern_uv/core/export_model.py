@@ -0,0 +1,250 @@
+"""エクスポートと検証が共有する中間表現。
+
+プロパティの走査（理由テキストの読み出しを含む）は 1 度だけにして、シームの絞り込み、
+スキーマ検証、頂点グループとの突き合わせ、書き出し用の dict はすべてここから作る。
+衣服が複数のメッシュオブジェクトに分かれている場合は、オブジェクトごとの
+シーム割り当てをスレッドプールで並列に計算してから 1 つにまとめる。
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .annotation import filter_seams, validate_data_dict, validate_groups
+from .geometry import attach_geometry
+from .profiling import timed
+from .seams import order_seams, seams_by_incidence, seams_for_export
+from .uv_metrics import finish_metrics, merge_totals
+
+
+def parts_snapshot(data):
+    """data から seams_for_export が参照する形（パーツ名 → seams → シーム名 → 理由）を作る。"""
+    return {
+        part["name"]: {
+            "seams": {
+                seam["name"]: {"seam_reasoning": seam["seam_reasoning"]}
+                for seam in part["seams"]
+            }
+        }
+        for part in data["parts"]
+    }
+
+
+def _unique(names):
+    return list(dict.fromkeys(names))
+
+
+def _with_uv_metrics(part, metrics):
+    """part の uv_reasoning の直後に uv_metrics を置いた dict を返す。"""
+    result = {}
+    for key, value in part.items():
+        result[key] = value
+        if key == "uv_reasoning":
+            result["uv_metrics"] = metrics
+    result.setdefault("uv_metrics", metrics)
+    return result
+
+
+@timed("merge_seams")
+def merge_seams_by_part(results):
+    """オブジェクトごとの seams_by_incidence の結果を合わせる。"""
+    merged = {}
+    for seams_by_part in results:
+        for part_name, seams in seams_by_part.items():
+            merged.setdefault(part_name, set()).update(seams)
+    return merged
+
+
+class MeshSource:
+    """メッシュオブジェクト 1 つ分の所属（GroupMembership）と頂点グループ名。
+
+    topology（MeshTopology）を渡すとシームとパーツの隣接を辺で判定し、
+    uv_mesh（UVMesh）を渡すとパーツごとの UV 指標を書き出す。
+    """
+
+    __slots__ = (
+        "name",
+        "membership",
+        "part_group_names",
+        "seam_group_names",
+        "has_uv_map",
+        "topology",
+        "uv_mesh",
+    )
+
+    def __init__(
+        self,
+        name,
+        membership,
+        part_group_names,
+        seam_group_names,
+        has_uv_map,
+        topology=None,
+        uv_mesh=None,
+    ):
+        self.name = name
+        self.membership = membership
+        self.part_group_names = list(part_group_names)
+        self.seam_group_names = list(seam_group_names)
+        self.has_uv_map = has_uv_map
+        self.topology = topology
+        self.uv_mesh = uv_mesh
+
+
+class ExportModel:
+    """_props_to_dict の結果とメッシュ側の情報をまとめたもの。
+
+    object_type が None ならオブジェクト無し、"MESH" 以外ならメッシュ以外を表す。
+    メッシュの場合は sources に MeshSource を 1 つ以上渡す。
+    """
+
+    def __init__(self, data, object_type=None, sources=(), max_workers=None):
+        self.data = data
+        self.object_type = object_type
+        self.sources = list(sources)
+        self.max_workers = max_workers
+        self.part_group_names = _unique(
+            name for source in self.sources for name in source.part_group_names
+        )
+        self.seam_group_names = _unique(
+            name for source in self.sources for name in source.seam_group_names
+        )
+        self._seams_by_part = None
+        self._uv_metrics = None
+        self._export_data = None
+        self._schema_errors = None
+
+    @property
+    def is_mesh(self):
+        return self.object_type == "MESH"
+
+    def _map_sources(self, fn):
+        """fn をソースごとに呼ぶ。複数あればスレッドプールで並列に計算する。
+
+        所属や辺・UV の配列は呼び出し側（メインスレッド）で読み終えているので、
+        ここでは numpy の演算だけが走る。大きな配列の演算中は GIL が解放される。
+        """
+        if len(self.sources) == 1:
+            return [fn(self.sources[0])]
+        workers = self.max_workers or min(len(self.sources), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            return list(pool.map(fn, self.sources))
+
+    @property
+    def seams_by_part(self):
+        """パーツごとに書き出すシーム名。メッシュでなければ None。"""
+        if self._seams_by_part is None and self.is_mesh:
+            snapshot = parts_snapshot(self.data)
+            if len(self.sources) == 1:
+                source = self.sources[0]
+                self._seams_by_part = seams_for_export(
+                    source.membership,
+                    source.part_group_names,
+                    source.seam_group_names,
+                    snapshot,
+                    source.topology,
+                )
+            else:
+                # 理由付きのシームは別オブジェクトのパーツに付くこともあるので、
+                # 統合した後にまとめて加える。
+                results = self._map_sources(
+                    lambda source: seams_by_incidence(
+                        source.membership,
+                        source.part_group_names,
+                        source.seam_group_names,
+                        source.topology,
+                    )
+                )
+                self._seams_by_part = order_seams(
+                    merge_seams_by_part(results),
+                    self.part_group_names,
+                    self.seam_group_names,
+                    snapshot,
+                )
+        return self._seams_by_part
+
+    @property
+    def uv_metrics(self):
+        """パーツ名 → UV 指標の dict。メッシュでなければ None。"""
+        if self._uv_metrics is None and self.is_mesh:
+            results = self._map_sources(
+                lambda source: source.uv_mesh.part_totals(
+                    source.membership, source.part_group_names
+                )
+                if source.uv_mesh is not None
+                else {}
+            )
+            self._uv_metrics = {
+                name: finish_metrics(entry) for name, entry in merge_totals(results).items()
+            }
+        return self._uv_metrics
+
+    def export_data(self):
+        """書き出し用の dict（メッシュがあれば seams を絞り込み、UV 指標を加えたもの）。"""
+        if self._export_data is None:
+            if self.is_mesh:
+                data = dict(self.data)
+                metrics = self.uv_metrics
+                data["parts"] = [
+                    _with_uv_metrics(part, metrics[part["name"]])
+                    if part["name"] in metrics
+                    else dict(part)
+                    for part in self.data["parts"]
+                ]
+                self._export_data = filter_seams(data, self.seams_by_part)
+            else:
+                self._export_data = self.data
+        return self._export_data
+
+    def part_vertices(self):
+        """[(パーツ名, オブジェクト名, 頂点番号の配列)]。data にあるパーツだけ、ソース順。"""
+        names = {part["name"] for part in self.data["parts"]}
+        return [
+            (name, source.name, source.membership.indices_of(name))
+            for source in self.sources
+            for name in source.part_group_names
+            if name in names and name in source.membership
+        ]
+
+    def geometry_data(self, writer):
+        """export_data に、パーツ・シームの配列（core.geometry）を writer へ書いて参照を加えた dict。"""
+        return attach_geometry(self.export_data(), self.sources, writer)
+
+    def schema_errors(self):
+        if self._schema_errors is None:
+            self._schema_errors = validate_data_dict(self.data)
+        return self._schema_errors
+
+    def validate(self):
+        """(errors, warnings) を返す。"""
+        errors = list(self.schema_errors())
+        warnings = []
+        if self.object_type is None:
+            warnings.append("No active object; skipped mesh validation.")
+            return errors, warnings
+        if not self.is_mesh:
+            errors.append("アクティブなオブジェクトがメッシュではありません。")
+            return errors, warnings
+        if len(self.sources) == 1:
+            if not self.sources[0].has_uv_map:
+                errors.append("アクティブなメッシュに UVMap がありません。")
+        else:
+            for source in self.sources:
+                if not source.has_uv_map:
+                    errors.append(f"メッシュ {source.name} に UVMap がありません。")
+
+        group_errors, group_warnings = validate_groups(
+            {part["name"] for part in self.data["parts"]},
+            self.part_group_names,
+            self.seams_by_part,
+            {
+                part["name"]: {seam["name"] for seam in part["seams"]}
+                for part in self.data["parts"]
+            },
+        )
+        errors.extend(group_errors)
+        warnings.extend(group_warnings)
+        for part in self.data["parts"]:
+            metrics = self.uv_metrics.get(part["name"])
+            if metrics is not None and metrics["area_uv"] <= 0:
+                warnings.append(f"Part {part['name']} has no UV area.")
+        return errors, warnings
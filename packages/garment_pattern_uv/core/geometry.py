@@ -0,0 +1,293 @@
+"""パーツ・シームの頂点番号・座標・UV を、アノテーション JSON から参照する配列として書き出す。
+
+配列は 1 着につき 1 つのファイル（JSON と同じ名前で拡張子が .gpuvg）に、
+リトルエンディアンのまま 64 バイト境界で並べる。JSON のルートの geometry に
+ファイル名と大きさを、パーツ・シームの geometry にオブジェクトごとの配列の参照
+（offset・dtype・shape）を書く。GeometryFile はファイルを np.memmap で開き、
+参照した配列だけをコピーせずに返すので、.blend を開き直さずに形状を読める。
+
+配列はエクスポートで読み終えた所属（GroupMembership）・辺（MeshTopology）・
+UV（UVMesh）から numpy で切り出すだけで、bpy のデータを要素ごとには読まない。
+パーツの面は UV 指標と同じく「全頂点がパーツの頂点グループに入っている」もの。
+シームの UV は辺の両側で分かれるので、辺に接する面の側ごとに持つ。
+座標はオブジェクトのローカル座標。
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from .profiling import timed
+
+SUFFIX = ".gpuvg"
+ALIGNMENT = 64
+_PADDING = bytes(ALIGNMENT)
+_EMPTY_SIDES = np.zeros(0, dtype=np.int32)
+_EMPTY_SIDE_UVS = np.zeros((0, 2, 2), dtype=np.float32)
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+class GeometryWriter:
+    """配列を順に一時ファイルへ書き、JSON に書く参照を返す。
+
+    JSON と対で置き換えるため、path への置き換え（commit）は呼び出し側が JSON を
+    書き終えてから行う。with で使う場合は例外無しで抜けたときに置き換える。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._handle = open(self._temp_path, "xb")
+        self._committed = False
+
+    def add(self, values):
+        """values を書き、{"offset", "dtype", "shape"} を返す。"""
+        values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+        offset = _align(self.size)
+        self._handle.write(_PADDING[: offset - self.size])
+        self._handle.write(values.reshape(-1).view(np.uint8).data)
+        self.size = offset + values.nbytes
+        return {"offset": offset, "dtype": values.dtype.str, "shape": list(values.shape)}
+
+    def flush(self):
+        """書いた内容を fsync して閉じる（path はまだ置き換えない）。"""
+        if not self._handle.closed:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._handle.close()
+
+    def commit(self):
+        self.flush()
+        os.replace(self._temp_path, self.path)
+        self._committed = True
+
+    def discard(self):
+        """置き換えていなければ一時ファイルを消す。"""
+        self._handle.close()
+        if not self._committed and os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_exc):
+        try:
+            if exc_type is None:
+                self.commit()
+        finally:
+            self.discard()
+
+
+def _local(vertices, values):
+    """頂点番号 values を、昇順の vertices 内の位置にする。"""
+    return np.searchsorted(vertices, values).astype(np.int32)
+
+
+def _part_faces(uv_mesh, membership, part_names):
+    """パーツ名 → (面ごとの頂点数, 面の角のループ番号)。面を持たないパーツは含めない。"""
+    if not part_names or not uv_mesh.polygon_count:
+        return {}
+    polygons, columns = uv_mesh._polygon_parts(membership, tuple(part_names))
+    order = np.lexsort((polygons, columns))
+    polygons = polygons[order]
+    columns = columns[order]
+    sizes = uv_mesh.loop_totals[polygons]
+    face_ends = np.cumsum(sizes)
+    starts = np.repeat(uv_mesh.loop_offsets[polygons] - (face_ends - sizes), sizes)
+    loops = uv_mesh.loop_order[np.arange(int(sizes.sum())) + starts]
+    face_bounds = np.searchsorted(columns, np.arange(len(part_names) + 1))
+    corner_bounds = np.r_[0, face_ends][face_bounds]
+    result = {}
+    for column, name in enumerate(part_names):
+        first, last = face_bounds[column], face_bounds[column + 1]
+        if first < last:
+            result[name] = (
+                sizes[first:last].astype(np.int32),
+                loops[corner_bounds[column] : corner_bounds[column + 1]],
+            )
+    return result
+
+
+class _LoopEdges:
+    """面の各ループからその面の次のループへの辺を、辺（両端の頂点）の順に並べたもの。
+
+    1 メッシュにつき 1 度作り、シームの辺ごとに二分探索で接する面の側を引く。
+    """
+
+    def __init__(self, uv_mesh):
+        positions = np.arange(uv_mesh.loop_order.size)
+        polygons = uv_mesh.loop_polygons
+        following = positions + 1
+        wrap = following == uv_mesh.loop_offsets[polygons] + uv_mesh.loop_totals[polygons]
+        following[wrap] = uv_mesh.loop_offsets[polygons[wrap]]
+        first = uv_mesh.loop_order
+        second = first[following]
+        start = uv_mesh.loop_vertices[first].astype(np.int64)
+        end = uv_mesh.loop_vertices[second].astype(np.int64)
+        self.vertex_count = uv_mesh.vertex_count
+        keys = np.minimum(start, end) * self.vertex_count + np.maximum(start, end)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.first = first[order]
+        self.second = second[order]
+        self.start = start[order]
+        self.uvs = uv_mesh.uvs
+
+    def sides(self, edges):
+        """edges（(k, 2) の頂点番号）に接する面の側ごとの (edges 内の位置, 両端の UV)。"""
+        if not edges.size:
+            return _EMPTY_SIDES, _EMPTY_SIDE_UVS
+        low = np.minimum(edges[:, 0], edges[:, 1]).astype(np.int64)
+        high = np.maximum(edges[:, 0], edges[:, 1]).astype(np.int64)
+        edge_keys = low * self.vertex_count + high
+        left = np.searchsorted(self.keys, edge_keys, side="left")
+        counts = np.searchsorted(self.keys, edge_keys, side="right") - left
+        total = int(counts.sum())
+        sides = np.repeat(np.arange(edges.shape[0], dtype=np.int32), counts)
+        rows = np.arange(total) + np.repeat(left - (np.cumsum(counts) - counts), counts)
+        first_uvs = self.uvs[self.first[rows]]
+        second_uvs = self.uvs[self.second[rows]]
+        # ループの向きが辺の並びと逆なら両端の UV を入れ替える
+        flipped = (self.start[rows] != edges[sides, 0])[:, None]
+        side_uvs = np.stack(
+            [
+                np.where(flipped, second_uvs, first_uvs),
+                np.where(flipped, first_uvs, second_uvs),
+            ],
+            axis=1,
+        )
+        return sides, side_uvs.astype(np.float32, copy=False)
+
+
+def _with_geometry(item, entries):
+    result = dict(item)
+    if entries:
+        result["geometry"] = entries
+    return result
+
+
+@timed("geometry_arrays")
+def attach_geometry(data, sources, writer):
+    """data（書き出し用の dict）の各パーツ・シームの配列を writer に書き、参照を加えた dict を返す。
+
+    data 自体は書き換えない。複数のパーツに付くシームの配列は 1 度だけ書く。
+    """
+    part_names = {part["name"] for part in data["parts"]}
+    seam_names = {seam["name"] for part in data["parts"] for seam in part["seams"]}
+    part_entries = {}
+    seam_entries = {}
+    for source in sources:
+        membership = source.membership
+        coords = source.topology.coords
+        uv_mesh = source.uv_mesh
+        names = [
+            name
+            for name in source.part_group_names
+            if name in part_names and name in membership
+        ]
+        faces = _part_faces(uv_mesh, membership, names) if uv_mesh is not None else {}
+        for name in names:
+            vertices = membership.indices_of(name)
+            entry = {
+                "object": source.name,
+                "vertices": writer.add(vertices),
+                "positions": writer.add(coords[vertices]),
+            }
+            if name in faces:
+                sizes, loops = faces[name]
+                entry["face_sizes"] = writer.add(sizes)
+                entry["face_vertices"] = writer.add(
+                    _local(vertices, uv_mesh.loop_vertices[loops])
+                )
+                entry["face_uvs"] = writer.add(uv_mesh.uvs[loops])
+            part_entries.setdefault(name, []).append(entry)
+
+        loop_edges = None
+        for name in source.seam_group_names:
+            if name not in seam_names or name not in membership:
+                continue
+            vertices = membership.indices_of(name)
+            edges = source.topology.seam(membership, name).edges
+            entry = {
+                "object": source.name,
+                "vertices": writer.add(vertices),
+                "positions": writer.add(coords[vertices]),
+                "edges": writer.add(_local(vertices, edges)),
+            }
+            if uv_mesh is not None:
+                if loop_edges is None:
+                    loop_edges = _LoopEdges(uv_mesh)
+                sides, side_uvs = loop_edges.sides(edges)
+                entry["edge_sides"] = writer.add(sides)
+                entry["edge_side_uvs"] = writer.add(side_uvs)
+            seam_entries.setdefault(name, []).append(entry)
+
+    result = dict(data)
+    result["parts"] = [
+        _with_geometry(
+            dict(
+                part,
+                seams=[
+                    _with_geometry(seam, seam_entries.get(seam["name"]))
+                    for seam in part["seams"]
+                ],
+            ),
+            part_entries.get(part["name"]),
+        )
+        for part in data["parts"]
+    ]
+    result["geometry"] = {"file": os.path.basename(writer.path), "size": writer.size}
+    return result
+
+
+class GeometryFile:
+    """アノテーションの geometry が指す配列ファイルを np.memmap で開いたもの。"""
+
+    def __init__(self, path, size=None):
+        self.path = path
+        actual = os.path.getsize(path)
+        if size is not None and actual != size:
+            raise ValueError(
+                f"{path}: {actual} bytes, but the annotation expects {size} bytes."
+            )
+        self._buffer = (
+            np.memmap(path, dtype=np.uint8, mode="r") if actual else np.zeros(0, np.uint8)
+        )
+
+    @classmethod
+    def for_annotation(cls, json_path, data):
+        """json_path から読んだ data の配列ファイルを開く。"""
+        info = data.get("geometry")
+        if info is None:
+            raise ValueError(f"{json_path} does not reference geometry arrays.")
+        return cls(os.path.join(os.path.dirname(json_path), info["file"]), info.get("size"))
+
+    def array(self, ref):
+        """参照 {"offset", "dtype", "shape"} の配列（memmap のビュー）。"""
+        dtype = np.dtype(ref["dtype"])
+        shape = tuple(ref["shape"])
+        start = ref["offset"]
+        stop = start + int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        return self._buffer[start:stop].view(dtype).reshape(shape)
+
+    def arrays(self, entry):
+        """geometry の要素 1 つ（オブジェクト 1 つ分）を 名前 → 配列 の dict にする。"""
+        return {key: self.array(ref) for key, ref in entry.items() if key != "object"}
+
+    def close(self):
+        # 返した配列は memmap を参照し続けるので、ここでは参照を外すだけにする
+        self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
@@ -0,0 +1,119 @@
+"""頂点グループ名を接頭辞ルールで分類する。
+
+ルールは (役割, 接頭辞) の並びで、先に書いたものが優先される。すべての接頭辞を
+1 つの正規表現にまとめ、名前ごとの結果もメモするので、同じ名前の分類は 2 回目から
+辞書引きになる。オブジェクトごとの分類結果（GroupIndex）はグループ名の並びが
+変わるまで使い回す。
+"""
+
+import re
+
+from ..constants import GROUP_PREFIX_RULES
+
+_MEMO_LIMIT = 1 << 16
+
+
+class GroupClassifier:
+    """接頭辞ルールを 1 つの正規表現にまとめた分類器（大文字小文字・先頭の空白は無視）。"""
+
+    def __init__(self, rules=GROUP_PREFIX_RULES):
+        self.rules = tuple(rules)
+        self.roles = tuple(dict.fromkeys(role for role, _ in self.rules))
+        alternatives = "|".join(f"({re.escape(prefix)})" for _, prefix in self.rules)
+        self._match = re.compile(rf"\s*(?:{alternatives})", re.IGNORECASE).match
+        self._group_roles = tuple(role for role, _ in self.rules)
+        self._memo = {}
+
+    def role(self, name):
+        """name の役割（"part" など）。どのルールにも当たらなければ None。"""
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+        match = self._match(name)
+        role = self._group_roles[match.lastindex - 1] if match else None
+        if len(self._memo) >= _MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[name] = role
+        return role
+
+
+class GroupIndex:
+    """頂点グループ名の並びを分類した結果。役割と位置を O(1) で引ける。
+
+    group_index_for が呼び出し元の間で使い回すので、名前の並びはすべて tuple で持つ。
+    """
+
+    def __init__(self, names, classifier):
+        self.names = tuple(names)
+        by_role = {role: [] for role in classifier.roles}
+        self._roles = {}
+        self._positions = {}
+        for position, name in enumerate(self.names):
+            role = classifier.role(name)
+            self._positions.setdefault(name, position)
+            self._roles.setdefault(name, role)
+            if role is not None:
+                by_role[role].append(name)
+        self.by_role = {role: tuple(names) for role, names in by_role.items()}
+
+    def role_of(self, name):
+        return self._roles.get(name)
+
+    def index_of(self, name):
+        """vertex_groups 内の位置。無ければ -1。"""
+        return self._positions.get(name, -1)
+
+    def names_with(self, role):
+        return self.by_role.get(role, ())
+
+    @property
+    def part_names(self):
+        return self.names_with("part")
+
+    @property
+    def seam_names(self):
+        return self.names_with("seam")
+
+
+_CLASSIFIER = GroupClassifier()
+# オブジェクトのポインタ → GroupIndex
+_INDEX_CACHE = {}
+
+
+def set_prefix_rules(rules):
+    """分類ルールを差し替え、キャッシュを捨てる。"""
+    global _CLASSIFIER
+    _CLASSIFIER = GroupClassifier(rules)
+    _INDEX_CACHE.clear()
+
+
+def group_index(names):
+    return GroupIndex(names, _CLASSIFIER)
+
+
+def group_index_for(pointer, names):
+    """pointer（オブジェクト）の GroupIndex。names が前回と同じならそのまま返す。"""
+    names = tuple(names)
+    cached = _INDEX_CACHE.get(pointer)
+    if cached is not None and cached.names == names:
+        return cached
+    index = _INDEX_CACHE[pointer] = GroupIndex(names, _CLASSIFIER)
+    return index
+
+
+def invalidate_group_index(pointer=None):
+    if pointer is None:
+        _INDEX_CACHE.clear()
+    else:
+        _INDEX_CACHE.pop(pointer, None)
+
+
+def split_group_names(names):
+    """頂点グループ名を (パーツ名の list, シーム名の list) に振り分ける。"""
+    index = group_index(names)
+    return list(index.part_names), list(index.seam_names)
+
+
+def is_part_name(name):
+    return _CLASSIFIER.role(name) == "part"
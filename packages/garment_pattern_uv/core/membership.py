@@ -0,0 +1,361 @@
+import os
+from collections.abc import Mapping, Set
+from itertools import islice
+
+import numpy as np
+
+DEFAULT_MEMORY_LIMIT = 128 * 1024 * 1024
+# 頂点 1 つを読むあいだに積む Python オブジェクトのおおよその大きさ（グループ数個ぶん）
+READ_BYTES_PER_VERTEX = 256
+MIN_CHUNK_VERTICES = 4096
+
+
+def _memory_limit_from_environment():
+    try:
+        megabytes = float(os.environ.get("GPUV_MEMORY_LIMIT_MB", ""))
+    except ValueError:
+        return DEFAULT_MEMORY_LIMIT
+    return int(megabytes * 1024 * 1024) if megabytes > 0 else DEFAULT_MEMORY_LIMIT
+
+
+_MEMORY_LIMIT = _memory_limit_from_environment()
+
+
+def memory_limit():
+    """所属の構築・隣接判定で使う作業用メモリの上限（バイト）。結果の CSR 自体は含まない。"""
+    return _MEMORY_LIMIT
+
+
+def set_memory_limit(limit_bytes=None):
+    """作業用メモリの上限を変える。None なら環境変数 GPUV_MEMORY_LIMIT_MB か既定値に戻す。"""
+    global _MEMORY_LIMIT
+    if limit_bytes is None:
+        _MEMORY_LIMIT = _memory_limit_from_environment()
+    else:
+        _MEMORY_LIMIT = max(1, int(limit_bytes))
+
+
+def _group_chunk(first_vertex, counts, groups, weights):
+    counts = np.array(counts, dtype=np.int32)
+    vertices = np.repeat(
+        np.arange(first_vertex, first_vertex + counts.size, dtype=np.int32), counts
+    )
+    keep = np.array(weights, dtype=np.float32) > 0
+    return vertices[keep], np.array(groups, dtype=np.int32)[keep]
+
+
+def _read_group_chunks(mesh, chunk_vertices):
+    """頂点グループの所属を、chunk_vertices 頂点ずつ (頂点, グループ) の配列で返す。
+
+    制約: この読み出しは頂点ごと・要素ごとの Python のループのままで、一括読み出し
+    ではない。Blender（4.x）は頂点グループのウェイトを foreach_get で読む手段を
+    持たず（MeshVertex.groups は頂点ごとのコレクションで、属性にもならない）、
+    頂点ごとの foreach_get は要素数が少なく呼び出しの固定費が勝つ。このため
+    from_object の時間はほぼこの読み出しで決まり、numpy で速くなるのは
+    from_chunks 以降（CSR への書き込みと隣接判定）だけになる。
+    bench_membership.py は読み出しと構築の時間を分けて出す。
+
+    頂点を 1 回だけ走査して平らなリストに積み、そこから numpy 配列を作る。
+    リストは要素ごとに数十バイトを使うので、chunk_vertices ごとに配列へ移し、
+    ウェイトが 0 の要素もそこで落とす。
+    """
+    iterator = iter(mesh.vertices)
+    first_vertex = 0
+    while True:
+        counts = []
+        groups = []
+        weights = []
+        append_count = counts.append
+        append_group = groups.append
+        append_weight = weights.append
+        for vertex in islice(iterator, chunk_vertices):
+            elements = vertex.groups
+            append_count(len(elements))
+            for element in elements:
+                append_group(element.group)
+                append_weight(element.weight)
+        if not counts:
+            return
+        yield _group_chunk(first_vertex, counts, groups, weights)
+        first_vertex += len(counts)
+
+
+def _bitmap(indices):
+    """昇順の頂点インデックスを、0 でない 64 bit ワードだけの圧縮ビット列にする。
+
+    (ワード番号, ワードの値) の組で持つので、数十頂点のシームは頂点数によらず
+    数ワードで済む（密なビット配列だと頂点数 / 8 バイト）。
+    """
+    if not indices.size:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint64)
+    words = indices >> 6
+    flags = np.left_shift(np.uint64(1), (indices & 63).astype(np.uint64))
+    starts = np.flatnonzero(np.r_[True, words[1:] != words[:-1]])
+    return words[starts].astype(np.int64), np.bitwise_or.reduceat(flags, starts)
+
+
+def _dense_words(bitmaps, words):
+    """圧縮ビット列から昇順のワード番号 words の分だけを取り出し、密な 2 次元配列にする。"""
+    dense = np.zeros((len(bitmaps), words.size), dtype=np.uint64)
+    for row, (group_words, bits) in enumerate(bitmaps):
+        start, stop = np.searchsorted(group_words, (words[0], words[-1] + 1))
+        if start == stop:
+            continue
+        candidates = group_words[start:stop]
+        positions = np.searchsorted(words, candidates)
+        found = words[positions] == candidates
+        dense[row, positions[found]] = bits[start:stop][found]
+    return dense
+
+
+def _incidence(row_bitmaps, col_bitmaps, limit):
+    """行グループ × 列グループで共有頂点があるかどうかの bool 行列を返す。
+
+    行側のワードを、作業用の配列が limit バイトに収まる幅ずつ処理する。
+    """
+    result = np.zeros((len(row_bitmaps), len(col_bitmaps)), dtype=bool)
+    if not result.size:
+        return result
+    # 行側（シーム）が 1 ビットも持たないワードは結果に影響しないので除外する。
+    active = np.unique(np.concatenate([words for words, _ in row_bitmaps]))
+    bytes_per_word = 8 * (len(row_bitmaps) + len(col_bitmaps) + result.size)
+    step = max(1, limit // bytes_per_word)
+    for start in range(0, active.size, step):
+        words = active[start : start + step]
+        rows = _dense_words(row_bitmaps, words)
+        cols = _dense_words(col_bitmaps, words)
+        result |= (rows[:, None, :] & cols[None, :, :]).any(axis=2)
+    return result
+
+
+def _gather(indptr, values, rows):
+    """CSR の rows 行ぶんの値を 1 本の配列につなげて返す。"""
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    total = int(counts.sum())
+    if not total:
+        return values[:0]
+    offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return values[np.arange(total) + offsets]
+
+
+def _rows_of(indptr, rows):
+    """CSR の rows 行ぶんの各要素に、rows 内での位置を振った配列。"""
+    counts = indptr[rows + 1] - indptr[rows]
+    return np.repeat(np.arange(rows.size, dtype=np.int64), counts)
+
+
+class GroupVertices(Set):
+    """1 グループに属する頂点インデックス（昇順の int32 配列）を set として扱う。"""
+
+    __slots__ = ("indices",)
+
+    def __init__(self, indices):
+        self.indices = indices
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return cls(np.array(sorted(iterable), dtype=np.int32))
+
+    def __len__(self):
+        return int(self.indices.size)
+
+    def __iter__(self):
+        return iter(self.indices.tolist())
+
+    def __contains__(self, value):
+        position = np.searchsorted(self.indices, value)
+        return position < self.indices.size and self.indices[position] == value
+
+    def __and__(self, other):
+        if isinstance(other, GroupVertices):
+            return GroupVertices(
+                np.intersect1d(self.indices, other.indices, assume_unique=True)
+            )
+        return super().__and__(other)
+
+    __rand__ = __and__
+
+    def isdisjoint(self, other):
+        if isinstance(other, GroupVertices):
+            return not np.intersect1d(
+                self.indices, other.indices, assume_unique=True
+            ).size
+        return super().isdisjoint(other)
+
+
+class GroupMembership(Mapping):
+    """グループ名 → 頂点集合を CSR（indptr/indices）形式で保持する。"""
+
+    def __init__(self, names, indptr, indices, vertex_count):
+        self.names = tuple(names)
+        self.indptr = indptr
+        self.indices = indices
+        self.vertex_count = vertex_count
+        self._slot_by_name = {name: slot for slot, name in enumerate(self.names)}
+        self._bitmaps = {}
+        self._incidence_cache = {}
+        self._inverse_cache = {}
+
+    @classmethod
+    def from_chunks(cls, names, chunks, vertex_count):
+        """(頂点, グループ) 配列の列から構築する。グループは names の並び順。
+
+        チャンクは頂点の昇順に並んでいること（_read_group_chunks の出力どおり）。
+        グループごとの件数を数えてから、各チャンクを CSR の位置へ直接書き込むので、
+        作業用のメモリは全要素の並べ替えではなくチャンク単位で済む。
+        """
+        slot_count = len(names)
+        slot_type = np.min_scalar_type(max(slot_count - 1, 0))
+        sorted_chunks = []
+        counts = np.zeros(slot_count, dtype=np.int64)
+        for members, slots in chunks:
+            valid = (slots >= 0) & (slots < slot_count)
+            members = members[valid]
+            slots = slots[valid]
+            order = np.lexsort((members, slots))
+            members = members[order].astype(np.int32, copy=False)
+            slots = slots[order].astype(slot_type)
+            sorted_chunks.append((members, slots))
+            counts += np.bincount(slots, minlength=slot_count)
+
+        indptr = np.zeros(slot_count + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        indices = np.empty(int(indptr[-1]), dtype=np.int32)
+        cursor = indptr[:-1].copy()
+        while sorted_chunks:
+            members, slots = sorted_chunks.pop(0)
+            chunk_counts = np.bincount(slots, minlength=slot_count)
+            chunk_starts = np.cumsum(chunk_counts) - chunk_counts
+            offsets = np.arange(slots.size) - chunk_starts[slots]
+            indices[cursor[slots] + offsets] = members
+            cursor += chunk_counts
+        return cls(names, indptr, indices, vertex_count)
+
+    @classmethod
+    def from_buffers(cls, names, vertex_buffer, group_buffer, weight_buffer, vertex_count):
+        """(頂点, グループ, ウェイト) のフラットなバッファから構築する。"""
+        valid = weight_buffer > 0
+        return cls.from_chunks(
+            names, [(vertex_buffer[valid], group_buffer[valid])], vertex_count
+        )
+
+    @classmethod
+    def from_object(cls, obj, limit=None):
+        """obj の頂点グループを、作業用メモリ limit（既定は memory_limit()）で読む。
+
+        読み出しは頂点ごとの走査になる（_read_group_chunks を参照）。
+        """
+        names = [group.name for group in obj.vertex_groups]
+        mesh = obj.data
+        limit = memory_limit() if limit is None else limit
+        chunk_vertices = max(MIN_CHUNK_VERTICES, limit // READ_BYTES_PER_VERTEX)
+        return cls.from_chunks(
+            names, _read_group_chunks(mesh, chunk_vertices), len(mesh.vertices)
+        )
+
+    def slot(self, name):
+        return self._slot_by_name[name]
+
+    def indices_of(self, name):
+        slot = self._slot_by_name[name]
+        return self.indices[self.indptr[slot] : self.indptr[slot + 1]]
+
+    def bitmaps(self, names):
+        """names の順に並べた圧縮ビット列 (ワード番号, 値) のリスト。未知の名前は空。"""
+        empty = _bitmap(self.indices[:0])
+        bitmaps = []
+        for name in names:
+            if name not in self._slot_by_name:
+                bitmaps.append(empty)
+                continue
+            bitmap = self._bitmaps.get(name)
+            if bitmap is None:
+                bitmap = self._bitmaps[name] = _bitmap(self.indices_of(name))
+            bitmaps.append(bitmap)
+        return bitmaps
+
+    def incidence(self, row_names, col_names):
+        """row_names × col_names の隣接行列（共有頂点の有無）をまとめて計算する。"""
+        key = (tuple(row_names), tuple(col_names))
+        matrix = self._incidence_cache.get(key)
+        if matrix is None:
+            matrix = _incidence(self.bitmaps(key[0]), self.bitmaps(key[1]), memory_limit())
+            matrix.flags.writeable = False
+            self._incidence_cache[key] = matrix
+        return matrix
+
+    def groups_by_vertex(self, names):
+        """頂点 → names 内の位置の CSR (indptr, columns)。未知の名前は含めない。"""
+        key = tuple(names)
+        cached = self._inverse_cache.get(key)
+        if cached is None:
+            positions = [row for row, name in enumerate(key) if name in self._slot_by_name]
+            slots = np.array([self._slot_by_name[key[row]] for row in positions], dtype=np.int64)
+            vertices = _gather(self.indptr, self.indices, slots)
+            columns = np.asarray(positions, dtype=np.int64)[_rows_of(self.indptr, slots)]
+            order = np.argsort(vertices, kind="stable")
+            indptr = np.zeros(self.vertex_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(vertices, minlength=self.vertex_count), out=indptr[1:])
+            cached = self._inverse_cache[key] = (indptr, columns[order])
+        return cached
+
+    def __getitem__(self, name):
+        return GroupVertices(self.indices_of(name))
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._slot_by_name
+
+
+class _CachedMembership:
+    __slots__ = ("key", "membership")
+
+    def __init__(self, key, membership):
+        self.key = key
+        self.membership = membership
+
+
+_MEMBERSHIP_CACHE = {}
+
+
+def _membership_key(obj):
+    mesh = obj.data
+    return (
+        mesh.as_pointer(),
+        tuple(group.name for group in obj.vertex_groups),
+        len(mesh.vertices),
+    )
+
+
+def membership_for(obj):
+    """オブジェクトごとにキャッシュした GroupMembership を返す。"""
+    key = _membership_key(obj)
+    entry = _MEMBERSHIP_CACHE.get(obj.as_pointer())
+    if entry is None or entry.key != key:
+        entry = _CachedMembership(key, GroupMembership.from_object(obj))
+        _MEMBERSHIP_CACHE[obj.as_pointer()] = entry
+    return entry.membership
+
+
+def cached_membership(obj):
+    """キャッシュ済みで最新の GroupMembership。無ければ読み込まずに None を返す。"""
+    entry = _MEMBERSHIP_CACHE.get(obj.as_pointer())
+    if entry is None or entry.key != _membership_key(obj):
+        return None
+    return entry.membership
+
+
+def invalidate_membership(pointer=None):
+    """オブジェクトまたはメッシュのポインタに紐づくキャッシュを破棄する（None で全破棄）。"""
+    if pointer is None:
+        _MEMBERSHIP_CACHE.clear()
+        return
+    for obj_pointer, entry in list(_MEMBERSHIP_CACHE.items()):
+        if obj_pointer == pointer or entry.key[0] == pointer:
+            del _MEMBERSHIP_CACHE[obj_pointer]
@@ -0,0 +1,170 @@
+"""オプトインの計測。呼び出し回数・累計・p95 とカウンタを集め、JSON や Chrome トレースに書き出す。
+
+無効時は timed() で包んだ関数もフラグを 1 つ見るだけで素通りする。
+環境変数 GPUV_PROFILE=1 で起動時から有効にできる（バッチ処理向け）。
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+SAMPLE_LIMIT = 1024
+EVENT_LIMIT = 20_000
+
+_ENABLED = os.environ.get("GPUV_PROFILE", "") not in ("", "0")
+_STATS = {}
+_COUNTERS = {}
+_EVENTS = deque(maxlen=EVENT_LIMIT)
+_ORIGIN_NS = time.perf_counter_ns()
+_LOCK = threading.Lock()
+
+
+class _Stat:
+    __slots__ = ("calls", "total_ns", "max_ns", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.samples = deque(maxlen=SAMPLE_LIMIT)
+
+    def add(self, duration_ns):
+        self.calls += 1
+        self.total_ns += duration_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+        self.samples.append(duration_ns)
+
+    def percentile(self, fraction):
+        """直近 SAMPLE_LIMIT 回の分位点（ナノ秒）。"""
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def is_enabled():
+    return _ENABLED
+
+
+def enable(value=True):
+    global _ENABLED
+    _ENABLED = bool(value)
+
+
+def reset():
+    global _ORIGIN_NS
+    with _LOCK:
+        _STATS.clear()
+        _COUNTERS.clear()
+        _EVENTS.clear()
+        _ORIGIN_NS = time.perf_counter_ns()
+
+
+def _record(name, start_ns, duration_ns):
+    with _LOCK:
+        stat = _STATS.get(name)
+        if stat is None:
+            stat = _STATS[name] = _Stat()
+        stat.add(duration_ns)
+        _EVENTS.append((name, start_ns, duration_ns, threading.get_ident()))
+
+
+def count(name, amount=1):
+    """カウンタを加算する（無効時は何もしない）。"""
+    if _ENABLED:
+        with _LOCK:
+            _COUNTERS[name] = _COUNTERS.get(name, 0) + amount
+
+
+@contextmanager
+def span(name):
+    """with ブロックの所要時間を name で記録する。"""
+    if not _ENABLED:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _record(name, start, time.perf_counter_ns() - start)
+
+
+def timed(name):
+    """関数の所要時間を name で記録するデコレータ。"""
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(name, start, time.perf_counter_ns() - start)
+
+        return wrapper
+
+    return decorate
+
+
+def snapshot():
+    """集計結果を返す。stats は累計時間の降順。"""
+    with _LOCK:
+        stats = [
+            {
+                "name": name,
+                "calls": stat.calls,
+                "total_ms": stat.total_ns / 1e6,
+                "mean_ms": stat.total_ns / stat.calls / 1e6,
+                "p95_ms": stat.percentile(0.95) / 1e6,
+                "max_ms": stat.max_ns / 1e6,
+            }
+            for name, stat in _STATS.items()
+        ]
+        counters = dict(sorted(_COUNTERS.items()))
+    stats.sort(key=lambda item: item["total_ms"], reverse=True)
+    return {"enabled": _ENABLED, "stats": stats, "counters": counters}
+
+
+def _write(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, ensure_ascii=False, indent=2)
+        handle.write("\n")
+
+
+def dump_json(path):
+    _write(path, snapshot())
+
+
+def dump_chrome_trace(path):
+    """chrome://tracing や Perfetto で開けるトレースを書き出す。"""
+    pid = os.getpid()
+    with _LOCK:
+        events = list(_EVENTS)
+        counters = dict(_COUNTERS)
+        origin = _ORIGIN_NS
+    trace = [
+        {
+            "name": name,
+            "ph": "X",
+            "ts": (start - origin) / 1000,
+            "dur": duration / 1000,
+            "pid": pid,
+            "tid": thread,
+        }
+        for name, start, duration, thread in events
+    ]
+    end = max((event["ts"] + event["dur"] for event in trace), default=0)
+    trace.extend(
+        {"name": name, "ph": "C", "ts": end, "pid": pid, "args": {"count": value}}
+        for name, value in counters.items()
+    )
+    _write(path, {"traceEvents": trace, "displayTimeUnit": "ms"})
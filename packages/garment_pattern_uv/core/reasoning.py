@@ -0,0 +1,40 @@
+import re
+import textwrap
+
+
+def sanitize_token(value: str) -> str:
+    token = re.sub(r"[^0-9A-Za-z_.-]+", "_", (value or "").strip())
+    token = token.strip("._-")
+    return token or "unnamed"
+
+
+def reasoning_text_name(scope: str, name: str, field: str) -> str:
+    return (
+        f"gpuv.{sanitize_token(scope)}."
+        f"{sanitize_token(name)}."
+        f"{sanitize_token(field)}"
+    )
+
+
+def build_preview_lines(value: str, width: int = 56, max_lines: int = 8):
+    if not value:
+        return ["(empty)"]
+
+    lines = []
+    for raw_line in value.splitlines() or [""]:
+        if raw_line == "":
+            lines.append("")
+            continue
+        lines.extend(
+            textwrap.wrap(
+                raw_line,
+                width=width,
+                replace_whitespace=False,
+                drop_whitespace=False,
+            )
+            or [""]
+        )
+
+    if len(lines) > max_lines:
+        lines = lines[: max_lines - 1] + ["..."]
+    return lines
@@ -0,0 +1,53 @@
+"""理由テキストを内容のハッシュで引くための補助。
+
+同じ文字列は同じキーになるので、格納先には 1 つだけ置けばよく、キー → 文字列の
+対応は一度読めば変わらない。LRUCache はシーンや操作をまたいで使い回してよい。
+"""
+
+import hashlib
+from collections import OrderedDict
+
+KEY_DIGEST_SIZE = 16
+DEFAULT_CACHE_ENTRIES = 4096
+
+
+def content_key(value: str) -> str:
+    """value の内容から決まるキー（BLAKE2b 128bit の 16 進表記）。"""
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=KEY_DIGEST_SIZE).hexdigest()
+
+
+class LRUCache:
+    """キー → 値を、最近使った max_entries 件まで保持する。"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
@@ -0,0 +1,142 @@
+"""CollectionProperty 互換のコレクション（add/remove/move を持つもの）を名前で突き合わせる。"""
+
+from difflib import SequenceMatcher
+
+
+def _similarity(a, b):
+    return SequenceMatcher(None, a.casefold(), b.casefold(), autojunk=False).ratio()
+
+
+def _pair_block(old_names, new_names):
+    """名前の変わった区間 1 つで、旧名と新名を並び順を保って対応付ける。
+
+    頂点グループはリネームしても位置が変わらないので、旧名が新名以下の数なら
+    先頭から順に対応付ける（余った新名は末尾への追加）。旧名の方が多ければ
+    その差だけ削除されているので、どれを削除とみなすかを、順序を保つ対応の
+    うち名前の似ている度合いの合計が最大になるものから決める（同点なら前を残す）。
+    """
+    if len(old_names) <= len(new_names):
+        return dict(zip(old_names, new_names))
+    rows, cols = len(old_names), len(new_names)
+    # best[i][j]: 旧名 i 個・新名 j 個までを対応付けたときの類似度の合計
+    best = [[0.0] * (cols + 1) for _ in range(rows + 1)]
+    for j in range(1, cols + 1):
+        best[0][j] = float("-inf")
+    for i in range(1, rows + 1):
+        for j in range(1, cols + 1):
+            paired = best[i - 1][j - 1] + _similarity(old_names[i - 1], new_names[j - 1])
+            best[i][j] = max(paired, best[i - 1][j])
+    pairs = {}
+    i, j = rows, cols
+    while j:
+        paired = best[i - 1][j - 1] + _similarity(old_names[i - 1], new_names[j - 1])
+        if i > j and best[i - 1][j] >= paired:
+            i -= 1
+            continue
+        pairs[old_names[i - 1]] = new_names[j - 1]
+        i -= 1
+        j -= 1
+    return pairs
+
+
+def pair_renames(old_names, new_names):
+    """旧名 → 新名の対応を求める。
+
+    両方にある名前を目印に並びを揃え（差分）、その間で名前の変わった区間ごとに
+    対応を付ける（_pair_block）。削除と同時に行ったリネームも対応が付く。
+    もう一方にもある名前は並べ替えなのでリネームに使わず、対応の付かない旧名の
+    データは削除として捨てる。
+    """
+    old_set = set(old_names)
+    new_set = set(new_names)
+    renames = {}
+    matcher = SequenceMatcher(None, list(old_names), list(new_names), autojunk=False)
+    for tag, old_start, old_stop, new_start, new_stop in matcher.get_opcodes():
+        if tag != "replace":
+            continue
+        removed = [name for name in old_names[old_start:old_stop] if name not in new_set]
+        added = [name for name in new_names[new_start:new_stop] if name not in old_set]
+        renames.update(_pair_block(removed, added))
+    return renames
+
+
+def reconcile_collection(collection, names, on_add=None):
+    """collection の name を names に一致させる。変化した要素だけを追加・削除・移動する。
+
+    戻り値は追加された名前の set。
+    """
+    current = [item.name for item in collection]
+    renames = pair_renames(current, names)
+    for index, old_name in enumerate(current):
+        new_name = renames.get(old_name)
+        if new_name is not None:
+            collection[index].name = new_name
+            current[index] = new_name
+
+    wanted = set(names)
+    seen = set()
+    stale = []
+    for index, name in enumerate(current):
+        if name not in wanted or name in seen:
+            stale.append(index)
+        else:
+            seen.add(name)
+    for index in reversed(stale):
+        collection.remove(index)
+        del current[index]
+
+    added = set()
+    for name in names:
+        if name in seen:
+            continue
+        item = collection.add()
+        item.name = name
+        if on_add is not None:
+            on_add(item)
+        current.append(name)
+        added.add(name)
+
+    for target, name in enumerate(names):
+        if current[target] != name:
+            source = current.index(name, target)
+            collection.move(source, target)
+            current.insert(target, current.pop(source))
+    return added
+
+
+def active_name(collection, index):
+    return collection[index].name if 0 <= index < len(collection) else None
+
+
+def restore_active_index(collection, name, index):
+    """アクティブ要素を名前で追従させる。消えていれば範囲内に丸める。"""
+    for position, item in enumerate(collection):
+        if item.name == name:
+            return position
+    if not len(collection):
+        return -1
+    return min(max(index, 0), len(collection) - 1)
+
+
+def reconcile_parts(props, part_names, seams_by_part):
+    """props.parts とその seams をグループ名に合わせ、アクティブ要素を名前で追従させる。"""
+    # シームの選択 update がアクティブパーツを書き換えるので、先に控えておく。
+    active_part_index = props.active_part_index
+    active_part_name = active_name(props.parts, active_part_index)
+    added_parts = reconcile_collection(props.parts, part_names)
+
+    for part in props.parts:
+        active_seam_name = active_name(part.seams, part.active_seam_index)
+        reconcile_collection(part.seams, seams_by_part.get(part.name, []))
+        if part.name in added_parts:
+            new_index = 0 if part.seams else -1
+        else:
+            new_index = restore_active_index(
+                part.seams, active_seam_name, part.active_seam_index
+            )
+        if part.active_seam_index != new_index:
+            part.active_seam_index = new_index
+
+    new_index = restore_active_index(props.parts, active_part_name, active_part_index)
+    if props.active_part_index != new_index:
+        props.active_part_index = new_index
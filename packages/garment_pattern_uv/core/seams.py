@@ -0,0 +1,43 @@
+from ..constants import _nonempty
+from .profiling import timed
+from .topology import seams_by_edges
+
+
+def seams_by_incidence(membership, part_names, seam_names, topology=None):
+    """パーツ名 → 接するシーム名の set。
+
+    topology（MeshTopology）に辺があれば辺で判定し、無ければ頂点の共有で判定する。
+    """
+    if topology is not None and topology.has_edges:
+        return seams_by_edges(topology, membership, part_names, seam_names)
+    incidence = membership.incidence(seam_names, part_names)
+    return {
+        part_name: {seam_names[row] for row in incidence[:, column].nonzero()[0]}
+        for column, part_name in enumerate(part_names)
+    }
+
+
+def order_seams(seams_by_part, part_names, seam_names, parts_snapshot):
+    """理由が入力済みのシームを加え、seam_names の並びのリストにする。"""
+    for part_name in part_names:
+        part_data = parts_snapshot.get(part_name, {})
+        for seam_name, seam_data in part_data.get("seams", {}).items():
+            if seam_name in seam_names and _nonempty(
+                seam_data.get("seam_reasoning", "")
+            ):
+                seams_by_part.setdefault(part_name, set()).add(seam_name)
+    return {
+        part_name: [name for name in seam_names if name in seams]
+        for part_name, seams in seams_by_part.items()
+    }
+
+
+@timed("seams_for_export")
+def seams_for_export(membership, part_names, seam_names, parts_snapshot, topology=None):
+    """パーツごとに、接するシームと理由が入力済みのシームを返す。"""
+    seams_by_part = seams_by_incidence(membership, part_names, seam_names, topology)
+    return order_seams(seams_by_part, part_names, seam_names, parts_snapshot)
+
+
+def seams_for_ui(part_names, seam_names):
+    return {part_name: list(seam_names) for part_name in part_names}
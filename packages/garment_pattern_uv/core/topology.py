@@ -0,0 +1,278 @@
+"""辺の接続からシームの形（折れ線・長さ）とパーツとの隣接を求める。
+
+メッシュの辺は foreach_get で 1 度だけ読み、頂点 → 接続する辺の CSR を作っておく。
+シーム 1 本の処理はそのシームの頂点に接続する辺だけを見るので、辺の総数ではなく
+シームの大きさに比例する。結果はオブジェクトごとにキャッシュし、形状が変わるか
+所属（GroupMembership）が作り直されるまで使い回す。
+"""
+
+import numpy as np
+
+from .membership import _gather, _rows_of
+from .profiling import count, timed
+
+_EMPTY_EDGES = np.zeros((0, 2), dtype=np.int32)
+_EMPTY_VERTICES = np.zeros(0, dtype=np.int32)
+
+
+def _read_edges(mesh):
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    return edges.reshape(-1, 2), coords.reshape(-1, 3)
+
+
+def _contains_sorted(sorted_values, values):
+    """values の各要素が昇順配列 sorted_values に含まれるかの bool 配列。"""
+    if not sorted_values.size:
+        return np.zeros(values.shape, dtype=bool)
+    positions = np.searchsorted(sorted_values, values)
+    positions[positions == sorted_values.size] = 0
+    return sorted_values[positions] == values
+
+
+def _polylines(edges):
+    """辺の集合を折れ線（頂点インデックスのリスト）に分ける。
+
+    端点・分岐点（次数が 2 以外の頂点）で区切る。閉じたループは先頭の頂点を
+    末尾にも置く。
+    """
+    neighbors = {}
+    for a, b in edges.tolist():
+        neighbors.setdefault(a, []).append(b)
+        neighbors.setdefault(b, []).append(a)
+    visited = set()
+
+    def walk(start, step):
+        line = [start]
+        previous, current = start, step
+        while True:
+            visited.add((min(previous, current), max(previous, current)))
+            line.append(current)
+            following = neighbors[current]
+            if len(following) != 2 or current == start:
+                return line
+            step = following[0] if following[1] == previous else following[1]
+            if (min(current, step), max(current, step)) in visited:
+                return line
+            previous, current = current, step
+
+    lines = []
+    for vertex in sorted(neighbors):
+        if len(neighbors[vertex]) == 2:
+            continue
+        for step in neighbors[vertex]:
+            if (min(vertex, step), max(vertex, step)) not in visited:
+                lines.append(walk(vertex, step))
+    for vertex in sorted(neighbors):
+        for step in neighbors[vertex]:
+            if (min(vertex, step), max(vertex, step)) not in visited:
+                lines.append(walk(vertex, step))
+    return lines
+
+
+class SeamTopology:
+    """シーム 1 本の辺と、そこから求めた折れ線・長さ。"""
+
+    __slots__ = ("edges", "vertices", "length", "_polylines")
+
+    def __init__(self, edges, coords):
+        self.edges = edges
+        self.vertices = np.unique(edges)
+        if edges.size:
+            deltas = coords[edges[:, 0]] - coords[edges[:, 1]]
+            self.length = float(np.sqrt((deltas.astype(np.float64) ** 2).sum(axis=1)).sum())
+        else:
+            self.length = 0.0
+        self._polylines = None
+
+    @property
+    def edge_count(self):
+        return int(self.edges.shape[0])
+
+    @property
+    def polylines(self):
+        """連結成分ごとの折れ線。参照されたときに初めて作る。"""
+        if self._polylines is None:
+            self._polylines = _polylines(self.edges)
+        return self._polylines
+
+
+class MeshTopology:
+    """メッシュの辺と、頂点 → 接続する辺の CSR。"""
+
+    def __init__(self, edges, coords):
+        self.edges = edges
+        self.coords = coords
+        self.vertex_count = coords.shape[0]
+        endpoints = edges.ravel()
+        order = np.argsort(endpoints, kind="stable")
+        self.edges_by_vertex = (order >> 1).astype(np.int32)
+        self.indptr = np.zeros(self.vertex_count + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(endpoints, minlength=self.vertex_count), out=self.indptr[1:]
+        )
+        # 所属（GroupMembership）から求めた結果。所属が作り直されたら捨てる。
+        self._owner = None
+        self._seams = {}
+        self._adjacency = {}
+
+    @classmethod
+    @timed("topology_build")
+    def from_mesh(cls, mesh):
+        return cls(*_read_edges(mesh))
+
+    @property
+    def has_edges(self):
+        return self.edges.shape[0] > 0
+
+    def _cache_for(self, membership):
+        if self._owner is not membership:
+            self._owner = membership
+            self._seams.clear()
+            self._adjacency.clear()
+
+    def edges_within(self, vertices):
+        """両端が vertices（昇順）に含まれる辺を (k, 2) の配列で返す。"""
+        if not vertices.size:
+            return _EMPTY_EDGES
+        candidates = np.unique(_gather(self.indptr, self.edges_by_vertex, vertices))
+        edges = self.edges[candidates]
+        inside = _contains_sorted(vertices, edges[:, 0]) & _contains_sorted(
+            vertices, edges[:, 1]
+        )
+        return edges[inside]
+
+    def _group_edges(self, membership, slots):
+        """slots の各グループについて、両端がグループ内にある辺を (行, 辺) の組で返す。
+
+        グループの頂点から接続する辺をまとめて集めると、両端がグループ内の辺は
+        ちょうど 2 回現れる。シームごとのループを使わずに全シームを一度に処理できる。
+        """
+        vertices = _gather(membership.indptr, membership.indices, slots)
+        rows = np.repeat(
+            _rows_of(membership.indptr, slots),
+            self.indptr[vertices + 1] - self.indptr[vertices],
+        )
+        edge_ids = _gather(self.indptr, self.edges_by_vertex, vertices)
+        keys, counts = np.unique(
+            rows * self.edges.shape[0] + edge_ids, return_counts=True
+        )
+        keys = keys[counts == 2]
+        return keys // self.edges.shape[0], keys % self.edges.shape[0]
+
+    def seam(self, membership, name):
+        """membership 上のシーム name の SeamTopology。"""
+        self._cache_for(membership)
+        result = self._seams.get(name)
+        if result is None:
+            count("topology.seam_resolve")
+            vertices = membership.indices_of(name) if name in membership else _EMPTY_VERTICES
+            result = self._seams[name] = SeamTopology(self.edges_within(vertices), self.coords)
+        return result
+
+    def seams(self, membership, names):
+        return {name: self.seam(membership, name) for name in names}
+
+    def adjacency(self, membership, seam_names, part_names):
+        """seam_names × part_names の bool 行列（シームの辺の両端がパーツに入るか）。"""
+        self._cache_for(membership)
+        key = (tuple(seam_names), tuple(part_names))
+        matrix = self._adjacency.get(key)
+        if matrix is None:
+            count("topology.adjacency")
+            matrix = self._adjacency[key] = self._compute_adjacency(
+                membership, key[0], key[1]
+            )
+            matrix.flags.writeable = False
+        return matrix
+
+    def _compute_adjacency(self, membership, seam_names, part_names):
+        matrix = np.zeros((len(seam_names), len(part_names)), dtype=bool)
+        seam_rows = [row for row, name in enumerate(seam_names) if name in membership]
+        if not seam_rows or not any(name in membership for name in part_names):
+            return matrix
+        seam_slots = np.array(
+            [membership.slot(seam_names[row]) for row in seam_rows], dtype=np.int64
+        )
+
+        rows, edge_ids = self._group_edges(membership, seam_slots)
+        if not rows.size:
+            return matrix
+        endpoints = self.edges[edge_ids]
+
+        # 頂点 → パーツの CSR（パーツは重なってもよい）
+        part_indptr, parts_by_vertex = membership.groups_by_vertex(part_names)
+        part_count = len(part_names)
+
+        def edge_parts(vertices):
+            # (シームの辺の番号 × パーツ数 + パーツの位置)。辺の番号は rows 内の位置
+            parts = _gather(part_indptr, parts_by_vertex, vertices)
+            return _rows_of(part_indptr, vertices) * part_count + parts
+
+        # 辺の両端がともに入っているパーツだけを隣接とする
+        shared = np.intersect1d(edge_parts(endpoints[:, 0]), edge_parts(endpoints[:, 1]))
+        matrix[
+            np.asarray(seam_rows, dtype=np.int64)[rows[shared // part_count]],
+            shared % part_count,
+        ] = True
+        return matrix
+
+
+def seams_by_edges(topology, membership, part_names, seam_names):
+    """パーツ名 → 辺で接するシーム名の set。
+
+    シームの辺のうち 1 本でも両端がパーツの頂点に入っていれば隣接とみなす。
+    辺の片端がパーツに触れるだけ（隣のパーツの縁の頂点を 1 点塗っただけ）や、
+    どの辺にも乗らない孤立した頂点では付かない。
+    """
+    adjacency = topology.adjacency(membership, seam_names, part_names)
+    return {
+        part_name: {seam_names[row] for row in adjacency[:, column].nonzero()[0]}
+        for column, part_name in enumerate(part_names)
+    }
+
+
+class _CachedTopology:
+    __slots__ = ("key", "topology")
+
+    def __init__(self, key, topology):
+        self.key = key
+        self.topology = topology
+
+
+_TOPOLOGY_CACHE = {}
+
+
+def _topology_key(obj):
+    mesh = obj.data
+    return (mesh.as_pointer(), len(mesh.vertices), len(mesh.edges))
+
+
+def topology_for(obj):
+    """オブジェクトごとにキャッシュした MeshTopology を返す。"""
+    key = _topology_key(obj)
+    entry = _TOPOLOGY_CACHE.get(obj.as_pointer())
+    if entry is None or entry.key != key:
+        entry = _CachedTopology(key, MeshTopology.from_mesh(obj.data))
+        _TOPOLOGY_CACHE[obj.as_pointer()] = entry
+    return entry.topology
+
+
+def cached_topology(obj):
+    """キャッシュ済みで最新の MeshTopology。無ければ辺を読まずに None を返す。"""
+    entry = _TOPOLOGY_CACHE.get(obj.as_pointer())
+    if entry is None or entry.key != _topology_key(obj):
+        return None
+    return entry.topology
+
+
+def invalidate_topology(pointer=None):
+    """オブジェクトまたはメッシュのポインタに紐づくキャッシュを破棄する（None で全破棄）。"""
+    if pointer is None:
+        _TOPOLOGY_CACHE.clear()
+        return
+    for obj_pointer, entry in list(_TOPOLOGY_CACHE.items()):
+        if obj_pointer == pointer or entry.key[0] == pointer:
+            del _TOPOLOGY_CACHE[obj_pointer]
@@ -0,0 +1,365 @@
+"""パーツごとの UV の定量指標（面積・歪み・アイランド数・詰め込み率）を求める。
+
+ループ・面・UV・頂点座標は foreach_get でまとめて読み、面を扇形に三角形分割して
+すべて numpy で計算する。面は「全頂点がそのパーツの頂点グループに入っている」
+ときにそのパーツに属するとみなす。
+
+オブジェクトをまたぐパーツでも合算できるよう、まず足し合わせられる量
+（面積の和、重み付きの和、UV の範囲など）を求め、最後に finish_metrics で
+書き出す値にする。
+"""
+
+import numpy as np
+
+from ..constants import UV_MAP_NAME
+from .membership import _gather
+from .profiling import count, timed
+
+# 足し合わせる量。bbox 以外は和をとる。
+_SUM_FIELDS = (
+    "polygon_count",
+    "area_3d",
+    "area_uv",
+    "log_weight",
+    "log_sum",
+    "log_square_sum",
+    "angle_sum",
+    "island_count",
+)
+
+
+def _read_uv_buffers(mesh, uv_name):
+    loop_count = len(mesh.loops)
+    polygon_count = len(mesh.polygons)
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    loop_vertices = np.empty(loop_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    loop_starts = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    uvs = np.empty(loop_count * 2, dtype=np.float32)
+    mesh.uv_layers[uv_name].data.foreach_get("uv", uvs)
+    return (
+        coords.reshape(-1, 3),
+        loop_vertices,
+        loop_starts,
+        loop_totals,
+        uvs.reshape(-1, 2),
+    )
+
+
+def _cross_norm(u, v):
+    """2D なら外積の絶対値、3D なら外積の長さ。"""
+    if u.shape[1] == 2:
+        return np.abs(u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0])
+    x = u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1]
+    y = u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2]
+    z = u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+    return np.sqrt(x * x + y * y + z * z)
+
+
+def _triangle_angles(a, b, c):
+    """三角形 (a, b, c) の a と b の角（ラジアン）と、2 倍の面積を返す。
+
+    残りの角は π から引けば求まるので計算しない。
+    """
+    ab = b - a
+    ac = c - a
+    bc = c - b
+    double_area = _cross_norm(ab, ac)
+    angle_a = np.arctan2(double_area, np.einsum("ij,ij->i", ab, ac))
+    angle_b = np.arctan2(double_area, -np.einsum("ij,ij->i", ab, bc))
+    return angle_a, angle_b, double_area
+
+
+def _components(node_count, left, right):
+    """left[i]–right[i] を辺とする無向グラフの連結成分ラベル（根の番号）。
+
+    親を小さい番号へ付け替えてからポインタを飛ばす操作を、全辺の両端が同じ根に
+    なるまで繰り返す。繰り返し回数はおおむね成分の大きさの対数で済む。
+    """
+    parent = np.arange(node_count, dtype=np.int64)
+    while True:
+        root_left = parent[left]
+        root_right = parent[right]
+        differs = root_left != root_right
+        if not differs.any():
+            return parent
+        low = np.minimum(root_left[differs], root_right[differs])
+        high = np.maximum(root_left[differs], root_right[differs])
+        np.minimum.at(parent, high, low)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+class UVMesh:
+    """UV 指標の計算に使うメッシュの配列（面ごとの面積・歪みとアイランド）。"""
+
+    def __init__(self, coords, loop_vertices, loop_starts, loop_totals, uvs):
+        self.vertex_count = coords.shape[0]
+        self.loop_vertices = loop_vertices
+        self.loop_totals = loop_totals.astype(np.int64)
+        self.polygon_count = loop_totals.size
+        polygon_ids = np.arange(self.polygon_count, dtype=np.int64)
+        # 面ごとのループを連続に並べた順序（loop_start の並びに依存しない）
+        offsets = np.cumsum(self.loop_totals) - self.loop_totals
+        self.loop_order = np.repeat(
+            loop_starts.astype(np.int64) - offsets, self.loop_totals
+        ) + np.arange(int(self.loop_totals.sum()))
+        self.loop_offsets = offsets
+        self.loop_polygons = np.repeat(polygon_ids, self.loop_totals)
+        # ループごとの UV（パーツの配列の書き出しでも使う）
+        self.uvs = uvs
+
+        self._polygon_measures(coords, uvs)
+        self._polygon_islands(uvs)
+        self._owner = None
+        self._metrics = {}
+
+    @classmethod
+    @timed("uv_mesh_build")
+    def from_mesh(cls, mesh, uv_name=UV_MAP_NAME):
+        return cls(*_read_uv_buffers(mesh, uv_name))
+
+    def _polygon_measures(self, coords, uvs):
+        """面ごとの 3D 面積・UV 面積・角度の誤差と、UV の範囲を求める。"""
+        fan = np.clip(self.loop_totals - 2, 0, None)
+        triangle_polygons = np.repeat(np.arange(self.polygon_count), fan)
+        step = np.arange(int(fan.sum())) - np.repeat(np.cumsum(fan) - fan, fan) + 1
+        first = self.loop_offsets[triangle_polygons]
+        corners = [
+            self.loop_order[first],
+            self.loop_order[first + step],
+            self.loop_order[first + step + 1],
+        ]
+        points = [coords[self.loop_vertices[corner]] for corner in corners]
+        flat = [uvs[corner] for corner in corners]
+
+        angle_a, angle_b, double_3d = _triangle_angles(*points)
+        flat_a, flat_b, double_uv = _triangle_angles(*flat)
+        area_3d = 0.5 * double_3d.astype(np.float64)
+        area_uv = 0.5 * double_uv.astype(np.float64)
+        # 3 つ目の角のずれは最初の 2 つのずれの和の符号反転になる
+        error_a = angle_a - flat_a
+        error_b = angle_b - flat_b
+        angle_error = (np.abs(error_a) + np.abs(error_b) + np.abs(error_a + error_b)) / 3
+
+        size = self.polygon_count
+        self.area_3d = np.bincount(triangle_polygons, area_3d, minlength=size)
+        self.area_uv = np.bincount(triangle_polygons, area_uv, minlength=size)
+        self.angle_sum = np.bincount(triangle_polygons, area_3d * angle_error, minlength=size)
+
+        # 面積比の対数（どちらかの面積が 0 の面は歪みの集計から外す）
+        valid = (self.area_3d > 0) & (self.area_uv > 0)
+        log_ratio = np.zeros(size)
+        log_ratio[valid] = np.log2(self.area_uv[valid] / self.area_3d[valid])
+        self.log_weight = np.where(valid, self.area_3d, 0.0)
+        self.log_ratio = log_ratio
+
+        ordered = uvs[self.loop_order]
+        starts = self.loop_offsets[self.loop_totals > 0]
+        self.uv_min = np.zeros((size, 2), dtype=np.float32)
+        self.uv_max = np.zeros((size, 2), dtype=np.float32)
+        if starts.size:
+            self.uv_min[self.loop_totals > 0] = np.minimum.reduceat(ordered, starts, axis=0)
+            self.uv_max[self.loop_totals > 0] = np.maximum.reduceat(ordered, starts, axis=0)
+
+    def _polygon_islands(self, uvs):
+        """UV を共有する面どうしをつないだアイランドの番号を面ごとに求める。
+
+        同じ頂点で UV が一致するループを 1 つの UV 頂点とみなし、面の各ループを
+        その面の先頭ループとつないで連結成分を取る。
+        """
+        if not self.polygon_count:
+            self.islands = np.zeros(0, dtype=np.int64)
+            return
+        # -0.0 と 0.0 を同じビット列にそろえてから比較する
+        bits = (uvs + np.float32(0.0)).view(np.uint32).astype(np.uint64)
+        uv_keys = (bits[:, 0] << np.uint64(32)) | bits[:, 1]
+        # 頂点で並べたあと、UV が 1 種類でない頂点のループだけを UV でも並べ直す
+        order = np.argsort(self.loop_vertices, kind="stable")
+        sorted_vertices = self.loop_vertices[order]
+        sorted_keys = uv_keys[order]
+        mixed = (sorted_vertices[1:] == sorted_vertices[:-1]) & (
+            sorted_keys[1:] != sorted_keys[:-1]
+        )
+        if mixed.any():
+            mixed_vertices = np.unique(sorted_vertices[1:][mixed])
+            span = np.flatnonzero(np.isin(sorted_vertices, mixed_vertices))
+            local = np.lexsort((sorted_keys[span], sorted_vertices[span]))
+            order[span] = order[span[local]]
+            sorted_keys = uv_keys[order]
+        new_node = np.r_[
+            True,
+            (sorted_vertices[1:] != sorted_vertices[:-1]) | (sorted_keys[1:] != sorted_keys[:-1]),
+        ]
+        nodes = np.empty(order.size, dtype=np.int64)
+        nodes[order] = np.cumsum(new_node) - 1
+
+        loop_nodes = nodes[self.loop_order]
+        first_nodes = loop_nodes[self.loop_offsets[self.loop_polygons]]
+        roots = _components(int(new_node.sum()), loop_nodes, first_nodes)
+        self.islands = roots[first_nodes[self.loop_offsets]]
+
+    def _cache_for(self, membership):
+        if self._owner is not membership:
+            self._owner = membership
+            self._metrics.clear()
+
+    def _polygon_parts(self, membership, part_names):
+        """(面, パーツの位置) の組。面の全頂点がパーツに入っている組だけを返す。"""
+        indptr, columns = membership.groups_by_vertex(part_names)
+        part_count = len(part_names)
+        loop_vertices = self.loop_vertices[self.loop_order]
+        hits = _gather(indptr, columns, loop_vertices)
+        hit_polygons = np.repeat(
+            self.loop_polygons, indptr[loop_vertices + 1] - indptr[loop_vertices]
+        )
+        keys, counts = np.unique(hit_polygons * part_count + hits, return_counts=True)
+        polygons = keys // part_count
+        keep = counts == self.loop_totals[polygons]
+        return polygons[keep], keys[keep] % part_count
+
+    def part_totals(self, membership, part_names):
+        """パーツ名 → 足し合わせられる量の dict（面を持たないパーツは含めない）。"""
+        self._cache_for(membership)
+        key = tuple(part_names)
+        totals = self._metrics.get(key)
+        if totals is not None:
+            return totals
+        count("uv_metrics.compute")
+        totals = self._metrics[key] = {}
+        if not part_names or not self.polygon_count:
+            return totals
+        polygons, parts = self._polygon_parts(membership, key)
+        size = len(key)
+
+        def per_part(values):
+            return np.bincount(parts, values[polygons], minlength=size)
+
+        sums = {
+            "polygon_count": np.bincount(parts, minlength=size),
+            "area_3d": per_part(self.area_3d),
+            "area_uv": per_part(self.area_uv),
+            "log_weight": per_part(self.log_weight),
+            "log_sum": per_part(self.log_weight * self.log_ratio),
+            "log_square_sum": per_part(self.log_weight * self.log_ratio**2),
+            "angle_sum": per_part(self.angle_sum),
+        }
+        island_pairs = np.unique(parts * (self.polygon_count + 1) + self.islands[polygons])
+        sums["island_count"] = np.bincount(
+            island_pairs // (self.polygon_count + 1), minlength=size
+        )
+        uv_min = np.zeros((size, 2))
+        uv_max = np.zeros((size, 2))
+        order = np.argsort(parts, kind="stable")
+        present = np.flatnonzero(sums["polygon_count"])
+        starts = np.cumsum(sums["polygon_count"]) - sums["polygon_count"]
+        if present.size:
+            uv_min[present] = np.minimum.reduceat(
+                self.uv_min[polygons[order]], starts[present], axis=0
+            )
+            uv_max[present] = np.maximum.reduceat(
+                self.uv_max[polygons[order]], starts[present], axis=0
+            )
+
+        for column in present:
+            entry = {field: sums[field][column].item() for field in _SUM_FIELDS}
+            entry["uv_min"] = uv_min[column].tolist()
+            entry["uv_max"] = uv_max[column].tolist()
+            totals[key[column]] = entry
+        return totals
+
+
+def merge_totals(results):
+    """オブジェクトごとの part_totals をパーツ名で合算する。"""
+    merged = {}
+    for totals in results:
+        for part_name, entry in totals.items():
+            current = merged.get(part_name)
+            if current is None:
+                merged[part_name] = dict(entry)
+                continue
+            for field in _SUM_FIELDS:
+                current[field] += entry[field]
+            current["uv_min"] = [min(a, b) for a, b in zip(current["uv_min"], entry["uv_min"])]
+            current["uv_max"] = [max(a, b) for a, b in zip(current["uv_max"], entry["uv_max"])]
+    return merged
+
+
+def finish_metrics(entry, digits=6):
+    """合算した量から書き出す指標の dict を作る。
+
+    - area_3d / area_uv: 3D と UV の面積
+    - uv_scale: UV 面積 / 3D 面積 の平方根（テクセル密度の目安）
+    - area_distortion: 面ごとの面積比（log2）の標準偏差（3D 面積で重み付け）
+    - angle_distortion: 角度のずれの平均（度、3D 面積で重み付け）
+    - island_count: UV アイランドの数
+    - packing_ratio: UV 面積 / UV の外接矩形の面積
+    """
+    area_3d = entry["area_3d"]
+    area_uv = entry["area_uv"]
+    weight = entry["log_weight"]
+    if weight > 0:
+        mean = entry["log_sum"] / weight
+        area_distortion = max(entry["log_square_sum"] / weight - mean * mean, 0.0) ** 0.5
+    else:
+        area_distortion = 0.0
+    width = entry["uv_max"][0] - entry["uv_min"][0]
+    height = entry["uv_max"][1] - entry["uv_min"][1]
+    bbox_area = width * height
+    return {
+        "polygon_count": int(entry["polygon_count"]),
+        "island_count": int(entry["island_count"]),
+        "area_3d": round(area_3d, digits),
+        "area_uv": round(area_uv, digits),
+        "uv_scale": round((area_uv / area_3d) ** 0.5, digits) if area_3d > 0 else 0.0,
+        "area_distortion": round(area_distortion, digits),
+        "angle_distortion": (
+            round(np.degrees(entry["angle_sum"] / area_3d).item(), digits) if area_3d > 0 else 0.0
+        ),
+        "packing_ratio": round(area_uv / bbox_area, digits) if bbox_area > 0 else 0.0,
+    }
+
+
+class _CachedUVMesh:
+    __slots__ = ("key", "uv_mesh")
+
+    def __init__(self, key, uv_mesh):
+        self.key = key
+        self.uv_mesh = uv_mesh
+
+
+_UV_MESH_CACHE = {}
+
+
+def _uv_mesh_key(obj):
+    mesh = obj.data
+    return (mesh.as_pointer(), len(mesh.vertices), len(mesh.loops), len(mesh.polygons))
+
+
+def uv_mesh_for(obj):
+    """オブジェクトごとにキャッシュした UVMesh。UVMap が無ければ None。"""
+    if UV_MAP_NAME not in obj.data.uv_layers:
+        return None
+    key = _uv_mesh_key(obj)
+    entry = _UV_MESH_CACHE.get(obj.as_pointer())
+    if entry is None or entry.key != key:
+        entry = _CachedUVMesh(key, UVMesh.from_mesh(obj.data))
+        _UV_MESH_CACHE[obj.as_pointer()] = entry
+    return entry.uv_mesh
+
+
+def invalidate_uv_mesh(pointer=None):
+    """オブジェクトまたはメッシュのポインタに紐づくキャッシュを破棄する（None で全破棄）。"""
+    if pointer is None:
+        _UV_MESH_CACHE.clear()
+        return
+    for obj_pointer, entry in list(_UV_MESH_CACHE.items()):
+        if obj_pointer == pointer or entry.key[0] == pointer:
+            del _UV_MESH_CACHE[obj_pointer]
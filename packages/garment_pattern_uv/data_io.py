@@ -1,281 +1,234 @@
-from .constants import GARMENT_TYPE_OPTIONS
-from .mesh_sync import _seams_for_export, _snapshot_props, _split_group_names
+import json
+import os
+import threading
+
+from .constants import UV_MAP_NAME
+from .core.annotation import (
+    format_validation_summary,
+    normalize_annotation,
+    validate_data_dict,
+)
+from .core.annotation_schema import SCHEMA_SHA256
+from .core.columnar import ColumnarWriter
+from .core.content_hash import ContentHasher
+from .core.export_model import ExportModel, MeshSource
+from .core.geometry import SUFFIX as GEOMETRY_SUFFIX
+from .core.geometry import GeometryWriter
+from .core.profiling import timed
+from .item_index import invalidate_item_index
+from .mesh_sync import _mesh_topology, _split_group_names, _uv_mesh, _vertices_by_group
 from .reasoning_text import get_reasoning_value, set_reasoning_value
 
-
-def _annotation_key(_props):
-    return "scene"
-
-
-def _part_key(part):
-    return part.name or "unnamed_part"
-
-
-def _seam_key(part, seam):
-    return f"{_part_key(part)}.{seam.name or 'unnamed_seam'}"
+# 同じ入力から書き出す内容を変えたとき（シームの割り当て、配列ファイルの中身など、
+# スキーマに現れない変更）に上げる。入力ハッシュに混ぜ、前回の書き出しを無効にする。
+EXPORT_FORMAT_VERSION = 1
 
 
 def _props_to_dict(props):
     data = {
         "garment_id": props.garment_id,
         "garment_type": props.garment_type,
-        "design_reasoning": get_reasoning_value(
-            props,
-            "design_reasoning_text",
-            "design_reasoning",
-            "annotation",
-            _annotation_key(props),
-            "design_reasoning",
-        ),
+        "design_reasoning": get_reasoning_value(props, "design_reasoning"),
         "parts": [],
     }
     for part in props.parts:
         part_data = {
             "name": part.name,
             "label": part.label,
-            "modeling_reasoning": get_reasoning_value(
-                part,
-                "modeling_reasoning_text",
-                "modeling_reasoning",
-                "part",
-                _part_key(part),
-                "modeling_reasoning",
-            ),
-            "uv_reasoning": get_reasoning_value(
-                part,
-                "uv_reasoning_text",
-                "uv_reasoning",
-                "part",
-                _part_key(part),
-                "uv_reasoning",
-            ),
+            "modeling_reasoning": get_reasoning_value(part, "modeling_reasoning"),
+            "uv_reasoning": get_reasoning_value(part, "uv_reasoning"),
             "seams": [],
         }
         for seam in part.seams:
             part_data["seams"].append(
                 {
                     "name": seam.name,
-                    "seam_reasoning": get_reasoning_value(
-                        seam,
-                        "seam_reasoning_text",
-                        "seam_reasoning",
-                        "seam",
-                        _seam_key(part, seam),
-                        "seam_reasoning",
-                    ),
+                    "seam_reasoning": get_reasoning_value(seam, "seam_reasoning"),
                 }
             )
         data["parts"].append(part_data)
     return data
 
 
-def _props_to_dict_filtered(props, obj):
-    data = _props_to_dict(props)
-    if obj is None or obj.type != "MESH":
-        return data
+def _mesh_source(obj):
     part_names, seam_names = _split_group_names(obj)
-    seams_by_part = _seams_for_export(
-        obj, part_names, seam_names, _snapshot_props(props)[0]
-    )
-    filtered_parts = []
-    for part in data["parts"]:
-        part_name = part.get("name", "")
-        allowed_seams = set(seams_by_part.get(part_name, []))
-        part["seams"] = [
-            seam for seam in part["seams"] if seam.get("name") in allowed_seams
-        ]
-        filtered_parts.append(part)
-    data["parts"] = filtered_parts
-    return data
-
-
-def _dict_to_props(data, props):
-    garment_id_value = data.get("garment_id", "")
-    props.garment_id = garment_id_value if isinstance(garment_id_value, str) else ""
-
-    garment_type_value = data.get("garment_type", "")
-    if not isinstance(garment_type_value, str):
-        garment_type_value = ""
-    if garment_type_value in GARMENT_TYPE_OPTIONS:
-        props.garment_type = garment_type_value
-    else:
-        props.garment_type = GARMENT_TYPE_OPTIONS[0]
-
-    design_reasoning_value = data.get("design_reasoning", "")
-    if not isinstance(design_reasoning_value, str):
-        design_reasoning_value = ""
-    props.design_reasoning = design_reasoning_value
-    set_reasoning_value(
-        props,
-        "design_reasoning_text",
-        "design_reasoning",
-        "annotation",
-        _annotation_key(props),
-        "design_reasoning",
-        design_reasoning_value,
+    return MeshSource(
+        obj.name,
+        _vertices_by_group(obj),
+        part_names,
+        seam_names,
+        UV_MAP_NAME in obj.data.uv_layers,
+        _mesh_topology(obj),
+        _uv_mesh(obj),
     )
 
-    props.parts.clear()
-    for part_data in data.get("parts") or []:
-        if not isinstance(part_data, dict):
-            continue
-        part = props.parts.add()
-        part_name_value = part_data.get("name", "")
-        part.name = part_name_value if isinstance(part_name_value, str) else ""
-        label_value = part_data.get("label", "")
-        part.label = label_value if isinstance(label_value, str) else ""
-
-        modeling_value = part_data.get("modeling_reasoning", "")
-        if not isinstance(modeling_value, str):
-            modeling_value = ""
-        part.modeling_reasoning = modeling_value
-        set_reasoning_value(
-            part,
-            "modeling_reasoning_text",
-            "modeling_reasoning",
-            "part",
-            _part_key(part),
-            "modeling_reasoning",
-            modeling_value,
-        )
-
-        uv_value = part_data.get("uv_reasoning", "")
-        if not isinstance(uv_value, str):
-            uv_value = ""
-        part.uv_reasoning = uv_value
-        set_reasoning_value(
-            part,
-            "uv_reasoning_text",
-            "uv_reasoning",
-            "part",
-            _part_key(part),
-            "uv_reasoning",
-            uv_value,
-        )
 
-        part.seams.clear()
-        for seam_data in part_data.get("seams") or []:
-            if not isinstance(seam_data, dict):
-                continue
-            seam = part.seams.add()
-            seam_name_value = seam_data.get("name", "")
-            seam.name = seam_name_value if isinstance(seam_name_value, str) else ""
-            seam_value = seam_data.get("seam_reasoning", "")
-            if not isinstance(seam_value, str):
-                seam_value = ""
-            seam.seam_reasoning = seam_value
-            set_reasoning_value(
-                seam,
-                "seam_reasoning_text",
-                "seam_reasoning",
-                "seam",
-                _seam_key(part, seam),
-                "seam_reasoning",
-                seam_value,
-            )
-        part.active_seam_index = 0 if part.seams else -1
-    props.active_part_index = 0 if props.parts else -1
+@timed("export_model")
+def _export_model_for_objects(props, objects, max_workers=None):
+    """プロパティを 1 度だけ読み、エクスポートと検証で共有する中間表現を作る。
 
+    objects が複数のメッシュなら、所属の読み出しはここ（メインスレッド）で済ませ、
+    シームの割り当てを ExportModel がスレッドプールで計算する。
+    """
+    data = _props_to_dict(props)
+    objects = [obj for obj in objects if obj is not None]
+    if not objects:
+        return ExportModel(data)
+    meshes = [obj for obj in objects if obj.type == "MESH"]
+    if not meshes:
+        return ExportModel(data, object_type=objects[0].type)
+    return ExportModel(
+        data,
+        object_type="MESH",
+        sources=[_mesh_source(obj) for obj in meshes],
+        max_workers=max_workers,
+    )
 
-def _validate_data_dict(data):
-    errors = []
-    if not isinstance(data, dict):
-        return ["ルートはオブジェクトである必要があります。"]
-
-    if "garment_id" in data and not isinstance(data.get("garment_id"), str):
-        errors.append("garment_id は文字列である必要があります。")
-    if "garment_type" in data and not isinstance(data.get("garment_type"), str):
-        errors.append("garment_type は文字列である必要があります。")
-    if "design_reasoning" in data and not isinstance(data.get("design_reasoning"), str):
-        errors.append("design_reasoning は文字列である必要があります。")
-
-    if "parts" in data and not isinstance(data.get("parts"), list):
-        errors.append("parts は配列である必要があります。")
-        return errors
-
-    parts = data.get("parts", [])
-    for index, part in enumerate(parts):
-        if not isinstance(part, dict):
-            errors.append(f"parts[{index}] はオブジェクトである必要があります。")
-            continue
-
-        for key in ("name", "label", "modeling_reasoning", "uv_reasoning"):
-            if key in part and not isinstance(part.get(key), str):
-                errors.append(f"parts[{index}].{key} は文字列である必要があります。")
 
-        if "seams" in part and not isinstance(part.get("seams"), list):
-            errors.append(f"parts[{index}].seams は配列である必要があります。")
+@timed("export_input_hash")
+def _export_input_hash(props, objects):
+    """エクスポート結果を決める入力（プロパティ・所属・形状・UV）のハッシュ。
+
+    スキーマのハッシュと EXPORT_FORMAT_VERSION も混ぜるので、出力形式か書き出しの
+    処理が変わると全件が書き出し直しになる。
+
+    安くはない: 所属（_vertices_by_group）は頂点ウェイトの一括読み出し API が
+    無いので頂点ごとに Python で読む。書き出すときは同じキャッシュを使うので
+    二度は読まないが、変更のない衣服でもこの読み出しの分はかかる。費用は
+    benchmarks/bench_incremental_export.py が 1 ファイルあたりで表示する。
+    """
+    hasher = ContentHasher()
+    hasher.update_text("schema", SCHEMA_SHA256)
+    hasher.update_text("format", str(EXPORT_FORMAT_VERSION))
+    hasher.update_json("annotation", _props_to_dict(props))
+    for obj in objects:
+        if obj is None:
             continue
+        hasher.update_text("object", f"{obj.type}:{obj.name}")
+        if obj.type == "MESH":
+            hasher.update_membership(_vertices_by_group(obj))
+            hasher.update_mesh(obj.data, UV_MAP_NAME)
+    return hasher.hexdigest()
 
-        for seam_index, seam in enumerate(part.get("seams", [])):
-            if not isinstance(seam, dict):
-                errors.append(
-                    f"parts[{index}].seams[{seam_index}] はオブジェクトである必要があります。"
-                )
-                continue
-            for key in ("name", "seam_reasoning"):
-                if key in seam and not isinstance(seam.get(key), str):
-                    errors.append(
-                        f"parts[{index}].seams[{seam_index}].{key} は文字列である必要があります。"
-                    )
-    return errors
 
+def _export_model(props, obj):
+    return _export_model_for_objects(props, [obj])
 
-def _validate_props(props, obj):
-    errors = []
-    warnings = []
 
-    data = _props_to_dict(props)
-    errors.extend(_validate_data_dict(data))
+def _props_to_dict_filtered(props, obj):
+    return _export_model(props, obj).export_data()
+
+
+def _props_to_dict_for_objects(props, objects):
+    return _export_model_for_objects(props, objects).export_data()
+
+
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+# 中断の確認は iterencode の断片この数ごと
+_STOP_CHECK_CHUNKS = 4096
+
+
+def _write_json(path, data, should_stop=None):
+    """data を JSON で path に書く。書き終えたら True、should_stop() で中断したら False。
+
+    同じディレクトリの一時ファイルに書いて fsync してから置き換えるので、失敗や
+    中断のあとも path には前の内容か新しい内容のどちらかが丸ごと残る。
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    finished = completed = False
+    try:
+        with open(temp_path, "x", encoding="utf-8") as handle:
+            for index, chunk in enumerate(_JSON_ENCODER.iterencode(data)):
+                if (
+                    should_stop is not None
+                    and index % _STOP_CHECK_CHUNKS == 0
+                    and should_stop()
+                ):
+                    break
+                handle.write(chunk)
+            else:
+                handle.write("\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+                finished = True
+        if finished:
+            os.replace(temp_path, path)
+            completed = True
+    finally:
+        if not completed and os.path.exists(temp_path):
+            os.remove(temp_path)
+    return completed
+
+
+def _geometry_path(path):
+    """JSON の path と対になる配列ファイル（core.geometry）のパス。"""
+    return os.path.splitext(path)[0] + GEOMETRY_SUFFIX
+
+
+@timed("write_json_geometry")
+def _write_json_with_geometry(path, model, should_stop=None):
+    """model の JSON と、そこから参照するパーツ・シームの配列ファイルを書く。
+
+    配列を一時ファイルに書き終えてから JSON を置き換え、最後に配列のファイルを
+    置き換える。中断や失敗のときはどちらも前の内容のまま残る。メッシュが無ければ
+    JSON だけを書く。戻り値は _write_json と同じ。
+    """
+    if not model.is_mesh:
+        return _write_json(path, model.export_data(), should_stop)
+    writer = GeometryWriter(_geometry_path(path))
+    try:
+        data = model.geometry_data(writer)
+        writer.flush()
+        if not _write_json(path, data, should_stop):
+            return False
+        writer.commit()
+        return True
+    finally:
+        writer.discard()
+
+
+@timed("write_columnar")
+def _write_columnar(path, model, include_vertices=True):
+    """model の書き出し用データを列指向形式（core.columnar）で path に書く。"""
+    vertices = model.part_vertices() if include_vertices else ()
+    with ColumnarWriter(path) as writer:
+        writer.add(model.export_data(), vertices)
 
-    if obj is None:
-        warnings.append("No active object; skipped mesh validation.")
-        return errors, warnings
 
-    if obj.type != "MESH":
-        errors.append("アクティブなオブジェクトがメッシュではありません。")
-        return errors, warnings
+def _dict_to_props(data, props):
+    data = normalize_annotation(data)
+    props.garment_id = data["garment_id"]
+    props.garment_type = data["garment_type"]
+    set_reasoning_value(props, "design_reasoning", data["design_reasoning"])
 
-    mesh = obj.data
-    if "UVMap" not in mesh.uv_layers:
-        errors.append("アクティブなメッシュに UVMap がありません。")
+    props.parts.clear()
+    for part_data in data["parts"]:
+        part = props.parts.add()
+        part.name = part_data["name"]
+        part.label = part_data["label"]
+        set_reasoning_value(part, "modeling_reasoning", part_data["modeling_reasoning"])
+        set_reasoning_value(part, "uv_reasoning", part_data["uv_reasoning"])
 
-    part_group_names, seam_group_names = _split_group_names(obj)
-    vg_names = set(part_group_names)
-    part_names = {part.name for part in props.parts}
+        part.seams.clear()
+        for seam_data in part_data["seams"]:
+            seam = part.seams.add()
+            seam.name = seam_data["name"]
+            set_reasoning_value(seam, "seam_reasoning", seam_data["seam_reasoning"])
+        part.active_seam_index = 0 if part.seams else -1
+    props.active_part_index = 0 if props.parts else -1
+    invalidate_item_index(props.as_pointer())
 
-    missing_parts = sorted(name for name in part_names if name not in vg_names)
-    extra_parts = sorted(name for name in vg_names if name not in part_names)
 
-    if missing_parts:
-        errors.append(f"欠落しているパートの頂点グループ: {', '.join(missing_parts)}")
-    if extra_parts:
-        warnings.append(f"Vertex groups not in JSON (parts): {', '.join(extra_parts)}")
+def _validate_data_dict(data):
+    return validate_data_dict(data)
 
-    parts_snapshot, _ = _snapshot_props(props)
-    seams_by_part = _seams_for_export(
-        obj, part_group_names, seam_group_names, parts_snapshot
-    )
-    props_seams = {
-        part.name: {seam.name for seam in part.seams} for part in props.parts
-    }
-    for part_name, expected_seams in seams_by_part.items():
-        actual_seams = props_seams.get(part_name, set())
-        missing_seams = sorted(set(expected_seams) - actual_seams)
-        extra_seams = sorted(actual_seams - set(expected_seams))
-        if missing_seams:
-            warnings.append(f"Missing seams for {part_name}: {', '.join(missing_seams)}")
-        if extra_seams:
-            warnings.append(f"Extra seams for {part_name}: {', '.join(extra_seams)}")
 
-    return errors, warnings
+def _validate_props(props, obj):
+    return _export_model(props, obj).validate()
 
 
 def _format_validation_summary(errors, warnings):
-    if errors:
-        summary = f"Errors: {len(errors)}"
-    else:
-        summary = "OK"
-    if warnings:
-        summary = f"{summary}, Warnings: {len(warnings)}"
-    return summary
+    return format_validation_summary(errors, warnings)
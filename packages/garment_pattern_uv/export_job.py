@@ -0,0 +1,262 @@
+"""JSON エクスポートを UI を止めずに進めるジョブ。
+
+bpy のデータはメインスレッドでしか読めないので、読み出しはモーダルオペレーターの
+タイマーから少しずつ進める（頂点グループは 1 ティックあたり数万頂点ずつ）。
+読み終えた配列は書き込み禁止にしてワーカースレッドへ渡し、辺の接続と UV 指標の
+構築・シームの絞り込み・検証・JSON 化・書き込みはワーカーで行う。書き込みは
+一時ファイルからの置き換えなので、中断しても前のファイルが壊れることはない。
+
+辺・座標・UV は最初のティックでまとめて読み、頂点グループだけを分けて読む。
+その間に頂点グループの構成か形状（ウェイト・辺・UV。depsgraph の形状更新と
+編集モードの反映で上がる版 mesh_sync._geometry_revision で見る）が変わった場合は、
+読み終えた部分と食い違うのでエラーにして中断する。読み終えた後の変更は結果に
+影響しない（ワーカーは読み取り済みの配列だけを使う）。
+"""
+
+import threading
+import time
+
+import bpy
+
+from .constants import UV_MAP_NAME
+from .core.export_model import ExportModel, MeshSource
+from .core.membership import (
+    GroupMembership,
+    _membership_key,
+    _read_group_chunks,
+    cached_membership,
+)
+from .core.profiling import timed
+from .core.topology import MeshTopology, _read_edges
+from .core.uv_metrics import UVMesh, _read_uv_buffers
+from .data_io import (
+    _props_to_dict,
+    _validate_data_dict,
+    _write_json,
+    _write_json_with_geometry,
+)
+from .mesh_sync import _geometry_revision, _split_group_names
+
+# 1 ティックで読む頂点数と、1 ティックでメインスレッドを使ってよい時間
+CAPTURE_CHUNK_VERTICES = 16384
+CAPTURE_STEP_SECONDS = 0.02
+# 進捗のうち読み出し（メインスレッド）に割り当てる割合
+_CAPTURE_SHARE = 0.5
+
+_CURRENT_JOB = None
+
+
+def _frozen(*arrays):
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+class _MeshCapture:
+    """メッシュ 1 つ分の、ワーカーへ渡す読み取り済みのデータ。"""
+
+    def __init__(self, obj):
+        mesh = obj.data
+        self.obj = obj
+        self.name = obj.name
+        self.key = _membership_key(obj)
+        self.revision = _geometry_revision(obj)
+        self.part_names, self.seam_names = _split_group_names(obj)
+        self.has_uv_map = UV_MAP_NAME in mesh.uv_layers
+        self.vertex_count = len(mesh.vertices)
+        self.edges = _frozen(*_read_edges(mesh))
+        self.uv_buffers = (
+            _frozen(*_read_uv_buffers(mesh, UV_MAP_NAME)) if self.has_uv_map else None
+        )
+        # 所属がキャッシュ済みならそれを使い、無ければ read_step で少しずつ読む
+        self.membership = cached_membership(obj)
+        self.group_names = list(self.key[1])
+        self.chunks = []
+        self.vertices_read = self.vertex_count
+        self._reader = None
+        if self.membership is None:
+            self._reader = _read_group_chunks(mesh, CAPTURE_CHUNK_VERTICES)
+            self.vertices_read = 0
+
+    @property
+    def captured(self):
+        return self._reader is None
+
+    def read_step(self):
+        """頂点グループをチャンク 1 つ分読む。
+
+        前のティックから頂点グループの構成か形状が変わっていれば RuntimeError。
+        """
+        try:
+            changed = (
+                _membership_key(self.obj) != self.key
+                or _geometry_revision(self.obj) != self.revision
+            )
+        except ReferenceError:
+            raise RuntimeError(f"エクスポート中に {self.name} が削除されました。") from None
+        if changed:
+            raise RuntimeError(f"エクスポート中に {self.name} が変更されました。")
+        chunk = next(self._reader, None)
+        if chunk is None:
+            self._reader = None
+            self.vertices_read = self.vertex_count
+            return
+        self.chunks.append(_frozen(*chunk))
+        self.vertices_read = min(self.vertex_count, self.vertices_read + CAPTURE_CHUNK_VERTICES)
+
+    def source(self):
+        """ワーカースレッドで MeshSource を組み立てる。"""
+        membership = self.membership
+        if membership is None:
+            membership = GroupMembership.from_chunks(
+                self.group_names, self.chunks, self.vertex_count
+            )
+        uv_mesh = UVMesh(*self.uv_buffers) if self.uv_buffers is not None else None
+        return MeshSource(
+            self.name,
+            membership,
+            self.part_names,
+            self.seam_names,
+            self.has_uv_map,
+            MeshTopology(*self.edges),
+            uv_mesh,
+        )
+
+
+class ExportJob:
+    """1 回分のバックグラウンドエクスポート。step() はメインスレッドから呼ぶ。
+
+    status は RUNNING → FINISHED / CANCELLED / FAILED と進み、FAILED のときは
+    error にメッセージが入る。progress（0〜1）と stage は UI の表示用。
+    geometry なら、パーツ・シームの配列ファイル（core.geometry）も書く。
+    """
+
+    def __init__(self, props, objects, path, geometry=False):
+        self.path = path
+        self.geometry = geometry
+        self.status = "RUNNING"
+        self.error = ""
+        self.stage = "読み込み中"
+        self.progress = 0.0
+        self._cancel = threading.Event()
+        self._thread = None
+
+        self._data = _props_to_dict(props)
+        objects = [obj for obj in objects if obj is not None]
+        meshes = [obj for obj in objects if obj.type == "MESH"]
+        self._object_type = None
+        if meshes:
+            self._object_type = "MESH"
+        elif objects:
+            self._object_type = objects[0].type
+        self._captures = [_MeshCapture(obj) for obj in meshes]
+        self._vertex_total = sum(capture.vertex_count for capture in self._captures)
+
+    @property
+    def done(self):
+        return self.status != "RUNNING"
+
+    def cancel(self):
+        self._cancel.set()
+
+    def step(self):
+        """読み出しを 1 ティック分進め、読み終えたらワーカーを起動する。"""
+        if self.done or self._thread is not None:
+            return
+        if self._cancel.is_set():
+            self.status = "CANCELLED"
+            return
+        deadline = time.perf_counter() + CAPTURE_STEP_SECONDS
+        try:
+            for capture in self._captures:
+                while not capture.captured and time.perf_counter() < deadline:
+                    capture.read_step()
+                if not capture.captured:
+                    break
+        except RuntimeError as exc:
+            self.error = str(exc)
+            self.status = "FAILED"
+            return
+        if self._vertex_total:
+            read = sum(capture.vertices_read for capture in self._captures)
+            self.progress = _CAPTURE_SHARE * read / self._vertex_total
+        if all(capture.captured for capture in self._captures):
+            self._stage("シームと UV 指標を計算中", _CAPTURE_SHARE)
+            self._thread = threading.Thread(
+                target=self._run, name="garment_uv_export", daemon=True
+            )
+            self._thread.start()
+
+    def _stage(self, stage, progress):
+        self.stage = stage
+        self.progress = progress
+
+    @timed("export_job.worker")
+    def _run(self):
+        try:
+            status = self._export()
+        except OSError as exc:
+            self.error = f"Failed to write JSON: {exc}"
+            status = "FAILED"
+        except Exception as exc:  # noqa: BLE001 - ワーカーの例外は UI に表示する
+            self.error = f"Export failed: {type(exc).__name__}: {exc}"
+            status = "FAILED"
+        self.progress = 1.0
+        self.status = status
+
+    def _export(self):
+        sources = []
+        for capture in self._captures:
+            if self._cancel.is_set():
+                return "CANCELLED"
+            sources.append(capture.source())
+        if self._object_type is None:
+            model = ExportModel(self._data)
+        else:
+            model = ExportModel(self._data, object_type=self._object_type, sources=sources)
+        data = model.export_data()
+
+        if self._cancel.is_set():
+            return "CANCELLED"
+        self._stage("検証中", 0.8)
+        errors = _validate_data_dict(data)
+        if errors:
+            self.error = errors[0]
+            return "FAILED"
+
+        self._stage("書き込み中", 0.85)
+        if self.geometry:
+            written = _write_json_with_geometry(
+                self.path, model, should_stop=self._cancel.is_set
+            )
+        else:
+            written = _write_json(self.path, data, should_stop=self._cancel.is_set)
+        if not written:
+            return "CANCELLED"
+        return "FINISHED"
+
+
+def current_job():
+    """実行中のエクスポート。無ければ None。"""
+    return _CURRENT_JOB
+
+
+def start_job(job):
+    global _CURRENT_JOB
+    _CURRENT_JOB = job
+    return job
+
+
+def finish_job(job):
+    global _CURRENT_JOB
+    if _CURRENT_JOB is job:
+        _CURRENT_JOB = None
+
+
+@bpy.app.handlers.persistent
+def _export_job_load_post(*_args):
+    # 読み込みでモーダルオペレーターは破棄されるので、残ったジョブを止めて外す。
+    job = _CURRENT_JOB
+    if job is not None:
+        job.cancel()
+        finish_job(job)
@@ -0,0 +1,97 @@
+"""パーツ・シーム（PropertyGroup の項目）の位置の逆引き。
+
+オペレーターは名前から、is_selected の update は項目そのものから (パーツ番号,
+シーム番号) を引く。コレクションを作り直す同期・インポート・読み込みで
+invalidate_item_index() を呼んで捨て、次に引いたときに 1 度だけ作り直す。
+
+引いた位置の項目が一致するかも確かめるので、UI での名前の変更など捨て忘れた
+変更があっても結果は正しい（作り直しが 1 回増えるだけ）。索引に無い名前は
+collection.find で本当に無いかを確かめてから作り直す。
+"""
+
+from .core.profiling import count
+
+
+class _ItemIndex:
+    """名前 → 位置と、シームのポインタ → (パーツ番号, シーム番号)。"""
+
+    __slots__ = ("parts", "seams", "locations")
+
+    def __init__(self, props):
+        self.parts = {}
+        self.seams = []
+        self.locations = {}
+        for part_index, part in enumerate(props.parts):
+            self.parts.setdefault(part.name, part_index)
+            names = {}
+            for seam_index, seam in enumerate(part.seams):
+                names.setdefault(seam.name, seam_index)
+                self.locations[seam.as_pointer()] = (part_index, seam_index)
+            self.seams.append(names)
+
+
+# アノテーション（シーンの garment_uv）のポインタ → _ItemIndex
+_ITEM_INDEX = {}
+
+
+def _index_for(props, rebuild=False):
+    pointer = props.as_pointer()
+    index = None if rebuild else _ITEM_INDEX.get(pointer)
+    if index is None:
+        count("item_index.rebuild")
+        index = _ItemIndex(props)
+        _ITEM_INDEX[pointer] = index
+    return index
+
+
+def _named_at(collection, position, name):
+    return 0 <= position < len(collection) and collection[position].name == name
+
+
+def find_part(props, name):
+    """name のパーツの位置。無ければ -1。"""
+    position = _index_for(props).parts.get(name, -1)
+    if _named_at(props.parts, position, name):
+        return position
+    if position < 0 and props.parts.find(name) < 0:
+        return -1
+    return _index_for(props, rebuild=True).parts.get(name, -1)
+
+
+def find_seam(props, part_position, name):
+    """part_position のパーツにある name のシームの位置。無ければ -1。"""
+    seams = props.parts[part_position].seams
+    index = _index_for(props)
+    position = -1
+    if part_position < len(index.seams):
+        position = index.seams[part_position].get(name, -1)
+    if _named_at(seams, position, name):
+        return position
+    if position < 0 and seams.find(name) < 0:
+        return -1
+    index = _index_for(props, rebuild=True)
+    return index.seams[part_position].get(name, -1)
+
+
+def locate_seam(props, seam):
+    """seam の (パーツ番号, シーム番号)。props に無ければ None。"""
+    pointer = seam.as_pointer()
+    for rebuild in (False, True):
+        location = _index_for(props, rebuild).locations.get(pointer)
+        if location is None:
+            continue
+        part_position, seam_position = location
+        parts = props.parts
+        if part_position < len(parts):
+            seams = parts[part_position].seams
+            if seam_position < len(seams) and seams[seam_position].as_pointer() == pointer:
+                return location
+    return None
+
+
+def invalidate_item_index(pointer=None):
+    """pointer（アノテーション）の索引を捨てる。None なら全部。"""
+    if pointer is None:
+        _ITEM_INDEX.clear()
+    else:
+        _ITEM_INDEX.pop(pointer, None)
@@ -1,131 +1,76 @@
 import bpy
 
-from .constants import _nonempty
-from .reasoning_text import get_reasoning_value
+from .core.groups import group_index_for, invalidate_group_index, is_part_name
+from .core.membership import invalidate_membership, membership_for
+from .core.profiling import count, timed
+from .core.reconcile import reconcile_parts
+from .core.seams import seams_for_ui
+from .core.topology import invalidate_topology, topology_for
+from .core.uv_metrics import invalidate_uv_mesh, uv_mesh_for
+from .item_index import invalidate_item_index
 
 _SYNC_GUARD = False
+_SYNC_PENDING = False
+_SYNC_DEBOUNCE_SECONDS = 0.2
 
-
-def _part_key(part):
-    return part.name or "unnamed_part"
-
-
-def _seam_key(part, seam):
-    return f"{_part_key(part)}.{seam.name or 'unnamed_seam'}"
-
-
-def _valid_text(text):
-    return isinstance(text, bpy.types.Text) and bpy.data.texts.get(text.name) is not None
-
-
-def _snapshot_props(props):
-    parts = {}
-    seam_to_part = {}
-    for part in props.parts:
-        seam_data = {}
-        for seam in part.seams:
-            seam_data[seam.name] = {
-                "seam_reasoning": get_reasoning_value(
-                    seam,
-                    "seam_reasoning_text",
-                    "seam_reasoning",
-                    "seam",
-                    _seam_key(part, seam),
-                    "seam_reasoning",
-                ),
-                "seam_reasoning_text": seam.seam_reasoning_text
-                if _valid_text(seam.seam_reasoning_text)
-                else None,
-            }
-            seam_to_part[seam.name] = part.name
-        parts[part.name] = {
-            "label": part.label,
-            "modeling_reasoning": get_reasoning_value(
-                part,
-                "modeling_reasoning_text",
-                "modeling_reasoning",
-                "part",
-                _part_key(part),
-                "modeling_reasoning",
-            ),
-            "modeling_reasoning_text": part.modeling_reasoning_text
-            if _valid_text(part.modeling_reasoning_text)
-            else None,
-            "uv_reasoning": get_reasoning_value(
-                part,
-                "uv_reasoning_text",
-                "uv_reasoning",
-                "part",
-                _part_key(part),
-                "uv_reasoning",
-            ),
-            "uv_reasoning_text": part.uv_reasoning_text
-            if _valid_text(part.uv_reasoning_text)
-            else None,
-            "seams": seam_data,
-        }
-    return parts, seam_to_part
-
-
-def _apply_single_rename(removed, added, rename_fn):
-    if len(removed) == 1 and len(added) == 1:
-        old_name = next(iter(removed))
-        new_name = next(iter(added))
-        rename_fn(old_name, new_name)
+# オブジェクトのポインタ → (グループ数, グループ名のハッシュ)
+_GROUP_FINGERPRINTS = {}
+# 最後に同期した (シーン, オブジェクト) のポインタ
+_LAST_SYNCED = None
+# オブジェクト・メッシュのポインタ → 形状（ウェイト・辺・UV を含む）の更新回数
+_GEOMETRY_REVISIONS = {}
 
 
+@timed("vertices_by_group")
 def _vertices_by_group(obj):
-    group_index_to_name = {group.index: group.name for group in obj.vertex_groups}
-    vertices_by_group = {group.name: set() for group in obj.vertex_groups}
-    for vertex in obj.data.vertices:
-        for group in vertex.groups:
-            if group.weight <= 0:
-                continue
-            name = group_index_to_name.get(group.group)
-            if name is not None:
-                vertices_by_group[name].add(vertex.index)
-    return vertices_by_group
+    return membership_for(obj)
+
+
+def _mesh_topology(obj):
+    """辺の接続（MeshTopology）。頂点数・辺数が変わるか形状の更新で作り直す。"""
+    return topology_for(obj)
+
+
+def _uv_mesh(obj):
+    """UV 指標用の配列（UVMesh）。UVMap が無ければ None。"""
+    return uv_mesh_for(obj)
+
+
+def _group_index(obj):
+    """グループ名が変わるまで使い回す、オブジェクトの分類結果。"""
+    return group_index_for(
+        obj.as_pointer(), [group.name for group in obj.vertex_groups]
+    )
 
 
 def _split_group_names(obj):
-    seam_groups = []
-    part_groups = []
-    for group in obj.vertex_groups:
-        normalized = group.name.strip().lower()
-        if normalized.startswith("seam_"):
-            seam_groups.append(group.name)
-        elif normalized.startswith("part_"):
-            part_groups.append(group.name)
-    if seam_groups:
-        part_groups = [name for name in part_groups if name not in seam_groups]
-    return part_groups, seam_groups
-
-
-def _seams_for_export(obj, part_names, seam_names, parts_snapshot):
-    vertices_by_group = _vertices_by_group(obj)
-    seams_by_part = {name: set() for name in part_names}
-    for seam_name in seam_names:
-        seam_vertices = vertices_by_group.get(seam_name, set())
-        for part_name in part_names:
-            if seam_vertices & vertices_by_group.get(part_name, set()):
-                seams_by_part[part_name].add(seam_name)
-    for part_name in part_names:
-        part_data = parts_snapshot.get(part_name, {})
-        for seam_name, seam_data in part_data.get("seams", {}).items():
-            if seam_name in seam_names and _nonempty(
-                seam_data.get("seam_reasoning", "")
-            ):
-                seams_by_part[part_name].add(seam_name)
-    return {
-        part_name: [name for name in seam_names if name in seams]
-        for part_name, seams in seams_by_part.items()
-    }
-
-
-def _seams_for_ui(part_names, seam_names):
-    return {part_name: list(seam_names) for part_name in part_names}
+    index = _group_index(obj)
+    return index.part_names, index.seam_names
+
+
+def _garment_objects(objects):
+    """part_ / seam_ の頂点グループを持つメッシュオブジェクトを返す。"""
+    result = []
+    for obj in objects:
+        if obj.type != "MESH":
+            continue
+        part_names, seam_names = _split_group_names(obj)
+        if part_names or seam_names:
+            result.append(obj)
+    return result
 
 
+def _objects_for_scope(context, scope):
+    """エクスポート対象のオブジェクト。scope は ACTIVE / SCENE / COLLECTION。"""
+    if scope == "SCENE":
+        return _garment_objects(context.scene.objects)
+    if scope == "COLLECTION":
+        collection = getattr(context, "collection", None) or context.scene.collection
+        return _garment_objects(collection.all_objects)
+    return [context.object] if context.object is not None else []
+
+
+@timed("sync_from_vertex_groups")
 def _sync_from_vertex_groups(props, obj):
     if obj is None or obj.type != "MESH":
         return
@@ -133,84 +78,140 @@ def _sync_from_vertex_groups(props, obj):
     part_names, seam_names = _split_group_names(obj)
     signature = f"{obj.name}|parts:{'|'.join(part_names)}|seams:{','.join(seam_names)}"
     if props.last_sync_signature == signature:
-        has_invalid_part = any(
-            not part.name.strip().lower().startswith("part_") for part in props.parts
-        )
+        has_invalid_part = any(not is_part_name(part.name) for part in props.parts)
         if not has_invalid_part:
+            count("sync.signature_fast_path")
             return
 
-    parts, _ = _snapshot_props(props)
-    seams_by_part = _seams_for_ui(part_names, seam_names)
+    count("sync.full_rebuild")
+    reconcile_parts(props, part_names, seams_for_ui(part_names, seam_names))
+    invalidate_item_index(props.as_pointer())
+    props.last_sync_signature = signature
+
 
-    existing_part_names = set(parts.keys())
-    current_part_names = set(part_names)
-    removed_parts = existing_part_names - current_part_names
-    added_parts = current_part_names - existing_part_names
+def _geometry_changed(pointer):
+    """pointer（オブジェクトかメッシュ）の形状が変わった。キャッシュを捨て、版を上げる。"""
+    _GEOMETRY_REVISIONS[pointer] = _GEOMETRY_REVISIONS.get(pointer, 0) + 1
+    invalidate_membership(pointer)
+    invalidate_topology(pointer)
+    invalidate_uv_mesh(pointer)
 
-    def _rename_part(old_name, new_name):
-        if old_name not in parts:
-            return
-        parts[new_name] = parts.pop(old_name)
 
-    _apply_single_rename(removed_parts, added_parts, _rename_part)
+def _geometry_revision(obj):
+    """obj とそのメッシュの形状の版。ウェイトペイント・辺や UV の編集で変わる。"""
+    return (
+        _GEOMETRY_REVISIONS.get(obj.as_pointer(), 0),
+        _GEOMETRY_REVISIONS.get(obj.data.as_pointer(), 0),
+    )
 
-    if not part_names:
-        props.parts.clear()
-        props.active_part_index = -1
-        props.last_sync_signature = signature
-        return
 
-    for part_name in part_names:
-        if part_name not in parts:
-            parts[part_name] = {
-                "label": "",
-                "modeling_reasoning": "",
-                "modeling_reasoning_text": None,
-                "uv_reasoning": "",
-                "uv_reasoning_text": None,
-                "seams": {},
-            }
-
-    props.parts.clear()
-    for part_name in part_names:
-        part_data = parts.get(part_name, {})
-        part = props.parts.add()
-        part.name = part_name
-        part.label = part_data.get("label", "")
-        part.modeling_reasoning = part_data.get("modeling_reasoning", "")
-        part.modeling_reasoning_text = part_data.get("modeling_reasoning_text")
-        part.uv_reasoning = part_data.get("uv_reasoning", "")
-        part.uv_reasoning_text = part_data.get("uv_reasoning_text")
-        part.seams.clear()
-
-        for seam_name in seams_by_part.get(part_name, []):
-            seam = part.seams.add()
-            seam.name = seam_name
-            seam_data = part_data.get("seams", {}).get(seam_name, {})
-            seam.seam_reasoning = seam_data.get("seam_reasoning", "")
-            seam.seam_reasoning_text = seam_data.get("seam_reasoning_text")
-        part.active_seam_index = 0 if part.seams else -1
-
-    props.active_part_index = 0 if props.parts else -1
-    props.last_sync_signature = signature
+def _invalidate_updated_geometry(depsgraph):
+    for update in depsgraph.updates:
+        if update.is_updated_geometry:
+            _geometry_changed(update.id.original.as_pointer())
 
 
-def _depsgraph_sync_handler(_scene, depsgraph):
-    del depsgraph
-    global _SYNC_GUARD
-    if _SYNC_GUARD:
-        return
-    context = bpy.context
-    if context is None or context.scene is None:
-        return
-    obj = context.object
+def _group_fingerprint(obj):
+    names = tuple(group.name for group in obj.vertex_groups)
+    return len(names), hash(names)
+
+
+def _active_mesh(context):
+    view_layer = getattr(context, "view_layer", None)
+    obj = view_layer.objects.active if view_layer is not None else None
     if obj is None or obj.type != "MESH":
-        return
-    if obj.mode == "EDIT":
+        return None
+    return obj
+
+
+def _touches_object(depsgraph, obj):
+    pointers = {obj.as_pointer(), obj.data.as_pointer()}
+    return any(
+        update.id.original.as_pointer() in pointers for update in depsgraph.updates
+    )
+
+
+def _flush_edit_mode(obj):
+    """編集モード中のメッシュをオブジェクトデータへ反映し、所属・辺・UV のキャッシュを捨てる。"""
+    if obj is not None and obj.mode == "EDIT":
         obj.update_from_editmode()
-    props = context.scene.garment_uv
+        _geometry_changed(obj.as_pointer())
+
+
+@timed("deferred_sync")
+def _deferred_sync():
+    global _SYNC_GUARD, _SYNC_PENDING, _LAST_SYNCED
+    _SYNC_PENDING = False
+    context = bpy.context
+    scene = getattr(context, "scene", None)
+    obj = _active_mesh(context)
+    if scene is None or obj is None:
+        return None
+
+    key = (scene.as_pointer(), obj.as_pointer())
+    fingerprint = _group_fingerprint(obj)
+    if _LAST_SYNCED == key and _GROUP_FINGERPRINTS.get(key[1]) == fingerprint:
+        count("sync.fingerprint_skip")
+        return None
+
     _SYNC_GUARD = True
     try:
-        _sync_from_vertex_groups(props, obj)
+        _sync_from_vertex_groups(scene.garment_uv, obj)
     finally:
         _SYNC_GUARD = False
+    _GROUP_FINGERPRINTS[key[1]] = fingerprint
+    _LAST_SYNCED = key
+    return None
+
+
+def _schedule_sync():
+    global _SYNC_PENDING
+    if _SYNC_PENDING:
+        return
+    _SYNC_PENDING = True
+    bpy.app.timers.register(_deferred_sync, first_interval=_SYNC_DEBOUNCE_SECONDS)
+
+
+def _cancel_pending_sync():
+    global _SYNC_PENDING
+    if bpy.app.timers.is_registered(_deferred_sync):
+        bpy.app.timers.unregister(_deferred_sync)
+    _SYNC_PENDING = False
+
+
+def _reset_sync_state():
+    """次の同期を必ずフル実行させる（ファイル読み込みやインポート後に呼ぶ）。"""
+    global _LAST_SYNCED
+    _GROUP_FINGERPRINTS.clear()
+    _LAST_SYNCED = None
+
+
+@bpy.app.handlers.persistent
+def _load_post_handler(*_args):
+    global _SYNC_PENDING
+    invalidate_membership()
+    invalidate_topology()
+    invalidate_uv_mesh()
+    invalidate_group_index()
+    invalidate_item_index()
+    _reset_sync_state()
+    # 読み込みで非永続タイマーは破棄されるため、保留フラグも戻す。
+    _SYNC_PENDING = False
+
+
+@timed("depsgraph_sync_handler")
+def _depsgraph_sync_handler(scene, depsgraph):
+    if _SYNC_GUARD:
+        return
+    _invalidate_updated_geometry(depsgraph)
+    obj = _active_mesh(bpy.context)
+    if obj is None:
+        return
+    # ビューポート操作や無関係なプロパティ変更ではアクティブオブジェクトが
+    # 更新されないので、同期済みなら何もしない。
+    if _LAST_SYNCED == (scene.as_pointer(), obj.as_pointer()) and not _touches_object(
+        depsgraph, obj
+    ):
+        count("depsgraph.unrelated_update")
+        return
+    _schedule_sync()
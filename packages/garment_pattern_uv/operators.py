@@ -1,15 +1,42 @@
-import json
-import os
-
 import bpy
-from bpy.props import EnumProperty, StringProperty
+from bpy.props import BoolProperty, EnumProperty, IntProperty, StringProperty
 from bpy.types import Operator
 
-from .data_io import _props_to_dict_filtered, _validate_data_dict
+from .batch_import import find_annotation_record, import_annotation
+from .core import profiling
+from .core.dataset_writer import ShardedJsonlWriter
+from .data_io import (
+    _export_model_for_objects,
+    _props_to_dict_for_objects,
+    _validate_data_dict,
+    _write_columnar,
+    _write_json,
+    _write_json_with_geometry,
+)
+from .export_job import ExportJob, current_job, finish_job, start_job
+from .item_index import find_part, find_seam
+from .mesh_sync import (
+    _flush_edit_mode,
+    _mesh_topology,
+    _objects_for_scope,
+    _reset_sync_state,
+    _vertices_by_group,
+)
 from .reasoning_text import set_reasoning_value
 
+_EXPORT_SCOPE_ITEMS = [
+    ("ACTIVE", "Active Object", "アクティブなオブジェクトだけ"),
+    ("SCENE", "Scene", "シーン内で part_/seam_ グループを持つ全メッシュ"),
+    ("COLLECTION", "Collection", "アクティブなコレクション内の同様のメッシュ"),
+]
+
 
 def _tag_redraw(context):
+    """サイドバーから呼ばれたらその 3D ビューだけ、それ以外は全 3D ビューを再描画する。"""
+    area = getattr(context, "area", None)
+    if area is not None and area.type == "VIEW_3D":
+        area.tag_redraw()
+        return
     wm = getattr(context, "window_manager", None)
     if wm is None:
         return
@@ -22,19 +49,26 @@ def _tag_redraw(context):
                 area.tag_redraw()
 
 
+def _export_objects(context, scope):
+    objects = _objects_for_scope(context, scope)
+    for obj in objects:
+        _flush_edit_mode(obj)
+    return objects
+
+
 def _find_part(props, part_name):
-    for index, part in enumerate(props.parts):
-        if part.name == part_name:
-            return index, part
+    index = find_part(props, part_name)
+    if index >= 0:
+        return index, props.parts[index]
     if 0 <= props.active_part_index < len(props.parts):
         return props.active_part_index, props.parts[props.active_part_index]
     return -1, None
 
 
-def _find_seam(part, seam_name):
-    for index, seam in enumerate(part.seams):
-        if seam.name == seam_name:
-            return index, seam
+def _find_seam(props, part_index, part, seam_name):
+    index = find_seam(props, part_index, seam_name)
+    if index >= 0:
+        return index, part.seams[index]
     if 0 <= part.active_seam_index < len(part.seams):
         return part.active_seam_index, part.seams[part.active_seam_index]
     return -1, None
@@ -71,15 +105,7 @@ class GARMENT_UV_OT_paste_reasoning_text(Operator):
         value = context.window_manager.clipboard or ""
 
         if self.target_scope == "annotation":
-            set_reasoning_value(
-                props,
-                "design_reasoning_text",
-                "design_reasoning",
-                "annotation",
-                "scene",
-                "design_reasoning",
-                value,
-            )
+            set_reasoning_value(props, "design_reasoning", value)
             _tag_redraw(context)
             return {"FINISHED"}
 
@@ -90,43 +116,21 @@ class GARMENT_UV_OT_paste_reasoning_text(Operator):
         props.active_part_index = part_index
 
         if self.target_scope == "part":
-            if self.field_id == "modeling_reasoning":
-                pointer_prop = "modeling_reasoning_text"
-                legacy_prop = "modeling_reasoning"
-            elif self.field_id == "uv_reasoning":
-                pointer_prop = "uv_reasoning_text"
-                legacy_prop = "uv_reasoning"
-            else:
+            if self.field_id not in ("modeling_reasoning", "uv_reasoning"):
                 self.report({"ERROR"}, "Invalid field for part.")
                 return {"CANCELLED"}
 
-            set_reasoning_value(
-                part,
-                pointer_prop,
-                legacy_prop,
-                "part",
-                part.name or "unnamed_part",
-                self.field_id,
-                value,
-            )
+            set_reasoning_value(part, self.field_id, value)
             _tag_redraw(context)
             return {"FINISHED"}
 
-        seam_index, seam = _find_seam(part, self.seam_name)
+        seam_index, seam = _find_seam(props, part_index, part, self.seam_name)
         if seam is None:
             self.report({"ERROR"}, "Seam not found.")
             return {"CANCELLED"}
         part.active_seam_index = seam_index
 
-        set_reasoning_value(
-            seam,
-            "seam_reasoning_text",
-            "seam_reasoning",
-            "seam",
-            f"{part.name or 'unnamed_part'}.{seam.name or 'unnamed_seam'}",
-            "seam_reasoning",
-            value,
-        )
+        set_reasoning_value(seam, "seam_reasoning", value)
         _tag_redraw(context)
         return {"FINISHED"}
 
@@ -144,7 +148,7 @@ class GARMENT_UV_OT_toggle_seam_selection(Operator):
         if part is None:
             self.report({"ERROR"}, "Part not found.")
             return {"CANCELLED"}
-        seam_index, seam = _find_seam(part, self.seam_name)
+        seam_index, seam = _find_seam(props, part_index, part, self.seam_name)
         if seam is None:
             self.report({"ERROR"}, "Seam not found.")
             return {"CANCELLED"}
@@ -157,19 +161,59 @@ class GARMENT_UV_OT_toggle_seam_selection(Operator):
         return {"FINISHED"}
 
 
+class GARMENT_UV_OT_compute_seam_shape(Operator):
+    bl_idname = "garment_uv.compute_seam_shape"
+    bl_label = "Compute Seam Shape"
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == "MESH" and obj.mode != "EDIT"
+
+    def execute(self, context):
+        obj = context.active_object
+        # 読んだ所属・辺はキャッシュに残り、パネルの描画はそれを使う
+        _mesh_topology(obj)
+        _vertices_by_group(obj)
+        _tag_redraw(context)
+        return {"FINISHED"}
+
+
 class GARMENT_UV_OT_export_json(Operator):
     bl_idname = "garment_uv.export_json"
     bl_label = "Export JSON"
 
     filepath: StringProperty(subtype="FILE_PATH")
+    scope: EnumProperty(name="Objects", items=_EXPORT_SCOPE_ITEMS, default="ACTIVE")
+    include_geometry: BoolProperty(
+        name="Geometry Arrays",
+        description="パーツ・シームの頂点番号・座標・UV を .gpuvg に書き、JSON から参照する",
+        default=False,
+    )
+    # UI から呼ばれたとき（invoke）だけモーダルで進める。スクリプトからの実行は従来どおり同期。
+    background: BoolProperty(default=False, options={"HIDDEN", "SKIP_SAVE"})
 
+    # モーダル中にタイマーを回す間隔（秒）
+    _TIMER_INTERVAL = 0.05
+
+    @classmethod
+    def poll(cls, context):
+        del context
+        return current_job() is None
+
+    @profiling.timed("operator.export_json")
     def execute(self, context):
         props = context.scene.garment_uv
         if hasattr(props, "last_error"):
             props.last_error = ""
 
-        data = _props_to_dict_filtered(props, context.object)
-        errors = _validate_data_dict(data)
+        objects = _export_objects(context, self.scope)
+        path = bpy.path.abspath(self.filepath)
+        if self.background and context.window is not None:
+            return self._start_job(context, props, objects, path)
+
+        model = _export_model_for_objects(props, objects)
+        errors = _validate_data_dict(model.export_data())
         if errors:
             msg = errors[0]
             if hasattr(props, "last_error"):
@@ -177,15 +221,11 @@ class GARMENT_UV_OT_export_json(Operator):
             self.report({"ERROR"}, msg)
             return {"CANCELLED"}
 
-        path = bpy.path.abspath(self.filepath)
-        directory = os.path.dirname(path)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-
         try:
-            with open(path, "w", encoding="utf-8") as handle:
-                json.dump(data, handle, ensure_ascii=False, indent=2)
-                handle.write("\n")
+            if self.include_geometry:
+                _write_json_with_geometry(path, model)
+            else:
+                _write_json(path, model.export_data())
         except OSError as exc:
             msg = f"Failed to write JSON: {exc}"
             if hasattr(props, "last_error"):
@@ -196,11 +236,284 @@ class GARMENT_UV_OT_export_json(Operator):
         self.report({"INFO"}, f"Exported JSON to {path}")
         return {"FINISHED"}
 
+    def _start_job(self, context, props, objects, path):
+        self._job = start_job(
+            ExportJob(props, objects, path, geometry=self.include_geometry)
+        )
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(self._TIMER_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        _tag_redraw(context)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event):
+        if event.type == "ESC" and event.value == "PRESS":
+            self._job.cancel()
+            return {"RUNNING_MODAL"}
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+        self._job.step()
+        _tag_redraw(context)
+        if not self._job.done:
+            return {"PASS_THROUGH"}
+        return self._finish(context)
+
+    def _finish(self, context):
+        job = self._job
+        context.window_manager.event_timer_remove(self._timer)
+        finish_job(job)
+        _tag_redraw(context)
+        if job.status == "FINISHED":
+            self.report({"INFO"}, f"Exported JSON to {job.path}")
+            return {"FINISHED"}
+        if job.status == "CANCELLED":
+            self.report({"WARNING"}, "Export cancelled")
+            return {"CANCELLED"}
+        props = context.scene.garment_uv
+        if hasattr(props, "last_error"):
+            props.last_error = job.error
+        self.report({"ERROR"}, job.error)
+        return {"CANCELLED"}
+
+    def cancel(self, context):
+        self._job.cancel()
+        context.window_manager.event_timer_remove(self._timer)
+        finish_job(self._job)
+
     def invoke(self, context, event):
         del event
         props = context.scene.garment_uv
         if not self.filepath:
             name = props.garment_id.strip() or "annotations"
             self.filepath = bpy.path.abspath(f"//{name}.json")
+        self.background = True
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+
+class GARMENT_UV_OT_export_columnar(Operator):
+    bl_idname = "garment_uv.export_columnar"
+    bl_label = "Export Columnar"
+
+    filepath: StringProperty(subtype="FILE_PATH")
+    filter_glob: StringProperty(default="*.gpuvc", options={"HIDDEN"})
+    scope: EnumProperty(name="Objects", items=_EXPORT_SCOPE_ITEMS, default="ACTIVE")
+    include_vertices: BoolProperty(
+        name="Part Vertices",
+        description="パーツごとの頂点番号の配列も書き出す",
+        default=True,
+    )
+
+    @profiling.timed("operator.export_columnar")
+    def execute(self, context):
+        props = context.scene.garment_uv
+        props.last_error = ""
+
+        objects = _export_objects(context, self.scope)
+        model = _export_model_for_objects(props, objects)
+        errors = _validate_data_dict(model.export_data())
+        if errors:
+            props.last_error = errors[0]
+            self.report({"ERROR"}, errors[0])
+            return {"CANCELLED"}
+
+        path = bpy.path.abspath(self.filepath)
+        try:
+            _write_columnar(path, model, include_vertices=self.include_vertices)
+        except OSError as exc:
+            msg = f"Failed to write columnar file: {exc}"
+            props.last_error = msg
+            self.report({"ERROR"}, msg)
+            return {"CANCELLED"}
+
+        self.report({"INFO"}, f"Exported columnar file to {path}")
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        del event
+        props = context.scene.garment_uv
+        if not self.filepath:
+            name = props.garment_id.strip() or "annotations"
+            self.filepath = bpy.path.abspath(f"//{name}.gpuvc")
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+
+class GARMENT_UV_OT_cancel_export(Operator):
+    bl_idname = "garment_uv.cancel_export"
+    bl_label = "Cancel Export"
+
+    @classmethod
+    def poll(cls, context):
+        del context
+        return current_job() is not None
+
+    def execute(self, context):
+        del context
+        current_job().cancel()
+        return {"FINISHED"}
+
+
+class GARMENT_UV_OT_import_json(Operator):
+    bl_idname = "garment_uv.import_json"
+    bl_label = "Import JSON"
+    bl_options = {"REGISTER", "UNDO"}
+
+    filepath: StringProperty(subtype="FILE_PATH")
+    filter_glob: StringProperty(
+        default="*.json;*.jsonl;*.jsonl.gz;*.jsonl.zst", options={"HIDDEN"}
+    )
+    garment_id: StringProperty(
+        name="Garment ID",
+        description="JSONL やデータセットから読み込むレコード（空なら現在の garment_id）",
+        default="",
+    )
+
+    @profiling.timed("operator.import_json")
+    def execute(self, context):
+        props = context.scene.garment_uv
+        props.last_error = ""
+
+        path = bpy.path.abspath(self.filepath)
+        garment_id = self.garment_id.strip() or props.garment_id.strip()
+        try:
+            data = find_annotation_record(path, garment_id)
+        except (OSError, ValueError, RuntimeError) as exc:
+            msg = f"Failed to read {path}: {exc}"
+            props.last_error = msg
+            self.report({"ERROR"}, msg)
+            return {"CANCELLED"}
+        if data is None:
+            msg = f"{garment_id} のレコードが見つかりません。"
+            props.last_error = msg
+            self.report({"ERROR"}, msg)
+            return {"CANCELLED"}
+
+        errors = import_annotation(data, props)
+        if errors:
+            props.last_error = errors[0]
+            self.report({"ERROR"}, errors[0])
+            return {"CANCELLED"}
+
+        _reset_sync_state()
+        _tag_redraw(context)
+        self.report({"INFO"}, f"Imported {props.garment_id or path}")
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        del event
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+
+class GARMENT_UV_OT_export_jsonl(Operator):
+    bl_idname = "garment_uv.export_jsonl"
+    bl_label = "Append to JSONL Dataset"
+
+    directory: StringProperty(subtype="DIR_PATH")
+    compression: EnumProperty(
+        name="Compression",
+        items=[
+            ("NONE", "None", ""),
+            ("GZIP", "gzip", ""),
+            ("ZSTD", "zstd", ""),
+        ],
+        default="NONE",
+    )
+    shard_size_mb: IntProperty(name="Shard Size (MB)", default=256, min=1)
+    scope: EnumProperty(name="Objects", items=_EXPORT_SCOPE_ITEMS, default="ACTIVE")
+
+    @profiling.timed("operator.export_jsonl")
+    def execute(self, context):
+        props = context.scene.garment_uv
+        props.last_error = ""
+
+        garment_id = props.garment_id.strip()
+        if not garment_id:
+            msg = "garment_id を入力してください。"
+            props.last_error = msg
+            self.report({"ERROR"}, msg)
+            return {"CANCELLED"}
+
+        objects = _export_objects(context, self.scope)
+        data = _props_to_dict_for_objects(props, objects)
+        errors = _validate_data_dict(data)
+        if errors:
+            props.last_error = errors[0]
+            self.report({"ERROR"}, errors[0])
+            return {"CANCELLED"}
+
+        directory = bpy.path.abspath(self.directory)
+        compression = None if self.compression == "NONE" else self.compression.lower()
+        try:
+            with ShardedJsonlWriter(
+                directory,
+                max_shard_bytes=self.shard_size_mb * 1024 * 1024,
+                compression=compression,
+            ) as writer:
+                entry = writer.write(garment_id, data)
+        except (OSError, RuntimeError) as exc:
+            msg = f"Failed to write JSONL: {exc}"
+            props.last_error = msg
+            self.report({"ERROR"}, msg)
+            return {"CANCELLED"}
+
+        if entry is None:
+            self.report({"WARNING"}, f"{garment_id} is already in {directory}")
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Appended {garment_id} to {entry['shard']}")
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        del event
+        if not self.directory:
+            self.directory = bpy.path.abspath("//dataset/")
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+
+class GARMENT_UV_OT_profiling_reset(Operator):
+    bl_idname = "garment_uv.profiling_reset"
+    bl_label = "Reset Profiling"
+
+    def execute(self, context):
+        profiling.reset()
+        _tag_redraw(context)
+        return {"FINISHED"}
+
+
+class GARMENT_UV_OT_profiling_dump(Operator):
+    bl_idname = "garment_uv.profiling_dump"
+    bl_label = "Dump Profiling"
+
+    filepath: StringProperty(subtype="FILE_PATH")
+    format: EnumProperty(
+        name="Format",
+        items=[
+            ("JSON", "JSON", "呼び出し回数・累計・p95 とカウンタ"),
+            ("CHROME", "Chrome Trace", "chrome://tracing や Perfetto で開くトレース"),
+        ],
+        default="JSON",
+    )
+
+    def execute(self, context):
+        del context
+        path = bpy.path.abspath(self.filepath)
+        try:
+            if self.format == "CHROME":
+                profiling.dump_chrome_trace(path)
+            else:
+                profiling.dump_json(path)
+        except OSError as exc:
+            self.report({"ERROR"}, f"Failed to write profile: {exc}")
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Wrote profile to {path}")
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        del event
+        if not self.filepath:
+            suffix = ".trace.json" if self.format == "CHROME" else ".json"
+            self.filepath = bpy.path.abspath(f"//garment_uv_profile{suffix}")
         context.window_manager.fileselect_add(self)
         return {"RUNNING_MODAL"}
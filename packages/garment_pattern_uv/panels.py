@@ -1,6 +1,15 @@
-import bpy
+import fnmatch
+
+import numpy as np
+from bpy.props import BoolProperty
 from bpy.types import Panel, UIList
 
+from .core import profiling
+from .core.membership import cached_membership
+from .core.topology import cached_topology
+from .export_job import current_job
+
+
 class GARMENT_UV_UL_part_list(UIList):
     """パーツ一覧の UIList。"""
 
@@ -10,26 +19,93 @@ class GARMENT_UV_UL_part_list(UIList):
         layout.prop(item, "name", text="", emboss=False)
 
 
+def _filter_seams(seams, pattern, selected_only, sort_alpha, bitflag):
+    """UIList.filter_items の戻り値（表示フラグ, 並び順）を作る。
+
+    pattern は Blender の既定と同じく前後に * を付けた大文字小文字を区別しない
+    ワイルドカード。反転と逆順は Blender 側で適用される。
+    """
+    names = [seam.name for seam in seams]
+    flags = [bitflag] * len(names)
+    if pattern:
+        pattern = f"*{pattern.lower()}*"
+        flags = [
+            flag if fnmatch.fnmatchcase(name.lower(), pattern) else 0
+            for flag, name in zip(flags, names)
+        ]
+    if selected_only:
+        selected = np.zeros(len(names), dtype=bool)
+        seams.foreach_get("is_selected", selected)
+        flags = [flag if keep else 0 for flag, keep in zip(flags, selected.tolist())]
+    order = []
+    if sort_alpha:
+        order = [0] * len(names)
+        by_name = sorted(range(len(names)), key=lambda index: names[index].lower())
+        for position, index in enumerate(by_name):
+            order[index] = position
+    return flags, order
+
+
 class GARMENT_UV_UL_seam_list(UIList):
-    """シーム一覧の UIList。"""
+    """シーム一覧の UIList。
+
+    template_list は見えている行だけ draw_item を呼ぶので、1 行はチェックボックス
+    1 つ（名前をクリックしても切り替わる）にとどめる。数百本のシームは名前・
+    選択中のみで絞り込む。
+    """
+
+    use_filter_selected: BoolProperty(
+        name="選択中のみ", description="選択中のシームだけを表示する", default=False
+    )
 
     def draw_item(
-        self, _context, layout, data, item, _icon, _active_data, _active_propname
+        self, _context, layout, _data, item, _icon, _active_data, _active_propname
     ):
-        row = layout.row()
-        row.alignment = "LEFT"
-        row.prop(item, "is_selected", text="")
-
-        name_row = row.row()
-        name_row.alignment = "LEFT"
-        op = name_row.operator(
-            "garment_uv.toggle_seam_selection",
-            text=item.name,
-            emboss=False,
-            depress=item.is_selected,
+        layout.prop(item, "is_selected", text=item.name)
+
+    def draw_filter(self, _context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon="ARROW_LEFTRIGHT")
+        row.prop(self, "use_filter_selected", text="", icon="CHECKBOX_HLT")
+        row.prop(self, "use_filter_sort_alpha", text="", icon="SORTALPHA")
+        icon = "SORT_DESC" if self.use_filter_sort_reverse else "SORT_ASC"
+        row.prop(self, "use_filter_sort_reverse", text="", icon=icon)
+
+    def filter_items(self, _context, data, propname):
+        return _filter_seams(
+            getattr(data, propname),
+            self.filter_name,
+            self.use_filter_selected,
+            self.use_filter_sort_alpha,
+            self.bitflag_filter_item,
         )
-        op.part_name = getattr(data, "name", "")
-        op.seam_name = item.name
+
+
+def _draw_seam_shape(layout, context, seam_name):
+    """アクティブメッシュ上のシームの長さと折れ線の数を表示する。
+
+    描画からは頂点グループも辺も読まない。ウェイトペイントやスカルプトでは
+    形状の更新ごとにキャッシュが捨てられるので、キャッシュが無ければ
+    「未計算」とし、計算はボタン（garment_uv.compute_seam_shape）から行う。
+    編集モード中は表示しない。
+    """
+    obj = getattr(context, "active_object", None)
+    if obj is None or obj.type != "MESH" or obj.mode == "EDIT":
+        return
+    if seam_name not in obj.vertex_groups:
+        return
+    membership = cached_membership(obj)
+    topology = cached_topology(obj)
+    if membership is None or topology is None:
+        row = layout.row()
+        row.label(text="形状: 未計算")
+        row.operator("garment_uv.compute_seam_shape", text="計算", icon="FILE_REFRESH")
+        return
+    shape = topology.seam(membership, seam_name)
+    layout.label(
+        text=f"長さ: {shape.length:.3f}  辺: {shape.edge_count}  折れ線: {len(shape.polylines)}"
+    )
 
 
 class GARMENT_UV_PT_sidebar(Panel):
@@ -102,13 +178,65 @@ class GARMENT_UV_PT_sidebar(Panel):
                 if part.seams and 0 <= part.active_seam_index < len(part.seams):
                     seam = part.seams[part.active_seam_index]
                     seam_col.prop(seam, "seam_reasoning", text="シーム理由")
+                    _draw_seam_shape(seam_col, context, seam.name)
                 else:
                     seam_col.label(text="シームを選択してください。")
             else:
                 box.label(text="パーツを選択するとシームを編集できます。")
 
         export_box = layout.box()
-        export_box.label(text="エクスポート")
-        export_box.operator("garment_uv.export_json", icon="EXPORT")
+        export_box.label(text="インポート／エクスポート")
+        export_box.operator("garment_uv.import_json", icon="IMPORT")
+        row = export_box.row(align=True)
+        row.operator("garment_uv.export_json", icon="EXPORT")
+        row.operator(
+            "garment_uv.export_json", text="シーン全体", icon="SCENE_DATA"
+        ).scope = "SCENE"
+        row = export_box.row(align=True)
+        row.operator("garment_uv.export_jsonl", icon="FILE_BLEND")
+        row.operator("garment_uv.export_columnar", text="列指向", icon="FILE_CACHE")
+        job = current_job()
+        if job is not None:
+            row = export_box.row(align=True)
+            row.progress(factor=job.progress, type="BAR", text=job.stage)
+            row.operator("garment_uv.cancel_export", text="", icon="CANCEL")
         if props.last_error:
             export_box.label(text=props.last_error, icon="ERROR")
+
+
+class GARMENT_UV_PT_profiling(Panel):
+    """計測結果を表示するサブパネル。"""
+
+    bl_label = "計測"
+    bl_idname = "GARMENT_UV_PT_profiling"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Garment UV"
+    bl_parent_id = "GARMENT_UV_PT_sidebar"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(context.window_manager, "garment_uv_profiling")
+
+        result = profiling.snapshot()
+        if not result["stats"] and not result["counters"]:
+            layout.label(text="計測データはありません。")
+        else:
+            grid = layout.grid_flow(row_major=True, columns=4, even_columns=False)
+            for text in ("名前", "回数", "累計 ms", "p95 ms"):
+                grid.label(text=text)
+            for stat in result["stats"]:
+                grid.label(text=stat["name"])
+                grid.label(text=str(stat["calls"]))
+                grid.label(text=f"{stat['total_ms']:.1f}")
+                grid.label(text=f"{stat['p95_ms']:.2f}")
+
+            col = layout.column(align=True)
+            for name, value in result["counters"].items():
+                col.label(text=f"{name}: {value}")
+
+        row = layout.row(align=True)
+        row.operator("garment_uv.profiling_reset", icon="X")
+        row.operator("garment_uv.profiling_dump", text="JSON").format = "JSON"
+        row.operator("garment_uv.profiling_dump", text="Chrome Trace").format = "CHROME"
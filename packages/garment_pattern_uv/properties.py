@@ -1,4 +1,5 @@
 import bpy
+import numpy as np
 from bpy.props import (
     BoolProperty,
     CollectionProperty,
@@ -10,13 +11,34 @@ from bpy.props import (
 from bpy.types import PropertyGroup
 
 from .constants import _garment_type_items
-from .mesh_sync import _depsgraph_sync_handler
+from .core import profiling
+from .export_job import _export_job_load_post
+from .item_index import locate_seam
+from .mesh_sync import (
+    _cancel_pending_sync,
+    _depsgraph_sync_handler,
+    _load_post_handler,
+)
+from .reasoning_text import (
+    _reasoning_load_post,
+    _reasoning_save_pre,
+    get_reasoning_value,
+    set_reasoning_value,
+)
 
 
 def _on_active_seam_index_changed(self, _context):
     """When list selection changes, keep the selected seam in sync."""
     if 0 <= self.active_seam_index < len(self.seams):
-        self.seams[self.active_seam_index].is_selected = True
+        seam = self.seams[self.active_seam_index]
+        if not seam.is_selected:
+            seam.is_selected = True
+
+
+def _first_selected_seam(part):
+    selected = np.zeros(len(part.seams), dtype=bool)
+    part.seams.foreach_get("is_selected", selected)
+    return int(selected.argmax()) if selected.any() else -1
 
 
 def _on_seam_selected(self, context):
@@ -25,28 +47,49 @@ def _on_seam_selected(self, context):
     props = getattr(props, "garment_uv", None)
     if props is None:
         return
+    location = locate_seam(props, self)
+    if location is None:
+        return
+
+    part_index, seam_index = location
+    part = props.parts[part_index]
+    if self.is_selected:
+        # 同じ値の代入でも update が走り、互いの update を呼び合うため比較する。
+        if part.active_seam_index != seam_index:
+            part.active_seam_index = seam_index
+        if props.active_part_index != part_index:
+            props.active_part_index = part_index
+    elif part.active_seam_index == seam_index:
+        part.active_seam_index = _first_selected_seam(part)
+
 
-    for part_index, part in enumerate(props.parts):
-        for seam_index, seam in enumerate(part.seams):
-            if seam is self:
-                if self.is_selected:
-                    part.active_seam_index = seam_index
-                    props.active_part_index = part_index
-                else:
-                    if part.active_seam_index == seam_index:
-                        next_active = next(
-                            (i for i, s in enumerate(part.seams) if s.is_selected),
-                            -1,
-                        )
-                        part.active_seam_index = next_active
-                return
+def _on_profiling_toggled(self, _context):
+    profiling.enable(self.garment_uv_profiling)
+
+
+def _reasoning_property(field, name):
+    """reasoning_store を介して読み書きする文字列プロパティ（値は .blend に直接持たない）。"""
+    return StringProperty(
+        name=name,
+        get=lambda self: get_reasoning_value(self, field),
+        set=lambda self, value: set_reasoning_value(self, field, value),
+    )
+
+
+class GarmentReasoningBlob(PropertyGroup):
+    """理由テキスト 1 件。name は内容のハッシュ。"""
+
+    name: StringProperty(name="Key")
+    value: StringProperty(name="Value")
 
 
 class GarmentSeamItem(PropertyGroup):
     """シーム 1 本のアノテーション。"""
 
     name: StringProperty(name="Name")
-    seam_reasoning: StringProperty(name="シーム理由")
+    seam_reasoning: _reasoning_property("seam_reasoning", "シーム理由")
+    seam_reasoning_ref: StringProperty(name="Seam Reasoning Key")
+    # 以前の形式（移行前のファイルを読むためだけに残す）
     seam_reasoning_text: PointerProperty(type=bpy.types.Text, name="Seam Reasoning Text")
     is_selected: BoolProperty(name="Selected", default=False, update=_on_seam_selected)
 
@@ -56,11 +99,14 @@ class GarmentPartItem(PropertyGroup):
 
     name: StringProperty(name="Name")
     label: StringProperty(name="ラベル")
-    modeling_reasoning: StringProperty(name="形状理由")
+    modeling_reasoning: _reasoning_property("modeling_reasoning", "形状理由")
+    modeling_reasoning_ref: StringProperty(name="Modeling Reasoning Key")
+    uv_reasoning: _reasoning_property("uv_reasoning", "UV理由")
+    uv_reasoning_ref: StringProperty(name="UV Reasoning Key")
+    # 以前の形式（移行前のファイルを読むためだけに残す）
     modeling_reasoning_text: PointerProperty(
         type=bpy.types.Text, name="Modeling Reasoning Text"
     )
-    uv_reasoning: StringProperty(name="UV理由")
     uv_reasoning_text: PointerProperty(type=bpy.types.Text, name="UV Reasoning Text")
     seams: CollectionProperty(type=GarmentSeamItem)
     active_seam_index: IntProperty(default=-1, update=_on_active_seam_index_changed)
@@ -74,9 +120,13 @@ class GarmentAnnotationProperties(PropertyGroup):
         name="Garment Type",
         items=_garment_type_items,
     )
-    design_reasoning: StringProperty(name="形状理由")
+    design_reasoning: _reasoning_property("design_reasoning", "形状理由")
+    design_reasoning_ref: StringProperty(name="Design Reasoning Key")
+    # 以前の形式（移行前のファイルを読むためだけに残す）
     design_reasoning_text: PointerProperty(type=bpy.types.Text, name="Design Reasoning Text")
     parts: CollectionProperty(type=GarmentPartItem)
+    # 理由テキストの実体（内容のハッシュ → 文字列）。パーツ間で同じ文は 1 つにまとまる。
+    reasoning_store: CollectionProperty(type=GarmentReasoningBlob)
     active_part_index: IntProperty(default=-1)
     last_sync_signature: StringProperty(name="Last Sync Signature", default="")
     last_error: StringProperty(name="エラー")
@@ -91,11 +141,35 @@ def register():
     bpy.types.Scene.garment_uv = bpy.props.PointerProperty(
         type=GarmentAnnotationProperties
     )
+    # 計測はセッション単位のオプトインなので、.blend に保存されない WindowManager に置く。
+    bpy.types.WindowManager.garment_uv_profiling = BoolProperty(
+        name="計測を有効にする",
+        default=profiling.is_enabled(),
+        update=_on_profiling_toggled,
+    )
     if _depsgraph_sync_handler not in bpy.app.handlers.depsgraph_update_post:
         bpy.app.handlers.depsgraph_update_post.append(_depsgraph_sync_handler)
+    if _load_post_handler not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_load_post_handler)
+    if _reasoning_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_reasoning_load_post)
+    if _export_job_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_export_job_load_post)
+    if _reasoning_save_pre not in bpy.app.handlers.save_pre:
+        bpy.app.handlers.save_pre.append(_reasoning_save_pre)
 
 
 def unregister():
     del bpy.types.Scene.garment_uv
+    del bpy.types.WindowManager.garment_uv_profiling
     if _depsgraph_sync_handler in bpy.app.handlers.depsgraph_update_post:
         bpy.app.handlers.depsgraph_update_post.remove(_depsgraph_sync_handler)
+    if _load_post_handler in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_load_post_handler)
+    if _reasoning_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_reasoning_load_post)
+    if _export_job_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_export_job_load_post)
+    if _reasoning_save_pre in bpy.app.handlers.save_pre:
+        bpy.app.handlers.save_pre.remove(_reasoning_save_pre)
+    _cancel_pending_sync()
@@ -1,113 +1,173 @@
-import re
-import textwrap
+"""理由テキストの読み書き。
 
-import bpy
+理由はシームやパーツごとには持たず、アノテーションの reasoning_store に内容の
+ハッシュをキーとして 1 つずつ置く。パーツやシームは ``<field>_ref`` にキーだけを
+持ち、``<field>`` は get/set でストアを介して読み書きする仮想プロパティになる。
+キー → 文字列の対応は変わらないので、読み出しは LRU キャッシュで済ませる。
 
+以前の形式（文字列プロパティと ``gpuv.*`` の Text に二重に保存）は
+migrate_reasoning でストアへ移す。移行と Text の削除は読み込み後と保存前の
+ハンドラだけで行い、プロパティの set からは ID データを消さない。
+"""
 
-def _sanitize_token(value: str) -> str:
-    token = re.sub(r"[^0-9A-Za-z_.-]+", "_", (value or "").strip())
-    token = token.strip("._-")
-    return token or "unnamed"
-
-
-def reasoning_text_name(scope: str, name: str, field: str) -> str:
-    return (
-        f"gpuv.{_sanitize_token(scope)}."
-        f"{_sanitize_token(name)}."
-        f"{_sanitize_token(field)}"
-    )
-
-
-def _valid_text(text):
-    return isinstance(text, bpy.types.Text) and bpy.data.texts.get(text.name) is not None
-
-
-def ensure_reasoning_text(
-    owner,
-    pointer_prop: str,
-    legacy_prop: str,
-    scope: str,
-    name: str,
-    field: str,
-):
-    text = getattr(owner, pointer_prop, None)
-    if _valid_text(text):
-        return text
-
-    text_name = reasoning_text_name(scope, name, field)
-    text = bpy.data.texts.get(text_name)
-    if text is None:
-        text = bpy.data.texts.new(text_name)
-
-    legacy_value = getattr(owner, legacy_prop, "")
-    if legacy_value and not text.as_string():
-        text.clear()
-        text.write(legacy_value)
-
-    setattr(owner, pointer_prop, text)
-    return text
-
-
-def get_reasoning_value(
-    owner,
-    pointer_prop: str,
-    legacy_prop: str,
-    scope: str,
-    name: str,
-    field: str,
-    assign_missing: bool = True,
-):
-    text = getattr(owner, pointer_prop, None)
-    if _valid_text(text):
-        value = text.as_string()
-        if assign_missing and getattr(owner, legacy_prop, "") != value:
-            setattr(owner, legacy_prop, value)
-        return value
-
-    legacy_value = getattr(owner, legacy_prop, "")
-    if legacy_value and assign_missing:
-        migrated = ensure_reasoning_text(
-            owner, pointer_prop, legacy_prop, scope, name, field
-        )
-        return migrated.as_string()
-    return legacy_value
-
-
-def set_reasoning_value(
-    owner,
-    pointer_prop: str,
-    legacy_prop: str,
-    scope: str,
-    name: str,
-    field: str,
-    value: str,
-):
-    text = ensure_reasoning_text(owner, pointer_prop, legacy_prop, scope, name, field)
-    text.clear()
-    text.write(value)
-    setattr(owner, legacy_prop, value)
-    return text
-
-
-def build_preview_lines(value: str, width: int = 56, max_lines: int = 8):
-    if not value:
-        return ["(empty)"]
+import bpy
 
-    lines = []
-    for raw_line in value.splitlines() or [""]:
-        if raw_line == "":
-            lines.append("")
+from .core.profiling import count
+from .core.reasoning import build_preview_lines, reasoning_text_name
+from .core.reasoning_store import LRUCache, content_key
+
+__all__ = (
+    "build_preview_lines",
+    "collect_reasoning_garbage",
+    "get_reasoning_value",
+    "iter_reasoning_fields",
+    "migrate_reasoning",
+    "reasoning_store",
+    "reasoning_text_name",
+    "resolve_reasoning",
+    "set_reasoning_value",
+)
+
+_REF_SUFFIX = "_ref"
+_TEXT_SUFFIX = "_text"
+_LEGACY_TEXT_PREFIX = "gpuv."
+# 以前の形式の値が残ったまま空にしたことを表す参照。ストアには置かないので
+# 空文字として読まれ、移行のときに "" へ戻す。
+_CLEARED_REF = "-"
+
+# キー → 文字列。内容で決まるキーなので、どのシーンのストアから読んでも同じ値になる。
+_VALUES = LRUCache()
+
+
+def reasoning_store(owner):
+    """owner（アノテーションかその下のパーツ・シーム）が参照する格納先。"""
+    return owner.id_data.garment_uv.reasoning_store
+
+
+def iter_reasoning_fields(props):
+    """(持ち主, フィールド名) をアノテーション全体について列挙する。"""
+    yield props, "design_reasoning"
+    for part in props.parts:
+        yield part, "modeling_reasoning"
+        yield part, "uv_reasoning"
+        for seam in part.seams:
+            yield seam, "seam_reasoning"
+
+
+def resolve_reasoning(store, key):
+    """キーに対応する文字列。ストアに無ければ空文字。"""
+    if not key:
+        return ""
+    value = _VALUES.get(key)
+    if value is None:
+        count("reasoning.store_lookup")
+        blob = store.get(key)
+        value = blob.value if blob is not None else ""
+        _VALUES.put(key, value)
+    return value
+
+
+def _intern(store, value):
+    """value をストアに 1 つだけ置き、そのキーを返す。空文字は置かない。"""
+    if not value:
+        return ""
+    key = content_key(value)
+    if store.get(key) is None:
+        blob = store.add()
+        blob.name = key
+        blob.value = value
+    _VALUES.put(key, value)
+    return key
+
+
+def _legacy_text(owner, field):
+    text = getattr(owner, field + _TEXT_SUFFIX, None)
+    return text if isinstance(text, bpy.types.Text) else None
+
+
+def _has_legacy(owner, field):
+    return _legacy_text(owner, field) is not None or field in owner.keys()
+
+
+def _legacy_value(owner, field):
+    """移行前の値（Text があればその内容、無ければ文字列プロパティの保存値）。"""
+    text = _legacy_text(owner, field)
+    if text is not None:
+        return text.as_string()
+    value = owner.get(field)
+    return value if isinstance(value, str) else ""
+
+
+def _drop_legacy(owner, field):
+    text = _legacy_text(owner, field)
+    if text is not None:
+        setattr(owner, field + _TEXT_SUFFIX, None)
+        if text.name.startswith(_LEGACY_TEXT_PREFIX) and text.users == 0:
+            bpy.data.texts.remove(text)
+    if field in owner.keys():
+        del owner[field]
+
+
+def get_reasoning_value(owner, field):
+    key = getattr(owner, field + _REF_SUFFIX)
+    if key:
+        return resolve_reasoning(reasoning_store(owner), key)
+    return _legacy_value(owner, field)
+
+
+def set_reasoning_value(owner, field, value):
+    """value をストアに置いて参照を付け替える。以前の形式の値には触れない。"""
+    key = _intern(reasoning_store(owner), value or "")
+    if not key and _has_legacy(owner, field):
+        # 参照が空だと以前の形式の値が読まれてしまう
+        key = _CLEARED_REF
+    ref_prop = field + _REF_SUFFIX
+    # update を持つプロパティは同値の代入でも走るので比較してから書く。
+    if getattr(owner, ref_prop) != key:
+        setattr(owner, ref_prop, key)
+
+
+def migrate_reasoning(props):
+    """文字列プロパティと Text に二重に持っていた理由をストアへ移し、以前の形式の
+    値と Text を消す。移した数を返す。"""
+    migrated = 0
+    for owner, field in iter_reasoning_fields(props):
+        if not _has_legacy(owner, field):
             continue
-        lines.extend(
-            textwrap.wrap(
-                raw_line,
-                width=width,
-                replace_whitespace=False,
-                drop_whitespace=False,
-            )
-            or [""]
-        )
-
-    if len(lines) > max_lines:
-        lines = lines[: max_lines - 1] + ["..."]
-    return lines
+        ref_prop = field + _REF_SUFFIX
+        if not getattr(owner, ref_prop):
+            key = _intern(reasoning_store(owner), _legacy_value(owner, field))
+            setattr(owner, ref_prop, key)
+            migrated += 1
+        _drop_legacy(owner, field)
+        if getattr(owner, ref_prop) == _CLEARED_REF:
+            setattr(owner, ref_prop, "")
+    return migrated
+
+
+def collect_reasoning_garbage(props):
+    """どこからも参照されないストアの要素を消す。消した数を返す。"""
+    referenced = {
+        getattr(owner, field + _REF_SUFFIX) for owner, field in iter_reasoning_fields(props)
+    }
+    store = props.reasoning_store
+    removed = 0
+    for index in range(len(store) - 1, -1, -1):
+        if store[index].name not in referenced:
+            store.remove(index)
+            removed += 1
+    return removed
+
+
+@bpy.app.handlers.persistent
+def _reasoning_load_post(*_args):
+    for scene in bpy.data.scenes:
+        migrate_reasoning(scene.garment_uv)
+
+
+@bpy.app.handlers.persistent
+def _reasoning_save_pre(*_args):
+    # アドオンを後から有効にしたファイルは読み込み後の移行を経ていない
+    for scene in bpy.data.scenes:
+        migrate_reasoning(scene.garment_uv)
+        collect_reasoning_garbage(scene.garment_uv)
@@ -0,0 +1,259 @@
+"""schema/annotations.schema.json から検証用の Python モジュールを生成する。
+
+    python scripts/compile_schema.py          # core/annotation_schema.py を書き直す
+    python scripts/compile_schema.py --check  # 生成物が最新でなければ終了コード 1
+
+汎用の JSON Schema 検証器を毎回走らせる代わりに、スキーマを isinstance と
+キー集合の比較だけの直線的なコードに展開しておく。対応するのはこのスキーマで
+使っているキーワード（type / properties / additionalProperties / required /
+items / $ref）だけで、それ以外が出てきたら生成を止める。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_PATH = os.path.join(ROOT, "schema", "annotations.schema.json")
+OUTPUT_PATH = os.path.join(
+    ROOT, "packages", "garment_pattern_uv", "core", "annotation_schema.py"
+)
+
+SUPPORTED_KEYWORDS = {
+    "$schema",
+    "$id",
+    "$defs",
+    "$ref",
+    "title",
+    "description",
+    "type",
+    "properties",
+    "additionalProperties",
+    "required",
+    "items",
+}
+
+# JSON Schema の type → (isinstance の引数, エラーメッセージでの呼び名)
+TYPE_CHECKS = {
+    "string": ("str", "文字列"),
+    "object": ("dict", "オブジェクト"),
+    "array": ("list", "配列"),
+    "boolean": ("bool", "真偽値"),
+    "number": ("(int, float)", "数値"),
+    "integer": ("int", "整数"),
+}
+
+
+class _Compiler:
+    def __init__(self, schema):
+        self.schema = schema
+        self.functions = []
+        self.constants = []
+
+    def _check_keywords(self, node, where):
+        unknown = set(node) - SUPPORTED_KEYWORDS
+        if unknown:
+            raise ValueError(f"{where}: unsupported keywords {sorted(unknown)}")
+
+    def _resolve(self, node):
+        ref = node.get("$ref")
+        if ref is None:
+            return None
+        prefix = "#/$defs/"
+        if not ref.startswith(prefix) or ref[len(prefix) :] not in self.schema["$defs"]:
+            raise ValueError(f"unsupported $ref: {ref}")
+        return ref[len(prefix) :]
+
+    def _type_condition(self, node, value, where):
+        type_name = node.get("type")
+        if type_name is None:
+            return None, None
+        if type_name not in TYPE_CHECKS:
+            raise ValueError(f"{where}: unsupported type {type_name!r}")
+        python_type, label = TYPE_CHECKS[type_name]
+        condition = f"not isinstance({value}, {python_type})"
+        if type_name in ("number", "integer"):
+            condition = f"({condition} or isinstance({value}, bool))"
+        return condition, label
+
+    def _body(self, node, value, path, indent, where, nested=False):
+        """node を検証する行を返す（value/path は生成コード上の式）。
+
+        関数の先頭（nested=False）では型が違えば return し、プロパティや要素
+        （nested=True）では else に続けて兄弟の検証を止めないようにする。
+        """
+        self._check_keywords(node, where)
+        pad = " " * indent
+        ref = self._resolve(node)
+        if ref is not None:
+            return [f"{pad}_validate_{ref}({value}, {path}, errors)"]
+
+        condition, label = self._type_condition(node, value, where)
+        if condition is None:
+            return self._children(node, value, path, indent, where)
+        lines = [
+            f"{pad}if {condition}:",
+            f'{pad}    errors.append(_message({path}, "{label}"))',
+        ]
+        if not nested:
+            lines.append(f"{pad}    return")
+            return lines + self._children(node, value, path, indent, where)
+        children = self._children(node, value, path, indent + 4, where)
+        if children:
+            lines.append(f"{pad}else:")
+            lines.extend(children)
+        return lines
+
+    def _children(self, node, value, path, indent, where):
+        pad = " " * indent
+        lines = []
+        if node.get("type") == "object":
+            properties = node.get("properties", {})
+            if node.get("additionalProperties") is False:
+                constant = f"_{where.upper()}_KEYS"
+                self.constants.append(
+                    f"{constant} = frozenset({tuple(sorted(properties))!r})"
+                )
+                lines.append(f"{pad}if not {constant}.issuperset({value}):")
+                lines.append(f"{pad}    for key in sorted({value}.keys() - {constant}):")
+                lines.append(
+                    f"{pad}        errors.append(_unknown_key_message(({path}, key)))"
+                )
+            for key in node.get("required", []):
+                lines.append(f'{pad}if "{key}" not in {value}:')
+                lines.append(
+                    f'{pad}    errors.append(_required_message(({path}, "{key}")))'
+                )
+            for key, child in properties.items():
+                child_value = f"{where}_{key}"
+                child_lines = self._body(
+                    child,
+                    child_value,
+                    f'({path}, "{key}")',
+                    indent + 4,
+                    child_value,
+                    nested=True,
+                )
+                if not child_lines:
+                    continue
+                lines.append(f'{pad}{child_value} = {value}.get("{key}", _MISSING)')
+                lines.append(f"{pad}if {child_value} is not _MISSING:")
+                lines.extend(child_lines)
+        elif node.get("type") == "array" and "items" in node:
+            item, index = f"{where}_item", f"{where}_index"
+            item_lines = self._body(
+                node["items"], item, f"({path}, {index})", indent + 4, item, nested=True
+            )
+            if item_lines:
+                lines.append(f"{pad}for {index}, {item} in enumerate({value}):")
+                lines.extend(item_lines)
+        return lines
+
+    def _function(self, name, node):
+        body = self._body(node, "value", "path", 4, name)
+        return "\n".join(
+            [f"def _validate_{name}(value, path, errors):"] + (body or ["    pass"])
+        )
+
+    def compile(self):
+        self._check_keywords(self.schema, "root")
+        for name, node in self.schema.get("$defs", {}).items():
+            self.functions.append(self._function(name, node))
+        self.functions.append(self._function("root", self.schema))
+        return self.functions, self.constants
+
+
+HEADER = '''"""annotations.schema.json を展開した検証コード。
+
+このファイルは scripts/compile_schema.py が生成する。直接編集せず、
+スキーマを変更したら生成し直すこと。
+"""
+
+SCHEMA_ID = {schema_id!r}
+SCHEMA_SHA256 = {digest!r}
+
+_MISSING = object()
+{constants}
+
+
+def _format_path(path):
+    """(親, キー) の入れ子タプルを parts[0].seams[1].name の形にする。"""
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    text = ""
+    for key in reversed(keys):
+        if isinstance(key, int):
+            text += f"[{{key}}]"
+        else:
+            text += f".{{key}}" if text else key
+    return text
+
+
+def _message(path, label):
+    if path is None:
+        return f"ルートは{{label}}である必要があります。"
+    return f"{{_format_path(path)}} は{{label}}である必要があります。"
+
+
+def _unknown_key_message(path):
+    return f"{{_format_path(path)}} はスキーマに無いキーです。"
+
+
+def _required_message(path):
+    return f"{{_format_path(path)}} は必須です。"
+
+
+'''
+
+FOOTER = '''
+
+def validate(data):
+    """data をスキーマで検証し、エラーメッセージのリストを返す（空なら妥当）。"""
+    errors = []
+    _validate_root(data, None, errors)
+    return errors
+'''
+
+
+def generate(schema_text):
+    schema = json.loads(schema_text)
+    functions, constants = _Compiler(schema).compile()
+    header = HEADER.format(
+        schema_id=schema.get("$id", ""),
+        digest=hashlib.sha256(schema_text.encode("utf-8")).hexdigest(),
+        constants="\n".join(constants),
+    )
+    return header + "\n\n\n".join(functions) + "\n" + FOOTER
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="compile_schema")
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args(argv)
+
+    with open(SCHEMA_PATH, encoding="utf-8") as handle:
+        source = generate(handle.read())
+
+    if args.check:
+        try:
+            with open(OUTPUT_PATH, encoding="utf-8") as handle:
+                current = handle.read()
+        except OSError:
+            current = None
+        if current != source:
+            print(f"{os.path.relpath(OUTPUT_PATH, ROOT)} is out of date", file=sys.stderr)
+            return 1
+        return 0
+
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as handle:
+        handle.write(source)
+    print(f"Wrote {os.path.relpath(OUTPUT_PATH, ROOT)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""書き出したアノテーションを列指向形式（.gpuvc）と JSON / JSONL の間で変換する。
+
+    python scripts/convert_dataset.py to-columnar OUT.gpuvc EXPORT_DIR [...]
+    python scripts/convert_dataset.py to-json IN.gpuvc OUT_DIR              # 1 着 1 ファイル
+    python scripts/convert_dataset.py to-json IN.gpuvc OUT_DIR --jsonl --compression gzip
+    python scripts/convert_dataset.py info IN.gpuvc
+
+EXPORT_DIR には batch_export の出力（.json の並び、または JSONL データセット）を渡す。
+どちらの向きでも schema/annotations.schema.json で各レコードを検証し、通らない
+レコードは飛ばして報告する（終了コード 1）。Blender は要らない。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# アドオン本体（__init__）は bpy を読み込むので、bpy に依存しない core だけを読む。
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "packages", "garment_pattern_uv"))
+
+from core.annotation_schema import SCHEMA_SHA256, validate  # noqa: E402
+from core.columnar import ColumnarDataset, ColumnarWriter  # noqa: E402
+from core.dataset_index import iter_corpus_files, iter_file_records  # noqa: E402
+from core.dataset_writer import ShardedJsonlWriter  # noqa: E402
+
+# JSONL へはこの件数ごとにまとめて書く（書くたびに fsync するため）
+JSONL_BATCH = 1000
+
+
+def _report_invalid(label, errors):
+    print(f"{label}: {errors[0]}" + (f" (+{len(errors) - 1} more)" if len(errors) > 1 else ""),
+          file=sys.stderr)
+
+
+def _to_columnar(args):
+    written = invalid = 0
+    with ColumnarWriter(args.output) as writer:
+        for path in iter_corpus_files(args.paths):
+            for data in iter_file_records(path):
+                errors = validate(data)
+                if errors:
+                    garment_id = data.get("garment_id", "?") if isinstance(data, dict) else "?"
+                    _report_invalid(f"{path}: {garment_id}", errors)
+                    invalid += 1
+                    continue
+                writer.add(data)
+                written += 1
+    print(f"Wrote {written} garments to {args.output} ({invalid} invalid records skipped).")
+    return 1 if invalid else 0
+
+
+def _safe_name(garment_id, row):
+    name = "".join(char if char.isalnum() or char in "-_." else "_" for char in garment_id)
+    return name or f"garment_{row:06d}"
+
+
+def _to_json(args):
+    written = invalid = 0
+    with ColumnarDataset(args.input) as dataset:
+        if dataset.schema_sha256 != SCHEMA_SHA256:
+            print("Warning: the file was written with a different schema version.", file=sys.stderr)
+        records = enumerate(dataset.iter_records())
+        if args.jsonl:
+            compression = None if args.compression == "none" else args.compression
+            with ShardedJsonlWriter(args.output, compression=compression) as writer:
+                batch = []
+                for row, data in records:
+                    errors = validate(data)
+                    if errors:
+                        _report_invalid(f"row {row}", errors)
+                        invalid += 1
+                        continue
+                    batch.append((data["garment_id"] or f"row_{row}", data))
+                    if len(batch) >= JSONL_BATCH:
+                        written += len(writer.write_many(batch))
+                        batch = []
+                written += len(writer.write_many(batch))
+        else:
+            os.makedirs(args.output, exist_ok=True)
+            for row, data in records:
+                errors = validate(data)
+                if errors:
+                    _report_invalid(f"row {row}", errors)
+                    invalid += 1
+                    continue
+                path = os.path.join(args.output, _safe_name(data["garment_id"], row) + ".json")
+                with open(path, "w", encoding="utf-8") as handle:
+                    json.dump(data, handle, ensure_ascii=False, indent=2)
+                    handle.write("\n")
+                written += 1
+    print(f"Wrote {written} garments to {args.output} ({invalid} invalid records skipped).")
+    return 1 if invalid else 0
+
+
+def _info(args):
+    with ColumnarDataset(args.input) as dataset:
+        print(f"{args.input}: {os.path.getsize(args.input) / 1e6:.1f} MB")
+        print(f"  schema {dataset.schema_sha256[:12]}"
+              + ("" if dataset.schema_sha256 == SCHEMA_SHA256 else " (differs from current)"))
+        for name, table in dataset.tables.items():
+            print(f"  {name:<14} {len(table):>10} rows  {', '.join(table.column_names)}")
+    return 0
+
+
+def _parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    to_columnar = commands.add_parser("to-columnar", help="pack JSON / JSONL exports")
+    to_columnar.add_argument("output")
+    to_columnar.add_argument("paths", nargs="+")
+
+    to_json = commands.add_parser("to-json", help="unpack into JSON files or a JSONL dataset")
+    to_json.add_argument("input")
+    to_json.add_argument("output")
+    to_json.add_argument("--jsonl", action="store_true", help="write a sharded JSONL dataset")
+    to_json.add_argument("--compression", choices=("none", "gzip", "zstd"), default="none")
+
+    info = commands.add_parser("info", help="print table sizes and columns")
+    info.add_argument("input")
+    return parser
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    start = time.perf_counter()
+    if args.command == "to-columnar":
+        status = _to_columnar(args)
+    elif args.command == "to-json":
+        status = _to_json(args)
+    else:
+        status = _info(args)
+    print(f"done in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""Headless batch export entry point.
+
+    blender --background --factory-startup --python scripts/garment_uv_batch.py -- \
+        INPUT_DIR OUTPUT_DIR [--workers N]
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "packages"))
+
+from garment_pattern_uv.batch_export import main  # noqa: E402
+
+argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+sys.exit(main(argv, runner=str(Path(__file__).resolve())))
@@ -0,0 +1,140 @@
+"""書き出したアノテーションの索引（SQLite）を作り、問い合わせる。
+
+    python scripts/query_dataset.py build INDEX.sqlite EXPORT_DIR [...]     # 追記分だけ読む
+    python scripts/query_dataset.py garments INDEX.sqlite --type skirt --min-parts 9
+    python scripts/query_dataset.py garments INDEX.sqlite --part-name 'sleeve*'
+    python scripts/query_dataset.py text INDEX.sqlite dart --field seam_reasoning
+    python scripts/query_dataset.py summary INDEX.sqlite
+
+EXPORT_DIR には batch_export の出力（.json の並び、または JSONL データセット）を渡す。
+Blender は要らない。
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+# アドオン本体（__init__）は bpy を読み込むので、bpy に依存しない core だけを読む。
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "packages", "garment_pattern_uv"))
+
+from core.dataset_index import REASONING_FIELDS, DatasetIndex  # noqa: E402
+
+SNIPPET_CHARS = 100
+
+
+def _build(index, args):
+    def progress(path, records):
+        if args.verbose:
+            print(f"{path}: {records} records", file=sys.stderr)
+
+    result = index.add_paths(args.paths, progress)
+    removed = index.optimize()
+    print(
+        f"Indexed {result['records']} records from {result['files']} files"
+        f" ({result['skipped']} unchanged, {result['removed']} missing files dropped,"
+        f" {removed} stale texts removed)."
+    )
+    return 0
+
+
+def _garments(index, args):
+    return index.find_garments(
+        garment_type=args.type,
+        min_parts=args.min_parts,
+        max_parts=args.max_parts,
+        min_seams=args.min_seams,
+        max_seams=args.max_seams,
+        part_name=args.part_name,
+        part_label=args.part_label,
+        limit=args.limit or None,
+    )
+
+
+def _text(index, args):
+    rows = index.search_reasoning(
+        args.query, field=args.field, garment_type=args.type, limit=args.limit or None
+    )
+    if not args.json:
+        for row in rows:
+            body = " ".join(row["text"].split())
+            if len(body) > SNIPPET_CHARS:
+                body = body[: SNIPPET_CHARS - 1] + "…"
+            row["text"] = body
+    return rows
+
+
+def _print_rows(rows, as_json):
+    if as_json:
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+        return
+    for row in rows:
+        print("\t".join("" if value is None else str(value) for value in row.values()))
+
+
+def _parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="index exported annotations")
+    build.add_argument("index")
+    build.add_argument("paths", nargs="+")
+    build.add_argument("--verbose", action="store_true")
+
+    garments = commands.add_parser("garments", help="find garments by type and counts")
+    garments.add_argument("index")
+    garments.add_argument("--type")
+    garments.add_argument("--min-parts", type=int)
+    garments.add_argument("--max-parts", type=int)
+    garments.add_argument("--min-seams", type=int)
+    garments.add_argument("--max-seams", type=int)
+    garments.add_argument("--part-name", help="glob pattern, e.g. 'sleeve*'")
+    garments.add_argument("--part-label")
+
+    text = commands.add_parser("text", help="full-text search over reasoning")
+    text.add_argument("index")
+    text.add_argument("query", help="FTS5 match expression, e.g. 'dart*' or '\"bias cut\"'")
+    text.add_argument("--field", choices=REASONING_FIELDS)
+    text.add_argument("--type")
+
+    summary = commands.add_parser("summary", help="garment counts per type")
+    summary.add_argument("index")
+
+    for command in (garments, text, summary):
+        command.add_argument("--json", action="store_true", help="print one JSON object per line")
+    for command in (garments, text):
+        command.add_argument("--limit", type=int, default=100, help="0 for no limit")
+    return parser
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    if args.command != "build" and not os.path.exists(args.index):
+        print(f"Index not found: {args.index}", file=sys.stderr)
+        return 1
+    with DatasetIndex(args.index) as index:
+        if args.command == "build":
+            return _build(index, args)
+        start = time.perf_counter()
+        if args.command == "garments":
+            rows = _garments(index, args)
+        elif args.command == "text":
+            try:
+                rows = _text(index, args)
+            except sqlite3.OperationalError as exc:
+                print(f"Invalid search query: {exc}", file=sys.stderr)
+                return 1
+        else:
+            rows = index.summary()
+        elapsed = time.perf_counter() - start
+    _print_rows(rows, args.json)
+    print(f"{len(rows)} rows in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
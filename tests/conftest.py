@@ -0,0 +1,42 @@
+"""テスト共通の初期化。Blender の外では benchmarks/fake_bpy を bpy として読み込む。
+
+ベンチマークと同じ _harness でアドオンを登録するので、bpy の無い Linux でも
+``python -m pytest`` だけで動く。時間を測るテストは pytest-benchmark の
+benchmark フィクスチャを使う（``--benchmark-skip`` で飛ばせる）。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS = Path(__file__).resolve().parents[1] / "benchmarks"
+if str(BENCHMARKS) not in sys.path:
+    sys.path.insert(0, str(BENCHMARKS))
+
+import _harness  # noqa: E402
+
+_BPY = _harness.setup()
+
+import synthetic  # noqa: E402
+from garment_pattern_uv.core.membership import set_memory_limit  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def bpy():
+    return _BPY
+
+
+@pytest.fixture
+def garment(bpy):
+    """小さな合成衣服 (obj, 期待するシーム割り当て)。"""
+    spec = synthetic.GarmentSpec("test_garment", 6_000, 6, 4, 12, 0.5, seed=7)
+    obj, expected = synthetic.build_garment(bpy, spec)
+    yield obj, expected
+    synthetic.remove_garment(bpy, obj)
+
+
+@pytest.fixture
+def restore_memory_limit():
+    yield
+    set_memory_limit()
@@ -0,0 +1,96 @@
+"""スキーマから生成した検証コード（core/annotation_schema.py）。"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from garment_pattern_uv.core.annotation import validate_data_dict
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _valid():
+    return {
+        "garment_id": "shirt_001",
+        "garment_type": "shirt",
+        "design_reasoning": "身頃と袖を分ける",
+        "parts": [
+            {
+                "name": "part_front",
+                "label": "前身頃",
+                "modeling_reasoning": "",
+                "uv_reasoning": "",
+                "uv_metrics": {
+                    "polygon_count": 10,
+                    "island_count": 1,
+                    "area_3d": 1.0,
+                    "area_uv": 0.5,
+                    "uv_scale": 0.7,
+                    "area_distortion": 0.0,
+                    "angle_distortion": 0.0,
+                    "packing_ratio": 0.5,
+                },
+                "seams": [{"name": "seam_side", "seam_reasoning": "脇"}],
+                "geometry": [
+                    {
+                        "object": "Shirt",
+                        "vertices": {"offset": 0, "dtype": "<i4", "shape": [3]},
+                        "positions": {"offset": 64, "dtype": "<f4", "shape": [3, 3]},
+                    }
+                ],
+            }
+        ],
+        "geometry": {"file": "shirt_001.gpuvg", "size": 128},
+    }
+
+
+def test_valid_annotation_has_no_errors():
+    assert validate_data_dict(_valid()) == []
+    assert validate_data_dict({"garment_id": "", "parts": []}) == []
+
+
+def test_errors_name_the_offending_path():
+    data = _valid()
+    data["parts"][0]["seams"][0]["seam_reasoning"] = 3
+    data["parts"][0]["label"] = None
+    errors = validate_data_dict(data)
+    assert len(errors) == 2
+    assert any(error.startswith("parts[0].label ") for error in errors)
+    assert any(error.startswith("parts[0].seams[0].seam_reasoning ") for error in errors)
+
+
+def test_unknown_keys_and_wrong_containers_are_reported():
+    data = _valid()
+    data["extra"] = 1
+    data["parts"][0]["seams"] = {}
+    errors = validate_data_dict(data)
+    assert len(errors) == 2
+    assert any("extra" in error for error in errors)
+    assert any(error.startswith("parts[0].seams ") for error in errors)
+
+
+def test_root_must_be_an_object():
+    assert validate_data_dict([]) == ["ルートはオブジェクトである必要があります。"]
+
+
+def test_array_refs_are_checked():
+    data = _valid()
+    data["parts"][0]["geometry"][0]["vertices"] = {"offset": "0", "dtype": "<i4", "shape": [3]}
+    data["parts"][0]["geometry"][0]["positions"]["shape"] = [3, 1.5]
+    # bool は整数として扱わない
+    data["geometry"]["size"] = True
+    errors = validate_data_dict(data)
+    assert len(errors) == 3
+    assert any(error.startswith("parts[0].geometry[0].vertices.offset ") for error in errors)
+    assert any(error.startswith("parts[0].geometry[0].positions.shape[1] ") for error in errors)
+    assert any(error.startswith("geometry.size ") for error in errors)
+
+
+def test_generated_validator_is_up_to_date():
+    result = subprocess.run(
+        [sys.executable, str(ROOT / "scripts" / "compile_schema.py"), "--check"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,126 @@
+"""pytest-benchmark で時間を測るケース。``--benchmark-skip`` で飛ばし、
+``--benchmark-only`` でこれだけを走らせる。
+
+大きさは CI で数十秒に収まる 10 万頂点にとどめる。100 万頂点までの比較や
+旧実装との比較は benchmarks/ のスクリプトで行う。
+"""
+
+import pytest
+
+import synthetic
+from garment_pattern_uv.core.columnar import ColumnarDataset, write_columnar
+from garment_pattern_uv.core.membership import (
+    MIN_CHUNK_VERTICES,
+    READ_BYTES_PER_VERTEX,
+    GroupMembership,
+    _read_group_chunks,
+    invalidate_membership,
+    memory_limit,
+)
+from garment_pattern_uv.core.seams import seams_by_incidence
+from garment_pattern_uv.core.topology import MeshTopology, invalidate_topology
+from garment_pattern_uv.core.uv_metrics import invalidate_uv_mesh
+from garment_pattern_uv.data_io import _export_model_for_objects, _validate_data_dict
+from garment_pattern_uv.mesh_sync import _split_group_names
+
+SPEC = synthetic.GarmentSpec("bench_100k", 100_000, 20, 6, 48, 0.5, seed=1)
+ROUNDS = 3
+
+
+@pytest.fixture(scope="module")
+def large_garment(bpy):
+    obj, expected = synthetic.build_garment(bpy, SPEC)
+    scene = bpy.context.scene
+    scene.collection.objects.link(obj)
+    yield obj, expected
+    scene.collection.objects.unlink(obj)
+    synthetic.remove_garment(bpy, obj)
+
+
+def _pedantic(benchmark, fn, setup=None):
+    return benchmark.pedantic(fn, setup=setup, rounds=ROUNDS, iterations=1)
+
+
+@pytest.mark.benchmark(group="membership")
+def test_membership_read(benchmark, large_garment):
+    obj, _ = large_garment
+    chunk_vertices = max(MIN_CHUNK_VERTICES, memory_limit() // READ_BYTES_PER_VERTEX)
+    chunks = _pedantic(
+        benchmark, lambda: list(_read_group_chunks(obj.data, chunk_vertices))
+    )
+    assert sum(vertices.size for vertices, _ in chunks) > 0
+
+
+@pytest.mark.benchmark(group="membership")
+def test_membership_build(benchmark, large_garment):
+    obj, _ = large_garment
+    names = [group.name for group in obj.vertex_groups]
+    chunks = list(_read_group_chunks(obj.data, MIN_CHUNK_VERTICES))
+    membership = benchmark(
+        GroupMembership.from_chunks, names, chunks, len(obj.data.vertices)
+    )
+    assert list(membership) == names
+
+
+@pytest.mark.benchmark(group="seams")
+def test_edge_adjacency_cold(benchmark, large_garment):
+    obj, expected = large_garment
+    membership = GroupMembership.from_object(obj)
+    part_names, seam_names = _split_group_names(obj)
+    topology = MeshTopology.from_mesh(obj.data)
+
+    def assign():
+        topology._adjacency.clear()
+        return seams_by_incidence(membership, part_names, seam_names, topology)
+
+    assert benchmark(assign) == expected
+
+
+@pytest.mark.benchmark(group="export")
+def test_export_model_cold(benchmark, bpy, large_garment):
+    obj, _ = large_garment
+    props = bpy.context.scene.garment_uv
+    synthetic.fill_annotation(props, obj, SPEC)
+
+    def invalidate():
+        invalidate_membership()
+        invalidate_topology()
+        invalidate_uv_mesh()
+
+    try:
+        data = _pedantic(
+            benchmark,
+            lambda: _export_model_for_objects(props, [obj]).export_data(),
+            setup=invalidate,
+        )
+    finally:
+        props.parts.clear()
+    assert not _validate_data_dict(data)
+    assert len(data["parts"]) == SPEC.part_count
+
+
+@pytest.mark.benchmark(group="columnar")
+def test_columnar_restore(benchmark, tmp_path):
+    records = [
+        {
+            "garment_id": f"garment_{number:05d}",
+            "garment_type": "skirt",
+            "design_reasoning": "理由" * 20,
+            "parts": [
+                {
+                    "name": f"part_{index}",
+                    "label": f"label_{index}",
+                    "modeling_reasoning": "",
+                    "uv_reasoning": "",
+                    "seams": [{"name": f"seam_{index}", "seam_reasoning": "縫い代"}],
+                }
+                for index in range(8)
+            ],
+        }
+        for number in range(5_000)
+    ]
+    path = tmp_path / "annotations.gpuvc"
+    write_columnar(path, records)
+    with ColumnarDataset(path) as dataset:
+        restored = benchmark(lambda: list(dataset))
+    assert restored == records
@@ -0,0 +1,102 @@
+"""列指向形式（.gpuvc）へ書いて読み戻したレコードが元と一致すること。"""
+
+import numpy as np
+import pytest
+
+from garment_pattern_uv.core.columnar import ColumnarDataset, write_columnar
+
+
+def _metrics(seed):
+    return {
+        "polygon_count": 100 + seed,
+        "island_count": 1 + seed % 3,
+        "area_3d": 1.5 * seed,
+        "area_uv": 0.25,
+        "uv_scale": 0.5,
+        "area_distortion": 0.125,
+        "angle_distortion": 0.0625,
+        "packing_ratio": 0.75,
+    }
+
+
+def _garment(number):
+    parts = []
+    for index in range(number % 4):
+        part = {
+            "name": f"part_{index}",
+            "label": ("前身頃", "後身頃", "袖")[index % 3],
+            "modeling_reasoning": f"理由 {number}-{index}",
+            "uv_reasoning": "",
+            "seams": [
+                {"name": f"seam_{index}_{seam}", "seam_reasoning": "縫い代 ✂"}
+                for seam in range(index)
+            ],
+        }
+        if index % 2 == 0:
+            part["uv_metrics"] = _metrics(number + index)
+        parts.append(part)
+    return {
+        "garment_id": f"garment_{number:04d}",
+        "garment_type": ("shirt", "skirt")[number % 2],
+        "design_reasoning": "" if number % 5 else "全体の理由",
+        "parts": parts,
+    }
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    records = [_garment(number) for number in range(50)]
+    vertices = {
+        record["garment_id"]: [
+            ("Body", np.arange(index, index + 5, dtype=np.int32))
+            for index in range(len(record["parts"]))
+        ]
+        for record in records
+    }
+    path = tmp_path / "annotations.gpuvc"
+    written = write_columnar(
+        path,
+        [
+            (
+                record,
+                [
+                    (part["name"], obj, values)
+                    for part, (obj, values) in zip(
+                        record["parts"], vertices[record["garment_id"]]
+                    )
+                ],
+            )
+            for record in records
+        ],
+    )
+    assert written == len(records)
+    with ColumnarDataset(path) as opened:
+        yield opened, records, vertices
+
+
+def test_records_round_trip(dataset):
+    opened, records, _ = dataset
+    assert len(opened) == len(records)
+    assert list(opened) == records
+    assert list(opened.iter_records(batch=7)) == records
+    assert opened.record(13) == records[13]
+    with pytest.raises(IndexError):
+        opened.record(len(records))
+
+
+def test_part_vertices_round_trip(dataset):
+    opened, records, vertices = dataset
+    part_offsets = opened.table("garments")["part_offsets"]
+    for row, record in enumerate(records):
+        expected = vertices[record["garment_id"]]
+        for index, part_row in enumerate(range(part_offsets[row], part_offsets[row + 1])):
+            ((obj, values),) = opened.part_vertices(part_row)
+            assert obj == expected[index][0]
+            np.testing.assert_array_equal(values, expected[index][1])
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_columnar.gpuvc"
+    path.write_bytes(b"{}")
+    with pytest.raises(ValueError):
+        ColumnarDataset(path)
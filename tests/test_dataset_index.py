@@ -0,0 +1,56 @@
+"""索引の差分更新（変わったファイル・消えたファイルの衣服の扱い）。"""
+
+import json
+import os
+
+from garment_pattern_uv.core.dataset_index import DatasetIndex
+
+
+def _write(path, garment_ids, mtime_ns):
+    records = [
+        {
+            "garment_id": garment_id,
+            "garment_type": "skirt",
+            "parts": [{"name": "part_front", "label": "前", "seams": []}],
+        }
+        for garment_id in garment_ids
+    ]
+    path.write_text(json.dumps(records), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _garment_ids(index):
+    return sorted(row["garment_id"] for row in index.find_garments(limit=None))
+
+
+def test_changed_and_missing_sources_drop_their_garments(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    _write(corpus / "a.json", ["g1", "g2"], 1_000_000_000)
+    _write(corpus / "b.json", ["g3"], 1_000_000_000)
+    with DatasetIndex(str(tmp_path / "index.sqlite")) as index:
+        assert index.add_paths([str(corpus)])["records"] == 3
+        assert _garment_ids(index) == ["g1", "g2", "g3"]
+
+        _write(corpus / "a.json", ["g1"], 2_000_000_000)
+        result = index.add_paths([str(corpus)])
+        assert (result["files"], result["skipped"]) == (1, 1)
+        assert _garment_ids(index) == ["g1", "g3"]
+        assert len(index.find_garments(part_label="前", limit=None)) == 2
+
+        (corpus / "b.json").unlink()
+        assert index.add_paths([str(corpus)])["removed"] == 1
+        assert _garment_ids(index) == ["g1"]
+        assert len(index.find_garments(part_label="前", limit=None)) == 1
+
+
+def test_garment_moved_to_another_file_is_kept(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    _write(corpus / "a.json", ["g1", "g2"], 1_000_000_000)
+    with DatasetIndex(str(tmp_path / "index.sqlite")) as index:
+        index.add_paths([str(corpus)])
+        _write(corpus / "a.json", ["g1"], 2_000_000_000)
+        _write(corpus / "b.json", ["g2"], 2_000_000_000)
+        index.add_paths([str(corpus)])
+        assert _garment_ids(index) == ["g1", "g2"]
@@ -0,0 +1,84 @@
+"""シャード付き JSONL ライターの書き込み・再開・中断後の切り捨て。"""
+
+import os
+
+import pytest
+
+from garment_pattern_uv.core.dataset_writer import (
+    INDEX_NAME,
+    ShardedJsonlWriter,
+    iter_shard_records,
+    read_index_entries,
+    read_record,
+)
+
+
+def _record(number):
+    return {"garment_id": f"g{number:03d}", "garment_type": "skirt", "parts": []}
+
+
+def _records(directory):
+    shards = sorted(
+        name for name in os.listdir(directory) if name.startswith("annotations-")
+    )
+    return [
+        record
+        for shard in shards
+        for record in iter_shard_records(os.path.join(directory, shard))
+    ]
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_resume_skips_written_garments_and_sources(tmp_path, compression):
+    with ShardedJsonlWriter(tmp_path, compression=compression) as writer:
+        writer.write_many(
+            [(f"g{n:03d}", _record(n)) for n in range(3)], source="a.blend"
+        )
+    with ShardedJsonlWriter(tmp_path, compression=compression) as writer:
+        assert writer.sources == {"a.blend"}
+        assert "g001" in writer
+        written = writer.write_many(
+            [(f"g{n:03d}", _record(n)) for n in range(2, 5)], source="b.blend"
+        )
+        assert [entry["garment_id"] for entry in written] == ["g003", "g004"]
+    assert [record["garment_id"] for record in _records(tmp_path)] == [
+        f"g{n:03d}" for n in range(5)
+    ]
+    entries = read_index_entries(tmp_path)
+    assert read_record(tmp_path, entries["g004"]) == _record(4)
+
+
+def test_shards_roll_over_at_max_bytes(tmp_path):
+    with ShardedJsonlWriter(tmp_path, max_shard_bytes=200) as writer:
+        for n in range(10):
+            writer.write(f"g{n:03d}", _record(n))
+    shards = {entry["shard"] for entry in read_index_entries(tmp_path).values()}
+    assert len(shards) > 1
+    assert len(_records(tmp_path)) == 10
+
+
+def test_resume_truncates_unindexed_tail(tmp_path):
+    with ShardedJsonlWriter(tmp_path) as writer:
+        entry = writer.write("g000", _record(0), source="a.blend")
+    shard = tmp_path / entry["shard"]
+    index = tmp_path / INDEX_NAME
+    valid_shard = shard.stat().st_size
+    valid_index = index.stat().st_size
+    # index に載る前に中断したレコードと、書きかけの index 行
+    with open(shard, "ab") as handle:
+        handle.write(b'{"garment_id":"g001","garm')
+    with open(index, "ab") as handle:
+        handle.write(b'{"garment_id": "g001", "sha')
+
+    with ShardedJsonlWriter(tmp_path) as writer:
+        assert shard.stat().st_size == valid_shard
+        assert index.stat().st_size == valid_index
+        assert set(writer.entries) == {"g000"}
+        writer.write("g001", _record(1), source="b.blend")
+    assert _records(tmp_path) == [_record(0), _record(1)]
+    assert set(read_index_entries(tmp_path)) == {"g000", "g001"}
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ShardedJsonlWriter(tmp_path, compression="brotli")
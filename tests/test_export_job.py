@@ -0,0 +1,62 @@
+"""バックグラウンドエクスポート（ExportJob）の結果と、読み出し中の変更の検出。"""
+
+import filecmp
+import time
+
+import pytest
+
+import synthetic
+from garment_pattern_uv.core.membership import invalidate_membership
+from garment_pattern_uv.data_io import _props_to_dict_for_objects, _write_json
+from garment_pattern_uv.export_job import ExportJob
+from garment_pattern_uv.mesh_sync import _geometry_changed
+
+
+@pytest.fixture
+def annotated(bpy):
+    spec = synthetic.GarmentSpec("job_garment", 40_000, 6, 3, 16, 0.5, seed=3)
+    obj, _ = synthetic.build_garment(bpy, spec)
+    scene = bpy.context.scene
+    scene.collection.objects.link(obj)
+    props = scene.garment_uv
+    synthetic.fill_annotation(props, obj, spec)
+    yield props, obj
+    scene.collection.objects.unlink(obj)
+    props.parts.clear()
+    synthetic.remove_garment(bpy, obj)
+
+
+def _run(job):
+    while not job.done:
+        job.step()
+        time.sleep(0.001)
+    return job
+
+
+def test_job_writes_the_same_json_as_sync_export(annotated, tmp_path):
+    props, obj = annotated
+    sync_path = tmp_path / "sync.json"
+    job_path = tmp_path / "job.json"
+    _write_json(str(sync_path), _props_to_dict_for_objects(props, [obj]))
+    invalidate_membership()
+    job = _run(ExportJob(props, [obj], str(job_path)))
+    assert job.status == "FINISHED", job.error
+    assert filecmp.cmp(sync_path, job_path, shallow=False)
+
+
+@pytest.mark.parametrize("changed", ["object", "mesh"])
+def test_geometry_update_during_capture_fails_the_job(annotated, tmp_path, changed):
+    props, obj = annotated
+    invalidate_membership()
+    job = ExportJob(props, [obj], str(tmp_path / "job.json"))
+    (capture,) = job._captures
+    assert not capture.captured
+    capture.read_step()
+    # ウェイトペイントや UV の編集で depsgraph が形状の更新を通知した
+    _geometry_changed((obj if changed == "object" else obj.data).as_pointer())
+    with pytest.raises(RuntimeError):
+        capture.read_step()
+    job.step()
+    assert job.status == "FAILED"
+    assert obj.name in job.error
+    assert not (tmp_path / "job.json").exists()
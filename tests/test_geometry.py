@@ -0,0 +1,161 @@
+"""パーツ・シームの配列ファイル（.gpuvg）の書き出し・置き換えの順序と読み出し。"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import synthetic
+from garment_pattern_uv.core.geometry import ALIGNMENT, GeometryFile, GeometryWriter
+from garment_pattern_uv.data_io import (
+    _export_model_for_objects,
+    _geometry_path,
+    _write_json_with_geometry,
+)
+from garment_pattern_uv.mesh_sync import _vertices_by_group
+
+
+def _leftovers(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_writer_aligns_arrays_and_reads_back(tmp_path):
+    path = tmp_path / "garment.gpuvg"
+    vertices = np.arange(5, dtype=np.int32)
+    # ビッグエンディアンで渡してもリトルエンディアンで書く
+    positions = np.arange(9, dtype=">f4").reshape(3, 3)
+    with GeometryWriter(str(path)) as writer:
+        vertices_ref = writer.add(vertices)
+        positions_ref = writer.add(positions)
+        assert not path.exists()
+    assert vertices_ref == {"offset": 0, "dtype": "<i4", "shape": [5]}
+    assert positions_ref == {"offset": ALIGNMENT, "dtype": "<f4", "shape": [3, 3]}
+    assert path.stat().st_size == writer.size == ALIGNMENT + positions.nbytes
+    assert not _leftovers(tmp_path)
+
+    with GeometryFile(str(path), writer.size) as geometry:
+        np.testing.assert_array_equal(geometry.array(vertices_ref), vertices)
+        np.testing.assert_array_equal(geometry.array(positions_ref), positions)
+        assert geometry.arrays({"object": "Body", "vertices": vertices_ref}).keys() == {
+            "vertices"
+        }
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "garment.gpuvg"
+    path.write_bytes(b"previous")
+    with pytest.raises(RuntimeError):
+        with GeometryWriter(str(path)) as writer:
+            writer.add(np.arange(3, dtype=np.int32))
+            raise RuntimeError("interrupted")
+    assert path.read_bytes() == b"previous"
+    assert not _leftovers(tmp_path)
+
+
+def test_flush_does_not_replace_until_commit(tmp_path):
+    path = tmp_path / "garment.gpuvg"
+    path.write_bytes(b"previous")
+    writer = GeometryWriter(str(path))
+    writer.add(np.arange(3, dtype=np.int32))
+    writer.flush()
+    assert path.read_bytes() == b"previous"
+    assert len(_leftovers(tmp_path)) == 1
+    writer.discard()
+    assert path.read_bytes() == b"previous"
+    assert not _leftovers(tmp_path)
+
+    writer = GeometryWriter(str(path))
+    writer.add(np.arange(3, dtype=np.int32))
+    writer.commit()
+    # 置き換えた後の discard はファイルを消さない
+    writer.discard()
+    assert path.stat().st_size == writer.size
+
+
+def test_geometry_file_checks_the_annotation(tmp_path):
+    path = tmp_path / "garment.gpuvg"
+    with GeometryWriter(str(path)) as writer:
+        writer.add(np.arange(3, dtype=np.int32))
+    json_path = str(tmp_path / "garment.json")
+    with pytest.raises(ValueError):
+        GeometryFile(str(path), writer.size + 1)
+    with pytest.raises(ValueError):
+        GeometryFile.for_annotation(json_path, {"parts": []})
+    data = {"geometry": {"file": path.name, "size": writer.size}}
+    with GeometryFile.for_annotation(json_path, data) as geometry:
+        assert geometry.path == str(path)
+
+
+@pytest.fixture
+def annotated(bpy):
+    spec = synthetic.GarmentSpec("geometry_garment", 6_000, 6, 4, 12, 0.5, seed=11)
+    obj, _ = synthetic.build_garment(bpy, spec)
+    scene = bpy.context.scene
+    scene.collection.objects.link(obj)
+    props = scene.garment_uv
+    synthetic.fill_annotation(props, obj, spec)
+    yield props, obj
+    scene.collection.objects.unlink(obj)
+    props.parts.clear()
+    synthetic.remove_garment(bpy, obj)
+
+
+def test_json_references_part_and_seam_arrays(annotated, tmp_path):
+    props, obj = annotated
+    json_path = str(tmp_path / "garment.json")
+    assert _write_json_with_geometry(json_path, _export_model_for_objects(props, [obj]))
+    assert not _leftovers(tmp_path)
+    with open(json_path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    assert data["geometry"]["file"] == os.path.basename(_geometry_path(json_path))
+
+    membership = _vertices_by_group(obj)
+    coords = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+    obj.data.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3)
+    seams_checked = 0
+    with GeometryFile.for_annotation(json_path, data) as geometry:
+        for part in data["parts"]:
+            (entry,) = part["geometry"]
+            arrays = geometry.arrays(entry)
+            assert entry["object"] == obj.name
+            np.testing.assert_array_equal(
+                arrays["vertices"], membership.indices_of(part["name"])
+            )
+            np.testing.assert_array_equal(arrays["positions"], coords[arrays["vertices"]])
+            assert arrays["face_sizes"].sum() == len(arrays["face_vertices"])
+            assert len(arrays["face_uvs"]) == len(arrays["face_vertices"])
+            assert arrays["face_vertices"].max() < len(arrays["vertices"])
+            for seam in part["seams"]:
+                if "geometry" not in seam:
+                    continue
+                (entry,) = seam["geometry"]
+                arrays = geometry.arrays(entry)
+                assert arrays["edges"].max() < len(arrays["vertices"])
+                sides = arrays["edge_sides"]
+                assert np.all(np.diff(sides) >= 0)
+                assert sides.max() < len(arrays["edges"])
+                assert arrays["edge_side_uvs"].shape == (len(sides), 2, 2)
+                seams_checked += 1
+    assert seams_checked
+
+
+def test_stopped_write_keeps_both_previous_files(annotated, tmp_path):
+    props, obj = annotated
+    json_path = str(tmp_path / "garment.json")
+    model = _export_model_for_objects(props, [obj])
+    assert _write_json_with_geometry(json_path, model)
+    with open(json_path, "rb") as handle:
+        previous_json = handle.read()
+    with open(_geometry_path(json_path), "rb") as handle:
+        previous_geometry = handle.read()
+
+    props.parts[0].label = "書き換えたラベル"
+    model = _export_model_for_objects(props, [obj])
+    assert not _write_json_with_geometry(json_path, model, should_stop=lambda: True)
+    with open(json_path, "rb") as handle:
+        assert handle.read() == previous_json
+    with open(_geometry_path(json_path), "rb") as handle:
+        assert handle.read() == previous_geometry
+    assert not _leftovers(tmp_path)
@@ -0,0 +1,75 @@
+"""頂点グループ名の接頭辞ルールによる分類と、オブジェクトごとの分類結果の使い回し。"""
+
+import pytest
+
+from garment_pattern_uv.constants import GROUP_PREFIX_RULES
+from garment_pattern_uv.core.groups import (
+    GroupClassifier,
+    group_index_for,
+    invalidate_group_index,
+    set_prefix_rules,
+    split_group_names,
+)
+
+
+@pytest.fixture
+def default_rules():
+    yield
+    set_prefix_rules(GROUP_PREFIX_RULES)
+
+
+def test_default_rules_ignore_case_and_leading_spaces():
+    classifier = GroupClassifier()
+    assert classifier.role("part_front") == "part"
+    assert classifier.role("  PART_back") == "part"
+    assert classifier.role("Seam_side") == "seam"
+    assert classifier.role("front_part_") is None
+    assert classifier.role("part") is None
+
+
+def test_earlier_rules_win():
+    classifier = GroupClassifier((("dart", "part_dart_"), ("part", "part_")))
+    assert classifier.roles == ("dart", "part")
+    assert classifier.role("part_dart_waist") == "dart"
+    assert classifier.role("part_skirt") == "part"
+
+
+def test_split_keeps_group_order():
+    names = ["seam_b", "part_2", "Group", "part_1", "seam_a"]
+    assert split_group_names(names) == (["part_2", "part_1"], ["seam_b", "seam_a"])
+
+
+def test_index_is_reused_until_names_change():
+    invalidate_group_index()
+    first = group_index_for(1, ["part_a", "seam_x"])
+    assert group_index_for(1, ("part_a", "seam_x")) is first
+    changed = group_index_for(1, ["part_a", "seam_y"])
+    assert changed is not first
+    assert changed.seam_names == ("seam_y",)
+    assert changed.index_of("seam_y") == 1
+    assert changed.index_of("missing") == -1
+    assert changed.role_of("part_a") == "part"
+    invalidate_group_index(1)
+
+
+def test_shared_index_cannot_be_mutated_by_callers():
+    invalidate_group_index()
+    index = group_index_for(2, ["part_a", "part_b", "seam_x"])
+    assert isinstance(index.part_names, tuple)
+    with pytest.raises(AttributeError):
+        index.part_names.append("part_c")
+    assert group_index_for(2, ["part_a", "part_b", "seam_x"]).part_names == (
+        "part_a",
+        "part_b",
+    )
+    assert index.names_with("dart") == ()
+    invalidate_group_index(2)
+
+
+def test_custom_rules_replace_the_cache(default_rules):
+    invalidate_group_index()
+    group_index_for(3, ["dart_waist", "part_a"])
+    set_prefix_rules((("dart", "dart_"),) + GROUP_PREFIX_RULES)
+    index = group_index_for(3, ["dart_waist", "part_a"])
+    assert index.names_with("dart") == ("dart_waist",)
+    assert index.part_names == ("part_a",)
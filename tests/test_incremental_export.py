@@ -0,0 +1,149 @@
+"""入力ハッシュ（ContentHasher）と、前回のマニフェストを使い回す再エクスポート。"""
+
+import os
+
+import numpy as np
+import pytest
+
+import synthetic
+from garment_pattern_uv import data_io
+from garment_pattern_uv.batch_export import export_library
+from garment_pattern_uv.core.content_hash import ContentHasher
+from garment_pattern_uv.core.membership import invalidate_membership
+from garment_pattern_uv.data_io import _export_input_hash
+from garment_pattern_uv.reasoning_text import set_reasoning_value
+
+FILE_COUNT = 3
+
+
+def _digest(*updates):
+    hasher = ContentHasher()
+    for method, *args in updates:
+        getattr(hasher, method)(*args)
+    return hasher.hexdigest()
+
+
+def test_hasher_separates_names_types_and_shapes():
+    values = np.arange(6, dtype=np.int32)
+    assert _digest(("update_text", "a", "bc")) == _digest(("update_text", "a", "bc"))
+    assert _digest(("update_text", "a", "bc")) != _digest(("update_text", "ab", "c"))
+    assert _digest(("update_array", "v", values)) != _digest(
+        ("update_array", "v", values.astype(np.int64))
+    )
+    assert _digest(("update_array", "v", values)) != _digest(
+        ("update_array", "v", values.reshape(2, 3))
+    )
+    # JSON はキー順に依らない
+    assert _digest(("update_json", "j", {"a": 1, "b": [2]})) == _digest(
+        ("update_json", "j", {"b": [2], "a": 1})
+    )
+
+
+def test_mesh_digest_follows_uvs(garment):
+    obj, _ = garment
+    mesh = obj.data
+
+    def digest():
+        hasher = ContentHasher()
+        hasher.update_mesh(mesh, "UVMap")
+        return hasher.hexdigest()
+
+    before = digest()
+    assert digest() == before
+    layer = mesh.uv_layers["UVMap"]
+    uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    layer.data.foreach_get("uv", uvs)
+    uvs[0] += 0.5
+    layer.data.foreach_set("uv", uvs)
+    assert digest() != before
+
+    hasher = ContentHasher()
+    hasher.update_mesh(mesh, "Missing")
+    assert hasher.hexdigest() not in (before, digest())
+
+
+@pytest.fixture
+def annotated(bpy):
+    spec = synthetic.GarmentSpec("incremental_garment", 6_000, 6, 4, 12, 0.5, seed=5)
+    obj, _ = synthetic.build_garment(bpy, spec)
+    scene = bpy.context.scene
+    scene.collection.objects.link(obj)
+    props = scene.garment_uv
+    synthetic.fill_annotation(props, obj, spec)
+    yield props, obj
+    scene.collection.objects.unlink(obj)
+    props.parts.clear()
+    synthetic.remove_garment(bpy, obj)
+
+
+def test_input_hash_follows_props_membership_and_format(annotated, monkeypatch):
+    props, obj = annotated
+    before = _export_input_hash(props, [obj])
+    assert _export_input_hash(props, [obj]) == before
+
+    set_reasoning_value(props.parts[0], "uv_reasoning", "書き換えた理由")
+    after_props = _export_input_hash(props, [obj])
+    assert after_props != before
+
+    obj.vertex_groups[0].add([len(obj.data.vertices) - 1], 1.0, "REPLACE")
+    invalidate_membership(obj.as_pointer())
+    after_membership = _export_input_hash(props, [obj])
+    assert after_membership != after_props
+
+    monkeypatch.setattr(data_io, "EXPORT_FORMAT_VERSION", data_io.EXPORT_FORMAT_VERSION + 1)
+    assert _export_input_hash(props, [obj]) != after_membership
+
+
+@pytest.fixture
+def library(bpy, annotated, tmp_path, monkeypatch):
+    """同じ 1 シーンを開いたことにする .blend を並べたライブラリ。"""
+    # fake_bpy では .blend を開けないので、開いても現在のシーンのまま
+    monkeypatch.setattr(bpy.ops.wm, "open_mainfile", lambda **_kwargs: None, raising=False)
+    input_root = tmp_path / "library"
+    for index in range(FILE_COUNT):
+        directory = input_root / f"garment_{index}"
+        directory.mkdir(parents=True)
+        (directory / "garment.blend").write_bytes(os.urandom(1024))
+    props, _ = annotated
+    return props, str(input_root), str(tmp_path / "export")
+
+
+def _counts(manifest):
+    assert not manifest["failed_files"]
+    return manifest["unchanged_files"], manifest["unchanged_garments"]
+
+
+def test_unchanged_library_is_not_reopened(library):
+    _, input_root, output_root = library
+    assert _counts(export_library(input_root, output_root)) == (0, 0)
+    assert _counts(export_library(input_root, output_root)) == (FILE_COUNT, FILE_COUNT)
+
+
+def test_changed_blend_is_reopened_but_reused_when_inputs_match(library):
+    props, input_root, output_root = library
+    export_library(input_root, output_root)
+    with open(os.path.join(input_root, "garment_0", "garment.blend"), "ab") as handle:
+        handle.write(b"\0")
+    assert _counts(export_library(input_root, output_root)) == (FILE_COUNT - 1, FILE_COUNT)
+
+    with open(os.path.join(input_root, "garment_1", "garment.blend"), "ab") as handle:
+        handle.write(b"\0")
+    set_reasoning_value(props.parts[0], "uv_reasoning", "書き換えた理由")
+    assert _counts(export_library(input_root, output_root)) == (
+        FILE_COUNT - 1,
+        FILE_COUNT - 1,
+    )
+
+
+def test_missing_output_is_written_again(library):
+    _, input_root, output_root = library
+    manifest = export_library(input_root, output_root)
+    os.remove(manifest["files"][0]["garments"][0]["output"])
+    assert _counts(export_library(input_root, output_root)) == (FILE_COUNT - 1, FILE_COUNT - 1)
+
+
+def test_non_incremental_run_writes_everything(library):
+    _, input_root, output_root = library
+    export_library(input_root, output_root)
+    manifest = export_library(input_root, output_root, incremental=False)
+    assert _counts(manifest) == (0, 0)
@@ -0,0 +1,93 @@
+"""パーツ・シームの位置の逆引き（item_index）と、古くなった位置からの作り直し。"""
+
+import pytest
+
+from garment_pattern_uv.core import profiling
+from garment_pattern_uv.item_index import (
+    find_part,
+    find_seam,
+    invalidate_item_index,
+    locate_seam,
+)
+
+
+@pytest.fixture
+def props(bpy):
+    props = bpy.context.scene.garment_uv
+    props.parts.clear()
+    for part_name, seam_names in (
+        ("part_a", ["seam_1", "seam_2", "seam_3"]),
+        ("part_b", ["seam_4"]),
+        ("part_c", []),
+    ):
+        part = props.parts.add()
+        part.name = part_name
+        for seam_name in seam_names:
+            seam = part.seams.add()
+            seam.name = seam_name
+    invalidate_item_index()
+    was_enabled = profiling.is_enabled()
+    profiling.enable()
+    profiling.reset()
+    yield props
+    profiling.enable(was_enabled)
+    profiling.reset()
+    invalidate_item_index()
+    props.parts.clear()
+
+
+def _rebuilds():
+    return profiling.snapshot()["counters"].get("item_index.rebuild", 0)
+
+
+def test_lookups_share_one_index(props):
+    assert find_part(props, "part_c") == 2
+    assert find_seam(props, 0, "seam_2") == 1
+    assert find_part(props, "part_missing") == -1
+    assert find_seam(props, 1, "seam_missing") == -1
+    assert _rebuilds() == 1
+
+
+def test_rename_without_invalidation_rebuilds_once(props):
+    find_part(props, "part_a")
+    # UI での名前の変更は索引を捨てない
+    props.parts[1].name = "part_B"
+    assert find_part(props, "part_B") == 1
+    assert _rebuilds() == 2
+    assert find_part(props, "part_b") == -1
+    assert _rebuilds() == 2
+
+
+def test_stale_part_position_is_rebuilt(props):
+    find_part(props, "part_a")
+    props.parts.move(0, 2)
+    assert find_part(props, "part_a") == 2
+    assert _rebuilds() == 2
+    assert find_part(props, "part_b") == 0
+    assert _rebuilds() == 2
+
+
+def test_stale_seam_position_is_rebuilt(props):
+    assert find_seam(props, 0, "seam_3") == 2
+    props.parts[0].seams.remove(0)
+    # 索引の位置 2 はもう範囲外
+    assert find_seam(props, 0, "seam_3") == 1
+    assert find_seam(props, 0, "seam_1") == -1
+    assert _rebuilds() == 2
+
+
+def test_locate_seam_follows_moves_and_removals(props):
+    seam = props.parts[0].seams[2]
+    assert locate_seam(props, seam) == (0, 2)
+    props.parts.move(0, 1)
+    assert locate_seam(props, props.parts[1].seams[2]) == (1, 2)
+    removed = props.parts[1].seams[0]
+    props.parts[1].seams.remove(0)
+    assert locate_seam(props, removed) is None
+
+
+def test_invalidation_drops_the_index(props):
+    find_part(props, "part_a")
+    invalidate_item_index(props.as_pointer())
+    find_part(props, "part_a")
+    assert _rebuilds() == 2
@@ -0,0 +1,95 @@
+"""頂点グループの所属（CSR）と、作業用メモリの上限を変えたときの隣接判定。"""
+
+import numpy as np
+
+from garment_pattern_uv.core.membership import (
+    MIN_CHUNK_VERTICES,
+    GroupMembership,
+    _bitmap,
+    _incidence,
+    set_memory_limit,
+)
+
+
+def _reference(obj):
+    """頂点ごとに読んだ グループ名 → 頂点の set。"""
+    names = {group.index: group.name for group in obj.vertex_groups}
+    result = {name: set() for name in names.values()}
+    for vertex in obj.data.vertices:
+        for element in vertex.groups:
+            if element.weight > 0:
+                result[names[element.group]].add(vertex.index)
+    return result
+
+
+def test_from_object_matches_per_vertex_read(garment):
+    obj, _ = garment
+    membership = GroupMembership.from_object(obj)
+    reference = _reference(obj)
+    assert list(membership) == [group.name for group in obj.vertex_groups]
+    for name, vertices in reference.items():
+        indices = membership.indices_of(name)
+        assert np.all(np.diff(indices) > 0), name
+        assert set(indices.tolist()) == vertices, name
+
+
+def test_chunked_read_matches_single_chunk(garment):
+    obj, _ = garment
+    whole = GroupMembership.from_object(obj)
+    # 最小のチャンク（MIN_CHUNK_VERTICES 頂点）ずつ読ませる
+    chunked = GroupMembership.from_object(obj, limit=1)
+    assert len(obj.data.vertices) > MIN_CHUNK_VERTICES
+    np.testing.assert_array_equal(whole.indptr, chunked.indptr)
+    np.testing.assert_array_equal(whole.indices, chunked.indices)
+
+
+def test_from_buffers_drops_zero_weights_and_unknown_groups():
+    membership = GroupMembership.from_buffers(
+        ["a", "b"],
+        np.array([0, 1, 2, 2, 3], dtype=np.int32),
+        np.array([0, 0, 1, 5, 1], dtype=np.int32),
+        np.array([1.0, 0.0, 0.5, 1.0, 1.0], dtype=np.float32),
+        4,
+    )
+    assert membership.indices_of("a").tolist() == [0]
+    assert membership.indices_of("b").tolist() == [2, 3]
+    assert 2 in membership["b"]
+    assert membership["a"].isdisjoint(membership["b"])
+
+
+def test_groups_by_vertex_is_inverse_of_membership(garment):
+    obj, _ = garment
+    membership = GroupMembership.from_object(obj)
+    names = [name for name in membership if name.startswith("part_")]
+    indptr, columns = membership.groups_by_vertex(names)
+    for column, name in enumerate(names):
+        rows = [
+            vertex
+            for vertex in range(membership.vertex_count)
+            if column in columns[indptr[vertex] : indptr[vertex + 1]]
+        ]
+        assert rows == membership.indices_of(name).tolist()
+
+
+def test_bitmap_incidence_matches_set_intersection():
+    rng = np.random.default_rng(0)
+    groups = [np.unique(rng.integers(0, 5000, size=size)) for size in (3, 40, 700, 2500)]
+    bitmaps = [_bitmap(indices.astype(np.int64)) for indices in groups]
+    expected = np.array(
+        [[bool(set(a.tolist()) & set(b.tolist())) for b in groups] for a in groups]
+    )
+    for limit in (1, 256, 1 << 20):
+        np.testing.assert_array_equal(_incidence(bitmaps, bitmaps, limit), expected)
+
+
+def test_incidence_does_not_depend_on_memory_limit(garment, restore_memory_limit):
+    obj, _ = garment
+    default = GroupMembership.from_object(obj)
+    part_names = [name for name in default if name.startswith("part_")]
+    seam_names = [name for name in default if name.startswith("seam_")]
+    expected = default.incidence(seam_names, part_names)
+
+    set_memory_limit(1024)
+    bounded = GroupMembership.from_object(obj)
+    np.testing.assert_array_equal(bounded.incidence(seam_names, part_names), expected)
+    np.testing.assert_array_equal(bounded.indices, default.indices)
@@ -0,0 +1,138 @@
+"""理由テキストのストア（内容ハッシュで 1 件ずつ保持）と以前の形式からの移行。"""
+
+import pytest
+
+from garment_pattern_uv import reasoning_text
+from garment_pattern_uv.reasoning_text import (
+    collect_reasoning_garbage,
+    migrate_reasoning,
+)
+
+
+@pytest.fixture
+def props(bpy):
+    props = bpy.context.scene.garment_uv
+
+    def clear():
+        props.parts.clear()
+        props.design_reasoning_ref = ""
+        props.reasoning_store.clear()
+        for text in list(bpy.data.texts):
+            bpy.data.texts.remove(text)
+        reasoning_text._VALUES.clear()
+
+    clear()
+    yield props
+    clear()
+
+
+def _part(props, name, seam_names=()):
+    part = props.parts.add()
+    part.name = name
+    for seam_name in seam_names:
+        seam = part.seams.add()
+        seam.name = seam_name
+    return part
+
+
+def _legacy(bpy, owner, field, value):
+    """以前の形式（文字列プロパティ + gpuv.* の Text）で値を持たせる。"""
+    text = bpy.data.texts.new(f"gpuv.{owner.name}.{field}")
+    text.write(value)
+    owner[field] = value
+    setattr(owner, f"{field}_text", text)
+    return text
+
+
+def test_equal_values_share_one_blob(props):
+    front = _part(props, "part_front", ["seam_side"])
+    back = _part(props, "part_back")
+    front.modeling_reasoning = "直線裁ち"
+    back.modeling_reasoning = "直線裁ち"
+    front.seams[0].seam_reasoning = "脇"
+    assert len(props.reasoning_store) == 2
+    assert front.modeling_reasoning_ref == back.modeling_reasoning_ref
+    # キャッシュが空でもストアから読める
+    reasoning_text._VALUES.clear()
+    assert back.modeling_reasoning == "直線裁ち"
+    assert front.seams[0].seam_reasoning == "脇"
+
+
+def test_unreferenced_blobs_are_collected(props):
+    part = _part(props, "part_front")
+    part.modeling_reasoning = "古い理由"
+    part.modeling_reasoning = "新しい理由"
+    part.uv_reasoning = ""
+    assert part.uv_reasoning_ref == ""
+    assert len(props.reasoning_store) == 2
+    assert collect_reasoning_garbage(props) == 1
+    assert [blob.value for blob in props.reasoning_store] == ["新しい理由"]
+    assert part.modeling_reasoning == "新しい理由"
+
+
+def test_setter_leaves_legacy_texts_to_the_migration(bpy, props):
+    part = _part(props, "part_front")
+    modeling = _legacy(bpy, part, "modeling_reasoning", "以前の理由")
+    uv = _legacy(bpy, part, "uv_reasoning", "以前の UV 理由")
+    assert part.modeling_reasoning == "以前の理由"
+
+    part.modeling_reasoning = "書き換えた理由"
+    part.uv_reasoning = ""
+    # set はストアと参照だけを書き、Text も文字列プロパティも消さない
+    assert set(bpy.data.texts) == {modeling, uv}
+    assert "modeling_reasoning" in part.keys()
+    assert part.modeling_reasoning == "書き換えた理由"
+    # 空にした値が以前の形式の値に戻らない
+    assert part.uv_reasoning == ""
+
+    assert migrate_reasoning(props) == 0
+    assert not bpy.data.texts
+    assert "modeling_reasoning" not in part.keys()
+    assert part.modeling_reasoning == "書き換えた理由"
+    assert part.uv_reasoning == ""
+    assert part.uv_reasoning_ref == ""
+
+
+def test_migration_moves_legacy_values_into_the_store(bpy, props):
+    front = _part(props, "part_front", ["seam_side"])
+    back = _part(props, "part_back")
+    _legacy(bpy, front, "modeling_reasoning", "定型の理由")
+    _legacy(bpy, back, "modeling_reasoning", "定型の理由")
+    _legacy(bpy, front.seams[0], "seam_reasoning", "脇")
+    # Text の無い、文字列プロパティだけの値
+    props["design_reasoning"] = "全体の理由"
+
+    assert migrate_reasoning(props) == 4
+    assert not bpy.data.texts
+    assert len(props.reasoning_store) == 3
+    assert front.modeling_reasoning_text is None
+    assert "design_reasoning" not in props.keys()
+    reasoning_text._VALUES.clear()
+    assert props.design_reasoning == "全体の理由"
+    assert back.modeling_reasoning == "定型の理由"
+    assert front.seams[0].seam_reasoning == "脇"
+    assert migrate_reasoning(props) == 0
+
+
+def test_migration_keeps_texts_used_elsewhere(bpy, props):
+    part = _part(props, "part_front")
+    _legacy(bpy, part, "modeling_reasoning", "理由")
+    # gpuv.* 以外の名前はユーザーが作った Text なので残す
+    own = bpy.data.texts.new("notes")
+    own.write("メモ")
+    part.uv_reasoning_text = own
+
+    migrate_reasoning(props)
+    assert list(bpy.data.texts) == [own]
+    assert part.uv_reasoning == "メモ"
+
+
+def test_save_pre_migrates_then_collects(bpy, props):
+    part = _part(props, "part_front")
+    _legacy(bpy, part, "modeling_reasoning", "以前の理由")
+    part.uv_reasoning = "使われなくなる理由"
+    part.uv_reasoning = "残る理由"
+
+    reasoning_text._reasoning_save_pre()
+    assert not bpy.data.texts
+    assert sorted(blob.value for blob in props.reasoning_store) == ["以前の理由", "残る理由"]
@@ -0,0 +1,113 @@
+"""パーツ・シームのコレクションをグループ名に合わせる処理（リネームの対応付けを含む）。"""
+
+import pytest
+
+from garment_pattern_uv.core.reconcile import (
+    pair_renames,
+    reconcile_collection,
+    reconcile_parts,
+)
+
+
+@pytest.fixture
+def props(bpy):
+    props = bpy.context.scene.garment_uv
+    props.parts.clear()
+    props.active_part_index = -1
+    yield props
+    props.parts.clear()
+    props.active_part_index = -1
+
+
+def _fill(props, seams_by_part):
+    for part_name, seam_names in seams_by_part.items():
+        part = props.parts.add()
+        part.name = part_name
+        part.label = part_name.upper()
+        for seam_name in seam_names:
+            seam = part.seams.add()
+            seam.name = seam_name
+
+
+@pytest.mark.parametrize(
+    ("old", "new", "expected"),
+    [
+        (["a", "b", "c"], ["a", "B", "c"], {"b": "B"}),
+        (["a", "b", "c"], ["A", "b", "C"], {"a": "A", "c": "C"}),
+        # 追加は末尾に付くので、手前のリネームは位置で対応が付く
+        (["a", "b"], ["a", "B", "x"], {"b": "B"}),
+        # 削除と同じ同期でのリネームも、残った名前で並びを揃えて対応を付ける
+        (["part_a", "part_b", "part_c"], ["part_a2", "part_c"], {"part_a": "part_a2"}),
+        (["part_a", "part_b", "part_c"], ["part_a", "part_c2"], {"part_c": "part_c2"}),
+        (["a", "b", "c"], ["a", "C"], {"c": "C"}),
+        # どれが削除か名前で決まらないときは前を対応付ける
+        (["a", "b", "c"], ["a", "x"], {"b": "x"}),
+        # 削除と無関係な追加を対応付けない
+        (["a", "b", "c"], ["b", "c", "d"], {}),
+        (["a", "b"], ["b", "a"], {}),
+        (["a", "b"], ["a", "b"], {}),
+    ],
+)
+def test_pair_renames(old, new, expected):
+    assert pair_renames(old, new) == expected
+
+
+def test_reconcile_collection_touches_only_changes(props):
+    _fill(props, {"part_a": ["seam_1"], "part_b": ["seam_2"], "part_c": []})
+    added = reconcile_collection(props.parts, ["part_a", "part_B", "part_c", "part_d"])
+    assert added == {"part_d"}
+    assert [part.name for part in props.parts] == ["part_a", "part_B", "part_c", "part_d"]
+    # 既存の要素は作り直さず、リネームした要素もデータを保つ
+    # （Blender では移動で要素のアドレスが変わるので、中身で比べる）
+    assert [part.label for part in props.parts] == ["PART_A", "PART_B", "PART_C", ""]
+    assert [[seam.name for seam in part.seams] for part in props.parts] == [
+        ["seam_1"],
+        ["seam_2"],
+        [],
+        [],
+    ]
+
+
+def test_reconcile_collection_renames_beside_a_deletion(props):
+    _fill(props, {"part_a": [], "part_b": [], "part_c": []})
+    added = reconcile_collection(props.parts, ["part_a2", "part_c"])
+    assert added == set()
+    assert [part.name for part in props.parts] == ["part_a2", "part_c"]
+    assert [part.label for part in props.parts] == ["PART_A", "PART_C"]
+
+
+def test_reconcile_collection_drops_removed_data(props):
+    _fill(props, {"part_a": [], "part_b": [], "part_c": []})
+    reconcile_collection(props.parts, ["part_b", "part_c", "part_d"])
+    assert [part.name for part in props.parts] == ["part_b", "part_c", "part_d"]
+    assert props.parts[2].label == ""
+
+
+def test_reconcile_collection_moves_to_group_order(props):
+    _fill(props, {"part_a": [], "part_b": [], "part_c": []})
+    reconcile_collection(props.parts, ["part_c", "part_a", "part_b"])
+    assert [part.name for part in props.parts] == ["part_c", "part_a", "part_b"]
+    assert [part.label for part in props.parts] == ["PART_C", "PART_A", "PART_B"]
+
+
+def test_reconcile_parts_keeps_active_items_by_name(props):
+    _fill(props, {"part_a": ["seam_1", "seam_2"], "part_b": ["seam_3"]})
+    # シームの選択 update がアクティブパーツを変えるので、パーツは後で選ぶ
+    props.parts[0].active_seam_index = 1
+    props.active_part_index = 1
+
+    reconcile_parts(
+        props,
+        ["part_new", "part_a", "part_b"],
+        {
+            "part_new": ["seam_4"],
+            "part_a": ["seam_0", "seam_1", "seam_2"],
+            "part_b": ["seam_3"],
+        },
+    )
+    assert [part.name for part in props.parts] == ["part_new", "part_a", "part_b"]
+    assert props.active_part_index == 2
+    part_a = props.parts[1]
+    assert [seam.name for seam in part_a.seams] == ["seam_0", "seam_1", "seam_2"]
+    assert part_a.seams[part_a.active_seam_index].name == "seam_2"
+    assert props.parts[0].active_seam_index == 0
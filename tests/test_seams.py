@@ -0,0 +1,104 @@
+"""シームのパーツへの割り当て（辺・頂点の共有）と並び順、折れ線と長さ。"""
+
+import numpy as np
+
+from garment_pattern_uv.core.membership import GroupMembership
+from garment_pattern_uv.core.seams import order_seams, seams_by_incidence, seams_for_export
+from garment_pattern_uv.core.topology import MeshTopology
+from garment_pattern_uv.mesh_sync import _split_group_names
+
+
+def _membership(groups, vertex_count):
+    names = list(groups)
+    vertices = np.concatenate([np.asarray(groups[name], dtype=np.int32) for name in names])
+    slots = np.repeat(
+        np.arange(len(names), dtype=np.int32), [len(groups[name]) for name in names]
+    )
+    return GroupMembership.from_buffers(
+        names, vertices, slots, np.ones(vertices.size, dtype=np.float32), vertex_count
+    )
+
+
+def _line(vertex_count):
+    """x 軸上に並んだ頂点を順につないだメッシュ。"""
+    edges = np.stack(
+        [np.arange(vertex_count - 1), np.arange(1, vertex_count)], axis=1
+    ).astype(np.int32)
+    coords = np.zeros((vertex_count, 3), dtype=np.float32)
+    coords[:, 0] = np.arange(vertex_count)
+    return MeshTopology(edges, coords)
+
+
+def test_edge_assignment_requires_both_endpoints_in_part():
+    topology = _line(6)
+    membership = _membership(
+        {
+            "part_a": [0, 1, 2],
+            "part_b": [3, 4, 5],
+            # 辺 (1, 2) は part_a の中、辺 (2, 3) は境界をまたぐ
+            "seam_inside": [1, 2, 3],
+            # 辺 (2, 3) だけで、どちらのパーツにも両端が入らない
+            "seam_across": [2, 3],
+            # 辺に乗らない孤立した頂点
+            "seam_stray": [0, 5],
+        },
+        6,
+    )
+    parts = ["part_a", "part_b"]
+    seams = ["seam_inside", "seam_across", "seam_stray"]
+    assert seams_by_incidence(membership, parts, seams, topology) == {
+        "part_a": {"seam_inside"},
+        "part_b": set(),
+    }
+    # 辺が無ければ頂点の共有で判定する
+    assert seams_by_incidence(membership, parts, seams) == {
+        "part_a": {"seam_inside", "seam_across", "seam_stray"},
+        "part_b": {"seam_inside", "seam_across", "seam_stray"},
+    }
+
+
+def test_edge_assignment_matches_generator(garment):
+    obj, expected = garment
+    membership = GroupMembership.from_object(obj)
+    part_names, seam_names = _split_group_names(obj)
+    topology = MeshTopology.from_mesh(obj.data)
+    assert seams_by_incidence(membership, part_names, seam_names, topology) == expected
+
+
+def test_order_seams_follows_group_order_and_keeps_reasoned_seams():
+    seams_by_part = {"part_a": {"seam_c", "seam_a"}, "part_b": set()}
+    snapshot = {
+        "part_b": {
+            "seams": {
+                "seam_b": {"seam_reasoning": "縫い代を揃える"},
+                "seam_c": {"seam_reasoning": "  "},
+                "seam_gone": {"seam_reasoning": "消えたシーム"},
+            }
+        }
+    }
+    ordered = order_seams(
+        seams_by_part, ["part_a", "part_b"], ["seam_a", "seam_b", "seam_c"], snapshot
+    )
+    assert ordered == {"part_a": ["seam_a", "seam_c"], "part_b": ["seam_b"]}
+
+
+def test_seams_for_export_uses_topology():
+    topology = _line(4)
+    membership = _membership(
+        {"part_a": [0, 1], "part_b": [2, 3], "seam_x": [1, 2], "seam_y": [0, 1]}, 4
+    )
+    result = seams_for_export(
+        membership, ["part_a", "part_b"], ["seam_x", "seam_y"], {}, topology
+    )
+    assert result == {"part_a": ["seam_y"], "part_b": []}
+
+
+def test_seam_polylines_and_length():
+    topology = _line(8)
+    membership = _membership({"seam_split": [0, 1, 2, 5, 6]}, 8)
+    shape = topology.seam(membership, "seam_split")
+    assert shape.edge_count == 3
+    assert shape.length == 3.0
+    assert sorted(shape.polylines) == [[0, 1, 2], [5, 6]]
+    # 同じ所属なら結果を使い回す
+    assert topology.seam(membership, "seam_split") is shape
@@ -0,0 +1,158 @@
+"""UVMesh の面ごとの面積・歪み・アイランドと、パーツごとの指標。"""
+
+import numpy as np
+import pytest
+
+from garment_pattern_uv.core.membership import GroupMembership
+from garment_pattern_uv.core.uv_metrics import UVMesh, finish_metrics, merge_totals
+
+# 横に並んだ 2 枚の単位正方形（z = 0）
+COORDS = np.array(
+    [[0, 0, 0], [1, 0, 0], [2, 0, 0], [0, 1, 0], [1, 1, 0], [2, 1, 0]], dtype=np.float32
+)
+FACES = ([0, 1, 4, 3], [1, 2, 5, 4])
+
+
+def _uv_mesh(uv_of_loop, faces=FACES, reverse_loops=False):
+    """faces のループに uv_of_loop(面, 頂点) の UV を付けた UVMesh。
+
+    reverse_loops なら面のループをループ配列の後ろから詰める（loop_start の並びが
+    面の並びと逆になる）。
+    """
+    totals = np.array([len(face) for face in faces], dtype=np.int32)
+    order = list(range(len(faces)))
+    if reverse_loops:
+        order.reverse()
+    starts = np.zeros(len(faces), dtype=np.int32)
+    loop_vertices = []
+    uvs = []
+    for face_index in order:
+        starts[face_index] = len(loop_vertices)
+        for vertex in faces[face_index]:
+            loop_vertices.append(vertex)
+            uvs.append(uv_of_loop(face_index, vertex))
+    return UVMesh(
+        COORDS,
+        np.array(loop_vertices, dtype=np.int32),
+        starts,
+        totals,
+        np.array(uvs, dtype=np.float32),
+    )
+
+
+def _scaled(scale):
+    return lambda _face, vertex: COORDS[vertex, :2] * scale
+
+
+def _membership(parts):
+    names = list(parts)
+    members = np.concatenate([np.asarray(vertices) for vertices in parts.values()])
+    slots = np.concatenate(
+        [np.full(len(vertices), slot) for slot, vertices in enumerate(parts.values())]
+    )
+    return GroupMembership.from_chunks(
+        names, [(members.astype(np.int32), slots.astype(np.int32))], len(COORDS)
+    )
+
+
+def _metrics(uv_mesh, parts):
+    membership = _membership(parts)
+    totals = uv_mesh.part_totals(membership, list(parts))
+    return {name: finish_metrics(entry) for name, entry in totals.items()}
+
+
+@pytest.mark.parametrize("reverse_loops", [False, True])
+def test_uniform_scale_has_no_distortion(reverse_loops):
+    uv_mesh = _uv_mesh(_scaled(0.5), reverse_loops=reverse_loops)
+    np.testing.assert_allclose(uv_mesh.area_3d, [1.0, 1.0])
+    np.testing.assert_allclose(uv_mesh.area_uv, [0.25, 0.25])
+    metrics = _metrics(uv_mesh, {"part_body": range(6)})["part_body"]
+    assert metrics == {
+        "polygon_count": 2,
+        "island_count": 1,
+        "area_3d": 2.0,
+        "area_uv": 0.5,
+        "uv_scale": 0.5,
+        "area_distortion": 0.0,
+        "angle_distortion": 0.0,
+        "packing_ratio": 1.0,
+    }
+
+
+def test_stretched_face_shows_area_and_angle_distortion():
+    # 2 枚目だけ U 方向に 2 倍（面積比は 1 と 2、log2 で 0 と 1）
+    def uv(face, vertex):
+        u, v = COORDS[vertex, :2]
+        return (1 + 2 * (u - 1), v) if face == 1 else (u, v)
+
+    uv_mesh = _uv_mesh(uv)
+    np.testing.assert_allclose(uv_mesh.log_ratio, [0.0, 1.0])
+    metrics = _metrics(uv_mesh, {"part_body": range(6)})["part_body"]
+    assert metrics["area_uv"] == 3.0
+    assert metrics["area_distortion"] == pytest.approx(0.5)
+    assert metrics["angle_distortion"] > 0
+    assert metrics["island_count"] == 1
+
+
+def test_split_uvs_make_separate_islands():
+    # 共有する辺（頂点 1, 4）の UV を 2 枚目だけずらす
+    def uv(face, vertex):
+        u, v = COORDS[vertex, :2]
+        return (u + 0.5, v) if face == 1 else (u, v)
+
+    uv_mesh = _uv_mesh(uv)
+    assert uv_mesh.islands[0] != uv_mesh.islands[1]
+    metrics = _metrics(uv_mesh, {"part_body": range(6)})["part_body"]
+    assert metrics["island_count"] == 2
+    assert metrics["packing_ratio"] == pytest.approx(2 / 2.5)
+
+
+def test_negative_zero_uv_is_the_same_uv_vertex():
+    def uv(face, vertex):
+        u, v = COORDS[vertex, :2]
+        return (-0.0 if face == 1 and u == 0 else u, v)
+
+    # 2 枚目は u = 0 の頂点 0, 3 だけを 1 枚目と共有する
+    uv_mesh = _uv_mesh(uv, faces=([0, 1, 4, 3], [0, 5, 3]))
+    assert uv_mesh.islands[0] == uv_mesh.islands[1]
+
+
+def test_faces_belong_to_parts_containing_all_their_vertices():
+    uv_mesh = _uv_mesh(_scaled(1.0))
+    metrics = _metrics(
+        uv_mesh,
+        {
+            "part_left": [0, 1, 3, 4],
+            "part_right": [1, 2, 4, 5],
+            # 頂点 5 が欠けているので面を持たない
+            "part_partial": [1, 2, 4],
+        },
+    )
+    assert set(metrics) == {"part_left", "part_right"}
+    assert metrics["part_left"]["polygon_count"] == 1
+    assert metrics["part_right"]["area_3d"] == 1.0
+
+
+def test_degenerate_uv_faces_are_left_out_of_area_distortion():
+    def uv(face, vertex):
+        u, v = COORDS[vertex, :2]
+        return (0.0, 0.0) if face == 1 else (u, v)
+
+    uv_mesh = _uv_mesh(uv)
+    assert uv_mesh.log_weight[1] == 0
+    metrics = _metrics(uv_mesh, {"part_body": range(6)})["part_body"]
+    assert metrics["area_distortion"] == 0.0
+    assert metrics["area_3d"] == 2.0
+
+
+def test_totals_merge_across_objects():
+    parts = {"part_body": range(6)}
+    first = _uv_mesh(_scaled(1.0)).part_totals(_membership(parts), list(parts))
+    second = _uv_mesh(lambda _face, vertex: COORDS[vertex, :2] + (3.0, 0.0)).part_totals(
+        _membership(parts), list(parts)
+    )
+    metrics = finish_metrics(merge_totals([first, second])["part_body"])
+    assert metrics["polygon_count"] == 4
+    assert metrics["island_count"] == 2
+    # 外接矩形は U が 0〜5、V が 0〜1
+    assert metrics["packing_ratio"] == pytest.approx(4 / 5)